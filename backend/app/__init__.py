@@ -1,17 +1,17 @@
 # app/__init__.py
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_mail import Mail
-from flask_migrate import Migrate
 from config import Config
+from app.utils.db_routing import RoutingSession
 import os
 
 # Initialize extensions outside create_app function
-db = SQLAlchemy()
+# (the routing session sends read-only requests to replicas, see utils/db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
-migrate = Migrate()
 mail = Mail()
 
 def create_app(config_class=Config):
@@ -35,11 +35,42 @@ def create_app(config_class=Config):
         app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'uploads')
         print(f"Using default upload folder: {app.config['UPLOAD_FOLDER']}")
         
+    # Connection pool sizing, pre-ping, recycle and statement timeout (see utils/db_engine.py)
+    from app.utils.db_engine import build_engine_options, init_engine_events
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(
+            app.config, app.config['SQLALCHEMY_DATABASE_URI']
+        )
+
     app.url_map.strict_slashes = False
     # Initialize extensions with app
     db.init_app(app)
+    from app.utils.schema import verify_schema
+    with app.app_context():
+        init_engine_events(app, db.engine)
+        # Refuse to start against an outdated schema (SCHEMA_CHECK, see utils/schema.py)
+        verify_schema(app, db.engine)
+
+    # Optional read replicas for GET requests
+    from app.utils.db_routing import init_db_routing
+    init_db_routing(app)
+
+    # Log changes to synced models for the /api/sync feed
+    from app.utils.change_log import init_change_log
+    init_change_log(app)
+
+    # Post-commit domain events (ExpenseCreated, UserRegistered, ...) and their subscribers
+    from app.utils.events import init_events
+    init_events(app)
+
+    # orjson for JSON responses, and 400s for unknown ?fields= (see utils/serializers.py)
+    from app.utils.serializers import init_serializers
+    init_serializers(app)
+
+    # Cache for property-scoped read endpoints, versioned by the change log
+    from app.utils.response_cache import init_response_cache
+    init_response_cache(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
     
     # Correct CORS configuration - don't use both CORS(app) and @app.after_request
     '''CORS(app, resources={r"/api/*": {
@@ -56,8 +87,8 @@ def create_app(config_class=Config):
     CORS(app, resources={r"/*": {
     "origins": origins,
     "supports_credentials": True,
-    "allow_headers": ["Content-Type", "Authorization"],
-    "expose_headers": ["Content-Type", "Authorization"],  # Add this line
+    "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key", "If-None-Match", "If-Modified-Since"],
+    "expose_headers": ["Content-Type", "Authorization", "Idempotent-Replayed", "ETag", "Last-Modified", "X-Cache"],  # Add this line
     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     }})
     mail.init_app(app)
@@ -114,6 +145,10 @@ def create_app(config_class=Config):
     from app.api.tenants import tenants_bp
     from app.api.property_users import property_users_bp
     from app.api.integrations import integrations_bp
+    from app.api.admin import admin_bp
+    from app.api.bootstrap import bootstrap_bp
+    from app.api.batch import batch_bp
+    from app.api.sync import sync_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(properties_bp, url_prefix='/api/properties')
@@ -129,5 +164,31 @@ def create_app(config_class=Config):
     app.register_blueprint(tenants_bp, url_prefix='/api/tenants')
     app.register_blueprint(property_users_bp, url_prefix='/api/property-users')
     app.register_blueprint(integrations_bp, url_prefix='/api/integrations')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(bootstrap_bp, url_prefix='/api/bootstrap')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+
+    # Request latency, status and SQL metrics on /metrics
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # gzip/brotli for responses the client accepts it for; registered after the
+    # metrics hooks so it runs first and request latency includes it
+    from app.utils.compression import init_compression
+    init_compression(app)
+
+    # Opt-in slow query log (served on /api/admin/slow-queries)
+    from app.utils.slow_query_log import init_slow_query_log
+    init_slow_query_log(app)
+
+    # Opt-in sampling profiler (managed on /api/admin/profiles)
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
+    # Register CLI commands (e.g. `flask notifications send-digest`)
+    from app.cli import register_cli
+    register_cli(app)
+
     return app
 
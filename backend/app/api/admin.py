@@ -0,0 +1,237 @@
+# api/admin.py
+import json
+import os
+import re
+import time
+import uuid
+from flask import Blueprint, request, jsonify, current_app, send_file
+from app.utils.auth_utils import admin_required
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """Get the most recent slow SQL statements, newest first"""
+    from app.utils.slow_query_log import slow_query_log
+
+    if slow_query_log is None:
+        return jsonify({"error": "Slow query log is disabled (set SLOW_QUERY_LOG_ENABLED=true)"}), 404
+
+    limit = request.args.get('limit', 100, type=int)
+    endpoint = request.args.get('endpoint')
+
+    records = slow_query_log.records()
+    if endpoint:
+        records = [record for record in records if record['endpoint'] == endpoint]
+
+    return jsonify({
+        "threshold_ms": slow_query_log.threshold_ms,
+        "explain_sample_rate": slow_query_log.explain_sample_rate,
+        "total": len(records),
+        "queries": records[:limit]
+    }), 200
+
+@admin_bp.route('/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """Clear the in-memory slow query buffer"""
+    from app.utils.slow_query_log import slow_query_log
+
+    if slow_query_log is None:
+        return jsonify({"error": "Slow query log is disabled (set SLOW_QUERY_LOG_ENABLED=true)"}), 404
+
+    slow_query_log.clear()
+    return jsonify({"message": "Slow query log cleared"}), 200
+
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def get_profiles():
+    """List stored request profiles, newest first"""
+    from app.utils.profiler import get_profiler_dir, list_profiles
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    return jsonify(list_profiles(get_profiler_dir())), 200
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def download_profile(profile_id):
+    """Download a profile as speedscope JSON (default) or collapsed stacks (?format=collapsed)"""
+    from app.utils.profiler import collapsed_to_speedscope, get_profiler_dir, profile_paths
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    paths = profile_paths(get_profiler_dir(), profile_id)
+    if not paths or not os.path.exists(paths[1]):
+        return jsonify({"error": "Profile not found"}), 404
+    collapsed_path, meta_path = paths
+
+    if request.args.get('format') == 'collapsed':
+        return send_file(collapsed_path, mimetype='text/plain', as_attachment=True,
+                         download_name=f"{profile_id}.collapsed.txt")
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(collapsed_path) as f:
+        collapsed = f.read()
+
+    # The sampler can't wake more often than the GIL switch interval allows,
+    # so spread the measured wall time over the samples actually taken
+    if meta['samples']:
+        sample_weight = meta['duration_ms'] / 1000.0 / meta['samples']
+    else:
+        sample_weight = meta['interval_ms'] / 1000.0
+
+    document = collapsed_to_speedscope(collapsed, f"{meta['method']} {meta['path']}", sample_weight)
+    response = jsonify(document)
+    response.headers['Content-Disposition'] = f'attachment; filename="{profile_id}.speedscope.json"'
+    return response, 200
+
+@admin_bp.route('/profiles/<profile_id>', methods=['DELETE'])
+@admin_required
+def delete_profile(profile_id):
+    """Delete a stored profile"""
+    from app.utils.profiler import get_profiler_dir, profile_paths
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    paths = profile_paths(get_profiler_dir(), profile_id)
+    if not paths or not os.path.exists(paths[1]):
+        return jsonify({"error": "Profile not found"}), 404
+
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+    return jsonify({"message": "Profile deleted"}), 200
+
+@admin_bp.route('/profiler/rules', methods=['GET'])
+@admin_required
+def get_profiler_rules():
+    """List the rules that select requests for sampled profiling"""
+    from app.utils.profiler import get_profiler_dir, read_rules
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    return jsonify(read_rules(get_profiler_dir())), 200
+
+@admin_bp.route('/profiler/rules', methods=['POST'])
+@admin_required
+def create_profiler_rule():
+    """Profile a fraction of requests whose path matches a regex
+
+    Body: {"pattern": "^/api/finances/reports", "sample_rate": 0.1,
+           "max_profiles": 20, "duration_minutes": 60}
+    """
+    from app.utils.profiler import get_profiler_dir, read_rules, save_rules
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    data = request.get_json() or {}
+    if not data.get('pattern'):
+        return jsonify({"error": "pattern is required"}), 400
+
+    try:
+        re.compile(data['pattern'])
+        sample_rate = float(data.get('sample_rate', 1.0))
+        max_profiles = int(data.get('max_profiles', 10))
+        duration_minutes = float(data.get('duration_minutes', 60))
+    except (re.error, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid rule: {e}"}), 400
+
+    if not 0 < sample_rate <= 1:
+        return jsonify({"error": "sample_rate must be between 0 and 1"}), 400
+
+    rule = {
+        'id': f"rule-{uuid.uuid4().hex[:8]}",
+        'pattern': data['pattern'],
+        'sample_rate': sample_rate,
+        'max_profiles': max_profiles,
+        'expires_at': time.time() + duration_minutes * 60
+    }
+
+    directory = get_profiler_dir()
+    rules = read_rules(directory)
+    rules.append(rule)
+    save_rules(directory, rules)
+
+    return jsonify(rule), 201
+
+@admin_bp.route('/profiler/rules/<rule_id>', methods=['DELETE'])
+@admin_required
+def delete_profiler_rule(rule_id):
+    """Stop a profiling rule (profiles it already captured are kept)"""
+    from app.utils.profiler import get_profiler_dir, read_rules, save_rules
+
+    if not current_app.config.get('PROFILER_ENABLED'):
+        return jsonify({"error": "Profiler is disabled (set PROFILER_ENABLED=true)"}), 404
+
+    directory = get_profiler_dir()
+    rules = read_rules(directory)
+    remaining = [rule for rule in rules if rule['id'] != rule_id]
+    if len(remaining) == len(rules):
+        return jsonify({"error": "Rule not found"}), 404
+
+    save_rules(directory, remaining)
+    return jsonify({"message": "Rule deleted"}), 200
+
+@admin_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool_stats():
+    """Connection pool occupancy and settings for this worker process"""
+    from app import db
+    from app.utils.db_engine import get_pool_stats
+    from app.utils.db_routing import get_replica_engines
+
+    options = {
+        key: (value.__name__ if isinstance(value, type) else value)
+        for key, value in current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+        if key != 'connect_args'
+    }
+
+    return jsonify({
+        "worker_pid": os.getpid(),
+        "pool": get_pool_stats(db.engine),
+        "replicas": [get_pool_stats(engine) for engine in get_replica_engines()],
+        "engine_options": options,
+        "pgbouncer_mode": current_app.config.get('DB_PGBOUNCER_MODE', False)
+    }), 200
+
+@admin_bp.route('/response-cache', methods=['GET'])
+@admin_required
+def get_response_cache_stats():
+    """Response cache size and this worker's hit ratio"""
+    from app.utils.response_cache import get_cache_stats
+
+    stats = get_cache_stats()
+    stats["worker_pid"] = os.getpid()
+    return jsonify(stats), 200
+
+@admin_bp.route('/response-cache', methods=['DELETE'])
+@admin_required
+def clear_response_cache():
+    """Drop all cached responses (only this worker's for the memory backend)"""
+    from app.utils.response_cache import get_response_cache
+
+    backend = get_response_cache()
+    if backend is None:
+        return jsonify({"error": "Response cache is disabled"}), 404
+    try:
+        backend.clear()
+    except (OSError, ConnectionError) as e:
+        return jsonify({"error": f"Could not reach the cache server: {e}"}), 503
+    return jsonify({"message": "Response cache cleared"}), 200
+
+@admin_bp.route('/jobs', methods=['GET'])
+@admin_required
+def get_job_queue_stats():
+    """Background job queue depth and dead-letter counts"""
+    from app.utils.jobs import get_queue_stats
+
+    return jsonify(get_queue_stats()), 200
@@ -6,26 +6,29 @@ from app.models.appliance import Appliance
 from app.models.user import User
 from datetime import datetime
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.response_cache import property_cached
+from app.utils.conditional import list_validators, not_modified, row_validators, with_validators
+from app.utils.serializers import APPLIANCE, APPLIANCE_DETAIL_FIELDS
 
 
 appliances_bp = Blueprint('appliances', __name__)
 
 @appliances_bp.route('/', methods=['GET'])
 @jwt_required()
+@property_cached()
 def get_appliances():
     """Get all appliances for the current user"""
     current_user_id = int(get_jwt_identity())
 
     property_id = request.args.get('property_id')
+    access = None
     
     # If property_id is provided, check access first
     if property_id:
         # Verify user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view appliances"}), 403
@@ -41,6 +44,7 @@ def get_appliances():
         ).all()
         
         property_ids = [pu.property_id for pu in property_users]
+        access = [(pu.property_id, pu.role) for pu in property_users]
         
         # Get appliances created by the user OR for properties they have owner/manager access to
         query = Appliance.query.filter(
@@ -52,32 +56,21 @@ def get_appliances():
     category = request.args.get('category')
     if category:
         query = query.filter_by(category=category)
+
+    etag, last_modified = list_validators(query, Appliance.updated_at, access=access)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
     # Execute query
-    appliances = query.order_by(Appliance.created_at.desc()).all()
-    
-    result = []
-    for appliance in appliances:
-        result.append({
-            'id': appliance.id,
-            'name': appliance.name,
-            'brand': appliance.brand,
-            'model': appliance.model,
-            'serial_number': appliance.serial_number,
-            'purchase_date': appliance.purchase_date.isoformat() if appliance.purchase_date else None,
-            'warranty_expiration': appliance.warranty_expiration.isoformat() if appliance.warranty_expiration else None,
-            'notes': appliance.notes,
-            'category': appliance.category,
-            'created_at': appliance.created_at.isoformat(),
-            'updated_at': appliance.updated_at.isoformat(),
-            'property_id': appliance.property_id,
-            'created_by': appliance.user_id  # Include who created the appliance
-        })
+    fields = APPLIANCE.requested_fields()
+    appliances = APPLIANCE.project(query, fields).order_by(Appliance.created_at.desc()).all()
     
-    return jsonify(result)
+    return with_validators(APPLIANCE.response(appliances, many=True, fields=fields), etag, last_modified)
 
 @appliances_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_appliance():
     """Add a new appliance"""
     current_user_id = int(get_jwt_identity())
@@ -91,11 +84,7 @@ def create_appliance():
     # If a property_id is provided, check permissions
     property_id = data.get('property_id')
     if property_id:
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to add appliances"}), 403
@@ -137,34 +126,20 @@ def get_appliance(appliance_id):
     if appliance.user_id != current_user_id:
         # If associated with a property, check property permissions
         if appliance.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=appliance.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(appliance.property_id, current_user_id)
             
             if not property_user:
                 return jsonify({"error": "You don't have permission to view this appliance"}), 403
         else:
             # Not user's appliance and not associated with a property they have access to
             return jsonify({"error": "Appliance not found or access denied"}), 404
+
+    etag, last_modified = row_validators(appliance)
+    cached = not_modified(etag, last_modified, use_if_modified_since=True)
+    if cached:
+        return cached
     
-    result = {
-        'id': appliance.id,
-        'name': appliance.name,
-        'brand': appliance.brand,
-        'model': appliance.model,
-        'serial_number': appliance.serial_number,
-        'purchase_date': appliance.purchase_date.isoformat() if appliance.purchase_date else None,
-        'warranty_expiration': appliance.warranty_expiration.isoformat() if appliance.warranty_expiration else None,
-        'notes': appliance.notes,
-        'category': appliance.category,
-        'created_at': appliance.created_at.isoformat(),
-        'updated_at': appliance.updated_at.isoformat(),
-        'property_id': appliance.property_id
-    }
-    
-    return jsonify(result)
+    return with_validators(APPLIANCE.response(appliance, only=APPLIANCE_DETAIL_FIELDS), etag, last_modified)
 
 @appliances_bp.route('/<int:appliance_id>', methods=['PUT'])
 @jwt_required()
@@ -180,11 +155,7 @@ def update_appliance(appliance_id):
     if appliance.user_id != current_user_id:
         # If associated with a property, check property permissions
         if appliance.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=appliance.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(appliance.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to update this appliance"}), 403
@@ -223,11 +194,7 @@ def update_appliance(appliance_id):
     if 'property_id' in data and data['property_id'] != appliance.property_id:
         new_property_id = data['property_id']
         if new_property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=new_property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(new_property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to move this appliance to the specified property"}), 403
@@ -256,11 +223,7 @@ def delete_appliance(appliance_id):
     if appliance.user_id != current_user_id:
         # If associated with a property, check property permissions
         if appliance.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=appliance.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(appliance.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to delete this appliance"}), 403
@@ -8,6 +8,7 @@ import secrets
 from datetime import datetime, timedelta
 from app.models.pending_invitation import PendingInvitation
 from app.models.Property_user import PropertyUser
+from app.utils.events import UserRegistered, emit
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -82,7 +83,8 @@ def register():
     verification_url = f"{frontend_url}/verify-email?token={verification_token}"
     
     # Send verification email instead of welcome email initially
-    send_verification_email(new_user, verification_url)
+    # (from a background subscriber, see services/event_handlers.py)
+    emit(UserRegistered(new_user.id, verification_url))
     
     return jsonify({
         "message": "User registered successfully. Please check your email to verify your account.",
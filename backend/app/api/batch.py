@@ -0,0 +1,187 @@
+# api/batch.py
+"""
+Batch endpoint: several API calls in one HTTP round trip.
+
+POST /api/batch
+    {"requests": [
+        {"id": "tenants", "method": "GET", "path": "/api/tenants/property/12"},
+        {"id": "note", "method": "POST", "path": "/api/maintenance/", "body": {...}}
+    ]}
+
+Sub-requests run in order through the normal Flask request pipeline
+(routing, jwt_required, error handlers, metrics), without network hops,
+using the caller's Authorization header. They share the outer request's
+database session, so the user and other rows loaded by one sub-request
+come from the identity map in the next, and one property-permission
+cache (see utils/property_permissions.py). Each sub-request still commits
+or fails on its own.
+"""
+import base64
+
+from flask import Blueprint, current_app, g, jsonify, request
+from flask.globals import app_ctx
+from flask_jwt_extended import jwt_required
+from werkzeug.test import EnvironBuilder
+
+from app import db
+
+batch_bp = Blueprint('batch', __name__)
+
+ALLOWED_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Headers every sub-request inherits from the batch request
+INHERITED_HEADERS = ('Authorization', 'User-Agent', 'Accept-Language', 'X-Forwarded-For')
+
+# Headers a sub-request may not set itself (bodies are embedded in the batch
+# response, which is compressed as a whole)
+FORBIDDEN_HEADERS = {'authorization', 'cookie', 'x-api-key', 'content-length', 'host', 'accept-encoding'}
+
+# Response headers passed back for each sub-request
+RETURNED_HEADERS = ('ETag', 'Last-Modified', 'Location', 'Cache-Control', 'Retry-After', 'X-Total-Count')
+
+
+def _validate_item(item):
+    if not isinstance(item, dict):
+        return "Each request must be an object"
+    method = str(item.get('method', 'GET')).upper()
+    if method not in ALLOWED_METHODS:
+        return f"Unsupported method: {method}"
+    path = item.get('path')
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return "path must be an /api/ URL path"
+    if path.rstrip('/').split('?')[0] == '/api/batch':
+        return "Batches can't be nested"
+    headers = item.get('headers', {})
+    if not isinstance(headers, dict):
+        return "headers must be an object"
+    return None
+
+
+def _build_environ(item):
+    headers = {name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers}
+    for name, value in item.get('headers', {}).items():
+        if name.lower() not in FORBIDDEN_HEADERS:
+            headers[name] = str(value)
+
+    builder = EnvironBuilder(
+        path=item['path'],
+        method=str(item.get('method', 'GET')).upper(),
+        headers=headers,
+        json=item.get('body'),
+        base_url=request.host_url,
+        environ_base={'REMOTE_ADDR': request.remote_addr}
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _response_body(response):
+    """Return (body, encoding) for a sub-response"""
+    if response.direct_passthrough:
+        return {"error": "File downloads are not supported in a batch"}, None
+    if response.is_json:
+        return response.get_json(), None
+    data = response.get_data()
+    if response.mimetype.startswith('text/'):
+        return data.decode(response.charset or 'utf-8', 'replace'), None
+    return base64.b64encode(data).decode('ascii'), 'base64'
+
+
+def _dispatch(item, memberships):
+    """Run one sub-request through the app and return its response"""
+    app = current_app._get_current_object()
+    ctx = app_ctx._get_current_object()
+
+    # The sub-request reuses this app context (and with it the DB session);
+    # give it its own `g` so request hooks don't clobber the batch's state
+    batch_g = ctx.g
+    ctx.g = app.app_ctx_globals_class()
+    ctx.g.property_memberships = memberships
+    # Read by response hooks that only make sense for the outer response (compression)
+    ctx.g.batch_subrequest = True
+
+    request_ctx = app.request_context(_build_environ(item))
+    request_ctx.push()
+    error = None
+    try:
+        response = app.full_dispatch_request()
+    except Exception as e:
+        error = e
+        db.session.rollback()
+        current_app.logger.exception(f"Batch sub-request {item['path']} failed")
+        response = app.make_response((jsonify({"error": "Internal server error"}), 500))
+    finally:
+        request_ctx.pop(error)
+        ctx.g = batch_g
+
+    # Don't let a failed sub-request's uncommitted changes leak into the next one
+    if db.session.new or db.session.dirty or db.session.deleted:
+        db.session.rollback()
+    return response
+
+
+@batch_bp.route('/', methods=['POST'])
+@jwt_required()
+def batch():
+    """Run several API requests in one round trip"""
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+    max_request_bytes = current_app.config.get('BATCH_MAX_REQUEST_BYTES', 1024 * 1024)
+    max_response_bytes = current_app.config.get('BATCH_MAX_RESPONSE_BYTES', 5 * 1024 * 1024)
+
+    if request.content_length is None or request.content_length > max_request_bytes:
+        return jsonify({"error": f"Batch body must be at most {max_request_bytes} bytes"}), 413
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('requests'), list):
+        return jsonify({"error": "Expected a JSON object with a 'requests' list"}), 400
+
+    items = data['requests']
+    if not items:
+        return jsonify({"error": "No requests given"}), 400
+    if len(items) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 400
+
+    memberships = g.setdefault('property_memberships', {})
+    responses = []
+    response_bytes = 0
+
+    for index, item in enumerate(items):
+        item_id = item.get('id', index) if isinstance(item, dict) else index
+
+        error = _validate_item(item)
+        if error:
+            responses.append({"id": item_id, "status": 400, "body": {"error": error}})
+            continue
+
+        response = _dispatch(item, memberships)
+        try:
+            body, encoding = _response_body(response)
+            response_bytes += response.calculate_content_length() or 0
+        finally:
+            response.close()
+
+        if response_bytes > max_response_bytes:
+            responses.append({
+                "id": item_id,
+                "status": 413,
+                "body": {"error": f"Batch responses exceeded {max_response_bytes} bytes"}
+            })
+            continue
+
+        result = {
+            "id": item_id,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RETURNED_HEADERS if name in response.headers},
+            "body": body
+        }
+        if encoding:
+            result["encoding"] = encoding
+        responses.append(result)
+
+        # Writes may change memberships (invitations, removals); re-check from here on
+        if item.get('method', 'GET').upper() != 'GET':
+            memberships.clear()
+
+    return jsonify({"responses": responses}), 200
@@ -0,0 +1,33 @@
+# api/bootstrap.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.bootstrap_service import build_bootstrap
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+@bootstrap_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_bootstrap():
+    """Everything the apps load on startup, in a single response
+
+    Replaces the launch sequence of /api/auth/me, /api/settings/,
+    /api/properties/, /api/maintenance/, /api/tenants/active and the
+    finance calls. Optional `expiring_days` widens or narrows the window
+    for upcoming expirations (default BOOTSTRAP_EXPIRING_DAYS).
+    """
+    current_user_id = int(get_jwt_identity())
+
+    expiring_days = request.args.get('expiring_days')
+    if expiring_days is not None:
+        try:
+            expiring_days = int(expiring_days)
+        except ValueError:
+            return jsonify({"error": "expiring_days must be an integer"}), 400
+        if not 0 <= expiring_days <= 365:
+            return jsonify({"error": "expiring_days must be between 0 and 365"}), 400
+
+    payload = build_bootstrap(current_user_id, expiring_days=expiring_days)
+    if payload is None:
+        return jsonify({"error": "User not found"}), 404
+
+    return jsonify(payload), 200
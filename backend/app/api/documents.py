@@ -10,8 +10,12 @@ from app.models.user import User
 from app.models.tenant import Tenant
 from app.models.property import Property
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
 from datetime import datetime, timedelta
 from app.utils.constants import DOCUMENT_CATEGORIES, EXPIRING_DOCUMENT_CATEGORIES
+from app.utils.idempotency import idempotent
+from app.utils.conditional import list_validators, not_modified, with_validators
+from app.utils.serializers import DOCUMENT, DOCUMENT_SEARCH_FIELDS
 
 
 documents_bp = Blueprint('documents', __name__)
@@ -31,15 +35,12 @@ def get_documents():
     tenant_id = request.args.get('tenant_id')
     appliance_id = request.args.get('appliance_id')
     category = request.args.get('category')
+    access = None
     
     # If property_id is provided, check access first
     if property_id:
         # Verify user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view documents"}), 403
@@ -59,11 +60,7 @@ def get_documents():
                 return jsonify({"error": "Tenant not found"}), 404
                 
             # Check if user has access to the property this tenant is associated with
-            property_user = PropertyUser.query.filter_by(
-                property_id=tenant.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(tenant.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to view this tenant's documents"}), 403
@@ -80,11 +77,7 @@ def get_documents():
             # Check if user has access to the appliance (either owns it or has access to its property)
             if appliance.user_id != current_user_id:
                 if appliance.property_id:
-                    property_user = PropertyUser.query.filter_by(
-                        property_id=appliance.property_id,
-                        user_id=current_user_id,
-                        status='active'
-                    ).first()
+                    property_user = get_property_membership(appliance.property_id, current_user_id)
 
                     if not property_user or property_user.role not in ['owner', 'manager']:
                         return jsonify({"error": "You don't have permission to view this appliance's documents"}), 403
@@ -102,6 +95,7 @@ def get_documents():
             ).all()
             
             property_ids = [pu.property_id for pu in property_users]
+            access = [(pu.property_id, pu.role) for pu in property_users]
             
             # Get documents created by the user OR for properties they have owner/manager access to
             query = Document.query.filter(
@@ -112,42 +106,24 @@ def get_documents():
     # Apply category filter if provided
     if category:
         query = query.filter_by(category=category)
+
+    etag, last_modified = list_validators(query, Document.updated_at, access=access)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
     # Execute query
-    documents = query.order_by(Document.created_at.desc()).all()
-    
-    result = []
-    for doc in documents:
-        # Generate URL based on file path
-        filename = os.path.basename(doc.file_path)
-        
-        # Determine the URL based on document association
-        if doc.property_id:
-            url = f"/uploads/documents/files/property_{doc.property_id}/{filename}"
-        else:
-            url = f"/uploads/documents/files/user_{current_user_id}/{filename}"
-        
-        result.append({
-            'id': doc.id,
-            'title': doc.title,
-            'description': doc.description,
-            'file_type': doc.file_type,
-            'file_size': doc.file_size,
-            'category': doc.category,
-            'created_at': doc.created_at.isoformat(),
-            'updated_at': doc.updated_at.isoformat(),
-            'property_id': doc.property_id,
-            'tenant_id': doc.tenant_id,
-            'appliance_id': doc.appliance_id,
-            'expiration_date': doc.expiration_date.isoformat() if doc.expiration_date else None,
-            'url': url,  # Add URL to the response
-            'created_by': doc.user_id  # Include who uploaded the document
-        })
+    fields = DOCUMENT.requested_fields()
+    documents = DOCUMENT.project(query, fields).order_by(Document.created_at.desc()).all()
     
-    return jsonify(result)
+    return with_validators(
+        DOCUMENT.response(documents, many=True, context={'user_id': current_user_id}, fields=fields),
+        etag, last_modified
+    )
 
 @documents_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def upload_document():
     """Upload a new document"""
     current_user_id = int(get_jwt_identity())
@@ -186,11 +162,7 @@ def upload_document():
     
     # If a property_id is provided, verify the user has access to it
     if property_id:
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to upload documents"}), 403
@@ -224,11 +196,7 @@ def upload_document():
         # Check if user has access to the appliance
         if appliance.user_id != current_user_id:
             if appliance.property_id:
-                property_user = PropertyUser.query.filter_by(
-                    property_id=appliance.property_id,
-                    user_id=current_user_id,
-                    status='active'
-                ).first()
+                property_user = get_property_membership(appliance.property_id, current_user_id)
 
                 if not property_user or property_user.role not in ['owner', 'manager']:
                     return jsonify({"error": "You don't have permission to upload documents for this appliance"}), 403
@@ -292,11 +260,7 @@ def update_document(document_id):
     if document.user_id != current_user_id:
         # If document is associated with a property, check property permissions
         if document.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=document.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(document.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to update this document"}), 403
@@ -337,11 +301,7 @@ def update_document(document_id):
             # Check if user has access to the appliance
             if appliance.user_id != current_user_id:
                 if appliance.property_id:
-                    property_user = PropertyUser.query.filter_by(
-                        property_id=appliance.property_id,
-                        user_id=current_user_id,
-                        status='active'
-                    ).first()
+                    property_user = get_property_membership(appliance.property_id, current_user_id)
 
                     if not property_user or property_user.role not in ['owner', 'manager']:
                         return jsonify({"error": "You don't have permission to link documents to this appliance"}), 403
@@ -384,11 +344,7 @@ def delete_document(document_id):
     if document.user_id != current_user_id:
         # If document is associated with a property, check property permissions
         if document.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=document.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(document.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to delete this document"}), 403
@@ -422,11 +378,7 @@ def download_document(document_id):
     if document.user_id != current_user_id:
         # If document is associated with a property, check property permissions
         if document.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=document.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(document.property_id, current_user_id)
             
             # For downloading, we might want to allow tenants too
             if not property_user or property_user.role not in ['owner', 'manager', 'tenant']:
@@ -537,33 +489,10 @@ def get_documents_by_category(category):
     if tenant_id:
         query = query.filter_by(tenant_id=tenant_id)
     
-    documents = query.order_by(Document.created_at.desc()).all()
+    fields = DOCUMENT.requested_fields(only=DOCUMENT_SEARCH_FIELDS)
+    documents = DOCUMENT.project(query, fields).order_by(Document.created_at.desc()).all()
     
-    result = []
-    for doc in documents:
-        # Generate URL for the document
-        filename = os.path.basename(doc.file_path)
-        if doc.property_id:
-            url = f"/uploads/documents/files/property_{doc.property_id}/{filename}"
-        else:
-            url = f"/uploads/documents/files/user_{current_user_id}/{filename}"
-        
-        result.append({
-            'id': doc.id,
-            'title': doc.title,
-            'description': doc.description,
-            'file_type': doc.file_type,
-            'file_size': doc.file_size,
-            'category': doc.category,
-            'created_at': doc.created_at.isoformat(),
-            'updated_at': doc.updated_at.isoformat(),
-            'property_id': doc.property_id,
-            'tenant_id': doc.tenant_id,
-            'expiration_date': doc.expiration_date.isoformat() if doc.expiration_date else None,
-            'url': url  # Add URL to the response
-        })
-    
-    return jsonify(result)
+    return DOCUMENT.response(documents, many=True, context={'user_id': current_user_id}, fields=fields)
 
 @documents_bp.route('/search', methods=['GET'])
 @jwt_required()
@@ -582,30 +511,7 @@ def search_documents():
     if tenant_id:
         query = query.filter_by(tenant_id=tenant_id)
     
-    documents = query.order_by(Document.created_at.desc()).all()
-    
-    result = []
-    for doc in documents:
-        # Generate URL for the document
-        filename = os.path.basename(doc.file_path)
-        if doc.property_id:
-            url = f"/uploads/documents/files/property_{doc.property_id}/{filename}"
-        else:
-            url = f"/uploads/documents/files/user_{current_user_id}/{filename}"
-        
-        result.append({
-            'id': doc.id,
-            'title': doc.title,
-            'description': doc.description,
-            'file_type': doc.file_type,
-            'file_size': doc.file_size,
-            'category': doc.category,
-            'created_at': doc.created_at.isoformat(),
-            'updated_at': doc.updated_at.isoformat(),
-            'property_id': doc.property_id,
-            'tenant_id': doc.tenant_id,
-            'expiration_date': doc.expiration_date.isoformat() if doc.expiration_date else None,
-            'url': url  # Add URL to the response
-        })
+    fields = DOCUMENT.requested_fields(only=DOCUMENT_SEARCH_FIELDS)
+    documents = DOCUMENT.project(query, fields).order_by(Document.created_at.desc()).all()
     
-    return jsonify(result)
\ No newline at end of file
+    return DOCUMENT.response(documents, many=True, context={'user_id': current_user_id}, fields=fields)
\ No newline at end of file
@@ -8,6 +8,9 @@ from app.models.user import User
 from datetime import datetime
 from sqlalchemy import func
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.serializers import BUDGET, EXPENSE
 
 finances_bp = Blueprint('finances', __name__)
 
@@ -26,11 +29,7 @@ def get_expenses():
     # If property_id is provided, check access first
     if property_id:
         # Verify user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view expenses"}), 403
@@ -70,19 +69,14 @@ def get_expenses():
         query = query.filter_by(category=category)
     
     # Execute query
-    expenses = query.order_by(Expense.date.desc()).all()
+    fields = EXPENSE.requested_fields()
+    expenses = EXPENSE.project(query, fields).order_by(Expense.date.desc()).all()
     
-    # Convert to dictionaries and add created_by
-    result = []
-    for expense in expenses:
-        expense_dict = expense.to_dict()
-        expense_dict['created_by'] = expense.user_id  # Add who created the expense
-        result.append(expense_dict)
-    
-    return jsonify(result)
+    return EXPENSE.response(expenses, many=True, fields=fields)
 
 @finances_bp.route('/expenses', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_expense():
     """Create a new expense"""
     current_user_id = int(get_jwt_identity())
@@ -96,11 +90,7 @@ def create_expense():
     
     # Check if user has permission for this property
     property_id = data['property_id']
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to create expenses"}), 403
@@ -157,19 +147,12 @@ def get_expense(expense_id):
         return jsonify({"error": "Expense not found"}), 404
     
     # Check if user has permission for the property this expense is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=expense.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(expense.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this expense"}), 403
     
-    expense_dict = expense.to_dict()
-    expense_dict['created_by'] = expense.user_id  # Add who created the expense
-    
-    return jsonify(expense_dict)
+    return EXPENSE.response(expense)
 
 @finances_bp.route('/expenses/<int:expense_id>', methods=['PUT'])
 @jwt_required()
@@ -182,11 +165,7 @@ def update_expense(expense_id):
         return jsonify({"error": "Expense not found"}), 404
     
     # Check if user has permission for the property this expense is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=expense.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(expense.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to update this expense"}), 403
@@ -228,11 +207,7 @@ def update_expense(expense_id):
     if 'property_id' in data and data['property_id'] != expense.property_id:
         new_property_id = data['property_id']
         if new_property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=new_property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(new_property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to move this expense to the specified property"}), 403
@@ -263,11 +238,7 @@ def delete_expense(expense_id):
         return jsonify({"error": "Expense not found"}), 404
     
     # Check if user has permission for the property this expense is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=expense.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(expense.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to delete this expense"}), 403
@@ -309,11 +280,7 @@ def get_budgets():
     # If property_id is provided, check access first
     if property_id:
         # Verify user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view budgets"}), 403
@@ -350,19 +317,14 @@ def get_budgets():
             return jsonify({"error": "Month must be a valid integer"}), 400
     
     # Execute query
-    budgets = query.order_by(Budget.year, Budget.month, Budget.category).all()
-    
-    # Convert to dictionaries and add created_by
-    result = []
-    for budget in budgets:
-        budget_dict = budget.to_dict()
-        budget_dict['created_by'] = budget.user_id  # Add who created the budget
-        result.append(budget_dict)
+    fields = BUDGET.requested_fields()
+    budgets = BUDGET.project(query, fields).order_by(Budget.year, Budget.month, Budget.category).all()
     
-    return jsonify(result)
+    return BUDGET.response(budgets, many=True, fields=fields)
 
 @finances_bp.route('/budgets', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_budget():
     """Create a new budget"""
     current_user_id = int(get_jwt_identity())
@@ -376,11 +338,7 @@ def create_budget():
     
     # Check if user has permission for this property
     property_id = data['property_id']
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to create budgets"}), 403
@@ -455,11 +413,7 @@ def get_budget(budget_id):
         return jsonify({"error": "Budget not found"}), 404
     
     # Check if user has permission for the property this budget is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=budget.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(budget.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this budget"}), 403
@@ -480,11 +434,7 @@ def update_budget(budget_id):
         return jsonify({"error": "Budget not found"}), 404
     
     # Check if user has permission for the property this budget is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=budget.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(budget.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to update this budget"}), 403
@@ -532,11 +482,7 @@ def update_budget(budget_id):
     if 'property_id' in data and data['property_id'] != budget.property_id:
         new_property_id = data['property_id']
         if new_property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=new_property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(new_property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to move this budget to the specified property"}), 403
@@ -583,11 +529,7 @@ def delete_budget(budget_id):
         return jsonify({"error": "Budget not found"}), 404
     
     # Check if user has permission for the property this budget is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=budget.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(budget.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to delete this budget"}), 403
@@ -627,11 +569,7 @@ def monthly_summary_report():
         return jsonify({"error": "Year and month must be valid integers"}), 400
     
     # Check if user has permission for this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to view reports"}), 403
@@ -752,11 +690,7 @@ def yearly_summary_report():
         return jsonify({"error": "Year must be a valid integer"}), 400
     
     # Check if user has permission for this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to view reports"}), 403
@@ -7,6 +7,7 @@ from app.models.property import Property
 from app.utils.api_key_auth import require_api_key, get_api_user_id
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from app.utils.idempotency import idempotent
 
 integrations_bp = Blueprint('integrations', __name__)
 
@@ -173,6 +174,7 @@ def ha_get_maintenance_tasks():
 
 @integrations_bp.route('/ha/maintenance', methods=['POST'])
 @require_api_key('write:maintenance')
+@idempotent
 def ha_create_maintenance_task():
     """
     Create a new maintenance task from Home Assistant
@@ -325,6 +327,6 @@ def ha_get_properties():
             'address': p.address,
             'city': p.city,
             'state': p.state,
-            'zip_code': p.zip_code
+            'zip_code': p.zip
         } for p in properties]
     }), 200
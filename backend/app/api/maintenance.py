@@ -6,6 +6,10 @@ from app.models.maintenance import Maintenance
 from app.models.user import User
 from datetime import datetime
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.conditional import list_validators, not_modified, row_validators, with_validators
+from app.utils.serializers import MAINTENANCE, MAINTENANCE_DETAIL_FIELDS
 
 maintenance_bp = Blueprint('maintenance', __name__)
 
@@ -16,15 +20,12 @@ def get_maintenance_requests():
     current_user_id = int(get_jwt_identity())
 
     property_id = request.args.get('property_id')
+    access = None
     
     # If property_id is provided, get requests for that property if user has access
     if property_id:
         # Check if user has owner or manager access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view maintenance requests"}), 403
@@ -40,6 +41,7 @@ def get_maintenance_requests():
         ).all()
         
         property_ids = [pu.property_id for pu in property_users]
+        access = [(pu.property_id, pu.role) for pu in property_users]
         
         # Get requests created by the user OR for properties they have owner/manager access to
         query = Maintenance.query.filter(
@@ -51,29 +53,20 @@ def get_maintenance_requests():
     status = request.args.get('status')
     if status:
         query = query.filter_by(status=status)
+
+    etag, last_modified = list_validators(query, Maintenance.updated_at, access=access)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    maintenance_requests = query.order_by(Maintenance.created_at.desc()).all()
-    
-    result = []
-    for req in maintenance_requests:
-        result.append({
-            'id': req.id,
-            'title': req.title,
-            'description': req.description,
-            'priority': req.priority,
-            'status': req.status,
-            'due_date': req.due_date.isoformat() if req.due_date else None,
-            'created_at': req.created_at.isoformat(),
-            'updated_at': req.updated_at.isoformat(),
-            'completed_at': req.completed_at.isoformat() if req.completed_at else None,
-            'property_id': req.property_id,
-            'created_by': req.user_id  # Include who created the request
-        })
+    fields = MAINTENANCE.requested_fields()
+    maintenance_requests = MAINTENANCE.project(query, fields).order_by(Maintenance.created_at.desc()).all()
     
-    return jsonify(result)
+    return with_validators(MAINTENANCE.response(maintenance_requests, many=True, fields=fields), etag, last_modified)
 
 @maintenance_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_maintenance_request():
     """Create a new maintenance request"""
     current_user_id = int(get_jwt_identity())
@@ -87,11 +80,7 @@ def create_maintenance_request():
     # If a property_id is provided, check permissions
     property_id = data.get('property_id')
     if property_id:
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user:
             return jsonify({"error": "Property not found or you don't have permission to create maintenance requests"}), 403
@@ -130,32 +119,22 @@ def get_maintenance_request(request_id):
     if maintenance_request.user_id != current_user_id:
         # If associated with a property, check property permissions
         if maintenance_request.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=maintenance_request.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(maintenance_request.property_id, current_user_id)
             
             if not property_user:
                 return jsonify({"error": "You don't have permission to view this maintenance request"}), 403
         else:
             # Not user's request and not associated with a property they have access to
             return jsonify({"error": "Maintenance request not found or access denied"}), 404
+
+    etag, last_modified = row_validators(maintenance_request)
+    cached = not_modified(etag, last_modified, use_if_modified_since=True)
+    if cached:
+        return cached
     
-    result = {
-        'id': maintenance_request.id,
-        'title': maintenance_request.title,
-        'description': maintenance_request.description,
-        'priority': maintenance_request.priority,
-        'status': maintenance_request.status,
-        'due_date': maintenance_request.due_date.isoformat() if maintenance_request.due_date else None,
-        'created_at': maintenance_request.created_at.isoformat(),
-        'updated_at': maintenance_request.updated_at.isoformat(),
-        'completed_at': maintenance_request.completed_at.isoformat() if maintenance_request.completed_at else None,
-        'property_id': maintenance_request.property_id
-    }
-    
-    return jsonify(result)
+    return with_validators(
+        MAINTENANCE.response(maintenance_request, only=MAINTENANCE_DETAIL_FIELDS), etag, last_modified
+    )
 
 @maintenance_bp.route('/<int:request_id>', methods=['PUT'])
 @jwt_required()
@@ -171,11 +150,7 @@ def update_maintenance_request(request_id):
     if maintenance_request.user_id != current_user_id:
         # If associated with a property, check property permissions
         if maintenance_request.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=maintenance_request.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(maintenance_request.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to update this maintenance request"}), 403
@@ -207,11 +182,7 @@ def update_maintenance_request(request_id):
     if 'property_id' in data and data['property_id'] != maintenance_request.property_id:
         new_property_id = data['property_id']
         if new_property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=new_property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(new_property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to move this request to the specified property"}), 403
@@ -240,11 +211,7 @@ def delete_maintenance_request(request_id):
     if maintenance_request.user_id != current_user_id:
         # If associated with a property, check property permissions
         if maintenance_request.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=maintenance_request.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(maintenance_request.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to delete this maintenance request"}), 403
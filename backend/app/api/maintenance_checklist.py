@@ -6,7 +6,13 @@ from app.models.maintenance_checklist import MaintenanceChecklistItem
 from app.models.user import User
 from app.models.property import Property
 from datetime import datetime
+import re
+from sqlalchemy import and_, case, distinct, func, literal, or_, select, union_all
+from sqlalchemy.exc import IntegrityError
 from app.models.Property_user import PropertyUser
+from app.utils.constants import DEFAULT_CHECKLIST_ITEMS
+from app.utils.property_permissions import get_property_membership, has_property_permission
+from app.utils.idempotency import idempotent
 
 # Create blueprint for checklist routes
 checklist_bp = Blueprint('maintenance_checklist', __name__, url_prefix='/api/maintenance/checklist')
@@ -26,11 +32,7 @@ def get_seasonal_checklist(season):
     # If property_id is provided, check access first
     if property_id:
         # Verify user has owner or manager access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view checklists"}), 403
@@ -61,12 +63,11 @@ def get_seasonal_checklist(season):
     checklist_items = query.order_by(MaintenanceChecklistItem.is_completed, 
                                     MaintenanceChecklistItem.task).all()
     
-    # If no items exist for this property, create default items
-    if not checklist_items and property_id:
-        checklist_items = create_default_checklist_items(current_user_id, property_id, season)
-    
     result = []
     for item in checklist_items:
+        # Hidden rows only exist to suppress a removed default item
+        if item.is_hidden:
+            continue
         result.append({
             'id': item.id,
             'task': item.task,
@@ -78,9 +79,15 @@ def get_seasonal_checklist(season):
             'property_id': item.property_id,
             'created_at': item.created_at.isoformat(),
             'updated_at': item.updated_at.isoformat(),
-            'created_by': item.user_id  # Include who created the item
+            'created_by': item.user_id,  # Include who created the item
+            'default_key': item.default_key
         })
     
+    # Merge in the default items this property hasn't overridden (nothing is written on read)
+    if property_id:
+        result.extend(get_virtual_default_items(int(property_id), season, checklist_items))
+        result.sort(key=lambda i: (bool(i['is_completed']), i['task']))
+    
     return jsonify(result)
 
 @checklist_bp.route('/', methods=['GET'])
@@ -93,11 +100,7 @@ def get_all_checklists():
     # If property_id is provided, check access first
     if property_id:
         # Verify user has owner or manager access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view checklists"}), 403
@@ -131,6 +134,8 @@ def get_all_checklists():
         result[season] = []
     
     for item in items:
+        if item.is_hidden:
+            continue
         result[item.season].append({
             'id': item.id,
             'task': item.task,
@@ -142,34 +147,24 @@ def get_all_checklists():
             'property_id': item.property_id,
             'created_at': item.created_at.isoformat(),
             'updated_at': item.updated_at.isoformat(),
-            'created_by': item.user_id  # Include who created the item
+            'created_by': item.user_id,  # Include who created the item
+            'default_key': item.default_key
         })
     
-    # Check if any seasons have no items for a specific property, create defaults for them
+    # Merge in the default items this property hasn't overridden (nothing is written on read)
     if property_id:
         property_id_int = int(property_id)
+        overridden_keys = {item.default_key for item in items if item.default_key}
         for season in ['Spring', 'Summer', 'Fall', 'Winter']:
-            if not result[season]:
-                new_items = create_default_checklist_items(current_user_id, property_id_int, season)
-                for item in new_items:
-                    result[season].append({
-                        'id': item.id,
-                        'task': item.task,
-                        'description': item.description,
-                        'season': item.season,
-                        'is_completed': item.is_completed,
-                        'completed_at': item.completed_at.isoformat() if item.completed_at else None,
-                        'is_default': item.is_default,
-                        'property_id': item.property_id,
-                        'created_at': item.created_at.isoformat(),
-                        'updated_at': item.updated_at.isoformat(),
-                        'created_by': item.user_id  # Include who created the item
-                    })
+            season_items = [item for item in items if item.season == season]
+            result[season].extend(get_virtual_default_items(property_id_int, season, season_items, overridden_keys))
+            result[season].sort(key=lambda i: (bool(i['is_completed']), i['task']))
     
     return jsonify(result)
 
 @checklist_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_checklist_item():
     """Create a new custom checklist item"""
     current_user_id = int(get_jwt_identity())
@@ -224,7 +219,8 @@ def get_checklist_item(item_id):
     
     item = MaintenanceChecklistItem.query.filter_by(
         id=item_id, 
-        user_id=current_user_id
+        user_id=current_user_id,
+        is_hidden=False
     ).first()
     
     if not item:
@@ -246,15 +242,13 @@ def get_checklist_item(item_id):
     return jsonify(result)
 
 @checklist_bp.route('/<int:item_id>', methods=['PUT'])
+@checklist_bp.route('/<item_id>', methods=['PUT'])
 @jwt_required()
 def update_checklist_item(item_id):
-    """Update an existing checklist item"""
+    """Update an existing checklist item (default items are materialized on first edit)"""
     current_user_id = int(get_jwt_identity())
     
-    item = MaintenanceChecklistItem.query.filter_by(
-        id=item_id, 
-        user_id=current_user_id
-    ).first()
+    item = resolve_checklist_item(item_id, current_user_id)
     
     if not item:
         return jsonify({"error": "Checklist item not found or access denied"}), 404
@@ -284,11 +278,27 @@ def update_checklist_item(item_id):
         
         item.is_completed = data['is_completed']
     
-    if 'property_id' in data:
+    moved = 'property_id' in data and str(data['property_id']) != str(item.property_id)
+    if moved:
+        if item.default_key:
+            # The moved item is no longer this property's default: leave a hidden row
+            # behind so the template item doesn't reappear, and drop the key so it
+            # doesn't suppress the default on the property it moves to
+            db.session.add(MaintenanceChecklistItem(
+                user_id=item.user_id,
+                property_id=item.property_id,
+                task=item.task,
+                description=item.description,
+                season=item.season,
+                is_default=True,
+                is_hidden=True,
+                default_key=item.default_key
+            ))
+            item.default_key = None
         item.property_id = data['property_id']
     
-    # If a default item is edited, it's no longer a default
-    if item.is_default and ('task' in data or 'description' in data or 'season' in data):
+    # If a default item is edited or moved, it's no longer a default
+    if item.is_default and ('task' in data or 'description' in data or 'season' in data or moved):
         item.is_default = False
     
     db.session.commit()
@@ -304,19 +314,18 @@ def update_checklist_item(item_id):
         'property_id': item.property_id,
         'created_at': item.created_at.isoformat(),
         'updated_at': item.updated_at.isoformat(),
+        'default_key': item.default_key,
         'message': 'Checklist item updated successfully'
     })
 
 @checklist_bp.route('/<int:item_id>/toggle', methods=['PUT'])
+@checklist_bp.route('/<item_id>/toggle', methods=['PUT'])
 @jwt_required()
 def toggle_checklist_item(item_id):
-    """Toggle completion status of a checklist item"""
+    """Toggle completion status of a checklist item (default items are materialized on first toggle)"""
     current_user_id = int(get_jwt_identity())
     
-    item = MaintenanceChecklistItem.query.filter_by(
-        id=item_id, 
-        user_id=current_user_id
-    ).first()
+    item = resolve_checklist_item(item_id, current_user_id)
     
     if not item:
         return jsonify({"error": "Checklist item not found or access denied"}), 404
@@ -337,24 +346,27 @@ def toggle_checklist_item(item_id):
         'task': item.task,
         'is_completed': item.is_completed,
         'completed_at': item.completed_at.isoformat() if item.completed_at else None,
+        'default_key': item.default_key,
         'message': 'Checklist item toggled successfully'
     })
 
 @checklist_bp.route('/<int:item_id>', methods=['DELETE'])
+@checklist_bp.route('/<item_id>', methods=['DELETE'])
 @jwt_required()
 def delete_checklist_item(item_id):
     """Delete a checklist item"""
     current_user_id = int(get_jwt_identity())
     
-    item = MaintenanceChecklistItem.query.filter_by(
-        id=item_id, 
-        user_id=current_user_id
-    ).first()
+    item = resolve_checklist_item(item_id, current_user_id)
     
     if not item:
         return jsonify({"error": "Checklist item not found or access denied"}), 404
     
-    db.session.delete(item)
+    if item.default_key:
+        # Keep a hidden row so the template item doesn't reappear for this property
+        item.is_hidden = True
+    else:
+        db.session.delete(item)
     db.session.commit()
     
     return jsonify({
@@ -373,36 +385,39 @@ def reset_seasonal_checklist(season):
     if season not in valid_seasons:
         return jsonify({"error": "Invalid season. Must be one of: Spring, Summer, Fall, Winter"}), 400
     
-    # Delete existing checklist items for this season and property
+    # Delete existing checklist items for this season and property. Removing the
+    # overriding rows is enough to bring back the untouched default items.
     query = MaintenanceChecklistItem.query.filter_by(
         user_id=current_user_id,
         season=season
     )
     
     if property_id:
-        query = query.filter_by(property_id=property_id)
+        if has_property_permission(property_id, current_user_id, ['owner', 'manager']):
+            # Every row overriding one of this season's defaults, whoever wrote it and
+            # wherever it was moved since, so all of them come back
+            season_keys = [template['key'] for template in DEFAULT_CHECKLIST_ITEMS[season]]
+            query = MaintenanceChecklistItem.query.filter(
+                MaintenanceChecklistItem.property_id == property_id,
+                or_(
+                    MaintenanceChecklistItem.default_key.in_(season_keys),
+                    and_(MaintenanceChecklistItem.user_id == current_user_id,
+                         MaintenanceChecklistItem.season == season)
+                )
+            )
+        else:
+            query = query.filter_by(property_id=property_id)
     
-    query.delete()
+    query.delete(synchronize_session=False)
     db.session.commit()
     
-    # Create new default items
-    property_id_int = int(property_id) if property_id else None
-    checklist_items = create_default_checklist_items(current_user_id, property_id_int, season)
-    
     result = []
-    for item in checklist_items:
-        result.append({
-            'id': item.id,
-            'task': item.task,
-            'description': item.description,
-            'season': item.season,
-            'is_completed': item.is_completed,
-            'completed_at': item.completed_at.isoformat() if item.completed_at else None,
-            'is_default': item.is_default,
-            'property_id': item.property_id,
-            'created_at': item.created_at.isoformat(),
-            'updated_at': item.updated_at.isoformat()
-        })
+    if property_id:
+        remaining_items = MaintenanceChecklistItem.query.filter_by(
+            property_id=property_id,
+            season=season
+        ).all()
+        result = get_virtual_default_items(int(property_id), season, remaining_items)
     
     return jsonify({
         'message': f'Checklist for {season} has been reset to defaults',
@@ -412,60 +427,127 @@ def reset_seasonal_checklist(season):
 @checklist_bp.route('/batch-update', methods=['PUT'])
 @jwt_required()
 def batch_update_checklist():
-    """Update multiple checklist items at once"""
+    """Update multiple checklist items at once.
+
+    Runs one authorization query over all submitted ids, then one UPDATE per
+    distinct change (e.g. "mark complete" for 40 items is a single UPDATE),
+    all in one transaction. Default items are materialized in bulk first.
+    """
     current_user_id = int(get_jwt_identity())
     data = request.get_json()
     
     if not data or not isinstance(data.get('items'), list):
         return jsonify({"error": "Request must include an 'items' array"}), 400
     
-    updated_items = []
     errors = []
-    
+    changes_by_ref = {}
+    submitted_ids = {}
     for item_data in data['items']:
-        if not item_data.get('id'):
+        if not isinstance(item_data, dict) or not isinstance(item_data.get('id'), (int, str)) or not item_data['id']:
             errors.append({"error": "Each item must have an id", "item": item_data})
             continue
         
-        item = MaintenanceChecklistItem.query.filter_by(
-            id=item_data['id'], 
-            user_id=current_user_id
-        ).first()
-        
-        if not item:
-            errors.append({"error": "Item not found or access denied", "item_id": item_data['id']})
+        changes = {field: item_data[field] for field in ('task', 'description', 'is_completed') if field in item_data}
+        # Changes are grouped by value, so they must be plain (hashable) values
+        if 'task' in changes and not isinstance(changes['task'], str):
+            errors.append({"error": "task must be a string", "item_id": item_data['id']})
+            continue
+        if 'description' in changes and changes['description'] is not None and not isinstance(changes['description'], str):
+            errors.append({"error": "description must be a string", "item_id": item_data['id']})
+            continue
+        if 'is_completed' in changes:
+            changes['is_completed'] = bool(changes['is_completed'])
+        # Repeated ids behave like sequential updates: later fields win
+        changes_by_ref.setdefault(str(item_data['id']), {}).update(changes)
+        submitted_ids[str(item_data['id'])] = item_data['id']
+    
+    numeric_ids = {int(ref) for ref in changes_by_ref if ref.isdigit()}
+    default_refs = [ref for ref in changes_by_ref if not ref.isdigit()]
+    ref_ids = materialize_default_items(default_refs, current_user_id) if default_refs else {}
+    
+    # One authorization query for every submitted item
+    authorized_filters = []
+    if numeric_ids:
+        authorized_filters.append(and_(
+            MaintenanceChecklistItem.id.in_(numeric_ids),
+            MaintenanceChecklistItem.user_id == current_user_id
+        ))
+    if ref_ids:
+        authorized_filters.append(MaintenanceChecklistItem.id.in_(set(ref_ids.values())))
+    
+    current_rows = {}
+    if authorized_filters:
+        rows = db.session.query(
+            MaintenanceChecklistItem.id,
+            MaintenanceChecklistItem.task,
+            MaintenanceChecklistItem.description,
+            MaintenanceChecklistItem.season,
+            MaintenanceChecklistItem.is_completed,
+            MaintenanceChecklistItem.completed_at,
+            MaintenanceChecklistItem.is_default
+        ).filter(
+            or_(*authorized_filters),
+            MaintenanceChecklistItem.is_hidden == False
+        ).all()
+        current_rows = {row.id: row for row in rows}
+    
+    # Group the authorized items by identical change sets
+    now = datetime.utcnow()
+    groups = {}
+    updated_items = []
+    for ref, changes in changes_by_ref.items():
+        item_id = int(ref) if ref.isdigit() else ref_ids.get(ref)
+        row = current_rows.get(item_id)
+        if not row:
+            errors.append({"error": "Item not found or access denied", "item_id": submitted_ids[ref]})
             continue
         
-        # Update fields if provided
-        if 'task' in item_data:
-            item.task = item_data['task']
-            if item.is_default:
-                item.is_default = False
-        
-        if 'description' in item_data:
-            item.description = item_data['description']
-            if item.is_default:
-                item.is_default = False
+        if changes:
+            groups.setdefault(tuple(sorted(changes.items())), []).append(item_id)
         
-        if 'is_completed' in item_data:
-            # Update completion status and timestamp
-            if item_data['is_completed'] and not item.is_completed:
-                item.completed_at = datetime.utcnow()
-            elif not item_data['is_completed'] and item.is_completed:
-                item.completed_at = None
-            
-            item.is_completed = item_data['is_completed']
+        is_completed = changes.get('is_completed', row.is_completed)
+        if 'is_completed' in changes and is_completed and not row.is_completed:
+            completed_at = now
+        elif 'is_completed' in changes and not is_completed:
+            completed_at = None
+        else:
+            completed_at = row.completed_at
         
         updated_items.append({
-            'id': item.id,
-            'task': item.task,
-            'description': item.description,
-            'season': item.season,
-            'is_completed': item.is_completed,
-            'completed_at': item.completed_at.isoformat() if item.completed_at else None,
-            'is_default': item.is_default
+            'id': item_id,
+            'task': changes.get('task', row.task),
+            'description': changes.get('description', row.description),
+            'season': row.season,
+            'is_completed': is_completed,
+            'completed_at': completed_at.isoformat() if completed_at else None,
+            'is_default': row.is_default and 'task' not in changes and 'description' not in changes
         })
     
+    for change_key, item_ids in groups.items():
+        changes = dict(change_key)
+        values = {}
+        if 'task' in changes:
+            values['task'] = changes['task']
+        if 'description' in changes:
+            values['description'] = changes['description']
+        if 'task' in changes or 'description' in changes:
+            # Edited default items are no longer defaults
+            values['is_default'] = False
+        if 'is_completed' in changes:
+            if changes['is_completed']:
+                # Only stamp items that weren't already complete
+                values['completed_at'] = case(
+                    (MaintenanceChecklistItem.is_completed == True, MaintenanceChecklistItem.completed_at),
+                    else_=now
+                )
+            else:
+                values['completed_at'] = None
+            values['is_completed'] = changes['is_completed']
+        
+        MaintenanceChecklistItem.query.filter(
+            MaintenanceChecklistItem.id.in_(item_ids)
+        ).update(values, synchronize_session=False)
+    
     db.session.commit()
     
     return jsonify({
@@ -477,25 +559,76 @@ def batch_update_checklist():
 @checklist_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_checklist_stats():
-    """Get statistics about checklist completion by season"""
+    """Get statistics about checklist completion by season, with a per-property breakdown.
+
+    Covers the caller's own items plus every item on properties they own or
+    manage, and counts untouched default items towards each property's
+    totals. Counts come from one aggregated query, plus one lookup of the
+    default items each property has overridden.
+    """
     current_user_id = int(get_jwt_identity())
-    property_id = request.args.get('property_id')
+    property_id = request.args.get('property_id', type=int)
     
     seasons = ['Spring', 'Summer', 'Fall', 'Winter']
-    stats = {}
     
-    for season in seasons:
-        query = MaintenanceChecklistItem.query.filter_by(
-            user_id=current_user_id,
-            season=season
-        )
-        
-        if property_id:
-            query = query.filter_by(property_id=property_id)
-        
-        total_items = query.count()
-        completed_items = query.filter_by(is_completed=True).count()
-        
+    rows = db.session.execute(build_checklist_stats_query(current_user_id, property_id)).all()
+    
+    # (property_id, season) -> [total, completed]; property_id is None for items without a property
+    counts = {}
+    overridden = {}
+    managed_property_ids = set()
+    for row in rows:
+        if row.managed:
+            managed_property_ids.add(row.property_id)
+        if row.season is None:
+            continue
+        key = (row.property_id, row.season)
+        entry = counts.setdefault(key, [0, 0])
+        entry[0] += row.total or 0
+        entry[1] += row.completed or 0
+        if row.managed:
+            overridden[key] = overridden.get(key, 0) + (row.overridden or 0)
+    
+    # Keyed overrides count against the template's season, wherever the row has moved to
+    for managed_id, keys in get_overridden_default_keys(managed_property_ids).items():
+        for default_key in keys:
+            template_season, template = find_default_template(default_key)
+            if template:
+                key = (managed_id, template_season)
+                overridden[key] = overridden.get(key, 0) + 1
+    
+    # Untouched default items have no row: they count towards the total but are never completed
+    for managed_id in managed_property_ids:
+        for season in seasons:
+            key = (managed_id, season)
+            virtual_count = max(len(DEFAULT_CHECKLIST_ITEMS[season]) - overridden.get(key, 0), 0)
+            if virtual_count:
+                counts.setdefault(key, [0, 0])[0] += virtual_count
+    
+    season_totals = {season: [0, 0] for season in seasons}
+    property_totals = {}
+    for (item_property_id, season), (total, completed) in counts.items():
+        if season not in season_totals:
+            continue
+        season_totals[season][0] += total
+        season_totals[season][1] += completed
+        if item_property_id is not None:
+            property_seasons = property_totals.setdefault(item_property_id, {s: [0, 0] for s in seasons})
+            property_seasons[season][0] += total
+            property_seasons[season][1] += completed
+    
+    stats = summarize_checklist_counts(season_totals)
+    stats['properties'] = {
+        str(item_property_id): summarize_checklist_counts(property_seasons)
+        for item_property_id, property_seasons in sorted(property_totals.items())
+    }
+    
+    return jsonify(stats)
+
+def summarize_checklist_counts(season_counts):
+    """Turn {season: [total, completed]} into per-season and overall stats with percentages"""
+    stats = {}
+    for season, (total_items, completed_items) in season_counts.items():
         completion_percentage = 0
         if total_items > 0:
             completion_percentage = (completed_items / total_items) * 100
@@ -520,74 +653,284 @@ def get_checklist_stats():
         'percentage': round(overall_percentage, 1)
     }
     
-    return jsonify(stats)
+    return stats
 
-def create_default_checklist_items(user_id, property_id, season):
-    """Create default checklist items for a given season"""
-    default_items = {
-        'Spring': [
-            {'task': 'Clean gutters and downspouts', 'description': 'Remove debris and check for proper drainage'},
-            {'task': 'Inspect roof for damage', 'description': 'Check for missing/damaged shingles or signs of leaks'},
-            {'task': 'Service air conditioning system', 'description': 'Schedule professional maintenance'},
-            {'task': 'Check exterior drainage', 'description': 'Ensure water flows away from foundation'},
-            {'task': 'Inspect and clean deck', 'description': 'Clean, repair, and reseal if needed'},
-            {'task': 'Test smoke and CO detectors', 'description': 'Replace batteries and test functionality'},
-            {'task': 'Check for leaks around windows and doors', 'description': 'Inspect seals and weatherstripping'},
-            {'task': 'Trim trees and shrubs', 'description': 'Remove branches near the house and roof'},
-            {'task': 'Inspect foundation for cracks', 'description': 'Note and repair any new or expanding cracks'},
-            {'task': 'Clean outdoor furniture', 'description': 'Clean and prepare patio furniture for use'}
-        ],
-        'Summer': [
-            {'task': 'Check irrigation systems', 'description': 'Ensure sprinklers and watering systems are working properly'},
-            {'task': 'Inspect for pest infestations', 'description': 'Look for signs of termites, ants, or other pests'},
-            {'task': 'Clean and inspect outdoor grill', 'description': 'Clean grates and check propane connections'},
-            {'task': 'Check window screens', 'description': 'Repair any tears or holes in window screens'},
-            {'task': 'Service lawn equipment', 'description': 'Sharpen mower blades and check other equipment'},
-            {'task': 'Check pool maintenance', 'description': 'Test water, clean filters, check equipment (if applicable)'},
-            {'task': 'Test garage door and lubricate', 'description': 'Ensure proper operation and safety features'},
-            {'task': 'Clean dryer vent', 'description': 'Remove lint buildup to prevent fire hazards'},
-            {'task': 'Check attic ventilation', 'description': 'Ensure proper airflow to prevent heat buildup'},
-            {'task': 'Inspect driveway and walkways', 'description': 'Repair cracks and seal if needed'}
-        ],
-        'Fall': [
-            {'task': 'Clean gutters and downspouts', 'description': 'Remove fallen leaves and debris'},
-            {'task': 'Service heating system', 'description': 'Schedule professional maintenance before winter'},
-            {'task': 'Check chimney and fireplace', 'description': 'Clean and inspect for safe operation'},
-            {'task': 'Seal gaps and cracks', 'description': 'Prevent drafts and pests from entering'},
-            {'task': 'Test smoke and CO detectors', 'description': 'Replace batteries and test functionality'},
-            {'task': 'Store outdoor furniture', 'description': 'Clean and store or cover for winter'},
-            {'task': 'Drain and store garden hoses', 'description': 'Prevent freezing and damage'},
-            {'task': 'Winterize irrigation system', 'description': 'Drain water to prevent freezing damage'},
-            {'task': 'Inspect roof and repair if needed', 'description': 'Address issues before winter weather'},
-            {'task': 'Rake leaves and aerate lawn', 'description': 'Prepare lawn for winter dormancy'}
-        ],
-        'Winter': [
-            {'task': 'Check for ice dams on roof', 'description': 'Remove snow buildup to prevent ice dams'},
-            {'task': 'Test sump pump', 'description': 'Ensure proper operation before spring thaw'},
-            {'task': 'Check for drafts', 'description': 'Identify and seal cold air leaks'},
-            {'task': 'Inspect attic insulation', 'description': 'Check for proper coverage and no moisture issues'},
-            {'task': 'Check basement for water leaks', 'description': 'Inspect during thaws or heavy rain'},
-            {'task': 'Monitor humidity levels', 'description': 'Maintain proper indoor humidity (30-50%)'},
-            {'task': 'Check water heater', 'description': 'Inspect for leaks and flush if needed'},
-            {'task': 'Clean refrigerator coils', 'description': 'Remove dust to improve efficiency'},
-            {'task': 'Check emergency supplies', 'description': 'Update emergency kit for winter storms'},
-            {'task': 'Protect outdoor faucets', 'description': 'Ensure they are drained and insulated'}
-        ]
-    }
+def build_checklist_stats_query(user_id, property_id=None):
+    """Build the aggregated checklist stats statement, grouped by property and season.
+
+    The first branch walks the user's owned/managed properties with an outer
+    join, so properties without any rows still show up (season NULL). The
+    second branch adds the user's own items that aren't on one of those
+    properties. 'overridden' counts the distinct legacy default items (rows
+    from before default_key, matched on their task) a property has per
+    season; keyed overrides are looked up separately because a row can move
+    away from its template's season. Both reduce the virtual defaults.
+    """
+    item = MaintenanceChecklistItem
+    default_tasks = sorted({t['task'] for templates in DEFAULT_CHECKLIST_ITEMS.values() for t in templates})
+    
+    total = func.sum(case((item.is_hidden == False, 1), else_=0)).label('total')
+    completed = func.sum(case((and_(item.is_hidden == False, item.is_completed == True), 1), else_=0)).label('completed')
+    overridden = func.count(distinct(case(
+        (and_(item.default_key.is_(None), item.is_default == True, item.task.in_(default_tasks)), item.task),
+    ))).label('overridden')
+    
+    managed_filter = [
+        PropertyUser.user_id == user_id,
+        PropertyUser.status == 'active',
+        PropertyUser.role.in_(['owner', 'manager'])
+    ]
+    if property_id:
+        managed_filter.append(PropertyUser.property_id == property_id)
+    
+    managed_rows = select(
+        PropertyUser.property_id.label('property_id'),
+        item.season.label('season'),
+        total,
+        completed,
+        overridden,
+        literal(True).label('managed')
+    ).select_from(PropertyUser).outerjoin(
+        item, item.property_id == PropertyUser.property_id
+    ).where(*managed_filter).group_by(PropertyUser.property_id, item.season)
+    
+    managed_ids = select(PropertyUser.property_id).where(
+        PropertyUser.user_id == user_id,
+        PropertyUser.status == 'active',
+        PropertyUser.role.in_(['owner', 'manager'])
+    )
+    own_filter = [
+        item.user_id == user_id,
+        or_(item.property_id.is_(None), item.property_id.not_in(managed_ids))
+    ]
+    if property_id:
+        own_filter.append(item.property_id == property_id)
+    
+    own_rows = select(
+        item.property_id.label('property_id'),
+        item.season.label('season'),
+        total,
+        completed,
+        literal(0).label('overridden'),
+        literal(False).label('managed')
+    ).where(*own_filter).group_by(item.property_id, item.season)
+    
+    return union_all(managed_rows, own_rows)
+
+DEFAULT_ITEM_REF_PATTERN = re.compile(r'^default-(\d+)-([a-z0-9_]+)$')
+
+def default_item_ref(property_id, default_key):
+    """Build the id exposed to clients for a default item that has no row yet"""
+    return f"default-{property_id}-{default_key}"
+
+def parse_default_item_ref(item_ref):
+    """Parse a default item id into (property_id, default_key), or None if it isn't one"""
+    match = DEFAULT_ITEM_REF_PATTERN.match(str(item_ref))
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+def find_default_template(default_key):
+    """Look up a default checklist template item and its season by key"""
+    for season, templates in DEFAULT_CHECKLIST_ITEMS.items():
+        for template in templates:
+            if template['key'] == default_key:
+                return season, template
+    return None, None
+
+def get_overridden_default_keys(property_ids):
+    """Map each property id to the default keys it has a row for.
+
+    Any row carrying a default_key overrides that default item, whatever its
+    current season and whether it's hidden, so this doesn't filter on either.
+    """
+    overridden = {property_id: set() for property_id in property_ids}
+    if not overridden:
+        return overridden
+    rows = db.session.query(
+        MaintenanceChecklistItem.property_id,
+        MaintenanceChecklistItem.default_key
+    ).filter(
+        MaintenanceChecklistItem.property_id.in_(overridden),
+        MaintenanceChecklistItem.default_key.isnot(None)
+    ).distinct()
+    for row in rows:
+        overridden[row.property_id].add(row.default_key)
+    return overridden
+
+def get_virtual_default_items(property_id, season, existing_items, overridden_keys=None):
+    """Build response dicts for the default items of a season that have no row for this property.
+
+    A default item is overridden by any row of the property carrying its
+    default_key (toggled, edited, moved to another season or hidden); pass
+    overridden_keys from get_overridden_default_keys to skip the lookup.
+    Rows created before defaults were virtual have no default_key, so they
+    are matched on their task within the season instead.
+    """
+    if overridden_keys is None:
+        overridden_keys = get_overridden_default_keys([property_id])[property_id]
+    legacy_tasks = set()
+    for item in existing_items:
+        if item.property_id != property_id or item.season != season:
+            continue
+        if not item.default_key and item.is_default:
+            legacy_tasks.add(item.task)
+    
+    result = []
+    for template in DEFAULT_CHECKLIST_ITEMS.get(season, []):
+        if template['key'] in overridden_keys or template['task'] in legacy_tasks:
+            continue
+        result.append({
+            'id': default_item_ref(property_id, template['key']),
+            'task': template['task'],
+            'description': template['description'],
+            'season': season,
+            'is_completed': False,
+            'completed_at': None,
+            'is_default': True,
+            'property_id': property_id,
+            'created_at': None,
+            'updated_at': None,
+            'created_by': None,
+            'default_key': template['key']
+        })
     
-    items = []
-    for task_data in default_items.get(season, []):
-        item = MaintenanceChecklistItem(
+    return result
+
+def resolve_checklist_item(item_id, user_id):
+    """Find the checklist item a client refers to, materializing a default item if needed.
+
+    Numeric ids resolve to the user's own rows. Default item ids
+    ('default-<property_id>-<key>') resolve to the property's row for that
+    template item, creating it (uncommitted) on first write. Returns None if
+    the item doesn't exist or the user lacks owner/manager access.
+    """
+    if isinstance(item_id, int) or str(item_id).isdigit():
+        return MaintenanceChecklistItem.query.filter_by(
+            id=int(item_id),
+            user_id=user_id,
+            is_hidden=False
+        ).first()
+    
+    ref = parse_default_item_ref(item_id)
+    if not ref:
+        return None
+    property_id, default_key = ref
+    
+    season, template = find_default_template(default_key)
+    if not template:
+        return None
+    
+    if not has_property_permission(property_id, user_id, ['owner', 'manager']):
+        return None
+    
+    item = MaintenanceChecklistItem.query.filter_by(
+        property_id=property_id,
+        default_key=default_key
+    ).first()
+    if not item:
+        item = insert_default_item(MaintenanceChecklistItem(
+            user_id=user_id,
+            property_id=property_id,
+            task=template['task'],
+            description=template['description'],
+            season=season,
+            is_completed=False,
+            is_default=True,
+            default_key=default_key
+        ))
+    return None if item.is_hidden else item
+
+def insert_default_item(item):
+    """Insert the row for a default item, or return the one a concurrent request inserted first.
+
+    The unique index on (property_id, default_key) turns the race between
+    two writers of the same virtual item (or a client retry) into an
+    IntegrityError, rolled back to a savepoint here.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.add(item)
+        return item
+    except IntegrityError:
+        return MaintenanceChecklistItem.query.filter_by(
+            property_id=item.property_id,
+            default_key=item.default_key
+        ).one()
+
+def materialize_default_items(item_refs, user_id):
+    """Resolve many default item ids to row ids at once, creating missing rows.
+
+    Returns a dict of item ref -> row id for the refs the user may write
+    (owner/manager of the property). Uses one permission query and one lookup
+    of existing rows; new rows are inserted in a single flush.
+    """
+    parsed = {}
+    for item_ref in item_refs:
+        ref = parse_default_item_ref(item_ref)
+        if ref and find_default_template(ref[1])[1]:
+            parsed[item_ref] = ref
+    if not parsed:
+        return {}
+    
+    property_ids = {property_id for property_id, _ in parsed.values()}
+    permitted = {row.property_id for row in db.session.query(PropertyUser.property_id).filter(
+        PropertyUser.property_id.in_(property_ids),
+        PropertyUser.user_id == user_id,
+        PropertyUser.status == 'active',
+        PropertyUser.role.in_(['owner', 'manager'])
+    )}
+    parsed = {item_ref: ref for item_ref, ref in parsed.items() if ref[0] in permitted}
+    if not parsed:
+        return {}
+    
+    existing = {}
+    for row in db.session.query(
+        MaintenanceChecklistItem.id,
+        MaintenanceChecklistItem.property_id,
+        MaintenanceChecklistItem.default_key,
+        MaintenanceChecklistItem.is_hidden
+    ).filter(
+        MaintenanceChecklistItem.property_id.in_(permitted),
+        MaintenanceChecklistItem.default_key.in_({key for _, key in parsed.values()})
+    ):
+        existing[(row.property_id, row.default_key)] = row
+    
+    new_items = {}
+    for item_ref, (property_id, default_key) in parsed.items():
+        if (property_id, default_key) in existing or (property_id, default_key) in new_items:
+            continue
+        season, template = find_default_template(default_key)
+        new_items[(property_id, default_key)] = MaintenanceChecklistItem(
             user_id=user_id,
             property_id=property_id,
-            task=task_data['task'],
-            description=task_data['description'],
+            task=template['task'],
+            description=template['description'],
             season=season,
             is_completed=False,
-            is_default=True  # Mark as default item
+            is_default=True,
+            default_key=default_key
         )
-        db.session.add(item)
-        items.append(item)
-    
-    db.session.commit()
-    return items
+    if new_items:
+        try:
+            with db.session.begin_nested():
+                db.session.add_all(new_items.values())
+        except IntegrityError:
+            # Another request materialized some of them first: insert one by one, keeping its rows
+            new_items = {key: insert_default_item(MaintenanceChecklistItem(
+                user_id=item.user_id,
+                property_id=item.property_id,
+                task=item.task,
+                description=item.description,
+                season=item.season,
+                is_completed=False,
+                is_default=True,
+                default_key=item.default_key
+            )) for key, item in new_items.items()}
+        existing.update(new_items)
+    
+    return {
+        item_ref: existing[key].id
+        for item_ref, key in parsed.items()
+        if not existing[key].is_hidden
+    }
@@ -6,26 +6,29 @@ from app.models.project import Project
 from app.models.user import User
 from datetime import datetime
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.response_cache import property_cached
+from app.utils.conditional import list_validators, not_modified, row_validators, with_validators
+from app.utils.serializers import PROJECT
 
 projects_bp = Blueprint('projects', __name__)
 
 @projects_bp.route('/', methods=['GET'])
 @jwt_required()
+@property_cached()
 def get_projects():
     """Get all projects for the current user"""
     current_user_id = int(get_jwt_identity())
 
     property_id = request.args.get('property_id')
     status = request.args.get('status')
+    access = None
     
     # If a specific property is requested
     if property_id:
         # Check if user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user:
             return jsonify({"error": "Property not found or access denied"}), 403
@@ -40,6 +43,7 @@ def get_projects():
         ).all()
         
         property_ids = [pu.property_id for pu in property_users]
+        access = [(pu.property_id, pu.role) for pu in property_users]
         
         # Get projects created by the user OR for properties they have access to
         query = Project.query.filter(
@@ -50,31 +54,21 @@ def get_projects():
     # Apply status filter if provided
     if status:
         query = query.filter_by(status=status)
+
+    etag, last_modified = list_validators(query, Project.updated_at, access=access)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
     # Execute query and order results
-    projects = query.order_by(Project.created_at.desc()).all()
+    fields = PROJECT.requested_fields()
+    projects = PROJECT.project(query, fields).order_by(Project.created_at.desc()).all()
     
-    result = []
-    for project in projects:
-        result.append({
-            'id': project.id,
-            'name': project.name,
-            'description': project.description,
-            'status': project.status,
-            'budget': project.budget,
-            'spent': project.spent,
-            'start_date': project.start_date.isoformat() if project.start_date else None,
-            'projected_end_date': project.projected_end_date.isoformat() if project.projected_end_date else None,
-            'completed_date': project.completed_date.isoformat() if project.completed_date else None,
-            'created_at': project.created_at.isoformat(),
-            'updated_at': project.updated_at.isoformat(),
-            'property_id': project.property_id
-        })
-    
-    return jsonify(result)
+    return with_validators(PROJECT.response(projects, many=True, fields=fields), etag, last_modified)
 
 @projects_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_project():
     """Create a new project"""
     current_user_id = int(get_jwt_identity())
@@ -88,11 +82,7 @@ def create_project():
     # If a property_id is provided, check permissions
     property_id = data.get('property_id')
     if property_id:
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to create projects"}), 403
@@ -133,34 +123,20 @@ def get_project(project_id):
     if project.user_id != current_user_id:
         # If associated with a property, check property permissions
         if project.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=project.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(project.property_id, current_user_id)
             
             if not property_user:
                 return jsonify({"error": "You don't have permission to view this project"}), 403
         else:
             # Not user's project and not associated with a property they have access to
             return jsonify({"error": "Project not found or access denied"}), 404
+
+    etag, last_modified = row_validators(project)
+    cached = not_modified(etag, last_modified, use_if_modified_since=True)
+    if cached:
+        return cached
     
-    result = {
-        'id': project.id,
-        'name': project.name,
-        'description': project.description,
-        'status': project.status,
-        'budget': project.budget,
-        'spent': project.spent,
-        'start_date': project.start_date.isoformat() if project.start_date else None,
-        'projected_end_date': project.projected_end_date.isoformat() if project.projected_end_date else None,
-        'completed_date': project.completed_date.isoformat() if project.completed_date else None,
-        'created_at': project.created_at.isoformat(),
-        'updated_at': project.updated_at.isoformat(),
-        'property_id': project.property_id
-    }
-    
-    return jsonify(result)
+    return with_validators(PROJECT.response(project), etag, last_modified)
 
 @projects_bp.route('/<int:project_id>', methods=['PUT'])
 @jwt_required()
@@ -176,11 +152,7 @@ def update_project(project_id):
     if project.user_id != current_user_id:
         # If associated with a property, check property permissions
         if project.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=project.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(project.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to update this project"}), 403
@@ -224,11 +196,7 @@ def update_project(project_id):
     if 'property_id' in data and data['property_id'] != project.property_id:
         new_property_id = data['property_id']
         if new_property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=new_property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(new_property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to move this project to the specified property"}), 403
@@ -257,11 +225,7 @@ def delete_project(project_id):
     if project.user_id != current_user_id:
         # If associated with a property, check property permissions
         if project.property_id:
-            property_user = PropertyUser.query.filter_by(
-                property_id=project.property_id,
-                user_id=current_user_id,
-                status='active'
-            ).first()
+            property_user = get_property_membership(project.property_id, current_user_id)
             
             if not property_user or property_user.role not in ['owner', 'manager']:
                 return jsonify({"error": "You don't have permission to delete this project"}), 403
@@ -1,10 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.property import Property
 from app.models.user import User
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
 from app import db
 from datetime import datetime
+from app.utils.idempotency import idempotent
+from app.services.property_deletion import delete_property_data, start_property_deletion
+from app.utils.conditional import list_validators, not_modified, row_validators, with_validators
+from app.utils.serializers import PROPERTY, PROPERTY_DETAIL_FIELDS
 
 properties_bp = Blueprint('properties', __name__)
 
@@ -27,38 +32,26 @@ def get_properties():
     property_ids = [assoc.property_id for assoc in property_associations]
     
     # Get all properties based on associations
-    properties = Property.query.filter(Property.id.in_(property_ids)).all()
+    query = Property.query.filter(Property.id.in_(property_ids))
+
+    etag, last_modified = list_validators(
+        query, Property.updated_at,
+        access=[(assoc.property_id, assoc.role) for assoc in property_associations]
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    fields = PROPERTY.requested_fields()
+    properties = PROPERTY.project(query, fields).all()
     
-    # Convert properties to JSON format
-    properties_data = []
-    for prop in properties:
-        # Get the user's role for this property
-        association = next((a for a in property_associations if a.property_id == prop.id), None)
-        role = association.role if association else None
-        
-        properties_data.append({
-            'id': prop.id,
-            'address': prop.address,
-            'city': prop.city,
-            'state': prop.state,
-            'zip': prop.zip,
-            'property_type': prop.property_type,
-            'status': prop.status,
-            'purchase_date': prop.purchase_date.isoformat() if prop.purchase_date else None,
-            'purchase_price': prop.purchase_price,
-            'current_value': prop.current_value,
-            'bedrooms': prop.bedrooms,
-            'bathrooms': prop.bathrooms,
-            'square_footage': prop.square_footage,
-            'is_primary_residence': prop.is_primary_residence,
-            'created_at': prop.created_at.isoformat(),
-            'role': role  # Add user's role for this property
-        })
-    
-    return jsonify(properties_data), 200
+    roles = {assoc.property_id: assoc.role for assoc in property_associations}
+    response = PROPERTY.response(properties, many=True, context={'roles': roles}, fields=fields)
+    return with_validators(response, etag, last_modified), 200
 
 @properties_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_property():
     """Create a new property"""
     current_user_id = int(get_jwt_identity())
@@ -116,11 +109,7 @@ def get_property(property_id):
     current_user_id = int(get_jwt_identity())
     
     # Check if user has access to this property through PropertyUser
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user:
         return jsonify({"error": "Property not found or you don't have permission to access it"}), 404
@@ -130,27 +119,16 @@ def get_property(property_id):
     
     if not property:
         return jsonify({"error": "Property not found"}), 404
+
+    etag, last_modified = row_validators(property, extra=[property_user.role])
+    cached = not_modified(etag, last_modified, use_if_modified_since=True)
+    if cached:
+        return cached
     
-    # Convert property to JSON format
-    property_data = {
-        'id': property.id,
-        'address': property.address,
-        'city': property.city,
-        'state': property.state,
-        'zip': property.zip,
-        'property_type': property.property_type,
-        'status': property.status,
-        'purchase_date': property.purchase_date.isoformat() if property.purchase_date else None,
-        'purchase_price': property.purchase_price,
-        'current_value': property.current_value,
-        'bedrooms': property.bedrooms,
-        'bathrooms': property.bathrooms,
-        'square_footage': property.square_footage,
-        'created_at': property.created_at.isoformat(),
-        'role': property_user.role  # Add user's role for this property
-    }
-    
-    return jsonify(property_data), 200
+    response = PROPERTY.response(
+        property, only=PROPERTY_DETAIL_FIELDS, context={'roles': {property.id: property_user.role}}
+    )
+    return with_validators(response, etag, last_modified), 200
 
 @properties_bp.route('/<int:property_id>', methods=['PUT'])
 @jwt_required()
@@ -159,11 +137,7 @@ def update_property(property_id):
     current_user_id = int(get_jwt_identity())
     
     # Check if user has permission to update this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to update this property"}), 403
@@ -234,12 +208,21 @@ def delete_property(property_id):
     if not property:
         return jsonify({"error": "Property not found"}), 404
     
-    # Delete all property user associations first
-    PropertyUser.query.filter_by(property_id=property_id).delete()
+    # Children are removed with chunked bulk deletes, in the request or, when
+    # asked for, in a background job (see services/property_deletion.py)
+    mode = request.args.get('mode', current_app.config.get('PROPERTY_DELETE_MODE', 'inline'))
+    if mode not in ('background', 'inline'):
+        return jsonify({"error": "mode must be 'background' or 'inline'"}), 400
     
-    # Then delete the property
-    db.session.delete(property)
-    db.session.commit()
+    if mode == 'background':
+        job_id = start_property_deletion(property)
+        return jsonify({
+            'message': 'Property deletion started',
+            'property_id': property_id,
+            'job_id': job_id
+        }), 202
+    
+    delete_property_data(property_id)
     
     return jsonify({
         'message': 'Property deleted successfully'
@@ -253,11 +236,7 @@ def set_primary_residence(property_id):
     current_user_id = int(get_jwt_identity())
     
     # Check if user has access to this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user:
         return jsonify({"error": "Property not found or access denied"}), 404
@@ -7,7 +7,9 @@ import uuid
 from app import db
 from app.models.document import Document
 from app.models.property import Property
-from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.response_cache import property_cached
 
 property_photos_bp = Blueprint('property_photos', __name__)
 
@@ -18,6 +20,7 @@ def allowed_file(filename):
 
 @property_photos_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def upload_property_photo():
     """Upload a new property photo"""
     current_user_id = int(get_jwt_identity())
@@ -37,11 +40,7 @@ def upload_property_photo():
     if not property_id:
         return jsonify({"error": "Property ID is required"}), 400
     
-    property_user = PropertyUser.query.filter_by(
-    property_id=property_id,
-    user_id=current_user_id,
-    status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
 
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to upload photos"}), 403
@@ -109,16 +108,13 @@ def upload_property_photo():
 
 @property_photos_bp.route('/<int:property_id>', methods=['GET'])
 @jwt_required()
+@property_cached()
 def get_property_photos(property_id):
     """Get all photos for a specific property"""
     current_user_id = int(get_jwt_identity())
     
     # Verify user has access to this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to view photos"}), 403
@@ -163,11 +159,7 @@ def set_primary_photo(photo_id):
         return jsonify({"error": "Photo not found"}), 404
     
     # Check if user has permission for this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=photo.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(photo.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to set the primary photo"}), 403
@@ -200,11 +192,7 @@ def delete_property_photo(photo_id):
         return jsonify({"error": "Photo not found"}), 404
     
     # Check if user has permission for this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=photo.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(photo.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to delete this photo"}), 403
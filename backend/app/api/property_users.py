@@ -5,7 +5,7 @@ from app import db
 from app.models.Property_user import PropertyUser
 from app.models.property import Property
 from app.models.user import User
-from app.services.email_service import send_property_invitation_email
+from app.utils.events import PropertyInvitationSent, emit
 from datetime import datetime, timedelta
 import uuid
 
@@ -105,7 +105,6 @@ def invite_user(property_id):
             db.session.commit()
             
             # Send invitation email
-            inviter = User.query.get(current_user_id)
             invitation_token = str(uuid.uuid4())
             
             # Save the token temporarily (can also be stored in a separate table)
@@ -116,14 +115,8 @@ def invite_user(property_id):
             frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:3000')
             invitation_url = f"{frontend_url}/accept-invitation?token={invitation_token}"
             
-            # Send email
-            send_property_invitation_email(
-                user=user,
-                inviter=inviter,
-                property=property,
-                role=data.get('role'),
-                invitation_url=invitation_url
-            )
+            # Send email (from a background subscriber)
+            emit(PropertyInvitationSent(property_id, current_user_id, data.get('role'), invitation_url, user_id=user.id))
             
             return jsonify({
                 "message": "Invitation updated and sent successfully",
@@ -143,7 +136,6 @@ def invite_user(property_id):
         db.session.commit()
         
         # Send invitation email
-        inviter = User.query.get(current_user_id)
         invitation_token = str(uuid.uuid4())
         
         # Save the token
@@ -154,14 +146,8 @@ def invite_user(property_id):
         frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:3000')
         invitation_url = f"{frontend_url}/accept-invitation?token={invitation_token}"
         
-        # Send email
-        send_property_invitation_email(
-            user=user,
-            inviter=inviter,
-            property=property,
-            role=data.get('role'),
-            invitation_url=invitation_url
-        )
+        # Send email (from a background subscriber)
+        emit(PropertyInvitationSent(property_id, current_user_id, data.get('role'), invitation_url, user_id=user.id))
         
         return jsonify({
             "message": "Invitation sent successfully",
@@ -193,20 +179,8 @@ def invite_user(property_id):
         frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:3000')
         invitation_url = f"{frontend_url}/register?invitation={invitation_token}"
         
-        # Send email inviting them to register
-        inviter = User.query.get(current_user_id)
-        
-        # Import the new email function at the top of your file
-        from app.services.email_service import send_property_invitation_email_to_new_user
-        
-        # Send invitation email
-        send_property_invitation_email_to_new_user(
-            email=data.get('email'),
-            inviter=inviter,
-            property=property,
-            role=data.get('role'),
-            invitation_url=invitation_url
-        )
+        # Send email inviting them to register (from a background subscriber)
+        emit(PropertyInvitationSent(property_id, current_user_id, data.get('role'), invitation_url, email=data.get('email')))
         
         return jsonify({
             "message": "Invitation sent to new user",
@@ -4,13 +4,17 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User
 from app.models.settings import Settings  # You'll need to create this model
+from app.utils.constants import DEFAULT_NOTIFICATION_SETTINGS
+from app.utils.db_routing import use_primary
 
 settings_bp = Blueprint('settings', __name__)
 
 @settings_bp.route('/', methods=['GET'])
+@use_primary
 @jwt_required()
 def get_settings():
     """Get user settings"""
+    # On the primary: a lagging replica would miss an existing row and insert a second one
     current_user_id = int(get_jwt_identity())
     
     # Get user settings from database
@@ -20,13 +24,7 @@ def get_settings():
         # Create default settings if none exist
         settings = Settings(
             user_id=current_user_id,
-            notifications={
-                "email_notifications": True,
-                "maintenance_reminders": True,
-                "payment_reminders": True,
-                "project_updates": True,
-                "document_updates": False
-            },
+            notifications=dict(DEFAULT_NOTIFICATION_SETTINGS),
             appearance={
                 "theme": "dark",
                 "dashboard_layout": "default"
@@ -84,13 +82,7 @@ def update_appearance():
         # Create settings if none exist
         settings = Settings(
             user_id=current_user_id,
-            notifications={
-                "email_notifications": True,
-                "maintenance_reminders": True,
-                "payment_reminders": True,
-                "project_updates": True,
-                "document_updates": False
-            },
+            notifications=dict(DEFAULT_NOTIFICATION_SETTINGS),
             appearance=data
         )
         db.session.add(settings)
@@ -0,0 +1,61 @@
+# api/sync.py
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.sync_service import SyncRejected, apply_changes, get_changes
+from app.utils.idempotency import idempotent
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_sync_changes():
+    """Changes since the client's last sync (see services/sync_service.py)
+
+    Query parameters:
+    - since: cursor from the previous response; 0 or missing for a full snapshot
+    - limit: maximum changes per page (at most SYNC_PAGE_SIZE)
+    - entities: comma-separated entity names to sync, default all
+    """
+    current_user_id = int(get_jwt_identity())
+
+    try:
+        since = int(request.args.get('since', 0))
+        limit = request.args.get('limit', type=int)
+    except ValueError:
+        return jsonify({"error": "since must be an integer"}), 400
+
+    entities = request.args.get('entities')
+    entity_names = [name.strip() for name in entities.split(',') if name.strip()] if entities else None
+
+    try:
+        payload = get_changes(current_user_id, since=since, limit=limit, entity_names=entity_names)
+    except SyncRejected as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(payload), 200
+
+
+@sync_bp.route('/push', methods=['POST'])
+@jwt_required()
+@idempotent
+def push_sync_changes():
+    """Apply edits made offline
+
+    Body: {"changes": [{"entity": "maintenance", "op": "upsert" | "delete",
+    "id": 12 (omit to create), "client_id": "...", "base_updated_at": "...",
+    "data": {...}}]}
+
+    Edits are applied in order and independently; the response has one
+    result per edit (applied, conflict or rejected).
+    """
+    current_user_id = int(get_jwt_identity())
+    max_changes = current_app.config.get('SYNC_PUSH_MAX_CHANGES', 200)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('changes'), list):
+        return jsonify({"error": "Expected a JSON object with a 'changes' list"}), 400
+    if len(data['changes']) > max_changes:
+        return jsonify({"error": f"At most {max_changes} changes per push"}), 400
+
+    results = apply_changes(current_user_id, data['changes'])
+    return jsonify({"results": results}), 200
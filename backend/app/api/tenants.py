@@ -13,6 +13,18 @@ from datetime import datetime, timedelta
 from flask import current_app
 from app.utils.constants import DOCUMENT_CATEGORIES, TENANT_DOCUMENT_CATEGORY_CHOICES
 from app.models.Property_user import PropertyUser
+from app.utils.property_permissions import get_property_membership
+from app.utils.idempotency import idempotent
+from app.utils.response_cache import property_cached
+from app.utils.conditional import list_validators, not_modified, row_validators, with_validators
+from app.utils.serializers import (
+    TENANT,
+    TENANT_ACTIVE_FIELDS,
+    TENANT_DETAIL_FIELDS,
+    TENANT_PROPERTY_FIELDS,
+    TENANT_SEARCH_FIELDS,
+    property_summaries,
+)
 
 # Create the blueprint
 tenants_bp = Blueprint('tenants', __name__)
@@ -30,15 +42,12 @@ def get_tenants():
     """Get all tenants for the current user"""
     current_user_id = int(get_jwt_identity())
     property_id = request.args.get('property_id')
+    access = None
     
     # If property_id is provided, check access first
     if property_id:
         # Verify user has access to this property
-        property_user = PropertyUser.query.filter_by(
-            property_id=property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        property_user = get_property_membership(property_id, current_user_id)
         
         if not property_user or property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "Property not found or you don't have permission to view tenants"}), 403
@@ -54,6 +63,7 @@ def get_tenants():
         ).all()
         
         property_ids = [pu.property_id for pu in property_users]
+        access = [(pu.property_id, pu.role) for pu in property_users]
         
         # Get tenants for all properties the user has owner/manager access to
         query = Tenant.query.filter(Tenant.property_id.in_(property_ids))
@@ -62,51 +72,26 @@ def get_tenants():
     status = request.args.get('status')
     if status:
         query = query.filter_by(status=status)
-    
-    # Execute query
-    tenants = query.order_by(Tenant.created_at.desc()).all()
-    
-    result = []
-    for tenant in tenants:
-        # Get property info if available
-        property_info = None
-        if tenant.property_id:
-            property_obj = Property.query.get(tenant.property_id)
-            if property_obj:
-                property_info = {
-                    'id': property_obj.id,
-                    'address': property_obj.address,
-                    'city': property_obj.city,
-                    'state': property_obj.state
-                }
 
-        result.append({
-            'id': tenant.id,
-            'property_id': tenant.property_id,
-            'property': property_info,
-            'first_name': tenant.first_name,
-            'last_name': tenant.last_name,
-            'email': tenant.email,
-            'phone': tenant.phone,
-            'lease_start': tenant.lease_start.isoformat() if tenant.lease_start else None,
-            'lease_end': tenant.lease_end.isoformat() if tenant.lease_end else None,
-            'lease_end_date': tenant.lease_end.isoformat() if tenant.lease_end else None,
-            'monthly_rent': tenant.monthly_rent,
-            'security_deposit': tenant.security_deposit,
-            'rent_paid_through': tenant.rent_paid_through.isoformat() if tenant.rent_paid_through else None,
-            'emergency_contact_name': tenant.emergency_contact_name,
-            'emergency_contact_phone': tenant.emergency_contact_phone,
-            'notes': tenant.notes,
-            'status': tenant.status,
-            'created_at': tenant.created_at.isoformat(),
-            'updated_at': tenant.updated_at.isoformat(),
-            'created_by': tenant.user_id  # Include who added the tenant
-        })
+    # Each tenant includes its property's address
+    etag, last_modified = list_validators(
+        query.outerjoin(Property, Property.id == Tenant.property_id),
+        Tenant.updated_at, Property.updated_at, access=access
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    return jsonify(result)
+    # Execute query, selecting only the columns the requested fields need
+    fields = TENANT.requested_fields()
+    tenants = TENANT.project(query, fields).order_by(Tenant.created_at.desc()).all()
+    context = {'properties': property_summaries(tenant.property_id for tenant in tenants) if 'property' in fields else {}}
+    
+    return with_validators(TENANT.response(tenants, many=True, context=context, fields=fields), etag, last_modified)
 
 @tenants_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_tenant():
     """Add a new tenant"""
     current_user_id = int(get_jwt_identity())
@@ -122,11 +107,7 @@ def create_tenant():
     property_id = data.get('property_id')
     
     # Check if user has permission for this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to add tenants"}), 403
@@ -176,51 +157,20 @@ def get_tenant(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this tenant"}), 403
 
-    # Get property info if available
-    property_info = None
-    if tenant.property_id:
-        property_obj = Property.query.get(tenant.property_id)
-        if property_obj:
-            property_info = {
-                'id': property_obj.id,
-                'address': property_obj.address,
-                'city': property_obj.city,
-                'state': property_obj.state
-            }
+    property_obj = Property.query.get(tenant.property_id) if tenant.property_id else None
 
-    result = {
-        'id': tenant.id,
-        'property_id': tenant.property_id,
-        'property': property_info,
-        'first_name': tenant.first_name,
-        'last_name': tenant.last_name,
-        'email': tenant.email,
-        'phone': tenant.phone,
-        'lease_start': tenant.lease_start.isoformat() if tenant.lease_start else None,
-        'lease_end': tenant.lease_end.isoformat() if tenant.lease_end else None,
-        'lease_end_date': tenant.lease_end.isoformat() if tenant.lease_end else None,
-        'monthly_rent': tenant.monthly_rent,
-        'security_deposit': tenant.security_deposit,
-        'rent_paid_through': tenant.rent_paid_through.isoformat() if tenant.rent_paid_through else None,
-        'emergency_contact_name': tenant.emergency_contact_name,
-        'emergency_contact_phone': tenant.emergency_contact_phone,
-        'notes': tenant.notes,
-        'status': tenant.status,
-        'created_at': tenant.created_at.isoformat(),
-        'updated_at': tenant.updated_at.isoformat(),
-        'created_by': tenant.user_id  # Include who added the tenant
-    }
-    
-    return jsonify(result)
+    etag, last_modified = row_validators(tenant, property_obj)
+    cached = not_modified(etag, last_modified, use_if_modified_since=True)
+    if cached:
+        return cached
+
+    context = {'properties': property_summaries([tenant.property_id])}
+    return with_validators(TENANT.response(tenant, only=TENANT_DETAIL_FIELDS, context=context), etag, last_modified)
 
 @tenants_bp.route('/<int:tenant_id>', methods=['PUT'])
 @jwt_required()
@@ -234,11 +184,7 @@ def update_tenant(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to update this tenant"}), 403
@@ -248,11 +194,7 @@ def update_tenant(tenant_id):
     # If property_id is being updated, verify user has permission for the new property too
     if 'property_id' in data:
         new_property_id = data['property_id']
-        new_property_user = PropertyUser.query.filter_by(
-            property_id=new_property_id,
-            user_id=current_user_id,
-            status='active'
-        ).first()
+        new_property_user = get_property_membership(new_property_id, current_user_id)
         
         if not new_property_user or new_property_user.role not in ['owner', 'manager']:
             return jsonify({"error": "You don't have permission to move the tenant to the specified property"}), 403
@@ -324,11 +266,7 @@ def delete_tenant(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to delete this tenant"}), 403
@@ -342,44 +280,24 @@ def delete_tenant(tenant_id):
 
 @tenants_bp.route('/property/<int:property_id>', methods=['GET'])
 @jwt_required()
+@property_cached()
 def get_tenants_by_property(property_id):
     """Get all tenants for a specific property"""
     current_user_id = int(get_jwt_identity())
     
     # Verify user has access to this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "Property not found or you don't have permission to view tenants"}), 403
     
     # Get all tenants for this property (not filtered by user_id)
-    tenants = Tenant.query.filter_by(
+    fields = TENANT.requested_fields(only=TENANT_PROPERTY_FIELDS)
+    tenants = TENANT.project(Tenant.query.filter_by(
         property_id=property_id
-    ).order_by(Tenant.created_at.desc()).all()
+    ), fields).order_by(Tenant.created_at.desc()).all()
     
-    result = []
-    for tenant in tenants:
-        result.append({
-            'id': tenant.id,
-            'property_id': tenant.property_id,
-            'first_name': tenant.first_name,
-            'last_name': tenant.last_name,
-            'email': tenant.email,
-            'phone': tenant.phone,
-            'lease_start': tenant.lease_start.isoformat() if tenant.lease_start else None,
-            'lease_end': tenant.lease_end.isoformat() if tenant.lease_end else None,
-            'monthly_rent': tenant.monthly_rent,
-            'security_deposit': tenant.security_deposit,
-            'status': tenant.status,
-            'created_at': tenant.created_at.isoformat(),
-            'created_by': tenant.user_id  # Include who added the tenant
-        })
-    
-    return jsonify(result)
+    return TENANT.response(tenants, many=True, fields=fields)
 
 @tenants_bp.route('/active', methods=['GET'])
 @jwt_required()
@@ -397,25 +315,13 @@ def get_active_tenants():
     property_ids = [pu.property_id for pu in property_users]
     
     # Get active tenants for all properties the user has owner/manager access to
-    tenants = Tenant.query.filter(
+    fields = TENANT.requested_fields(only=TENANT_ACTIVE_FIELDS)
+    tenants = TENANT.project(Tenant.query.filter(
         Tenant.property_id.in_(property_ids),
         Tenant.status == 'active'
-    ).order_by(Tenant.created_at.desc()).all()
-    
-    result = []
-    for tenant in tenants:
-        result.append({
-            'id': tenant.id,
-            'property_id': tenant.property_id,
-            'first_name': tenant.first_name,
-            'last_name': tenant.last_name,
-            'email': tenant.email,
-            'lease_end': tenant.lease_end.isoformat() if tenant.lease_end else None,
-            'monthly_rent': tenant.monthly_rent,
-            'created_by': tenant.user_id  # Include who added the tenant
-        })
+    ), fields).order_by(Tenant.created_at.desc()).all()
     
-    return jsonify(result)
+    return TENANT.response(tenants, many=True, fields=fields)
 
 @tenants_bp.route('/search', methods=['GET'])
 @jwt_required()
@@ -434,27 +340,15 @@ def search_tenants():
     property_ids = [pu.property_id for pu in property_users]
     
     # Search tenants for all properties the user has owner/manager access to
-    tenants = Tenant.query.filter(
+    fields = TENANT.requested_fields(only=TENANT_SEARCH_FIELDS)
+    tenants = TENANT.project(Tenant.query.filter(
         Tenant.property_id.in_(property_ids),
         (Tenant.first_name.ilike(f'%{query}%') | 
          Tenant.last_name.ilike(f'%{query}%') | 
          Tenant.email.ilike(f'%{query}%'))
-    ).order_by(Tenant.created_at.desc()).all()
+    ), fields).order_by(Tenant.created_at.desc()).all()
     
-    result = []
-    for tenant in tenants:
-        result.append({
-            'id': tenant.id,
-            'property_id': tenant.property_id,
-            'first_name': tenant.first_name,
-            'last_name': tenant.last_name,
-            'email': tenant.email,
-            'phone': tenant.phone,
-            'status': tenant.status,
-            'created_by': tenant.user_id  # Include who added the tenant
-        })
-    
-    return jsonify(result)
+    return TENANT.response(tenants, many=True, fields=fields)
 
 @tenants_bp.route('/<int:tenant_id>/documents', methods=['GET'])
 @jwt_required()
@@ -468,11 +362,7 @@ def get_tenant_documents(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this tenant's documents"}), 403
@@ -507,6 +397,7 @@ def get_tenant_documents(tenant_id):
 
 @tenants_bp.route('/<int:tenant_id>/documents', methods=['POST'])
 @jwt_required()
+@idempotent
 def upload_tenant_document(tenant_id):
     """Upload a document for a specific tenant"""
     current_user_id = int(get_jwt_identity())
@@ -517,11 +408,7 @@ def upload_tenant_document(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to upload documents for this tenant"}), 403
@@ -613,11 +500,7 @@ def delete_tenant_document(tenant_id, document_id):
         return jsonify({"error": "Document not found or not associated with this tenant"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to delete documents for this tenant"}), 403
@@ -646,11 +529,7 @@ def get_tenant_document_categories(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this tenant's document categories"}), 403
@@ -678,11 +557,7 @@ def get_tenant_expiring_documents(tenant_id):
         return jsonify({"error": "Tenant not found"}), 404
     
     # Check if user has permission for the property this tenant is associated with
-    property_user = PropertyUser.query.filter_by(
-        property_id=tenant.property_id,
-        user_id=current_user_id,
-        status='active'
-    ).first()
+    property_user = get_property_membership(tenant.property_id, current_user_id)
     
     if not property_user or property_user.role not in ['owner', 'manager']:
         return jsonify({"error": "You don't have permission to view this tenant's documents"}), 403
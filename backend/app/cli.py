@@ -0,0 +1,264 @@
+# app/cli.py
+"""Flask CLI commands for scheduled and maintenance tasks."""
+import click
+from flask.cli import AppGroup
+
+notifications_cli = AppGroup('notifications', help='Notification and digest commands.')
+checklist_cli = AppGroup('checklist', help='Maintenance checklist housekeeping commands.')
+
+
+@notifications_cli.command('send-digest')
+@click.option('--dry-run', is_flag=True, help='Build digests without sending any email.')
+@click.option('--days', default=None, help='Comma-separated reminder offsets in days (overrides NOTIFICATION_REMINDER_DAYS).')
+def send_digest_command(dry_run, days):
+    """Send expiration digests for documents, leases and warranties."""
+    from app.services.notification_service import send_expiration_digests
+
+    reminder_days = [int(d) for d in days.split(',') if d.strip()] if days else None
+    summary = send_expiration_digests(reminder_days=reminder_days, dry_run=dry_run)
+
+    click.echo(
+        f"Recipients: {summary['recipients']}, digests: {summary['digests']}, "
+        f"skipped: {summary['skipped']}, sent: {summary['sent']}, failed: {summary['failed']}"
+    )
+
+
+@checklist_cli.command('prune-defaults')
+@click.option('--dry-run', is_flag=True, help='Report what would change without writing.')
+def prune_defaults_command(dry_run):
+    """Remove untouched default checklist rows created before defaults became virtual.
+
+    Migration 0002 linked those rows to their template (default_key) and
+    hid the defaults a property had removed. A linked row that was never
+    completed or edited is the same as the virtual item merged in at read
+    time, so it is deleted; everything else, hidden rows included, is kept.
+    """
+    from app import db
+    from app.models.maintenance_checklist import MaintenanceChecklistItem
+    from app.utils.constants import DEFAULT_CHECKLIST_ITEMS
+
+    deleted = 0
+    for season, templates in DEFAULT_CHECKLIST_ITEMS.items():
+        for template in templates:
+            untouched = MaintenanceChecklistItem.query.filter(
+                MaintenanceChecklistItem.default_key == template['key'],
+                MaintenanceChecklistItem.is_default == True,
+                MaintenanceChecklistItem.is_hidden == False,
+                db.or_(MaintenanceChecklistItem.is_completed == False,
+                       MaintenanceChecklistItem.is_completed.is_(None)),
+                MaintenanceChecklistItem.season == season,
+                MaintenanceChecklistItem.task == template['task'],
+                MaintenanceChecklistItem.description == template['description']
+            )
+            if dry_run:
+                deleted += untouched.count()
+            else:
+                deleted += untouched.delete(synchronize_session=False)
+
+    if not dry_run:
+        db.session.commit()
+
+    click.echo(f"{'Would delete' if dry_run else 'Deleted'} {deleted} untouched default rows")
+
+
+sync_cli = AppGroup('sync', help='Offline sync housekeeping commands.')
+
+
+@sync_cli.command('prune')
+@click.option('--days', type=int, default=None, help='Keep this many days of changes (overrides SYNC_RETENTION_DAYS).')
+def sync_prune_command(days):
+    """Delete old entries from the sync change log.
+
+    Clients whose last sync is older than the retained log get a full
+    snapshot on their next sync.
+    """
+    from app.services.sync_service import prune_changes
+
+    deleted = prune_changes(days)
+    click.echo(f"Deleted {deleted} sync log entries")
+
+
+idempotency_cli = AppGroup('idempotency', help='Idempotency-Key housekeeping commands.')
+
+
+@idempotency_cli.command('prune')
+def idempotency_prune_command():
+    """Delete stored responses whose Idempotency-Key has expired."""
+    from app.utils.idempotency import prune_idempotency_keys
+
+    deleted = prune_idempotency_keys()
+    click.echo(f"Deleted {deleted} expired idempotency keys")
+
+
+cache_cli = AppGroup('cache', help='Response cache commands.')
+
+
+@cache_cli.command('serve')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', type=int, default=6379, show_default=True)
+@click.option('--max-bytes', type=int, default=None, help='Memory limit (defaults to RESPONSE_CACHE_MAX_BYTES).')
+def cache_serve_command(host, port, max_bytes):
+    """Run a local stand-in for a Redis server.
+
+    Lets RESPONSE_CACHE_BACKEND=redis be used in development without
+    installing Redis; point RESPONSE_CACHE_URL at it.
+    """
+    from flask import current_app
+    from app.utils.response_cache import make_standin_server
+
+    max_bytes = max_bytes or current_app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    server = make_standin_server(host, port, max_bytes)
+    click.echo(f"Response cache stand-in listening on {host}:{port} ({max_bytes} bytes)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+jobs_cli = AppGroup('jobs', help='Background job queue commands.')
+
+
+@jobs_cli.command('worker')
+@click.option('--concurrency', type=int, default=None, help='Worker threads (defaults to JOBS_CONCURRENCY).')
+@click.option('--poll-interval', type=float, default=None, help='Seconds between polls when idle (defaults to JOBS_POLL_INTERVAL).')
+@click.option('--burst', is_flag=True, help='Exit once no jobs are due instead of waiting for more.')
+def jobs_worker_command(concurrency, poll_interval, burst):
+    """Process queued background jobs until stopped.
+
+    SIGTERM/SIGINT let the jobs in progress finish before exiting. Run as
+    many workers as needed; they share the queue safely on PostgreSQL.
+    """
+    from flask import current_app
+    from app.utils.jobs import Worker
+
+    config = current_app.config
+    worker = Worker(
+        current_app._get_current_object(),
+        concurrency=concurrency or config.get('JOBS_CONCURRENCY', 2),
+        poll_interval=poll_interval or config.get('JOBS_POLL_INTERVAL', 1.0),
+        burst=burst
+    )
+    click.echo(f"Job worker {worker.id} started with {worker.concurrency} threads")
+    processed = worker.run()
+    click.echo(f"Job worker stopped: {processed['done']} done, {processed['retry']} retried, {processed['dead']} dead")
+
+
+@jobs_cli.command('stats')
+def jobs_stats_command():
+    """Show queued, running and dead jobs per job name."""
+    from app.utils.jobs import get_queue_stats
+
+    stats = get_queue_stats()
+    for name, counts in sorted(stats['jobs'].items()):
+        click.echo(f"{name}: {counts['queued']} queued, {counts['running']} running, {counts['dead']} dead")
+    click.echo(f"Total: {stats['queued']} queued, {stats['running']} running, {stats['dead']} dead")
+    if stats['oldest_due_seconds'] is not None:
+        click.echo(f"Oldest due job has waited {stats['oldest_due_seconds']}s")
+
+
+@jobs_cli.command('retry')
+@click.argument('dead_job_ids', nargs=-1, type=int)
+@click.option('--all', 'retry_all', is_flag=True, help='Requeue every dead job.')
+def jobs_retry_command(dead_job_ids, retry_all):
+    """Requeue dead jobs by dead_jobs id (or all of them with --all)."""
+    from app.utils.jobs import load_job_modules, retry_dead_jobs
+
+    if not dead_job_ids and not retry_all:
+        raise click.UsageError("Pass dead job ids or --all")
+    load_job_modules()
+    requeued = retry_dead_jobs(list(dead_job_ids) or None)
+    click.echo(f"Requeued {requeued} dead jobs")
+
+
+@jobs_cli.command('prune-dead')
+@click.option('--days', type=int, default=30, show_default=True, help='Keep dead jobs for this many days.')
+def jobs_prune_dead_command(days):
+    """Delete old entries from the dead-letter table."""
+    from app.utils.jobs import prune_dead_jobs
+
+    deleted = prune_dead_jobs(days)
+    click.echo(f"Deleted {deleted} dead jobs")
+
+
+schema_cli = AppGroup('schema', help='Database schema version commands.')
+
+
+@schema_cli.command('status')
+def schema_status_command():
+    """Compare the database schema revision with the migrations in the repo."""
+    from app import db
+    from app.utils.schema import get_schema_status
+
+    info = get_schema_status(db.engine)
+    click.echo(f"Status: {info['status']}")
+    click.echo(f"Database revision: {', '.join(info['database']) or 'none'}")
+    click.echo(f"Code revision: {', '.join(info['head'])}")
+    if info['status'] != 'current':
+        raise SystemExit(1)
+
+
+@schema_cli.command('upgrade')
+@click.option('--strict', is_flag=True,
+              help="Fail instead of adopting a database created by create_all or the old autogenerated migrations.")
+def schema_upgrade_command(strict):
+    """Apply pending migrations; returns immediately when the schema is current."""
+    from flask import current_app
+    from app.utils.schema import SchemaError, upgrade_schema
+
+    try:
+        info = upgrade_schema(current_app, adopt_legacy=not strict)
+    except SchemaError as e:
+        raise click.ClickException(str(e))
+
+    if info['status'] == 'current':
+        click.echo("Schema is up to date")
+    elif info['status'] == 'ahead':
+        click.echo(f"Database is at {', '.join(info['database'])}, newer than this code; nothing to do")
+    else:
+        click.echo(f"Upgraded {info['status']} schema to {', '.join(info['head'])}")
+
+
+def get_migrate(app):
+    """Set up Flask-Migrate on demand.
+
+    Flask-Migrate imports alembic, which is a good share of the app's import
+    time, and only the CLI needs it, so it isn't initialized in create_app.
+    """
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        from app import db
+        from app.utils.schema import MIGRATIONS_DIR
+
+        Migrate(app, db, directory=MIGRATIONS_DIR)
+    return app.extensions['migrate']
+
+
+class LazyMigrateGroup(click.Group):
+    """`flask db`, loading Flask-Migrate only when the command is used"""
+
+    def _migrate_group(self, ctx):
+        from flask.cli import ScriptInfo
+        from flask_migrate.cli import db as db_cli_group
+
+        get_migrate(ctx.ensure_object(ScriptInfo).load_app())
+        return db_cli_group
+
+    def list_commands(self, ctx):
+        return self._migrate_group(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._migrate_group(ctx).get_command(ctx, name)
+
+
+def register_cli(app):
+    """Attach the CLI command groups to the app"""
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(checklist_cli)
+    app.cli.add_command(sync_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(cache_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(LazyMigrateGroup('db', help='Perform database migrations (Flask-Migrate).'))
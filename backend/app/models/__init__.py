@@ -11,4 +11,7 @@ from app.models.finance import Expense, Budget
 from app.models.settings import Settings
 from app.models.tenant import Tenant
 from app.models.Property_user import PropertyUser
-from app.models.pending_invitation import PendingInvitation
\ No newline at end of file
+from app.models.pending_invitation import PendingInvitation
+from app.models.sync_change import SyncChange
+from app.models.idempotency_key import IdempotencyKey
+from app.models.job import Job, DeadJob
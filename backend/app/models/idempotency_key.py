@@ -0,0 +1,30 @@
+# models/idempotency_key.py
+from app import db
+from datetime import datetime
+
+class IdempotencyKey(db.Model):
+    """A client-supplied Idempotency-Key and the response it produced.
+
+    Rows are claimed (status 'in_progress') before the request runs and
+    completed with the response afterwards; see utils/idempotency.py.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256 of method, path and body
+    status = db.Column(db.String(20), nullable=False, default='in_progress')  # in_progress, completed
+    response_status = db.Column(db.Integer, nullable=True)
+    response_headers = db.Column(db.Text, nullable=True)  # JSON object
+    response_body = db.Column(db.LargeBinary, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key} ({self.status})>'
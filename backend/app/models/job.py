@@ -0,0 +1,51 @@
+# models/job.py
+from app import db
+from datetime import datetime
+
+class Job(db.Model):
+    """A queued background job; see utils/jobs.py.
+
+    Rows are deleted once the job succeeds, or moved to dead_jobs after its
+    last failed attempt, so the table only holds pending and running work.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON object of keyword arguments
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)  # worker id while running
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} ({self.status})>'
+
+
+class DeadJob(db.Model):
+    """A job that failed on every attempt, kept for inspection and retry"""
+    __tablename__ = 'dead_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)  # when the job was first queued
+    failed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_dead_jobs_failed_at', 'failed_at'),
+    )
+
+    def __repr__(self):
+        return f'<DeadJob {self.job_id} {self.name}>'
@@ -16,10 +16,24 @@ class MaintenanceChecklistItem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_default = db.Column(db.Boolean, default=True)
+    # Key of the DEFAULT_CHECKLIST_ITEMS template this row overrides (None for custom items)
+    default_key = db.Column(db.String(50), nullable=True)
+    # Set when a default item is removed, so the template item stays hidden for this property
+    is_hidden = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
     
     # Relationships
     user = db.relationship('User', backref=db.backref('checklist_items', lazy=True))
     property = db.relationship('Property', backref=db.backref('checklist_items', lazy=True))
     
+    __table_args__ = (
+        db.Index('ix_checklist_property_season', 'property_id', 'season'),
+        # At most one row per default item and property (see resolve_checklist_item)
+        db.Index(
+            'uq_checklist_property_default_key', 'property_id', 'default_key', unique=True,
+            postgresql_where=db.text('default_key IS NOT NULL'),
+            sqlite_where=db.text('default_key IS NOT NULL')
+        ),
+    )
+    
     def __repr__(self):
         return f'<ChecklistItem {self.id}: {self.task}>'
\ No newline at end of file
@@ -11,7 +11,7 @@ class Property(db.Model):
     state = db.Column(db.String(50), nullable=False)
     zip = db.Column(db.String(20), nullable=False)
     property_type = db.Column(db.String(50), nullable=False)  # residential, commercial, vacation, etc.
-    status = db.Column(db.String(20), default='active')  # active, vacant, maintenance, inactive
+    status = db.Column(db.String(20), default='active')  # active, vacant, maintenance, inactive, deleting
     purchase_date = db.Column(db.Date, nullable=True)
     purchase_price = db.Column(db.Float, nullable=True)
     current_value = db.Column(db.Float, nullable=True)
@@ -0,0 +1,29 @@
+# models/sync_change.py
+from app import db
+from datetime import datetime
+
+class SyncChange(db.Model):
+    """One entry in the change feed served by /api/sync.
+
+    The id doubles as the feed sequence: clients remember the last id they
+    saw and ask for everything after it. Rows are written by the change log
+    (see utils/change_log.py), never by API handlers directly.
+    """
+    __tablename__ = 'sync_changes'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)  # property, maintenance, tenant, ... or membership
+    entity_id = db.Column(db.Integer, nullable=False)
+    property_id = db.Column(db.Integer, nullable=True)  # Property the row belonged to when it changed
+    user_id = db.Column(db.Integer, nullable=True)  # Row owner (for memberships, the member)
+    op = db.Column(db.String(10), nullable=False)  # upsert, delete
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_sync_changes_property_id', 'property_id', 'id'),
+        db.Index('ix_sync_changes_user_id', 'user_id', 'id'),
+        db.Index('ix_sync_changes_changed_at', 'changed_at'),
+    )
+
+    def __repr__(self):
+        return f'<SyncChange {self.id}: {self.op} {self.entity} {self.entity_id}>'
@@ -0,0 +1,214 @@
+# services/bootstrap_service.py
+"""
+App startup payload.
+
+Everything the web and mobile apps need to render their first screen
+(profile, settings, properties with the user's role, open maintenance
+counts, upcoming expirations and this month's spend) in one response.
+
+Built with five queries no matter how many properties the user has:
+1. user + settings
+2. properties + the user's role on each
+3. open maintenance requests, counted per property
+4. expiring documents, leases and warranties (one UNION ALL)
+5. current-month expenses, summed per property
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, literal, or_, union_all
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.finance import Expense
+from app.models.maintenance import Maintenance
+from app.models.property import Property
+from app.models.Property_user import PropertyUser
+from app.models.settings import Settings
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.utils.constants import DEFAULT_NOTIFICATION_SETTINGS
+
+# Roles that see a property's maintenance, expirations and finances
+MANAGING_ROLES = ['owner', 'manager']
+
+OPEN_MAINTENANCE_STATUSES = ['pending', 'in-progress']
+
+DEFAULT_APPEARANCE = {
+    "theme": "dark",
+    "dashboard_layout": "default"
+}
+
+
+def _month_bounds(today):
+    start = today.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def _load_user_and_settings(user_id):
+    return db.session.query(User, Settings).outerjoin(
+        Settings, Settings.user_id == User.id
+    ).filter(User.id == user_id).first()
+
+
+def _load_properties(user_id):
+    return db.session.query(Property, PropertyUser.role).join(
+        PropertyUser, PropertyUser.property_id == Property.id
+    ).filter(
+        PropertyUser.user_id == user_id,
+        PropertyUser.status == 'active'
+    ).order_by(Property.is_primary_residence.desc(), Property.created_at).all()
+
+
+def _open_maintenance_counts(user_id, managed_ids):
+    """Open requests per property: on managed properties or created by the user"""
+    rows = db.session.query(
+        Maintenance.property_id, func.count(Maintenance.id)
+    ).filter(
+        or_(Maintenance.user_id == user_id, Maintenance.property_id.in_(managed_ids)),
+        Maintenance.status.in_(OPEN_MAINTENANCE_STATUSES)
+    ).group_by(Maintenance.property_id).all()
+    return dict(rows)
+
+
+def _expiring_items(user_id, managed_ids, today, until):
+    """Documents, leases and warranties expiring between today and until, soonest first"""
+    documents = db.session.query(
+        literal('document').label('kind'),
+        Document.id.label('id'),
+        Document.title.label('name'),
+        Document.expiration_date.label('expires_on'),
+        Document.property_id.label('property_id')
+    ).filter(
+        or_(Document.user_id == user_id, Document.property_id.in_(managed_ids)),
+        Document.expiration_date.between(today, until)
+    )
+    leases = db.session.query(
+        literal('lease'),
+        Tenant.id,
+        (Tenant.first_name + ' ' + Tenant.last_name),
+        Tenant.lease_end,
+        Tenant.property_id
+    ).filter(
+        Tenant.property_id.in_(managed_ids),
+        Tenant.status == 'active',
+        Tenant.lease_end.between(today, until)
+    )
+    warranties = db.session.query(
+        literal('warranty'),
+        Appliance.id,
+        Appliance.name,
+        Appliance.warranty_expiration,
+        Appliance.property_id
+    ).filter(
+        or_(Appliance.user_id == user_id, Appliance.property_id.in_(managed_ids)),
+        Appliance.warranty_expiration.between(today, until)
+    )
+
+    combined = union_all(documents, leases, warranties).subquery()
+    rows = db.session.query(combined).order_by(combined.c.expires_on, combined.c.kind).all()
+
+    items = []
+    for row in rows:
+        expires_on = row.expires_on
+        if isinstance(expires_on, str):
+            # SQLite returns dates from a UNION as plain strings
+            expires_on = datetime.strptime(expires_on, '%Y-%m-%d').date()
+        items.append({
+            'kind': row.kind,
+            'id': row.id,
+            'name': row.name,
+            'expires_on': expires_on.isoformat(),
+            'days_until_expiration': (expires_on - today).days,
+            'property_id': row.property_id
+        })
+    return items
+
+
+def _month_spend(managed_ids, today):
+    """This month's expenses in cents, per managed property"""
+    start, end = _month_bounds(today)
+    rows = db.session.query(
+        Expense.property_id, func.sum(Expense.amount)
+    ).filter(
+        Expense.property_id.in_(managed_ids),
+        Expense.date >= start,
+        Expense.date < end
+    ).group_by(Expense.property_id).all()
+    return {property_id: int(total or 0) for property_id, total in rows}
+
+
+def build_bootstrap(user_id, today=None, expiring_days=None):
+    """Return the startup payload for a user, or None if the user doesn't exist"""
+    today = today or datetime.utcnow().date()
+    if expiring_days is None:
+        expiring_days = current_app.config.get('BOOTSTRAP_EXPIRING_DAYS', 30)
+
+    loaded = _load_user_and_settings(user_id)
+    if loaded is None:
+        return None
+    user, settings = loaded
+
+    properties = _load_properties(user_id)
+    managed_ids = [prop.id for prop, role in properties if role in MANAGING_ROLES]
+
+    open_counts = _open_maintenance_counts(user_id, managed_ids)
+    expiring = _expiring_items(user_id, managed_ids, today, today + timedelta(days=expiring_days))
+    spend = _month_spend(managed_ids, today)
+
+    expiring_counts = defaultdict(int)
+    for item in expiring:
+        expiring_counts[item['property_id']] += 1
+
+    properties_data = []
+    for prop, role in properties:
+        managed = role in MANAGING_ROLES
+        properties_data.append({
+            'id': prop.id,
+            'address': prop.address,
+            'city': prop.city,
+            'state': prop.state,
+            'zip': prop.zip,
+            'property_type': prop.property_type,
+            'status': prop.status,
+            'is_primary_residence': prop.is_primary_residence,
+            'role': role,
+            'open_maintenance_count': open_counts.get(prop.id, 0),
+            'expiring_count': expiring_counts.get(prop.id, 0),
+            # Finances are only visible to owners and managers
+            'month_spend': spend.get(prop.id, 0) / 100.0 if managed else None
+        })
+
+    month_start, _ = _month_bounds(today)
+
+    return {
+        'user': {
+            'id': user.id,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'phone': user.phone,
+            'role': user.role
+        },
+        # Defaults are returned (not stored) until the user saves settings
+        'settings': {
+            'notifications': settings.notifications if settings else dict(DEFAULT_NOTIFICATION_SETTINGS),
+            'appearance': settings.appearance if settings else dict(DEFAULT_APPEARANCE)
+        },
+        'properties': properties_data,
+        'maintenance': {
+            'open_count': sum(open_counts.values())
+        },
+        'expiring': {
+            'days': expiring_days,
+            'items': expiring
+        },
+        'spend': {
+            'month': month_start.strftime('%Y-%m'),
+            'total': sum(spend.values()) / 100.0
+        },
+        'generated_at': datetime.utcnow().isoformat()
+    }
@@ -2,24 +2,70 @@
 from flask import current_app, render_template
 from flask_mail import Message
 from app import mail
+from app.utils.jobs import job
 import os
 from threading import Thread
 
-def send_async_email(app, msg):
-    """Send email asynchronously"""
-    with app.app_context():
-        mail.send(msg)
-
-def send_email(subject, recipients, html_body, sender=None):
-    """Send an email"""
-    app = current_app._get_current_object()
+def build_email(subject, recipients, html_body, sender=None):
+    """Build an HTML email message without sending it"""
     msg = Message(subject, 
                  sender=sender or current_app.config['MAIL_DEFAULT_SENDER'],
                  recipients=recipients)
     msg.html = html_body
+    return msg
+
+# Bodies carry password reset and verification links
+@job('email.send', max_attempts=8, redact=('html_body',))
+def deliver_email(subject, recipients, html_body, sender=None):
+    """Background job: send one email, retried by the job queue if SMTP fails"""
+    mail.send(build_email(subject, recipients, html_body, sender))
+
+def send_async_email(app, subject, recipients, html_body, sender=None):
+    """Send email from a thread, without retries"""
+    with app.app_context():
+        try:
+            deliver_email(subject, recipients, html_body, sender)
+        except Exception as e:
+            app.logger.error(f"Failed to send email to {recipients}: {e}")
+
+def send_email(subject, recipients, html_body, sender=None):
+    """Send an email"""
+    if current_app.config.get('MAIL_USE_QUEUE'):
+        # Queue it so SMTP round trips (and retries) happen in the job worker
+        deliver_email.enqueue(subject=subject, recipients=list(recipients), html_body=html_body, sender=sender)
+        return
     
-    # Send email asynchronously to not block the request
-    Thread(target=send_async_email, args=(app, msg)).start()
+    # No worker to rely on: send right away, without blocking the request
+    app = current_app._get_current_object()
+    Thread(target=send_async_email, args=(app, subject, list(recipients), html_body, sender)).start()
+
+def send_bulk_emails(messages, batch_size=None):
+    """Send many prebuilt messages, reusing one SMTP connection per batch.
+
+    Returns a tuple of (sent, failed) counts. Failures are logged and do
+    not abort the rest of the batch.
+    """
+    batch_size = batch_size or current_app.config.get('MAIL_BULK_BATCH_SIZE', 200)
+    sent = 0
+    failed = 0
+    
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start:start + batch_size]
+        try:
+            with mail.connect() as conn:
+                for msg in batch:
+                    try:
+                        conn.send(msg)
+                        sent += 1
+                    except Exception as e:
+                        failed += 1
+                        current_app.logger.warning(f"Failed to send email to {msg.recipients}: {e}")
+        except Exception as e:
+            # Could not open the SMTP connection at all - count the whole batch as failed
+            failed += len(batch)
+            current_app.logger.error(f"Failed to open mail connection for batch: {e}")
+    
+    return sent, failed
 
 def get_frontend_url():
     """Helper function to get the configured frontend URL"""
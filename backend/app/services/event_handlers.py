@@ -0,0 +1,52 @@
+# services/event_handlers.py
+"""
+Subscribers to the app's domain events (see utils/events.py).
+
+Imported by init_events, which registers everything decorated here.
+Email goes out from background subscribers so building and sending it
+stays off the request's latency path.
+"""
+from app.models.property import Property
+from app.models.user import User
+from app.services.email_service import (
+    send_property_invitation_email,
+    send_property_invitation_email_to_new_user,
+    send_verification_email,
+)
+from app.utils.events import PropertyInvitationSent, UserRegistered, subscribe
+
+
+@subscribe(UserRegistered, background=True)
+def send_registration_verification_email(event):
+    user = User.query.get(event.user_id)
+    if user is None:
+        return
+    send_verification_email(user, event.verification_url)
+
+
+@subscribe(PropertyInvitationSent, background=True)
+def send_invitation_email(event):
+    inviter = User.query.get(event.inviter_id)
+    property = Property.query.get(event.property_id)
+    if inviter is None or property is None:
+        return
+
+    if event.user_id is not None:
+        user = User.query.get(event.user_id)
+        if user is None:
+            return
+        send_property_invitation_email(
+            user=user,
+            inviter=inviter,
+            property=property,
+            role=event.role,
+            invitation_url=event.invitation_url
+        )
+    else:
+        send_property_invitation_email_to_new_user(
+            email=event.email,
+            inviter=inviter,
+            property=property,
+            role=event.role,
+            invitation_url=event.invitation_url
+        )
@@ -0,0 +1,308 @@
+# services/notification_service.py
+"""
+Expiration digest engine.
+
+Finds upcoming document expirations, lease endings and appliance warranty
+expirations across all users with a handful of set-based queries, groups
+them per recipient, applies each recipient's notification preferences and
+hands the resulting digests to the mail service in bulk.
+
+Intended to be run once a day, e.g. from cron:
+
+    flask notifications send-digest
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+
+from flask import current_app
+from markupsafe import escape
+from sqlalchemy import and_, func
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.property import Property
+from app.models.Property_user import PropertyUser
+from app.models.settings import Settings
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services.email_service import build_email, send_bulk_emails, get_frontend_url
+from app.utils.constants import DEFAULT_NOTIFICATION_SETTINGS
+
+# Which notification preference gates each kind of expiring item. Expiring
+# documents are reminders, not document activity, so they follow a reminder
+# preference that's on by default ('document_updates' defaults to off)
+DIGEST_PREFERENCE_KEYS = {
+    'document': 'maintenance_reminders',
+    'lease': 'payment_reminders',
+    'warranty': 'maintenance_reminders',
+}
+
+# Roles on a property that receive its expiration notices
+DIGEST_RECIPIENT_ROLES = ['owner', 'manager']
+
+
+def get_reminder_dates(today=None, reminder_days=None):
+    """Return the expiration dates that trigger a reminder today.
+
+    Only items expiring exactly N days from today (for each configured N)
+    are picked up, so a nightly run reminds about each item a fixed number
+    of times instead of every night until it expires.
+    """
+    today = today or datetime.utcnow().date()
+    if reminder_days is None:
+        reminder_days = current_app.config.get('NOTIFICATION_REMINDER_DAYS', [30, 7, 1])
+    return sorted({today + timedelta(days=int(days)) for days in reminder_days})
+
+
+def _recipient_join(model):
+    """Outer join condition matching a row to the active owners/managers of its property"""
+    return and_(
+        PropertyUser.property_id == model.property_id,
+        PropertyUser.status == 'active',
+        PropertyUser.role.in_(DIGEST_RECIPIENT_ROLES)
+    )
+
+
+def _expiring_documents(dates):
+    """Expiring documents, one row per (recipient, document)"""
+    recipient_id = func.coalesce(PropertyUser.user_id, Document.user_id)
+    return db.session.query(
+        recipient_id.label('recipient_id'),
+        Document.id,
+        Document.title,
+        Document.category,
+        Document.expiration_date,
+        Document.property_id,
+        Property.address
+    ).outerjoin(
+        PropertyUser, _recipient_join(Document)
+    ).outerjoin(
+        Property, Property.id == Document.property_id
+    ).filter(
+        Document.expiration_date.in_(dates)
+    )
+
+
+def _expiring_leases(dates):
+    """Active tenants whose lease ends on a reminder date, one row per (recipient, tenant)"""
+    return db.session.query(
+        PropertyUser.user_id.label('recipient_id'),
+        Tenant.id,
+        Tenant.first_name,
+        Tenant.last_name,
+        Tenant.lease_end,
+        Tenant.property_id,
+        Property.address
+    ).join(
+        PropertyUser, _recipient_join(Tenant)
+    ).join(
+        Property, Property.id == Tenant.property_id
+    ).filter(
+        Tenant.status == 'active',
+        Tenant.lease_end.in_(dates)
+    )
+
+
+def _expiring_warranties(dates):
+    """Appliances whose warranty expires on a reminder date, one row per (recipient, appliance)"""
+    recipient_id = func.coalesce(PropertyUser.user_id, Appliance.user_id)
+    return db.session.query(
+        recipient_id.label('recipient_id'),
+        Appliance.id,
+        Appliance.name,
+        Appliance.brand,
+        Appliance.warranty_expiration,
+        Appliance.property_id,
+        Property.address
+    ).outerjoin(
+        PropertyUser, _recipient_join(Appliance)
+    ).outerjoin(
+        Property, Property.id == Appliance.property_id
+    ).filter(
+        Appliance.warranty_expiration.in_(dates)
+    )
+
+
+def collect_expiring_items(today=None, reminder_days=None, yield_per=5000):
+    """Collect all expiring items for all users, grouped by recipient.
+
+    Returns a dict of recipient user id -> {'document': [...], 'lease': [...],
+    'warranty': [...]}. Runs one query per item kind regardless of how many
+    users or properties are involved.
+    """
+    today = today or datetime.utcnow().date()
+    dates = get_reminder_dates(today, reminder_days)
+    digests = defaultdict(lambda: defaultdict(list))
+
+    for row in _expiring_documents(dates).yield_per(yield_per):
+        digests[row.recipient_id]['document'].append({
+            'id': row.id,
+            'title': row.title,
+            'category': row.category,
+            'expiration_date': row.expiration_date.isoformat(),
+            'days_until_expiration': (row.expiration_date - today).days,
+            'property_id': row.property_id,
+            'property_address': row.address
+        })
+
+    for row in _expiring_leases(dates).yield_per(yield_per):
+        digests[row.recipient_id]['lease'].append({
+            'id': row.id,
+            'tenant_name': f"{row.first_name} {row.last_name}",
+            'lease_end': row.lease_end.isoformat(),
+            'days_until_expiration': (row.lease_end - today).days,
+            'property_id': row.property_id,
+            'property_address': row.address
+        })
+
+    for row in _expiring_warranties(dates).yield_per(yield_per):
+        digests[row.recipient_id]['warranty'].append({
+            'id': row.id,
+            'name': row.name,
+            'brand': row.brand,
+            'warranty_expiration': row.warranty_expiration.isoformat(),
+            'days_until_expiration': (row.warranty_expiration - today).days,
+            'property_id': row.property_id,
+            'property_address': row.address
+        })
+
+    return digests
+
+
+def load_recipients(user_ids, chunk_size=1000):
+    """Load email, name and notification preferences for the given users.
+
+    Users and settings are fetched together in chunks so the IN list stays
+    within database parameter limits. Users without a settings row get the
+    default preferences.
+    """
+    user_ids = list(user_ids)
+    recipients = {}
+
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        rows = db.session.query(
+            User.id,
+            User.email,
+            User.first_name,
+            Settings._notifications
+        ).outerjoin(
+            Settings, Settings.user_id == User.id
+        ).filter(
+            User.id.in_(chunk)
+        ).all()
+
+        for row in rows:
+            preferences = dict(DEFAULT_NOTIFICATION_SETTINGS)
+            if row._notifications:
+                try:
+                    preferences.update(json.loads(row._notifications))
+                except (ValueError, TypeError):
+                    pass
+            recipients[row.id] = {
+                'email': row.email,
+                'first_name': row.first_name,
+                'preferences': preferences
+            }
+
+    return recipients
+
+
+def filter_by_preferences(items_by_kind, preferences):
+    """Drop the kinds of items a user has opted out of"""
+    if not preferences.get('email_notifications', True):
+        return {}
+
+    return {
+        kind: items
+        for kind, items in items_by_kind.items()
+        if items and preferences.get(DIGEST_PREFERENCE_KEYS[kind], True)
+    }
+
+
+def render_digest_email(recipient, items_by_kind):
+    """Render the HTML body of an expiration digest"""
+    frontend_url = get_frontend_url()
+    sections = []
+
+    if items_by_kind.get('document'):
+        rows = ''.join(
+            f"<li>{escape(doc['title'])}{' (' + escape(doc['category']) + ')' if doc['category'] else ''} "
+            f"expires {doc['expiration_date']} "
+            f"- in {doc['days_until_expiration']} days"
+            f"{' at ' + escape(doc['property_address']) if doc['property_address'] else ''}</li>"
+            for doc in items_by_kind['document']
+        )
+        sections.append(f"<h2>Expiring Documents</h2><ul>{rows}</ul>")
+
+    if items_by_kind.get('lease'):
+        rows = ''.join(
+            f"<li>{escape(lease['tenant_name'])} at {escape(lease['property_address'])} - lease ends "
+            f"{lease['lease_end']} (in {lease['days_until_expiration']} days)</li>"
+            for lease in items_by_kind['lease']
+        )
+        sections.append(f"<h2>Ending Leases</h2><ul>{rows}</ul>")
+
+    if items_by_kind.get('warranty'):
+        rows = ''.join(
+            f"<li>{escape(appliance['name'])}{' (' + escape(appliance['brand']) + ')' if appliance['brand'] else ''} "
+            f"- warranty expires {appliance['warranty_expiration']} "
+            f"(in {appliance['days_until_expiration']} days)</li>"
+            for appliance in items_by_kind['warranty']
+        )
+        sections.append(f"<h2>Expiring Warranties</h2><ul>{rows}</ul>")
+
+    return f"""
+    <h1>Upcoming Expirations</h1>
+    <p>Hello {escape(recipient['first_name'] or 'there')},</p>
+    <p>The following items in your HomieHQ account are expiring soon:</p>
+    {''.join(sections)}
+    <p><a href="{frontend_url}">Open HomieHQ</a> to review them.</p>
+    <p>You can change which reminders you receive in your notification settings.</p>
+    <p>Thank you,<br>The HomieHQ Team</p>
+    """
+
+
+def send_expiration_digests(today=None, reminder_days=None, dry_run=False):
+    """Build and send expiration digests for every user with upcoming expirations.
+
+    Returns a summary dict with counts of recipients, skipped users and
+    sent/failed emails.
+    """
+    digests = collect_expiring_items(today, reminder_days)
+    recipients = load_recipients(digests.keys())
+
+    messages = []
+    skipped = 0
+    for user_id, items_by_kind in digests.items():
+        recipient = recipients.get(user_id)
+        if not recipient:
+            skipped += 1
+            continue
+
+        items = filter_by_preferences(items_by_kind, recipient['preferences'])
+        if not items:
+            skipped += 1
+            continue
+
+        item_count = sum(len(kind_items) for kind_items in items.values())
+        messages.append(build_email(
+            f"HomieHQ: {item_count} item{'s' if item_count != 1 else ''} expiring soon",
+            [recipient['email']],
+            render_digest_email(recipient, items)
+        ))
+
+    summary = {
+        'recipients': len(digests),
+        'skipped': skipped,
+        'digests': len(messages),
+        'sent': 0,
+        'failed': 0
+    }
+
+    if not dry_run and messages:
+        summary['sent'], summary['failed'] = send_bulk_emails(messages)
+
+    return summary
@@ -0,0 +1,127 @@
+# services/property_deletion.py
+"""
+Property deletion in chunks.
+
+Deleting a property through the ORM cascades loads every child row
+before deleting it one by one, which for a property with years of
+expenses and documents can outlast the proxy timeout, and it leaves the
+uploaded files on disk. Instead:
+
+1. start_property_deletion (in the request) marks the property
+   status='deleting' and removes its memberships and pending invitations,
+   so it disappears for every member at once, then queues a job
+2. delete_property_data (in the job worker) deletes the children with
+   chunked bulk DELETEs, committing after each chunk, unlinks the
+   documents' files, and finally deletes the property row
+
+Bulk deletes still go through the change log, so sync clients get their
+tombstones. The job can be retried at any point: each step only deletes
+what's left.
+"""
+import os
+
+from flask import current_app
+from sqlalchemy import delete, or_, select
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.finance import Budget, Expense
+from app.models.maintenance import Maintenance
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.pending_invitation import PendingInvitation
+from app.models.project import Project
+from app.models.property import Property
+from app.models.Property_user import PropertyUser
+from app.models.tenant import Tenant
+from app.utils.jobs import job
+
+DELETING_STATUS = 'deleting'
+
+
+def _child_conditions(property_id):
+    """(model, WHERE clause) in a safe deletion order: documents reference tenants and appliances"""
+    return [
+        (Document, or_(
+            Document.property_id == property_id,
+            Document.tenant_id.in_(select(Tenant.id).where(Tenant.property_id == property_id)),
+            Document.appliance_id.in_(select(Appliance.id).where(Appliance.property_id == property_id))
+        )),
+        (MaintenanceChecklistItem, MaintenanceChecklistItem.property_id == property_id),
+        (Maintenance, Maintenance.property_id == property_id),
+        (Tenant, Tenant.property_id == property_id),
+        (Appliance, Appliance.property_id == property_id),
+        (Project, Project.property_id == property_id),
+        (Expense, Expense.property_id == property_id),
+        (Budget, Budget.property_id == property_id),
+        (PendingInvitation, PendingInvitation.property_id == property_id),
+        (PropertyUser, PropertyUser.property_id == property_id),
+    ]
+
+
+def _remove_files(paths):
+    removed = 0
+    for path in paths:
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            current_app.logger.warning(f"Could not remove {path}: {e}")
+    return removed
+
+
+def start_property_deletion(property):
+    """Hide the property from its members and queue the deletion; returns the job id"""
+    property_id = property.id
+    property.status = DELETING_STATUS
+    PropertyUser.query.filter_by(property_id=property_id).delete(synchronize_session=False)
+    PendingInvitation.query.filter_by(property_id=property_id).delete(synchronize_session=False)
+    job_id = delete_property_job.enqueue(property_id=property_id, session=db.session)
+    db.session.commit()
+    return job_id
+
+
+def delete_property_data(property_id, chunk_size=None):
+    """Delete a property with its children and files; returns counts per table"""
+    chunk_size = chunk_size or current_app.config.get('PROPERTY_DELETE_CHUNK_SIZE', 1000)
+    counts = {}
+
+    for model, condition in _child_conditions(property_id):
+        deleted = 0
+        while True:
+            ids = db.session.execute(select(model.id).where(condition).limit(chunk_size)).scalars().all()
+            if not ids:
+                break
+            paths = []
+            if model is Document:
+                paths = db.session.execute(select(Document.file_path).where(Document.id.in_(ids))).scalars().all()
+            db.session.execute(
+                delete(model).where(model.id.in_(ids)),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            # Files go only once their rows are gone, so a crash leaves an orphaned file, never a broken row
+            _remove_files(paths)
+            deleted += len(ids)
+        counts[model.__tablename__] = deleted
+
+    db.session.execute(
+        delete(Property).where(Property.id == property_id),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+
+    photos_folder = os.path.join(current_app.root_path, 'uploads/documents/photos', f"property_{property_id}")
+    try:
+        os.rmdir(photos_folder)
+    except OSError:
+        pass  # Missing, or holds files that aren't tracked documents
+
+    return counts
+
+
+@job('properties.delete', max_attempts=10)
+def delete_property_job(property_id):
+    counts = delete_property_data(property_id)
+    current_app.logger.info(f"Deleted property {property_id}: {counts}")
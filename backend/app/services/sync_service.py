@@ -0,0 +1,427 @@
+# services/sync_service.py
+"""
+Offline sync for the mobile app.
+
+Pull: GET /api/sync?since=<cursor> returns what changed on the entities a
+user can see since their last sync, read from the sync_changes log (see
+utils/change_log.py):
+- upserts carry the current row, deletes are tombstones ({entity, id})
+- several changes to one row in a page collapse into one entry
+- `cursor` is the value to send next time; follow `has_more` to page
+
+A full snapshot of every visible row is returned instead (`reset: true`,
+the client replaces its local copy) on the first sync (since=0), when the
+user's property memberships changed after the cursor (a property was
+shared with or removed from them), and when the cursor is older than the
+retained log (SYNC_RETENTION_DAYS) or unknown to this server.
+
+Push: POST /api/sync/push applies a batch of offline edits. Each edit
+names the `updated_at` it was based on; if the row changed on the server
+since then the edit is not applied and the current server row comes back
+as a conflict for the client to resolve.
+"""
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.finance import Budget, Expense
+from app.models.maintenance import Maintenance
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.project import Project
+from app.models.property import Property
+from app.models.Property_user import PropertyUser
+from app.models.sync_change import SyncChange
+from app.models.tenant import Tenant
+
+MANAGING_ROLES = ['owner', 'manager']
+MEMBER_ROLES = ['owner', 'manager', 'tenant']
+
+# Never written from a pushed edit
+SERVER_FIELDS = ('id', 'user_id', 'created_at', 'updated_at')
+
+
+class SyncRejected(ValueError):
+    """A pushed edit that can't be applied"""
+
+
+class SyncEntity:
+    """How one model is exposed through the sync API
+
+    roles: roles on the row's property that can see the row
+    write_roles: roles that can change it (defaults to roles)
+    own_rows: the user can also see and change rows they created
+    money_fields: stored in cents, synced in dollars like the REST API
+    hidden_fields: never sent to clients
+    read_only_fields: sent, but ignored in pushed edits
+    """
+
+    def __init__(self, name, model, property_attr='property_id', roles=MANAGING_ROLES, write_roles=None,
+                 own_rows=True, money_fields=(), hidden_fields=(), read_only_fields=(),
+                 can_create=True, can_delete=True):
+        self.name = name
+        self.model = model
+        self.property_attr = property_attr
+        self.roles = roles
+        self.write_roles = write_roles or roles
+        self.own_rows = own_rows
+        self.money_fields = money_fields
+        self.hidden_fields = hidden_fields
+        self.read_only_fields = read_only_fields
+        self.can_create = can_create
+        self.can_delete = can_delete
+        self.columns = {column.key: column for column in model.__table__.columns}
+
+
+# Entity names match those written to sync_changes by utils/change_log.py
+ENTITIES = {entity.name: entity for entity in [
+    # Properties are created and deleted through /api/properties, which
+    # also sets up ownership and removes photos
+    SyncEntity('property', Property, property_attr='id', roles=MEMBER_ROLES, write_roles=MANAGING_ROLES,
+               own_rows=False, can_create=False, can_delete=False),
+    SyncEntity('maintenance', Maintenance),
+    SyncEntity('tenant', Tenant, own_rows=False),
+    SyncEntity('appliance', Appliance),
+    SyncEntity('project', Project),
+    SyncEntity('expense', Expense, own_rows=False, money_fields=('amount',)),
+    SyncEntity('budget', Budget, own_rows=False, money_fields=('amount',)),
+    # Metadata only: files are uploaded and deleted through /api/documents
+    SyncEntity('document', Document, hidden_fields=('file_path',),
+               read_only_fields=('file_path', 'file_type', 'file_size'), can_create=False, can_delete=False),
+    SyncEntity('checklist_item', MaintenanceChecklistItem),
+]}
+
+
+def _load_roles(user_id):
+    """property id -> the user's role, for active memberships"""
+    rows = db.session.query(PropertyUser.property_id, PropertyUser.role).filter(
+        PropertyUser.user_id == user_id,
+        PropertyUser.status == 'active'
+    ).all()
+    return dict(rows)
+
+
+def _allowed(entity, allowed_roles, property_id, owner_id, user_id, roles):
+    if property_id is not None and roles.get(property_id) in allowed_roles:
+        return True
+    return entity.own_rows and owner_id == user_id and (property_id is None or property_id in roles)
+
+
+def can_see(entity, property_id, owner_id, user_id, roles):
+    return _allowed(entity, entity.roles, property_id, owner_id, user_id, roles)
+
+
+def can_write(entity, property_id, owner_id, user_id, roles):
+    return _allowed(entity, entity.write_roles, property_id, owner_id, user_id, roles)
+
+
+def serialize_row(entity, row):
+    data = {}
+    for key in entity.columns:
+        if key in entity.hidden_fields:
+            continue
+        value = getattr(row, key)
+        if key in entity.money_fields and value is not None:
+            value = value / 100.0
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[key] = value
+    return data
+
+
+def _parse_entities(names):
+    if not names:
+        return list(ENTITIES.values())
+    unknown = [name for name in names if name not in ENTITIES]
+    if unknown:
+        raise SyncRejected(f"Unknown entity: {', '.join(unknown)}")
+    return [ENTITIES[name] for name in names]
+
+
+def _visible_rows_query(entity, user_id, roles):
+    model = entity.model
+    property_column = getattr(model, entity.property_attr)
+    visible_ids = [property_id for property_id, role in roles.items() if role in entity.roles]
+    conditions = [property_column.in_(visible_ids)]
+    if entity.own_rows:
+        conditions.append(and_(
+            model.user_id == user_id,
+            or_(property_column.is_(None), property_column.in_(list(roles)))
+        ))
+    return model.query.filter(or_(*conditions)).order_by(model.id)
+
+
+def _snapshot(user_id, roles, entities, cursor, reason):
+    changes = []
+    for entity in entities:
+        for row in _visible_rows_query(entity, user_id, roles).all():
+            changes.append({'entity': entity.name, 'id': row.id, 'op': 'upsert', 'data': serialize_row(entity, row)})
+    return {
+        'reset': True,
+        'reason': reason,
+        'cursor': cursor,
+        'has_more': False,
+        'changes': changes
+    }
+
+
+def _reset_reason(user_id, since, oldest, latest):
+    if since <= 0:
+        return 'initial'
+    if since > latest:
+        return 'unknown_cursor'
+    if oldest is not None and since < oldest - 1:
+        return 'expired_cursor'
+    membership_changed = db.session.query(SyncChange.id).filter(
+        SyncChange.entity == 'membership',
+        SyncChange.user_id == user_id,
+        SyncChange.id > since
+    ).first()
+    if membership_changed:
+        return 'memberships_changed'
+    return None
+
+
+def get_changes(user_id, since=0, limit=None, entity_names=None):
+    """Changes visible to a user after the `since` cursor, or a snapshot"""
+    max_limit = current_app.config.get('SYNC_PAGE_SIZE', 500)
+    limit = max(1, min(limit or max_limit, max_limit))
+    entities = _parse_entities(entity_names)
+    roles = _load_roles(user_id)
+
+    # Read the log bounds first: a snapshot taken afterwards is at least as
+    # new as the cursor, and anything it misses has a larger id
+    oldest, latest = db.session.query(func.min(SyncChange.id), func.max(SyncChange.id)).one()
+    latest = latest or 0
+
+    reason = _reset_reason(user_id, since, oldest, latest)
+    if reason:
+        return _snapshot(user_id, roles, entities, latest, reason)
+
+    log = SyncChange.query.filter(
+        SyncChange.id > since,
+        SyncChange.entity.in_([entity.name for entity in entities]),
+        or_(SyncChange.property_id.in_(list(roles)), SyncChange.user_id == user_id)
+    ).order_by(SyncChange.id).limit(limit + 1).all()
+
+    has_more = len(log) > limit
+    log = log[:limit]
+    if has_more:
+        cursor = log[-1].id
+    else:
+        # Nothing visible is left below `latest`; skip past changes the user can't see
+        cursor = max(log[-1].id if log else since, latest)
+
+    # Latest change per row in this page, in log order
+    latest_ops = {}
+    for change in log:
+        entity = ENTITIES[change.entity]
+        if not can_see(entity, change.property_id, change.user_id, user_id, roles):
+            continue
+        key = (change.entity, change.entity_id)
+        latest_ops.pop(key, None)
+        latest_ops[key] = change.op
+
+    upsert_ids = {}
+    for (name, entity_id), op in latest_ops.items():
+        if op == 'upsert':
+            upsert_ids.setdefault(name, []).append(entity_id)
+
+    rows = {}
+    for name, ids in upsert_ids.items():
+        model = ENTITIES[name].model
+        for row in model.query.filter(model.id.in_(ids)).all():
+            rows[(name, row.id)] = row
+
+    changes = []
+    for (name, entity_id), op in latest_ops.items():
+        entity = ENTITIES[name]
+        row = rows.get((name, entity_id))
+        # Deleted or moved out of reach since: its tombstone is further on
+        # in the log, but sending it now is just as correct
+        if op == 'upsert' and row is not None and can_see(
+                entity, getattr(row, entity.property_attr), row.user_id, user_id, roles):
+            changes.append({'entity': name, 'id': entity_id, 'op': 'upsert', 'data': serialize_row(entity, row)})
+        else:
+            changes.append({'entity': name, 'id': entity_id, 'op': 'delete'})
+
+    return {
+        'reset': False,
+        'cursor': cursor,
+        'has_more': has_more,
+        'changes': changes
+    }
+
+
+def _coerce(column, value):
+    if value is None:
+        if not column.nullable:
+            raise SyncRejected(f"{column.key} can't be null")
+        return None
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is bool:
+            if not isinstance(value, bool):
+                raise ValueError
+            return value
+        if python_type in (int, float):
+            return python_type(value)
+        return str(value)
+    except (TypeError, ValueError):
+        raise SyncRejected(f"Invalid value for {column.key}")
+
+
+def _assign(entity, row, data):
+    if not isinstance(data, dict):
+        raise SyncRejected("data must be an object")
+    for key, value in data.items():
+        column = entity.columns.get(key)
+        if column is None:
+            raise SyncRejected(f"Unknown field: {key}")
+        if key in SERVER_FIELDS or key in entity.read_only_fields or key in entity.hidden_fields:
+            continue
+        if key in entity.money_fields and value is not None:
+            try:
+                value = int(round(float(value) * 100))
+            except (TypeError, ValueError):
+                raise SyncRejected(f"Invalid value for {key}")
+        else:
+            value = _coerce(column, value)
+        setattr(row, key, value)
+
+
+def _check_required(entity, row):
+    for key, column in entity.columns.items():
+        if column.primary_key or column.nullable or column.default is not None or column.server_default is not None:
+            continue
+        if getattr(row, key) is None:
+            raise SyncRejected(f"{key} is required")
+
+
+def _parse_base(item):
+    value = item.get('base_updated_at')
+    if not value:
+        raise SyncRejected("base_updated_at is required")
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise SyncRejected("Invalid base_updated_at")
+
+
+def _create(entity, item, user_id, roles):
+    if item.get('op') == 'delete':
+        raise SyncRejected("id is required")
+    if not entity.can_create:
+        raise SyncRejected(f"{entity.name} can't be created through sync")
+
+    row = entity.model(user_id=user_id)
+    _assign(entity, row, item.get('data') or {})
+    if not can_write(entity, getattr(row, entity.property_attr), user_id, user_id, roles):
+        raise SyncRejected("Property not found or you don't have permission")
+    _check_required(entity, row)
+
+    db.session.add(row)
+    db.session.flush()
+    return {'status': 'applied', 'id': row.id, 'data': serialize_row(entity, row)}
+
+
+def _update_or_delete(entity, item, user_id, roles):
+    row = db.session.get(entity.model, item['id'])
+    if row is not None and not can_see(entity, getattr(row, entity.property_attr), row.user_id, user_id, roles):
+        row = None
+
+    if row is None:
+        if item.get('op') == 'delete':
+            return {'status': 'applied'}
+        # Deleted on the server while the client was offline
+        return {'status': 'conflict', 'server': None}
+
+    property_id = getattr(row, entity.property_attr)
+    if not can_write(entity, property_id, row.user_id, user_id, roles):
+        raise SyncRejected("You don't have permission to change this item")
+
+    base_updated_at = _parse_base(item)
+    if row.updated_at != base_updated_at:
+        return {'status': 'conflict', 'server': serialize_row(entity, row)}
+
+    if item.get('op') == 'delete':
+        if not entity.can_delete:
+            raise SyncRejected(f"{entity.name} can't be deleted through sync")
+        db.session.delete(row)
+        db.session.flush()
+        return {'status': 'applied'}
+
+    _assign(entity, row, item.get('data') or {})
+    new_property_id = getattr(row, entity.property_attr)
+    if new_property_id != property_id and not can_write(entity, new_property_id, row.user_id, user_id, roles):
+        raise SyncRejected("Property not found or you don't have permission")
+
+    db.session.flush()
+    return {'status': 'applied', 'data': serialize_row(entity, row)}
+
+
+def _apply(item, user_id, roles):
+    if not isinstance(item, dict):
+        raise SyncRejected("Each change must be an object")
+    entity = ENTITIES.get(item.get('entity'))
+    if entity is None:
+        raise SyncRejected(f"Unknown entity: {item.get('entity')}")
+    if item.get('op') not in ('upsert', 'delete'):
+        raise SyncRejected("op must be 'upsert' or 'delete'")
+    if item.get('id') is None:
+        return _create(entity, item, user_id, roles)
+    return _update_or_delete(entity, item, user_id, roles)
+
+
+def apply_changes(user_id, items):
+    """Apply pushed edits in order; each one succeeds or fails on its own.
+
+    Returns one result per edit with status applied (and the saved row),
+    conflict (and the server's row, or null if it was deleted) or rejected
+    (and an error).
+    """
+    roles = _load_roles(user_id)
+    results = []
+    for item in items:
+        result = {}
+        if isinstance(item, dict):
+            result = {'client_id': item.get('client_id'), 'entity': item.get('entity'), 'id': item.get('id')}
+        try:
+            with db.session.begin_nested():
+                result.update(_apply(item, user_id, roles))
+        except SyncRejected as e:
+            result.update({'status': 'rejected', 'error': str(e)})
+        except (IntegrityError, DataError):
+            result.update({'status': 'rejected', 'error': "Conflicts with existing data"})
+        results.append(result)
+
+    db.session.commit()
+    return results
+
+
+def prune_changes(days=None):
+    """Delete log entries older than SYNC_RETENTION_DAYS; returns the count.
+
+    The newest entry is always kept, so a cursor can be told apart from
+    one that predates the retained log.
+    """
+    if days is None:
+        days = current_app.config.get('SYNC_RETENTION_DAYS', 90)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    latest = db.session.query(func.max(SyncChange.id)).scalar()
+    if latest is None:
+        return 0
+    deleted = SyncChange.query.filter(
+        SyncChange.changed_at < cutoff,
+        SyncChange.id < latest
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
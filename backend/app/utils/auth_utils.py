@@ -0,0 +1,28 @@
+# utils/auth_utils.py
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.user import User
+
+def admin_required(f):
+    """
+    Decorator to require a logged-in user with the 'admin' role
+
+    Usage:
+        @admin_bp.route('/slow-queries')
+        @admin_required
+        def get_slow_queries():
+            ...
+    """
+    @wraps(f)
+    @jwt_required()
+    def decorated_function(*args, **kwargs):
+        current_user_id = int(get_jwt_identity())
+        user = User.query.get(current_user_id)
+
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+
+        return f(*args, **kwargs)
+
+    return decorated_function
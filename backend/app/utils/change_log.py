@@ -0,0 +1,221 @@
+# utils/change_log.py
+"""
+Change log behind the /api/sync feed.
+
+Every insert, update and delete of a synced model appends a row to
+sync_changes in the same transaction, so the log can't miss a change that
+committed or contain one that rolled back. Both paths that write rows are
+covered:
+- unit-of-work flushes (db.session.add/delete + commit), from after_flush
+- bulk query.update()/query.delete(), from do_orm_execute; the affected
+  ids are selected first with the same WHERE clause
+
+Changes to property memberships are logged as entity 'membership' for the
+member; the feed uses them to tell a client its visible set changed and it
+needs a fresh snapshot.
+
+Ordering: sync_changes ids come from a sequence, and a transaction that
+commits later can hold a smaller id than one already visible to readers.
+A client that read past the gap would skip that change forever. So changes
+are collected during the transaction and only inserted in before_commit:
+on PostgreSQL the writer takes a transaction-level advisory lock right
+there, which makes id order match commit order while holding the lock
+only for the insert and the commit itself, not for the whole request.
+SQLite serializes writers anyway. Changes made inside a savepoint that
+rolls back are dropped, like events (see utils/events.py).
+"""
+from datetime import datetime
+
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.orm import attributes
+
+from app.utils.events import queue_entity_events
+
+# Arbitrary, app-wide key for pg_advisory_xact_lock
+SYNC_LOCK_KEY = 7351001
+
+_listeners_installed = False
+
+# model class -> (entity name, attribute holding the property id)
+_tracked = {}
+
+
+def tracked_models():
+    if not _tracked:
+        from app.models.appliance import Appliance
+        from app.models.document import Document
+        from app.models.finance import Budget, Expense
+        from app.models.maintenance import Maintenance
+        from app.models.maintenance_checklist import MaintenanceChecklistItem
+        from app.models.project import Project
+        from app.models.property import Property
+        from app.models.Property_user import PropertyUser
+        from app.models.tenant import Tenant
+
+        _tracked.update({
+            Property: ('property', 'id'),
+            Maintenance: ('maintenance', 'property_id'),
+            Tenant: ('tenant', 'property_id'),
+            Appliance: ('appliance', 'property_id'),
+            Project: ('project', 'property_id'),
+            Expense: ('expense', 'property_id'),
+            Budget: ('budget', 'property_id'),
+            Document: ('document', 'property_id'),
+            MaintenanceChecklistItem: ('checklist_item', 'property_id'),
+            PropertyUser: ('membership', 'property_id'),
+        })
+    return _tracked
+
+
+def _change(entity, entity_id, property_id, user_id, op, now):
+    return {
+        'entity': entity,
+        'entity_id': entity_id,
+        'property_id': property_id,
+        'user_id': user_id,
+        'op': op,
+        'changed_at': now
+    }
+
+
+def _queue_changes(session, changes):
+    if not changes:
+        return
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault('pending_sync_changes', []).extend((transaction, change) for change in changes)
+
+
+def _write_changes(session):
+    """Insert the transaction's changes; the last step before it commits"""
+    pending = session.info.pop('pending_sync_changes', None)
+    if not pending:
+        return
+    from app.models.sync_change import SyncChange
+
+    conn = session.connection()
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': SYNC_LOCK_KEY})
+    conn.execute(insert(SyncChange.__table__), [change for _, change in pending])
+
+
+def _before_flush(session, flush_context, instances):
+    # Load what the tombstones need while the rows still exist; objects
+    # expired by an earlier commit would otherwise fail to refresh afterwards
+    tracked = tracked_models()
+    for obj in session.deleted:
+        spec = tracked.get(type(obj))
+        if spec:
+            getattr(obj, spec[1])
+            getattr(obj, 'user_id')
+
+
+def _after_flush(session, flush_context):
+    tracked = tracked_models()
+    now = datetime.utcnow()
+    changes = []
+
+    for obj in session.new:
+        spec = tracked.get(type(obj))
+        if spec:
+            entity, property_attr = spec
+            changes.append(_change(entity, obj.id, getattr(obj, property_attr), obj.user_id, 'upsert', now))
+
+    for obj in session.dirty:
+        spec = tracked.get(type(obj))
+        if not spec or not session.is_modified(obj, include_collections=False):
+            continue
+        entity, property_attr = spec
+        # Moved to another property: the old property's members get a tombstone
+        moved_from = attributes.get_history(obj, property_attr).deleted
+        for old_property_id in moved_from:
+            if old_property_id is not None and old_property_id != getattr(obj, property_attr):
+                changes.append(_change(entity, obj.id, old_property_id, obj.user_id, 'delete', now))
+        changes.append(_change(entity, obj.id, getattr(obj, property_attr), obj.user_id, 'upsert', now))
+
+    for obj in session.deleted:
+        spec = tracked.get(type(obj))
+        if spec:
+            entity, property_attr = spec
+            changes.append(_change(entity, obj.id, getattr(obj, property_attr), obj.user_id, 'delete', now))
+
+    _queue_changes(session, changes)
+
+
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    spec = tracked_models().get(mapper.class_) if mapper is not None else None
+    if not spec:
+        return None
+
+    entity, property_attr = spec
+    model = mapper.class_
+    statement = orm_execute_state.statement
+    # FOR UPDATE keeps the rows from changing before the bulk statement runs
+    # (and routes the SELECT to the primary, see utils/db_routing.py)
+    affected = select(model.id, getattr(model, property_attr), model.user_id).with_for_update()
+    if statement.whereclause is not None:
+        affected = affected.where(statement.whereclause)
+    rows = orm_execute_state.session.execute(affected).all()
+
+    result = orm_execute_state.invoke_statement()
+
+    op = 'delete' if orm_execute_state.is_delete else 'upsert'
+    now = datetime.utcnow()
+    _queue_changes(orm_execute_state.session, [
+        _change(entity, entity_id, property_id, user_id, op, now)
+        for entity_id, property_id, user_id in rows
+    ])
+    # Unit-of-work changes raise their events from utils/events.py
+    queue_entity_events(orm_execute_state.session, entity, 'deleted' if orm_execute_state.is_delete else 'updated', rows)
+    return result
+
+
+def _before_commit(session):
+    # Also fires when a savepoint is released; only the outermost commit writes
+    if session.in_nested_transaction():
+        return
+    # commit() would flush after this hook, too late for its changes to be logged
+    session.flush()
+    _write_changes(session)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # Drop changes made inside the rolled-back transaction or savepoint
+    pending = session.info.get('pending_sync_changes')
+    if not pending:
+        return
+
+    def rolled_back(transaction):
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+
+    session.info['pending_sync_changes'] = [entry for entry in pending if not rolled_back(entry[0])]
+
+
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        # Whatever wasn't written by now was rolled back or discarded by close()
+        session.info.pop('pending_sync_changes', None)
+
+
+def init_change_log(app):
+    """Start logging changes to synced models"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+
+    from app import db
+
+    session_class = db.session.session_factory.class_
+    event.listen(session_class, 'before_flush', _before_flush)
+    event.listen(session_class, 'after_flush', _after_flush)
+    event.listen(session_class, 'do_orm_execute', _do_orm_execute)
+    event.listen(session_class, 'before_commit', _before_commit)
+    event.listen(session_class, 'after_soft_rollback', _after_soft_rollback)
+    event.listen(session_class, 'after_transaction_end', _after_transaction_end)
+    _listeners_installed = True
@@ -0,0 +1,184 @@
+# utils/compression.py
+"""
+gzip / brotli compression of responses.
+
+JSON compresses very well (a tenant or document list typically shrinks
+by 85-95%), which matters most to the mobile app on slow links. Each
+response is compressed with the best encoding the client accepts
+(Accept-Encoding, br preferred over gzip at equal quality) when:
+
+- its mimetype is in COMPRESSION_MIMETYPES (JSON, text, JS, CSV, SVG)
+- it's at least COMPRESSION_MIN_SIZE bytes; below that the headers cost
+  more than the bytes saved
+- it isn't a file sent with send_file (direct passthrough), a 206/304, or
+  already encoded
+- it isn't a /api/batch sub-request: those bodies are embedded in the
+  batch response, which is compressed as a whole
+
+Levels are kept low for CPU (COMPRESSION_GZIP_LEVEL 5,
+COMPRESSION_BROTLI_QUALITY 4): past those, ratios on JSON barely improve
+while compression time grows quickly.
+
+Streamed responses (a generator as the body) are compressed chunk by
+chunk, flushing after each one so the client still receives data as it's
+produced; they're compressed whatever their size, which isn't known up
+front.
+
+Brotli needs the Brotli package; without it only gzip is offered. Bytes
+in and out per endpoint and encoding (their ratio is the compression
+ratio) and the CPU seconds spent compressing are exported on /metrics.
+"""
+import gzip
+import time
+import zlib
+
+from flask import g, request
+
+from app.utils.metrics import COMPRESSION_BYTES, COMPRESSION_RESPONSES, COMPRESSION_SECONDS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+    'image/svg+xml',
+)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits 31: gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encodings, encodings=None):
+    """The accepted encoding with the highest quality (first listed wins ties), or None"""
+    best, best_quality = None, 0
+    for encoding in encodings or available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('COMPRESSION_BROTLI_QUALITY', 4))
+    return gzip.compress(data, compresslevel=config.get('COMPRESSION_GZIP_LEVEL', 5), mtime=0)
+
+
+def _stream_compressor(encoding, config):
+    if encoding == 'br':
+        return _BrotliStream(config.get('COMPRESSION_BROTLI_QUALITY', 4))
+    return _GzipStream(config.get('COMPRESSION_GZIP_LEVEL', 5))
+
+
+def _compress_stream(chunks, encoding, config, endpoint):
+    compressor = _stream_compressor(encoding, config)
+    size_in = size_out = 0
+    cpu = 0.0
+    try:
+        for chunk in chunks:
+            start = time.thread_time()
+            data = compressor.compress(chunk)
+            cpu += time.thread_time() - start
+            size_in += len(chunk)
+            size_out += len(data)
+            if data:
+                yield data
+        start = time.thread_time()
+        data = compressor.finish()
+        cpu += time.thread_time() - start
+        size_out += len(data)
+        yield data
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+        _record(endpoint, encoding, size_in, size_out, cpu, streamed=True)
+
+
+def _record(endpoint, encoding, size_in, size_out, cpu, streamed):
+    COMPRESSION_RESPONSES.inc(encoding=encoding, streamed=str(streamed).lower())
+    COMPRESSION_BYTES.inc(size_in, endpoint=endpoint, encoding=encoding, stage='in')
+    COMPRESSION_BYTES.inc(size_out, endpoint=endpoint, encoding=encoding, stage='out')
+    COMPRESSION_SECONDS.inc(cpu, encoding=encoding)
+
+
+def _compressible(response, mimetypes):
+    if response.mimetype not in mimetypes:
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    return response.status_code >= 200 and response.status_code not in (204, 206, 304)
+
+
+def compress_response(response, config):
+    """Compress response in place if the client and the response allow it"""
+    mimetypes = config.get('COMPRESSION_MIMETYPES', DEFAULT_MIMETYPES)
+    if g.get('batch_subrequest') or not _compressible(response, mimetypes):
+        return response
+    # Caches must keep a copy per encoding even when this one goes out plain
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    endpoint = request.endpoint or 'none'
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(), encoding, config, endpoint)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config.get('COMPRESSION_MIN_SIZE', 1024):
+            return response
+        start = time.thread_time()
+        compressed = compress(data, encoding, config)
+        _record(endpoint, encoding, len(data), len(compressed), time.thread_time() - start, streamed=False)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag names exact bytes, so the compressed body needs its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_compression(app):
+    """Compress responses (COMPRESSION_ENABLED, see module docstring)"""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return
+
+    @app.after_request
+    def compress_after_request(response):
+        return compress_response(response, app.config)
@@ -0,0 +1,128 @@
+# utils/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for list and detail endpoints.
+
+Validators are computed before anything is serialized, so a client that
+re-polls an unchanged resource gets a 304 for the price of one small query:
+- lists: one aggregate over the list query, COUNT(*) and MAX(updated_at)
+  (plus MAX(updated_at) of joined rows shown in the list), combined with
+  the caller's access set (the property ids/roles the list was filtered by)
+- details: the row's own updated_at (plus that of related rows it shows)
+
+The count catches deletes, the max catches inserts and updates, and the
+access set catches properties being shared with or removed from the user.
+
+Usage in a view:
+
+    etag, last_modified = list_validators(query, Tenant.updated_at, access=property_ids)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    ...
+    return with_validators(jsonify(result), etag, last_modified)
+
+List endpoints ignore If-Modified-Since: a delete doesn't move
+MAX(updated_at), so only the ETag is reliable there.
+"""
+from datetime import datetime
+import hashlib
+
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+
+# Bump when a list or detail response changes shape without its data
+# changing, so clients don't keep serving the old representation
+REPRESENTATION_VERSION = '1'
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        # SQLite can return aggregates of DateTime columns as strings
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _make_etag(parts):
+    # ?fields= (utils/serializers.py) selects a different representation of the same data.
+    # Responses shared between members of a property (utils/response_cache.py) carry
+    # the same ETag for all of them, so the caller is left out there.
+    identity = '' if g.get('shared_response') else get_jwt_identity()
+    seed = '|'.join(str(part) for part in (
+        REPRESENTATION_VERSION, request.endpoint, identity, request.args.get('fields', ''), *parts
+    ))
+    return hashlib.sha1(seed.encode()).hexdigest()[:20]
+
+
+def _access_version(access):
+    if access is None:
+        return ''
+    if isinstance(access, dict):
+        access = access.items()
+    return hashlib.sha1(repr(sorted(access)).encode()).hexdigest()[:12]
+
+
+def list_validators(query, *updated_columns, access=None):
+    """(etag, last_modified) for the rows a list query returns.
+
+    updated_columns: updated_at columns of the listed model and of any
+    joined model shown in the list. access: property ids (or id -> role)
+    that scoped the query.
+    """
+    aggregates = [func.count()] + [func.max(column) for column in updated_columns]
+    row = query.order_by(None).with_entities(*aggregates).one()
+    count = row[0]
+    maxima = [_as_datetime(value) for value in row[1:]]
+
+    present = [value for value in maxima if value is not None]
+    last_modified = max(present) if present else None
+    etag = _make_etag([count, *(value.isoformat() if value else '' for value in maxima), _access_version(access)])
+    return etag, last_modified
+
+
+def row_validators(*rows, extra=()):
+    """(etag, last_modified) for a detail response built from these rows.
+
+    extra: anything else the response depends on, e.g. the caller's role.
+    """
+    stamps = [getattr(row, 'updated_at', None) if row is not None else None for row in rows]
+    present = [value for value in stamps if value is not None]
+    last_modified = max(present) if present else None
+    etag = _make_etag([
+        *(f"{type(row).__name__}:{row.id}" if row is not None else '' for row in rows),
+        *(value.isoformat() if value else '' for value in stamps),
+        *extra
+    ])
+    return etag, last_modified
+
+
+def _not_modified_since(last_modified):
+    since = request.if_modified_since
+    if since is None or last_modified is None:
+        return False
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag, last_modified=None, use_if_modified_since=False):
+    """A 304 response if the client's copy is current, else None"""
+    if request.if_none_match:
+        match = request.if_none_match.contains_weak(etag)
+    elif use_if_modified_since:
+        match = _not_modified_since(last_modified)
+    else:
+        match = False
+    if not match:
+        return None
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
@@ -76,4 +76,68 @@ TENANT_DOCUMENT_CATEGORY_CHOICES = [
     {'value': DOCUMENT_CATEGORIES['TENANT_INSPECTION'], 'label': 'Inspection Reports'},
     {'value': DOCUMENT_CATEGORIES['TENANT_PET_AGREEMENT'], 'label': 'Pet Agreement'},
     {'value': DOCUMENT_CATEGORIES['GENERAL'], 'label': 'Other Documents'},
-]
\ No newline at end of file
+]
+
+# Default notification preferences for users without a settings row
+DEFAULT_NOTIFICATION_SETTINGS = {
+    "email_notifications": True,
+    "maintenance_reminders": True,
+    "payment_reminders": True,
+    "project_updates": True,
+    "document_updates": False
+}
+
+
+# Template for the default seasonal checklist. These items are merged into
+# checklist responses at read time; a per-property row is only stored once a
+# user toggles, edits or removes one of them (see MaintenanceChecklistItem.default_key).
+DEFAULT_CHECKLIST_ITEMS = {
+    'Spring': [
+        {'key': 'spring_clean_gutters_downspouts', 'task': 'Clean gutters and downspouts', 'description': 'Remove debris and check for proper drainage'},
+        {'key': 'spring_inspect_roof_damage', 'task': 'Inspect roof for damage', 'description': 'Check for missing/damaged shingles or signs of leaks'},
+        {'key': 'spring_service_air_conditioning', 'task': 'Service air conditioning system', 'description': 'Schedule professional maintenance'},
+        {'key': 'spring_check_exterior_drainage', 'task': 'Check exterior drainage', 'description': 'Ensure water flows away from foundation'},
+        {'key': 'spring_inspect_clean_deck', 'task': 'Inspect and clean deck', 'description': 'Clean, repair, and reseal if needed'},
+        {'key': 'spring_test_smoke_co', 'task': 'Test smoke and CO detectors', 'description': 'Replace batteries and test functionality'},
+        {'key': 'spring_check_leaks_windows', 'task': 'Check for leaks around windows and doors', 'description': 'Inspect seals and weatherstripping'},
+        {'key': 'spring_trim_trees_shrubs', 'task': 'Trim trees and shrubs', 'description': 'Remove branches near the house and roof'},
+        {'key': 'spring_inspect_foundation_cracks', 'task': 'Inspect foundation for cracks', 'description': 'Note and repair any new or expanding cracks'},
+        {'key': 'spring_clean_outdoor_furniture', 'task': 'Clean outdoor furniture', 'description': 'Clean and prepare patio furniture for use'}
+    ],
+    'Summer': [
+        {'key': 'summer_check_irrigation_systems', 'task': 'Check irrigation systems', 'description': 'Ensure sprinklers and watering systems are working properly'},
+        {'key': 'summer_inspect_pest_infestations', 'task': 'Inspect for pest infestations', 'description': 'Look for signs of termites, ants, or other pests'},
+        {'key': 'summer_clean_inspect_outdoor', 'task': 'Clean and inspect outdoor grill', 'description': 'Clean grates and check propane connections'},
+        {'key': 'summer_check_window_screens', 'task': 'Check window screens', 'description': 'Repair any tears or holes in window screens'},
+        {'key': 'summer_service_lawn_equipment', 'task': 'Service lawn equipment', 'description': 'Sharpen mower blades and check other equipment'},
+        {'key': 'summer_check_pool_maintenance', 'task': 'Check pool maintenance', 'description': 'Test water, clean filters, check equipment (if applicable)'},
+        {'key': 'summer_test_garage_door', 'task': 'Test garage door and lubricate', 'description': 'Ensure proper operation and safety features'},
+        {'key': 'summer_clean_dryer_vent', 'task': 'Clean dryer vent', 'description': 'Remove lint buildup to prevent fire hazards'},
+        {'key': 'summer_check_attic_ventilation', 'task': 'Check attic ventilation', 'description': 'Ensure proper airflow to prevent heat buildup'},
+        {'key': 'summer_inspect_driveway_walkways', 'task': 'Inspect driveway and walkways', 'description': 'Repair cracks and seal if needed'}
+    ],
+    'Fall': [
+        {'key': 'fall_clean_gutters_downspouts', 'task': 'Clean gutters and downspouts', 'description': 'Remove fallen leaves and debris'},
+        {'key': 'fall_service_heating_system', 'task': 'Service heating system', 'description': 'Schedule professional maintenance before winter'},
+        {'key': 'fall_check_chimney_fireplace', 'task': 'Check chimney and fireplace', 'description': 'Clean and inspect for safe operation'},
+        {'key': 'fall_seal_gaps_cracks', 'task': 'Seal gaps and cracks', 'description': 'Prevent drafts and pests from entering'},
+        {'key': 'fall_test_smoke_co', 'task': 'Test smoke and CO detectors', 'description': 'Replace batteries and test functionality'},
+        {'key': 'fall_store_outdoor_furniture', 'task': 'Store outdoor furniture', 'description': 'Clean and store or cover for winter'},
+        {'key': 'fall_drain_store_garden', 'task': 'Drain and store garden hoses', 'description': 'Prevent freezing and damage'},
+        {'key': 'fall_winterize_irrigation_system', 'task': 'Winterize irrigation system', 'description': 'Drain water to prevent freezing damage'},
+        {'key': 'fall_inspect_roof_repair', 'task': 'Inspect roof and repair if needed', 'description': 'Address issues before winter weather'},
+        {'key': 'fall_rake_leaves_aerate', 'task': 'Rake leaves and aerate lawn', 'description': 'Prepare lawn for winter dormancy'}
+    ],
+    'Winter': [
+        {'key': 'winter_check_ice_dams', 'task': 'Check for ice dams on roof', 'description': 'Remove snow buildup to prevent ice dams'},
+        {'key': 'winter_test_sump_pump', 'task': 'Test sump pump', 'description': 'Ensure proper operation before spring thaw'},
+        {'key': 'winter_check_drafts', 'task': 'Check for drafts', 'description': 'Identify and seal cold air leaks'},
+        {'key': 'winter_inspect_attic_insulation', 'task': 'Inspect attic insulation', 'description': 'Check for proper coverage and no moisture issues'},
+        {'key': 'winter_check_basement_water', 'task': 'Check basement for water leaks', 'description': 'Inspect during thaws or heavy rain'},
+        {'key': 'winter_monitor_humidity_levels', 'task': 'Monitor humidity levels', 'description': 'Maintain proper indoor humidity (30-50%)'},
+        {'key': 'winter_check_water_heater', 'task': 'Check water heater', 'description': 'Inspect for leaks and flush if needed'},
+        {'key': 'winter_clean_refrigerator_coils', 'task': 'Clean refrigerator coils', 'description': 'Remove dust to improve efficiency'},
+        {'key': 'winter_check_emergency_supplies', 'task': 'Check emergency supplies', 'description': 'Update emergency kit for winter storms'},
+        {'key': 'winter_protect_outdoor_faucets', 'task': 'Protect outdoor faucets', 'description': 'Ensure they are drained and insulated'}
+    ]
+}
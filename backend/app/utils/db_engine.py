@@ -0,0 +1,111 @@
+# utils/db_engine.py
+"""
+SQLAlchemy engine and connection-pool configuration.
+
+Builds SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings in config.py:
+pool sizing, pre-ping (so connections killed by a PostgreSQL restart are
+replaced transparently instead of failing the next request), recycling and
+a per-statement timeout.
+
+DB_PGBOUNCER_MODE makes the engine safe behind PgBouncer in transaction
+pooling mode, where consecutive transactions may run on different server
+connections:
+- no startup `options` parameter (PgBouncer rejects it); the statement
+  timeout is applied with SET LOCAL at the start of each transaction instead
+- server-side prepared statements are disabled for drivers that use them
+- DB_POOL_SIZE=0 switches to NullPool and leaves pooling to PgBouncer
+
+Connection budget: each worker process holds at most
+DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so e.g. 16 workers x (4 + 2)
+= 96 stays under PostgreSQL's default max_connections of 100.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+
+def build_engine_options(config, database_uri):
+    """Return SQLALCHEMY_ENGINE_OPTIONS for the given config and database URI"""
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+
+    # SQLite has no server to pool connections to; keep SQLAlchemy's defaults
+    if backend != 'postgresql':
+        return {}
+
+    pgbouncer_mode = config.get('DB_PGBOUNCER_MODE', False)
+    pool_size = config.get('DB_POOL_SIZE', 5)
+    statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS')
+    connect_args = {}
+
+    options = {
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+
+    if pgbouncer_mode and pool_size == 0:
+        options['poolclass'] = NullPool
+    else:
+        options.update({
+            'pool_size': pool_size,
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            # Reuse the most recently returned connection so idle ones can time out
+            'pool_use_lifo': True,
+        })
+
+    connect_timeout = config.get('DB_CONNECT_TIMEOUT')
+    if connect_timeout:
+        connect_args['connect_timeout'] = connect_timeout
+
+    if pgbouncer_mode:
+        driver = url.get_driver_name()
+        if driver == 'psycopg':
+            # psycopg 3 prepares repeated statements server-side by default
+            connect_args['prepare_threshold'] = None
+        elif driver == 'asyncpg':
+            connect_args['statement_cache_size'] = 0
+            connect_args['prepared_statement_cache_size'] = 0
+        # psycopg2 never uses server-side prepared statements
+    elif statement_timeout:
+        connect_args['options'] = f"-c statement_timeout={int(statement_timeout)}"
+
+    if connect_args:
+        options['connect_args'] = connect_args
+
+    return options
+
+
+def _set_local_statement_timeout(timeout_ms):
+    def on_begin(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+    return on_begin
+
+
+def init_engine_events(app, engine):
+    """Attach per-transaction settings that can't be set at connect time"""
+    timeout_ms = app.config.get('DB_STATEMENT_TIMEOUT_MS')
+    if (app.config.get('DB_PGBOUNCER_MODE') and timeout_ms
+            and engine.dialect.name == 'postgresql'):
+        event.listen(engine, 'begin', _set_local_statement_timeout(timeout_ms))
+
+
+def get_pool_stats(engine):
+    """Current pool occupancy for an engine"""
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'dialect': engine.dialect.name,
+    }
+    # NullPool/StaticPool don't track occupancy
+    if hasattr(pool, 'checkedout'):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            # QueuePool reports overflow relative to pool_size (negative while under it)
+            'overflow': max(0, pool.overflow()),
+            'max_overflow': getattr(pool, '_max_overflow', None),
+            'timeout': pool.timeout() if callable(getattr(pool, 'timeout', None)) else None,
+        })
+    return stats
@@ -0,0 +1,185 @@
+# utils/db_routing.py
+"""
+Read-replica routing.
+
+With DB_REPLICA_URLS set, read-only requests (GET/HEAD) run their SELECTs
+against a replica, picked at random per request, while everything else
+stays on the primary database:
+- any non-GET request (writes, token refresh, login)
+- flushes, INSERT/UPDATE/DELETE and SELECT ... FOR UPDATE
+- every statement after the first write in a request
+- views marked with @use_primary and blueprints in
+  DB_REPLICA_EXCLUDED_BLUEPRINTS (auth and admin by default)
+- CLI commands and anything else outside a request
+
+Read-your-writes: after a successful write the user is pinned to the
+primary for DB_REPLICA_PIN_SECONDS, so the next page load shows their
+change even if the replica is lagging. The pin is kept per worker by user
+id and in a cookie so it also holds when the next request lands on
+another gunicorn worker.
+
+To try it locally, point DB_REPLICA_URLS at a second database (a copy of
+the SQLite file works) and watch the X-DB-Route response header.
+"""
+import random
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+import sqlalchemy as sa
+from sqlalchemy.sql.elements import TextClause
+
+from app.utils.metrics import DB_ROUTED_REQUESTS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_COOKIE = 'db_primary_until'
+
+# user id -> monotonic time the primary pin expires
+_pins = {}
+_pins_lock = threading.Lock()
+
+
+def use_primary(view):
+    """Always serve this view from the primary database.
+
+    Apply it below the route decorator, e.g. for reads that must not lag:
+
+        @bp.route('/status', methods=['GET'])
+        @use_primary
+        @jwt_required()
+        def status(): ...
+    """
+    view.use_primary_db = True
+    return view
+
+
+def _is_read_only(clause):
+    if clause is None:
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith('SELECT')
+    if getattr(clause, 'is_select', False):
+        return getattr(clause, '_for_update_arg', None) is None
+    return False
+
+
+def _request_replica():
+    """The replica engine chosen for the current request, if any"""
+    if not has_request_context() or g.get('db_wrote'):
+        return None
+    return g.get('db_replica')
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the request's replica and writes to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or not _is_read_only(clause):
+                if has_request_context():
+                    g.db_wrote = True
+            else:
+                replica = _request_replica()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def get_replica_engines(app=None):
+    app = app or current_app
+    return app.extensions.get('db_replicas', [])
+
+
+def _current_user_id():
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _is_pinned(user_id):
+    try:
+        if float(request.cookies.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    if user_id is None:
+        return False
+    with _pins_lock:
+        expires = _pins.get(user_id)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        del _pins[user_id]
+        return False
+
+
+def _pin(user_id, seconds, response):
+    if user_id is not None:
+        with _pins_lock:
+            now = time.monotonic()
+            # Drop expired pins so the map doesn't grow with every user seen
+            for key in [key for key, expires in _pins.items() if expires <= now]:
+                del _pins[key]
+            _pins[user_id] = now + seconds
+    response.set_cookie(
+        PIN_COOKIE, str(time.time() + seconds),
+        max_age=int(seconds) + 1, httponly=True, samesite='Lax'
+    )
+
+
+def _routes_to_replica(excluded_blueprints):
+    if request.method not in SAFE_METHODS or request.endpoint is None:
+        return False
+    if request.blueprint in excluded_blueprints:
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    return not getattr(view, 'use_primary_db', False)
+
+
+def init_db_routing(app):
+    """Create replica engines and register the routing request hooks.
+
+    The routing session itself is installed on the SQLAlchemy extension
+    (see app/__init__.py) and behaves like the default session until a
+    request selects a replica.
+    """
+    urls = app.config.get('DB_REPLICA_URLS') or []
+    if not urls:
+        return
+
+    from app.utils.db_engine import build_engine_options, init_engine_events
+
+    engines = []
+    for url in urls:
+        engine = sa.create_engine(url, **build_engine_options(app.config, url))
+        init_engine_events(app, engine)
+        engines.append(engine)
+    app.extensions['db_replicas'] = engines
+
+    pin_seconds = app.config.get('DB_REPLICA_PIN_SECONDS', 5)
+    excluded_blueprints = set(app.config.get('DB_REPLICA_EXCLUDED_BLUEPRINTS') or [])
+
+    @app.before_request
+    def choose_database():
+        g.db_user_id = _current_user_id()
+        if _routes_to_replica(excluded_blueprints) and not _is_pinned(g.db_user_id):
+            g.db_replica = random.choice(engines)
+
+    @app.after_request
+    def pin_after_write(response):
+        wrote = g.pop('db_wrote', False)
+        replica = g.pop('db_replica', None)
+        if response.status_code < 400 and (wrote or request.method not in SAFE_METHODS):
+            _pin(g.get('db_user_id'), pin_seconds, response)
+
+        target = 'replica' if replica is not None and not wrote else 'primary'
+        response.headers['X-DB-Route'] = target
+        DB_ROUTED_REQUESTS.inc(target=target)
+        return response
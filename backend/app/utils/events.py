@@ -0,0 +1,352 @@
+# utils/events.py
+"""
+In-process domain events, delivered after the transaction commits.
+
+Inserts, updates and deletes of the models in the change log (see
+utils/change_log.py) raise typed events such as ExpenseCreated,
+TenantUpdated or DocumentDeleted; code that isn't a row change raises its
+own (UserRegistered, PropertyInvitationSent) with emit(). Subscribers see
+an event only once the transaction that produced it has committed: events
+from a rolled-back transaction or savepoint are dropped.
+
+    from app.utils.events import ExpenseCreated, subscribe
+
+    @subscribe(ExpenseCreated, background=True)
+    def update_report_totals(event):
+        ...
+
+Subscribing to a base class (EntityCreated, EntityEvent, DomainEvent)
+receives all of its subclasses.
+
+- Synchronous subscribers run in the committing thread, right after the
+  commit. Keep them short, and don't write through db.session from them.
+- Background subscribers run on a bounded thread pool
+  (EVENTS_BACKGROUND_WORKERS threads, EVENTS_BACKGROUND_QUEUE waiting
+  events) in their own app context, so they can use the database. When the
+  queue is full the subscriber runs inline instead, which slows the
+  request down rather than losing the event. EVENTS_RUN_INLINE runs them
+  all inline (tests, one-off scripts).
+
+Events only hold ids and plain values, never ORM objects, so they can
+cross threads; subscribers load what they need. Delivery is in-process and
+best effort: a worker that exits with events still queued loses them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+
+from flask import current_app
+from sqlalchemy import event as sa_event, inspect
+
+from app.utils.metrics import EVENT_HANDLER_ERRORS, EVENTS_DISPATCHED
+
+_listeners_installed = False
+
+# (event type, handler, background)
+_subscribers = []
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class DomainEvent:
+    """Base class for all events"""
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.occurred_at = datetime.utcnow()
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def to_dict(self):
+        data = {key: value for key, value in vars(self).items() if key != 'occurred_at'}
+        data['event'] = self.name
+        data['occurred_at'] = self.occurred_at.isoformat()
+        return data
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in vars(self).items() if key != 'occurred_at')
+        return f"{self.name}({fields})"
+
+
+class EntityEvent(DomainEvent):
+    """A row of a change-logged model changed.
+
+    changed_fields: attribute names for updates, None when unknown (bulk
+    query.update()).
+    """
+    entity = None
+    kind = None
+
+    def __init__(self, entity_id, property_id=None, user_id=None, changed_fields=None):
+        super().__init__(entity_id=entity_id, property_id=property_id, user_id=user_id,
+                         changed_fields=changed_fields)
+
+
+class EntityCreated(EntityEvent):
+    kind = 'created'
+
+
+class EntityUpdated(EntityEvent):
+    kind = 'updated'
+
+
+class EntityDeleted(EntityEvent):
+    kind = 'deleted'
+
+
+class PropertyCreated(EntityCreated): entity = 'property'
+class PropertyUpdated(EntityUpdated): entity = 'property'
+class PropertyDeleted(EntityDeleted): entity = 'property'
+class MaintenanceCreated(EntityCreated): entity = 'maintenance'
+class MaintenanceUpdated(EntityUpdated): entity = 'maintenance'
+class MaintenanceDeleted(EntityDeleted): entity = 'maintenance'
+class TenantCreated(EntityCreated): entity = 'tenant'
+class TenantUpdated(EntityUpdated): entity = 'tenant'
+class TenantDeleted(EntityDeleted): entity = 'tenant'
+class ApplianceCreated(EntityCreated): entity = 'appliance'
+class ApplianceUpdated(EntityUpdated): entity = 'appliance'
+class ApplianceDeleted(EntityDeleted): entity = 'appliance'
+class ProjectCreated(EntityCreated): entity = 'project'
+class ProjectUpdated(EntityUpdated): entity = 'project'
+class ProjectDeleted(EntityDeleted): entity = 'project'
+class ExpenseCreated(EntityCreated): entity = 'expense'
+class ExpenseUpdated(EntityUpdated): entity = 'expense'
+class ExpenseDeleted(EntityDeleted): entity = 'expense'
+class BudgetCreated(EntityCreated): entity = 'budget'
+class BudgetUpdated(EntityUpdated): entity = 'budget'
+class BudgetDeleted(EntityDeleted): entity = 'budget'
+class DocumentCreated(EntityCreated): entity = 'document'
+class DocumentUpdated(EntityUpdated): entity = 'document'
+class DocumentDeleted(EntityDeleted): entity = 'document'
+class ChecklistItemCreated(EntityCreated): entity = 'checklist_item'
+class ChecklistItemUpdated(EntityUpdated): entity = 'checklist_item'
+class ChecklistItemDeleted(EntityDeleted): entity = 'checklist_item'
+class MembershipCreated(EntityCreated): entity = 'membership'
+class MembershipUpdated(EntityUpdated): entity = 'membership'
+class MembershipDeleted(EntityDeleted): entity = 'membership'
+
+
+class UserRegistered(DomainEvent):
+    def __init__(self, user_id, verification_url):
+        super().__init__(user_id=user_id, verification_url=verification_url)
+
+
+class PropertyInvitationSent(DomainEvent):
+    """An invitation to a property; user_id for existing users, email otherwise"""
+
+    def __init__(self, property_id, inviter_id, role, invitation_url, user_id=None, email=None):
+        super().__init__(property_id=property_id, inviter_id=inviter_id, role=role,
+                         invitation_url=invitation_url, user_id=user_id, email=email)
+
+
+def _entity_event_types():
+    types = {}
+    pending = [EntityEvent]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if cls.entity and cls.kind:
+            types[(cls.entity, cls.kind)] = cls
+    return types
+
+
+_ENTITY_EVENT_TYPES = _entity_event_types()
+
+
+def subscribe(event_type, handler=None, background=False):
+    """Register handler for event_type and its subclasses; usable as a decorator"""
+    def register(func):
+        _subscribers.append((event_type, func, background))
+        return func
+    if handler is not None:
+        return register(handler)
+    return register
+
+
+def unsubscribe(handler):
+    _subscribers[:] = [entry for entry in _subscribers if entry[1] is not handler]
+
+
+class BoundedExecutor:
+    """Thread pool that refuses work instead of queueing without limit"""
+
+    def __init__(self, max_workers, max_queue):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='events')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args):
+        """Run fn in the pool; False if it's full"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            future = self._pool.submit(fn, *args)
+        except RuntimeError:
+            # Interpreter shutting down
+            self._slots.release()
+            return False
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BoundedExecutor(
+                app.config.get('EVENTS_BACKGROUND_WORKERS', 4),
+                app.config.get('EVENTS_BACKGROUND_QUEUE', 1000)
+            )
+        return _executor
+
+
+def _call(handler, event):
+    try:
+        handler(event)
+    except Exception:
+        EVENT_HANDLER_ERRORS.inc(event=event.name, handler=handler.__name__)
+        current_app.logger.exception(f"Event handler {handler.__name__} failed for {event!r}")
+
+
+def _call_in_context(app, handler, event):
+    with app.app_context():
+        _call(handler, event)
+
+
+def dispatch(event):
+    """Deliver an event to its subscribers now"""
+    app = current_app._get_current_object()
+    run_inline = app.config.get('EVENTS_RUN_INLINE', False)
+    for event_type, handler, background in list(_subscribers):
+        if not isinstance(event, event_type):
+            continue
+        if not background:
+            mode = 'sync'
+            _call(handler, event)
+        elif not run_inline and _get_executor(app).submit(_call_in_context, app, handler, event):
+            mode = 'background'
+        else:
+            mode = 'inline'
+            _call(handler, event)
+        EVENTS_DISPATCHED.inc(event=event.name, mode=mode)
+
+
+def _queue(session, events):
+    if not events:
+        return
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault('pending_events', []).extend((transaction, event) for event in events)
+
+
+def emit(event):
+    """Deliver an event once the current transaction commits.
+
+    If nothing has been written in the current transaction (e.g. right
+    after a commit), there's nothing to wait for and it's delivered now.
+    """
+    from app import db
+
+    session = db.session()
+    has_writes = session.info.get('events_tx_writes') or session.new or session.dirty or session.deleted
+    if session.in_transaction() and has_writes:
+        _queue(session, [event])
+    else:
+        dispatch(event)
+
+
+def queue_entity_events(session, entity, kind, rows, changed_fields=None):
+    """Queue events for rows changed outside the unit of work (bulk updates).
+
+    rows: (entity_id, property_id, user_id) tuples
+    """
+    event_type = _ENTITY_EVENT_TYPES.get((entity, kind))
+    if event_type is None:
+        return
+    session.info['events_tx_writes'] = True
+    _queue(session, [
+        event_type(entity_id, property_id, user_id, changed_fields)
+        for entity_id, property_id, user_id in rows
+    ])
+
+
+def _after_flush(session, flush_context):
+    from app.utils.change_log import tracked_models
+
+    tracked = tracked_models()
+    events = []
+
+    for kind, objects in (('created', session.new), ('updated', session.dirty), ('deleted', session.deleted)):
+        for obj in objects:
+            spec = tracked.get(type(obj))
+            if not spec:
+                continue
+            entity, property_attr = spec
+            changed_fields = None
+            if kind == 'updated':
+                if not session.is_modified(obj, include_collections=False):
+                    continue
+                changed_fields = sorted(attr.key for attr in inspect(obj).attrs if attr.history.has_changes())
+            events.append(_ENTITY_EVENT_TYPES[(entity, kind)](
+                obj.id, getattr(obj, property_attr), obj.user_id, changed_fields
+            ))
+
+    session.info['events_tx_writes'] = True
+    _queue(session, events)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # Drop events raised inside the rolled-back transaction or savepoint
+    pending = session.info.get('pending_events')
+    if not pending:
+        return
+
+    def rolled_back(transaction):
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+
+    session.info['pending_events'] = [entry for entry in pending if not rolled_back(entry[0])]
+
+
+def _after_commit(session):
+    # Fires for savepoint releases too; only the outermost commit delivers
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop('pending_events', [])
+    session.info.setdefault('committed_events', []).extend(event for _, event in pending)
+
+
+def _after_transaction_end(session, transaction):
+    if transaction.parent is not None:
+        return
+    # Whatever wasn't committed by now was rolled back or discarded by close()
+    session.info.pop('pending_events', None)
+    session.info.pop('events_tx_writes', None)
+    committed = session.info.pop('committed_events', None)
+    for event in committed or ():
+        dispatch(event)
+
+
+def init_events(app):
+    """Start raising domain events and register the app's subscribers"""
+    global _listeners_installed
+    if not _listeners_installed:
+        from app import db
+
+        session_class = db.session.session_factory.class_
+        sa_event.listen(session_class, 'after_flush', _after_flush)
+        sa_event.listen(session_class, 'after_soft_rollback', _after_soft_rollback)
+        sa_event.listen(session_class, 'after_commit', _after_commit)
+        sa_event.listen(session_class, 'after_transaction_end', _after_transaction_end)
+        _listeners_installed = True
+
+    # Importing the module registers its subscribers
+    import app.services.event_handlers  # noqa: F401
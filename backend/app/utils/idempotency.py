@@ -0,0 +1,205 @@
+# utils/idempotency.py
+"""
+Idempotency-Key support for POST endpoints.
+
+Mobile clients retry a create after a timeout without knowing whether the
+first attempt went through. With an `Idempotency-Key: <unique string>`
+header, views decorated with @idempotent run at most once per key and
+user; a retry gets the stored response back (marked with an
+`Idempotent-Replayed: true` header) instead of creating a duplicate.
+
+- The key is claimed before the view runs by inserting a row in its own
+  transaction; the unique (user_id, key) constraint decides which of two
+  concurrent requests runs. The other waits up to IDEMPOTENCY_WAIT_SECONDS
+  for the response, then gets a 409 with Retry-After.
+- Responses below 500 (except 429) are stored for IDEMPOTENCY_KEY_TTL_HOURS.
+  Server errors release the key so a retry runs the request again.
+- Reusing a key for a different request (method, path or body) is a 422.
+- A claim left behind by a crashed worker is taken over after
+  IDEMPOTENCY_LOCK_SECONDS (300), which must stay above the gunicorn worker
+  timeout: a slow request still holding its claim would otherwise run twice.
+
+Apply it below the route and auth decorators:
+
+    @bp.route('/', methods=['POST'])
+    @jwt_required()
+    @idempotent
+    def create_thing(): ...
+"""
+from datetime import datetime, timedelta
+from functools import wraps
+import hashlib
+import json
+import time
+
+from flask import current_app, jsonify, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+MAX_KEY_LENGTH = 255
+
+# Response headers kept with the stored response
+STORED_HEADERS = ('Content-Type', 'Location')
+
+POLL_INTERVAL = 0.1
+
+
+def _current_user_id():
+    from flask_jwt_extended import get_jwt_identity
+    from app.utils.api_key_auth import get_api_user_id
+
+    user_id = get_api_user_id()
+    if user_id is None:
+        user_id = get_jwt_identity()
+    return int(user_id)
+
+
+def request_fingerprint():
+    """sha256 of the method, path and body.
+
+    Multipart bodies are hashed field by field: a retried upload usually
+    gets a new multipart boundary, which shouldn't count as a different request.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    if request.mimetype == 'multipart/form-data':
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"form {name}={value}\n".encode())
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: (item[0], item[1].filename or '')):
+            digest.update(f"file {name}={upload.filename}\n".encode())
+            for chunk in iter(lambda: upload.stream.read(64 * 1024), b''):
+                digest.update(chunk)
+            upload.stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _error(message, status, retry_after=None):
+    response = jsonify({"error": message})
+    response.status_code = status
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _replay(record):
+    headers = json.loads(record.response_headers or '{}')
+    response = current_app.response_class(record.response_body, status=record.response_status, headers=headers)
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _claim(engine, table, user_id, key, fingerprint):
+    """Claim the key for this request.
+
+    Returns None when the caller should run the view, or the response to
+    send instead (a replay, a mismatch or a timeout).
+    """
+    config = current_app.config
+    ttl = timedelta(hours=config.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    lock_timeout = timedelta(seconds=config.get('IDEMPOTENCY_LOCK_SECONDS', 300))
+    deadline = time.monotonic() + config.get('IDEMPOTENCY_WAIT_SECONDS', 10)
+
+    while True:
+        now = datetime.utcnow()
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(table).values(
+                    user_id=user_id, key=key, request_hash=fingerprint, status='in_progress',
+                    created_at=now, expires_at=now + ttl
+                ))
+            return None
+        except IntegrityError:
+            pass
+
+        with engine.connect() as conn:
+            record = conn.execute(
+                select(table).where(table.c.user_id == user_id, table.c.key == key)
+            ).first()
+
+        if record is not None:
+            stale = record.expires_at <= now or (
+                record.status == 'in_progress' and record.created_at <= now - lock_timeout
+            )
+            if stale:
+                with engine.begin() as conn:
+                    conn.execute(delete(table).where(table.c.id == record.id, table.c.status == record.status))
+                continue
+            if record.request_hash != fingerprint:
+                return _error("Idempotency-Key was already used for a different request", 422)
+            if record.status == 'completed':
+                return _replay(record)
+
+        if time.monotonic() >= deadline:
+            return _error("A request with this Idempotency-Key is still being processed", 409, retry_after=1)
+        time.sleep(POLL_INTERVAL)
+
+
+def _complete(engine, table, user_id, key, response):
+    headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+    with engine.begin() as conn:
+        conn.execute(update(table).where(table.c.user_id == user_id, table.c.key == key).values(
+            status='completed',
+            response_status=response.status_code,
+            response_headers=json.dumps(headers),
+            response_body=response.get_data()
+        ))
+
+
+def _release(engine, table, user_id, key):
+    with engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.user_id == user_id, table.c.key == key))
+
+
+def idempotent(view):
+    """Run the view at most once per Idempotency-Key (see module docstring)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters", 400)
+
+        from app import db
+        from app.models.idempotency_key import IdempotencyKey
+
+        # Claims and stored responses are written outside the request's
+        # session so they're visible to concurrent requests right away
+        engine = db.engine
+        table = IdempotencyKey.__table__
+        user_id = _current_user_id()
+
+        early_response = _claim(engine, table, user_id, key, request_fingerprint())
+        if early_response is not None:
+            return early_response
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release(engine, table, user_id, key)
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429 or response.direct_passthrough:
+            _release(engine, table, user_id, key)
+        else:
+            _complete(engine, table, user_id, key, response)
+        return response
+    return wrapper
+
+
+def prune_idempotency_keys():
+    """Delete expired keys; returns the count"""
+    from app import db
+    from app.models.idempotency_key import IdempotencyKey
+
+    deleted = IdempotencyKey.query.filter(
+        IdempotencyKey.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,416 @@
+# utils/jobs.py
+"""
+Background job queue stored in the application database.
+
+No broker to run: jobs are rows in the jobs table and `flask jobs worker`
+processes them.
+
+    from app.utils.jobs import job
+
+    @job('reports.rebuild', max_attempts=3)
+    def rebuild_report(property_id):
+        ...
+
+    rebuild_report.enqueue(property_id=7)                 # now
+    rebuild_report.enqueue(property_id=7, delay=300)      # in 5 minutes
+    enqueue('reports.rebuild', {'property_id': 7}, session=db.session)
+
+Arguments must be JSON-serializable (pass ids, not ORM objects). By
+default a job is committed right away in its own transaction; with
+session=db.session it's part of the caller's transaction and only becomes
+visible (and runs) if that commits.
+
+Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL,
+so any number of worker processes and threads can poll the same table;
+elsewhere (SQLite) a conditional UPDATE decides which worker gets a job.
+A job that raises is retried with exponential backoff
+(JOBS_RETRY_BASE_SECONDS doubling up to JOBS_RETRY_MAX_SECONDS) until
+max_attempts, then moved to dead_jobs, from which `flask jobs retry`
+requeues it. Payload fields named in redact= (e.g. an email body holding
+a reset link) are blanked when a job dies, so secrets don't outlive the
+attempts to deliver them; such jobs can't be requeued. Finished jobs are
+deleted. A job still running after JOBS_LOCK_TIMEOUT seconds is
+assumed lost with its worker and counted as a failed attempt. Delivery is
+at least once, so jobs should be safe to run twice.
+
+Modules defining jobs are listed in JOB_MODULES so workers know them.
+"""
+from datetime import datetime, timedelta
+import json
+import os
+import random
+import signal
+import socket
+import threading
+import traceback
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+
+# Imported by workers so their @job functions are registered
+JOB_MODULES = (
+    'app.services.email_service',
+    'app.services.property_deletion',
+)
+
+MAX_ERROR_LENGTH = 10000
+
+# Stored in place of redacted payload fields of dead jobs
+REDACTED = '[redacted]'
+
+# How often a worker looks for jobs abandoned by crashed workers
+RECOVERY_INTERVAL = 60
+
+_registry = {}
+
+
+class JobSpec:
+    """A registered job function"""
+
+    def __init__(self, name, func, max_attempts=None, redact=()):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.redact = tuple(redact)
+
+    def enqueue(self, run_at=None, delay=None, session=None, **kwargs):
+        return enqueue(self.name, kwargs, run_at=run_at, delay=delay, max_attempts=self.max_attempts,
+                       session=session)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+
+def job(name, max_attempts=None, redact=()):
+    """Register a function as a job; the result's .enqueue(**kwargs) queues it.
+
+    redact: payload fields to blank once the job is dead (see module docstring)
+    """
+    def decorator(func):
+        spec = JobSpec(name, func, max_attempts, redact)
+        _registry[name] = spec
+        return spec
+    return decorator
+
+
+def get_job(name):
+    return _registry.get(name)
+
+
+def load_job_modules():
+    import importlib
+
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+def _table():
+    from app.models.job import Job
+    return Job.__table__
+
+
+def enqueue(name, payload=None, run_at=None, delay=None, max_attempts=None, session=None):
+    """Queue a job; returns its id (None when JOBS_RUN_INLINE ran it right away)"""
+    payload = payload or {}
+    config = current_app.config
+    if config.get('JOBS_RUN_INLINE', False):
+        get_job(name).func(**payload)
+        return None
+
+    now = datetime.utcnow()
+    if run_at is None:
+        run_at = now + timedelta(seconds=delay or 0)
+    values = {
+        'name': name,
+        'payload': json.dumps(payload),
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': max_attempts or config.get('JOBS_MAX_ATTEMPTS', 5),
+        'run_at': run_at,
+        'created_at': now
+    }
+
+    if session is not None:
+        from app.models.job import Job
+
+        queued = Job(**values)
+        session.add(queued)
+        session.flush()
+        return queued.id
+
+    from app import db
+
+    with db.engine.begin() as conn:
+        result = conn.execute(insert(_table()).values(**values))
+    return result.inserted_primary_key[0]
+
+
+def claim_job(engine, worker_id):
+    """Take the next due job for this worker; returns its row or None"""
+    table = _table()
+    while True:
+        now = datetime.utcnow()
+        candidate = select(table.c.id).where(
+            table.c.status == 'queued',
+            table.c.run_at <= now
+        ).order_by(table.c.run_at, table.c.id).limit(1)
+
+        with engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                candidate = candidate.with_for_update(skip_locked=True)
+            job_id = conn.execute(candidate).scalar()
+            if job_id is None:
+                return None
+
+            # Locked on PostgreSQL; elsewhere another worker may have won the race
+            claimed = conn.execute(update(table).where(
+                table.c.id == job_id,
+                table.c.status == 'queued'
+            ).values(
+                status='running',
+                attempts=table.c.attempts + 1,
+                locked_by=worker_id,
+                locked_at=now
+            )).rowcount
+            if claimed:
+                return conn.execute(select(table).where(table.c.id == job_id)).first()
+
+
+def _retry_delay(attempts):
+    config = current_app.config
+    base = config.get('JOBS_RETRY_BASE_SECONDS', 10)
+    delay = min(base * 2 ** (attempts - 1), config.get('JOBS_RETRY_MAX_SECONDS', 3600))
+    # Jitter so jobs that failed together don't retry together
+    return delay * random.uniform(1.0, 1.1)
+
+
+def _redacted_payload(name, payload):
+    spec = get_job(name)
+    if spec is None or not spec.redact:
+        return payload
+    values = json.loads(payload)
+    for field in spec.redact:
+        if field in values:
+            values[field] = REDACTED
+    return json.dumps(values)
+
+
+def _is_redacted(name, payload):
+    spec = get_job(name)
+    if spec is None or not spec.redact:
+        return False
+    values = json.loads(payload)
+    return any(values.get(field) == REDACTED for field in spec.redact)
+
+
+def _fail(conn, row, error):
+    """Schedule a retry, or move the job to dead_jobs after its last attempt"""
+    from app.models.job import DeadJob
+
+    table = _table()
+    if row.attempts >= row.max_attempts:
+        conn.execute(insert(DeadJob.__table__).values(
+            job_id=row.id, name=row.name, payload=_redacted_payload(row.name, row.payload), attempts=row.attempts,
+            last_error=error, created_at=row.created_at, failed_at=datetime.utcnow()
+        ))
+        conn.execute(delete(table).where(table.c.id == row.id))
+        return 'dead'
+
+    conn.execute(update(table).where(table.c.id == row.id).values(
+        status='queued',
+        run_at=datetime.utcnow() + timedelta(seconds=_retry_delay(row.attempts)),
+        locked_by=None,
+        locked_at=None,
+        last_error=error
+    ))
+    return 'retry'
+
+
+def run_job(engine, row):
+    """Run a claimed job and record the outcome: 'done', 'retry' or 'dead'"""
+    from app import db
+
+    spec = get_job(row.name)
+    error = None
+    try:
+        if spec is None:
+            raise LookupError(f"Unknown job: {row.name}")
+        spec.func(**json.loads(row.payload))
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc()[-MAX_ERROR_LENGTH:]
+        current_app.logger.warning(f"Job {row.id} ({row.name}) failed on attempt {row.attempts}: {error}")
+    finally:
+        db.session.remove()
+
+    table = _table()
+    with engine.begin() as conn:
+        if error is None:
+            conn.execute(delete(table).where(table.c.id == row.id))
+            return 'done'
+        return _fail(conn, row, error)
+
+
+def recover_stale_jobs(engine):
+    """Fail jobs whose worker stopped responding; returns the count"""
+    table = _table()
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config.get('JOBS_LOCK_TIMEOUT', 900))
+    with engine.begin() as conn:
+        stale = conn.execute(select(table).where(
+            table.c.status == 'running',
+            table.c.locked_at < cutoff
+        ).with_for_update()).all()
+        for row in stale:
+            _fail(conn, row, f"Abandoned by worker {row.locked_by}")
+    return len(stale)
+
+
+class Worker:
+    """Polls the jobs table with a pool of threads"""
+
+    def __init__(self, app, concurrency=1, poll_interval=1.0, burst=False):
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+        self.processed = {'done': 0, 'retry': 0, 'dead': 0}
+        self._lock = threading.Lock()
+
+    def _loop(self, index):
+        from app import db
+
+        worker_id = f"{self.id}:{index}"
+        with self.app.app_context():
+            engine = db.engine
+            while not self.stop_event.is_set():
+                try:
+                    row = claim_job(engine, worker_id)
+                except Exception:
+                    current_app.logger.exception("Could not claim a job")
+                    row = None
+                    if not self.burst:
+                        self.stop_event.wait(self.poll_interval)
+                        continue
+                if row is None:
+                    if self.burst:
+                        return
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                outcome = run_job(engine, row)
+                with self._lock:
+                    self.processed[outcome] += 1
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def run(self, install_signal_handlers=True):
+        """Process jobs until stopped (or, in burst mode, until none are due)"""
+        from app import db
+
+        load_job_modules()
+        if install_signal_handlers:
+            # Finish the jobs in progress, then exit
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        threads = [
+            threading.Thread(target=self._loop, args=(index,), name=f"jobs-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        with self.app.app_context():
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    recovered = recover_stale_jobs(db.engine)
+                    if recovered:
+                        current_app.logger.warning(f"Recovered {recovered} abandoned jobs")
+                except Exception:
+                    current_app.logger.exception("Could not recover abandoned jobs")
+                for thread in threads:
+                    thread.join(RECOVERY_INTERVAL / len(threads))
+        return self.processed
+
+
+def start_embedded_worker(app):
+    """Run a worker in a daemon thread of this process (development server)"""
+    worker = Worker(app, app.config.get('JOBS_CONCURRENCY', 2), app.config.get('JOBS_POLL_INTERVAL', 1.0))
+    thread = threading.Thread(target=worker.run, kwargs={'install_signal_handlers': False},
+                              name='jobs-worker', daemon=True)
+    thread.start()
+    return worker
+
+
+def get_queue_stats():
+    """Queued, running and dead job counts per job name, and the oldest due job's wait"""
+    from app import db
+    from app.models.job import DeadJob
+
+    table = _table()
+    now = datetime.utcnow()
+    jobs = {}
+    rows = db.session.execute(
+        select(table.c.name, table.c.status, func.count(), func.min(table.c.run_at)).group_by(table.c.name, table.c.status)
+    ).all()
+    oldest_due = None
+    for name, status, count, first_run_at in rows:
+        jobs.setdefault(name, {'queued': 0, 'running': 0, 'dead': 0})[status] = count
+        if status == 'queued' and first_run_at is not None:
+            if isinstance(first_run_at, str):
+                first_run_at = datetime.fromisoformat(first_run_at)
+            if first_run_at <= now and (oldest_due is None or first_run_at < oldest_due):
+                oldest_due = first_run_at
+
+    dead = db.session.execute(
+        select(DeadJob.name, func.count()).group_by(DeadJob.name)
+    ).all()
+    for name, count in dead:
+        jobs.setdefault(name, {'queued': 0, 'running': 0, 'dead': 0})['dead'] = count
+
+    return {
+        'jobs': jobs,
+        'queued': sum(counts['queued'] for counts in jobs.values()),
+        'running': sum(counts['running'] for counts in jobs.values()),
+        'dead': sum(counts['dead'] for counts in jobs.values()),
+        'oldest_due_seconds': round((now - oldest_due).total_seconds(), 1) if oldest_due else None
+    }
+
+
+def retry_dead_jobs(ids=None):
+    """Requeue dead jobs (all, or the given dead_jobs ids); returns the count.
+
+    Jobs whose payload was redacted can't run again and stay in dead_jobs.
+    """
+    from app import db
+    from app.models.job import DeadJob, Job
+
+    query = DeadJob.query
+    if ids:
+        query = query.filter(DeadJob.id.in_(ids))
+    dead_jobs = [dead for dead in query.all() if not _is_redacted(dead.name, dead.payload)]
+    now = datetime.utcnow()
+    for dead in dead_jobs:
+        spec = get_job(dead.name)
+        db.session.add(Job(
+            name=dead.name, payload=dead.payload, status='queued', attempts=0,
+            max_attempts=(spec and spec.max_attempts) or current_app.config.get('JOBS_MAX_ATTEMPTS', 5),
+            run_at=now, last_error=dead.last_error, created_at=now
+        ))
+        db.session.delete(dead)
+    db.session.commit()
+    return len(dead_jobs)
+
+
+def prune_dead_jobs(days):
+    """Delete dead jobs older than this many days; returns the count"""
+    from app import db
+    from app.models.job import DeadJob
+
+    deleted = DeadJob.query.filter(
+        DeadJob.failed_at <= datetime.utcnow() - timedelta(days=days)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
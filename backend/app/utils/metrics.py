@@ -0,0 +1,604 @@
+# utils/metrics.py
+"""
+Prometheus-compatible request and database metrics.
+
+Collects per-endpoint latency histograms, status code counters and
+in-flight gauges from Flask request hooks, plus per-request SQL statement
+counts, DB time and connection-pool checkout wait from SQLAlchemy events.
+Everything is exposed in the Prometheus text format on /metrics.
+
+Metrics live in process memory. Under gunicorn each worker keeps its own
+registry; set METRICS_MULTIPROC_DIR to a directory shared by the workers
+and every worker periodically writes a snapshot there, which /metrics
+merges so a scrape sees the whole server regardless of which worker
+answers it. When a worker exits, the gunicorn master folds its snapshot
+into a single exited-workers file (merge_exited_workers).
+
+/metrics is open unless METRICS_TOKEN is set; with METRICS_REQUIRE_TOKEN
+(on in production) it isn't served at all until a token is configured.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, no gunicorn master there either
+    fcntl = None
+
+# Latency buckets in seconds, tuned for API requests (5ms - 30s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Buckets for SQL statements issued by a single request
+STATEMENT_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Buckets for pool checkout wait, which should normally be well under a millisecond
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class _Metric:
+    """Base class for a labelled metric family"""
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of the current values"""
+        with self._lock:
+            return [[list(key), self._copy_value(value)] for key, value in self._values.items()]
+
+    def _copy_value(self, value):
+        return value
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum, then count
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _copy_value(self, value):
+        return list(value)
+
+
+class MetricsRegistry:
+    """Holds the metric families and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self, snapshots=None):
+        """Render the registry, merging snapshots from other processes if given.
+
+        Counters and histograms are summed across processes; gauges are
+        summed too, which is the right aggregation for in-flight requests.
+        """
+        snapshots = snapshots or [self.snapshot()]
+        lines = []
+
+        for name, metric in self._metrics.items():
+            merged = _merge_values(snapshot.get(name, []) for snapshot in snapshots)
+
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type_name}")
+
+            for key, value in sorted(merged.items()):
+                labels = list(zip(metric.labelnames, key))
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float('inf'),), value[:-2]):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _merge_values(snapshot_values):
+    """Sum the [labels, value] lists of one metric from several snapshots into {labels: value}"""
+    merged = {}
+    for values in snapshot_values:
+        for key, value in values:
+            key = tuple(key)
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+    return merged
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape_label_value(value)}"' for label, value in labels) + '}'
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+# Global registry and metric families
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'homiehq_http_request_duration_seconds',
+    'HTTP request latency by blueprint and route.',
+    ('blueprint', 'endpoint', 'method')
+)
+REQUEST_COUNT = REGISTRY.counter(
+    'homiehq_http_requests_total',
+    'HTTP requests by blueprint, route and status code.',
+    ('blueprint', 'endpoint', 'method', 'status')
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'homiehq_http_requests_in_flight',
+    'HTTP requests currently being handled, by blueprint.',
+    ('blueprint',)
+)
+REQUEST_SQL_STATEMENTS = REGISTRY.histogram(
+    'homiehq_request_sql_statements',
+    'SQL statements issued per HTTP request.',
+    ('blueprint', 'endpoint'),
+    buckets=STATEMENT_COUNT_BUCKETS
+)
+REQUEST_SQL_DURATION = REGISTRY.histogram(
+    'homiehq_request_sql_duration_seconds',
+    'Total time spent executing SQL per HTTP request.',
+    ('blueprint', 'endpoint')
+)
+SQL_STATEMENTS = REGISTRY.counter(
+    'homiehq_sql_statements_total',
+    'SQL statements executed, by statement type.',
+    ('operation',)
+)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    'homiehq_db_pool_checkout_wait_seconds',
+    'Time spent waiting to check a connection out of the pool.',
+    buckets=POOL_WAIT_BUCKETS
+)
+
+POOL_CONNECTIONS = REGISTRY.gauge(
+    'homiehq_db_pool_connections',
+    'Database pool connections by state (checked_out, checked_in, overflow, size).',
+    ('database', 'state')
+)
+
+DB_ROUTED_REQUESTS = REGISTRY.counter(
+    'homiehq_db_routed_requests_total',
+    'Requests by the database they read from (primary or replica).',
+    ('target',)
+)
+
+RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    'homiehq_response_cache_lookups_total',
+    'Response cache lookups by endpoint and result (hit, miss, bypass).',
+    ('endpoint', 'result')
+)
+RESPONSE_CACHE_ENTRIES = REGISTRY.gauge(
+    'homiehq_response_cache_entries',
+    'Entries held by the in-process response cache.'
+)
+RESPONSE_CACHE_BYTES = REGISTRY.gauge(
+    'homiehq_response_cache_bytes',
+    'Bytes held by the in-process response cache.'
+)
+
+EVENTS_DISPATCHED = REGISTRY.counter(
+    'homiehq_events_dispatched_total',
+    'Domain events delivered to subscribers, by event and mode (sync, background, inline).',
+    ('event', 'mode')
+)
+EVENT_HANDLER_ERRORS = REGISTRY.counter(
+    'homiehq_event_handler_errors_total',
+    'Domain event subscribers that raised, by event and handler.',
+    ('event', 'handler')
+)
+
+COMPRESSION_RESPONSES = REGISTRY.counter(
+    'homiehq_response_compression_total',
+    'Compressed responses by encoding and whether they were streamed.',
+    ('encoding', 'streamed')
+)
+COMPRESSION_BYTES = REGISTRY.counter(
+    'homiehq_response_compression_bytes_total',
+    'Bytes before (stage=in) and after (stage=out) compression, by endpoint and encoding.',
+    ('endpoint', 'encoding', 'stage')
+)
+COMPRESSION_SECONDS = REGISTRY.counter(
+    'homiehq_response_compression_cpu_seconds_total',
+    'CPU time spent compressing responses, by encoding.',
+    ('encoding',)
+)
+
+_sql_listeners_installed = False
+
+
+def _request_labels():
+    """Blueprint and endpoint labels for the current request.
+
+    Unmatched URLs are grouped under a single label so 404 scans can't
+    blow up label cardinality.
+    """
+    endpoint = request.endpoint or 'unmatched'
+    return request.blueprint or 'app', endpoint
+
+
+def _statement_operation(statement):
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+    return operation if operation in ('SELECT', 'INSERT', 'UPDATE', 'DELETE') else 'OTHER'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    SQL_STATEMENTS.inc(operation=_statement_operation(statement))
+
+    # Attribute to the current request, if there is one
+    try:
+        stats = g.get('sql_stats')
+    except RuntimeError:
+        return
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+def _install_sql_listeners():
+    """Attach statement timing hooks to every SQLAlchemy engine (once per process)"""
+    global _sql_listeners_installed
+    if _sql_listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _sql_listeners_installed = True
+
+
+def _instrument_pool(pool):
+    """Wrap a pool's connect() to time how long checkouts wait.
+
+    SQLAlchemy has no pool event that fires before a checkout starts, so
+    the wait is measured around the call itself. Engines replace their
+    pool on dispose(), which is why this is checked per request.
+    """
+    if getattr(pool, '_metrics_instrumented', False):
+        return
+    original_connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return original_connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+    pool._metrics_instrumented = True
+
+
+def update_pool_metrics():
+    """Refresh the pool gauges from the current app's engines"""
+    from app import db
+    from app.utils.db_engine import get_pool_stats
+
+    engines = [('primary', db.engine)] + [
+        (f"replica_{index}", engine)
+        for index, engine in enumerate(current_app.extensions.get('db_replicas', []))
+    ]
+    for database, engine in engines:
+        stats = get_pool_stats(engine)
+        for state in ('checked_out', 'checked_in', 'overflow', 'size'):
+            if state in stats:
+                POOL_CONNECTIONS.set(stats[state], database=database, state=state)
+
+
+EXITED_SNAPSHOT = 'metrics_exited.json'
+
+
+def _snapshot_path(directory, pid=None):
+    return os.path.join(directory, f"metrics_{pid or os.getpid()}.json")
+
+
+@contextmanager
+def _snapshot_lock(directory, exclusive=False):
+    """Keep scrapes from reading the directory while exited workers are being merged.
+
+    The exclusive lock is only tried, never waited for (yields False if it's
+    busy): the gunicorn master merges from its SIGCHLD handler, which must
+    neither block behind a scrape nor on itself when a second worker exits.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(os.path.join(directory, 'metrics.lock'), 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB if exclusive else fcntl.LOCK_SH)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _without_gauges(snapshot):
+    return {
+        name: values for name, values in snapshot.items()
+        if getattr(REGISTRY.get(name), 'type_name', None) != 'gauge'
+    }
+
+
+def write_snapshot(directory):
+    """Atomically write this process's metrics to the shared directory"""
+    _write_json(_snapshot_path(directory), REGISTRY.snapshot())
+
+
+def merge_exited_workers(directory):
+    """Fold the snapshots of exited workers into the exited-workers total and remove them.
+
+    Called by the gunicorn master whenever a worker exits, so snapshots
+    don't pile up across worker restarts and a new worker reusing a pid
+    can't overwrite counts that were already reported. Gauges are dropped
+    since nothing is in flight in an exited worker. If the lock is busy the
+    snapshots are left for the next call (scrapes still count them).
+    """
+    with _snapshot_lock(directory, exclusive=True) as locked:
+        if not locked:
+            return
+        exited_path = os.path.join(directory, EXITED_SNAPSHOT)
+        totals = None
+        for pid, path in _worker_snapshot_paths(directory):
+            if _pid_alive(pid):
+                continue
+            snapshot = _read_json(path)
+            if totals is None:
+                totals = _read_json(exited_path) or {}
+            if snapshot:
+                snapshot = _without_gauges(snapshot)
+                for name in set(totals) | set(snapshot):
+                    merged = _merge_values([totals.get(name, []), snapshot.get(name, [])])
+                    totals[name] = [[list(key), value] for key, value in merged.items()]
+                _write_json(exited_path, totals)
+            os.remove(path)
+
+
+def _worker_snapshot_paths(directory):
+    for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+        try:
+            yield int(os.path.basename(path)[len('metrics_'):-len('.json')]), path
+        except ValueError:
+            continue
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _collect_snapshots(directory):
+    """Read the snapshots of all live workers plus the exited-workers total.
+
+    Counters and histograms of exited workers are kept so totals never go
+    backwards; their gauges are dropped since nothing is in flight there.
+    A snapshot whose worker died without being merged yet (no gunicorn
+    master, or the merge found the lock busy) is read the same way.
+    """
+    write_snapshot(directory)
+    snapshots = []
+    with _snapshot_lock(directory):
+        exited = _read_json(os.path.join(directory, EXITED_SNAPSHOT))
+        if exited:
+            snapshots.append(exited)
+        for pid, path in _worker_snapshot_paths(directory):
+            snapshot = _read_json(path)
+            if snapshot is None:
+                continue
+            snapshots.append(snapshot if _pid_alive(pid) else _without_gauges(snapshot))
+    return snapshots
+
+
+def init_metrics(app):
+    """Register request hooks, SQL listeners and the /metrics endpoint"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    _install_sql_listeners()
+    multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR')
+    flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+    if app.config.get('METRICS_REQUIRE_TOKEN') and not app.config.get('METRICS_TOKEN'):
+        app.logger.warning("METRICS_TOKEN is not set, /metrics is disabled (METRICS_REQUIRE_TOKEN)")
+    last_flush = [0.0]
+
+    @app.before_request
+    def start_request_metrics():
+        if request.path == '/metrics':
+            return
+        blueprint, _ = _request_labels()
+        g.metrics_start = time.perf_counter()
+        g.sql_stats = [0, 0.0]
+        g.metrics_in_flight = blueprint
+        REQUESTS_IN_FLIGHT.inc(blueprint=blueprint)
+
+        from app import db
+        _instrument_pool(db.engine.pool)
+        for engine in current_app.extensions.get('db_replicas', []):
+            _instrument_pool(engine.pool)
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+
+        blueprint, endpoint = _request_labels()
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            blueprint=blueprint, endpoint=endpoint, method=request.method
+        )
+        REQUEST_COUNT.inc(
+            blueprint=blueprint, endpoint=endpoint, method=request.method, status=response.status_code
+        )
+
+        statements, sql_time = g.pop('sql_stats', (0, 0.0))
+        REQUEST_SQL_STATEMENTS.observe(statements, blueprint=blueprint, endpoint=endpoint)
+        REQUEST_SQL_DURATION.observe(sql_time, blueprint=blueprint, endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        in_flight_blueprint = g.pop('metrics_in_flight', None)
+        if in_flight_blueprint is None:
+            return
+        REQUESTS_IN_FLIGHT.dec(blueprint=in_flight_blueprint)
+        blueprint, endpoint = _request_labels()
+
+        # An unhandled exception skips after_request; count it as a 500
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                blueprint=blueprint, endpoint=endpoint, method=request.method
+            )
+            REQUEST_COUNT.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=500)
+
+        if multiproc_dir and time.monotonic() - last_flush[0] >= flush_interval:
+            last_flush[0] = time.monotonic()
+            try:
+                update_pool_metrics()
+                write_snapshot(multiproc_dir)
+            except OSError as e:
+                current_app.logger.warning(f"Could not write metrics snapshot: {e}")
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint"""
+        token = current_app.config.get('METRICS_TOKEN')
+        if not token and current_app.config.get('METRICS_REQUIRE_TOKEN'):
+            return Response('Not Found\n', status=404, mimetype='text/plain')
+        if token and not hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()
+        ):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+        update_pool_metrics()
+        snapshots = _collect_snapshots(multiproc_dir) if multiproc_dir else None
+        return Response(
+            REGISTRY.render(snapshots),
+            mimetype='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -0,0 +1,321 @@
+# utils/profiler.py
+"""
+Opt-in statistical request profiler.
+
+While a request is profiled, a background thread samples the request
+thread's Python stack every PROFILER_INTERVAL_MS. The samples are written
+as a collapsed-stack file (one "frame;frame;frame count" line per unique
+stack) that can be downloaded as-is for flamegraph tools or converted to
+speedscope's JSON format.
+
+A request is profiled when:
+- an admin sends it with the `X-Profile: 1` header, or
+- it matches a profiling rule (path regex + sample rate + max profiles)
+  created through the admin API.
+
+Rules and profiles live in PROFILER_DIR, so every gunicorn worker picks up
+the same rules and any worker can serve any profile. Nothing is registered
+unless PROFILER_ENABLED is set, so a disabled profiler costs nothing.
+Stacks are sampled per OS thread, so use sync or gthread workers; gevent
+greenlets all share one thread.
+"""
+from collections import Counter
+from datetime import datetime
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from flask import current_app, g, request
+
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+RULES_FILENAME = 'rules.json'
+
+# Stacks deeper than this are truncated at the root end
+MAX_STACK_DEPTH = 200
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack at a fixed interval"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+        self.duration = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_file = __file__
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                if code.co_filename != own_file:
+                    stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            del frame
+
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Collapsed-stack text, one "root;...;leaf count" line per stack"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename):
+    """Trim site-packages and project prefixes so frame names stay readable"""
+    for marker in ('site-packages' + os.sep, 'backend' + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return filename
+
+
+def collapsed_to_speedscope(collapsed, name, interval):
+    """Convert collapsed stacks to a speedscope "sampled" profile document"""
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if not stack:
+            continue
+        indexes = []
+        for frame_name in stack.split(';'):
+            if frame_name not in frame_index:
+                frame_index[frame_name] = len(frames)
+                frames.append({'name': frame_name})
+            indexes.append(frame_index[frame_name])
+        samples.append(indexes)
+        weights.append(int(count) * interval)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights
+        }],
+        'name': name,
+        'exporter': 'homiehq'
+    }
+
+
+def get_profiler_dir(app=None):
+    app = app or current_app
+    return app.config['PROFILER_DIR']
+
+
+# Rules are re-read from disk at most once per RULES_CACHE_SECONDS per worker
+RULES_CACHE_SECONDS = 1.0
+_rules_cache = {'loaded_at': 0.0, 'mtime': None, 'rules': []}
+
+
+def load_rules(directory):
+    """Return the active (unexpired) profiling rules, cached per worker"""
+    now = time.monotonic()
+    if now - _rules_cache['loaded_at'] < RULES_CACHE_SECONDS:
+        return _rules_cache['rules']
+    _rules_cache['loaded_at'] = now
+
+    path = os.path.join(directory, RULES_FILENAME)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        _rules_cache.update(mtime=None, rules=[])
+        return []
+
+    if mtime != _rules_cache['mtime']:
+        try:
+            with open(path) as f:
+                rules = json.load(f)
+        except (OSError, ValueError):
+            rules = []
+        for rule in rules:
+            rule['compiled'] = re.compile(rule['pattern'])
+        _rules_cache.update(mtime=mtime, rules=rules)
+
+    current = time.time()
+    return [rule for rule in _rules_cache['rules'] if not rule.get('expires_at') or rule['expires_at'] > current]
+
+
+def save_rules(directory, rules):
+    """Atomically replace the rules file shared by all workers"""
+    path = os.path.join(directory, RULES_FILENAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump([{k: v for k, v in rule.items() if k != 'compiled'} for rule in rules], f)
+    os.replace(tmp_path, path)
+    _rules_cache['loaded_at'] = 0.0
+
+
+def read_rules(directory):
+    """All rules on disk, including expired ones"""
+    try:
+        with open(os.path.join(directory, RULES_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def count_profiles(directory, rule_id):
+    prefix = f"{rule_id}_"
+    return sum(1 for name in os.listdir(directory) if name.startswith(prefix) and name.endswith('.meta.json'))
+
+
+def list_profiles(directory):
+    """Metadata of all stored profiles, newest first"""
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith('.meta.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda profile: profile['created_at'], reverse=True)
+
+
+def profile_paths(directory, profile_id):
+    """Return (collapsed, meta) paths for a profile id, or None if the id is invalid"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return (
+        os.path.join(directory, f"{profile_id}.collapsed.txt"),
+        os.path.join(directory, f"{profile_id}.meta.json")
+    )
+
+
+def _is_admin_request():
+    """Check whether the current request carries an admin JWT"""
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+    from app.models.user import User
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    if not identity:
+        return False
+    user = User.query.get(int(identity))
+    return bool(user and user.role == 'admin')
+
+
+def _matching_rule(directory):
+    path = request.path
+    for rule in load_rules(directory):
+        if not rule['compiled'].search(path):
+            continue
+        if random.random() >= rule.get('sample_rate', 1.0):
+            continue
+        if count_profiles(directory, rule['id']) >= rule.get('max_profiles', 10):
+            continue
+        return rule
+    return None
+
+
+def init_profiler(app):
+    """Register the profiling request hooks if PROFILER_ENABLED is set"""
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    directory = app.config.get('PROFILER_DIR')
+    if not directory:
+        directory = app.config['PROFILER_DIR'] = os.path.join(app.instance_path, 'profiles')
+    os.makedirs(directory, exist_ok=True)
+    interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000.0
+
+    @app.before_request
+    def start_profiling():
+        if request.headers.get('X-Profile') == '1':
+            if not _is_admin_request():
+                return
+            source = 'manual'
+        else:
+            rule = _matching_rule(directory)
+            if rule is None:
+                return
+            source = rule['id']
+
+        profiler = SamplingProfiler(threading.get_ident(), interval)
+        g.profiler = profiler
+        g.profiler_source = source
+        profiler.start()
+
+    @app.after_request
+    def stop_profiling(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.stop()
+
+        source = g.pop('profiler_source')
+        profile_id = f"{source}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        collapsed_path, meta_path = profile_paths(directory, profile_id)
+        meta = {
+            'id': profile_id,
+            'source': source,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round(profiler.duration * 1000, 2),
+            'samples': profiler.samples,
+            'interval_ms': interval * 1000,
+            'worker_pid': os.getpid(),
+            'created_at': datetime.utcnow().isoformat()
+        }
+
+        try:
+            with open(collapsed_path, 'w') as f:
+                f.write(profiler.collapsed())
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            current_app.logger.warning(f"Could not write profile {profile_id}: {e}")
+            return response
+
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    @app.teardown_request
+    def discard_unfinished_profile(exc):
+        # after_request is skipped on unhandled errors; don't leave the sampler running
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
@@ -1,6 +1,35 @@
 # utils/property_permissions.py
+from flask import g, has_app_context
 from app.models.Property_user import PropertyUser
 
+
+def get_property_membership(property_id, user_id):
+    """
+    Get a user's active PropertyUser row for a property
+
+    Lookups are cached on `g` for the rest of the request (and shared by
+    all sub-requests of an /api/batch call), so checking the same property
+    repeatedly costs a single query.
+
+    Returns:
+        PropertyUser or None
+    """
+    try:
+        key = (int(property_id), int(user_id))
+    except (TypeError, ValueError):
+        return None
+
+    cache = g.setdefault('property_memberships', {}) if has_app_context() else {}
+    if key not in cache:
+        cache[key] = PropertyUser.query.filter_by(
+            property_id=key[0],
+            user_id=key[1],
+            status='active'
+        ).first()
+    return cache[key]
+
+
+
 def has_property_permission(property_id, user_id, required_roles):
     """
     Check if a user has the required role for a property
@@ -13,12 +42,8 @@ def has_property_permission(property_id, user_id, required_roles):
     Returns:
         bool: True if the user has permission, False otherwise
     """
-    # Query for the user's role on this property
-    property_user = PropertyUser.query.filter_by(
-        property_id=property_id,
-        user_id=user_id,
-        status='active'
-    ).first()
+    # Look up the user's role on this property
+    property_user = get_property_membership(property_id, user_id)
     
     if not property_user or property_user.role not in required_roles:
         return False
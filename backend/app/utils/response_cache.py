@@ -0,0 +1,423 @@
+# utils/response_cache.py
+"""
+Property-scoped response cache.
+
+Read endpoints that return one property's data (its tenants, photos,
+appliances, projects) are cached per
+(endpoint, property, property version, caller's role, query args).
+Role is part of the key because owners, managers and tenants can get
+different responses; the permission check still runs on every request.
+Members with the same role share entries, so the ETag of these responses
+leaves out the caller's identity (see utils/conditional.py): a hit then
+carries the same ETag the view would have computed for this caller.
+
+Versioning instead of invalidation: a property's version is the id of its
+latest entry in the change log (sync_changes, see utils/change_log.py),
+which every write to the property or its rows bumps in the same
+transaction, from any endpoint, bulk update or CLI command. Reading it is
+one index lookup, and since it comes from the database every worker and
+every backend agrees on it, so a write is visible on the next request
+without any cross-process invalidation. Entries for old versions are
+never read again and age out of the LRU (or the TTL).
+
+Backends (RESPONSE_CACHE_BACKEND):
+- memory: per-process LRU bounded by RESPONSE_CACHE_MAX_BYTES (default)
+- redis: any server speaking the Redis protocol at RESPONSE_CACHE_URL,
+  shared by all workers. For local runs `flask cache serve` starts a
+  small stand-in server with the same LRU.
+- none: disabled
+
+Hits, misses and bypasses per endpoint are counted on /metrics, along
+with the size of the in-process cache. Hit ratio, entries and bytes for
+either backend are on /api/admin/response-cache.
+"""
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import json
+import socket
+import socketserver
+import threading
+from urllib.parse import urlencode, urlparse
+
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+
+from app.utils.metrics import RESPONSE_CACHE_BYTES, RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_LOOKUPS
+
+CACHE_HEADER = 'X-Cache'
+
+# Response headers stored with the body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+_EXTENSION_KEY = 'response_cache'
+
+
+class MemoryBackend:
+    """Thread-safe LRU bounded by the total size of the stored values"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        # TTL isn't needed here: old versions are evicted by newer entries
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(key) + len(previous)
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= len(old_key) + len(old_value)
+            self._update_metrics()
+
+    def delete(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._bytes -= len(key) + len(value)
+            self._update_metrics()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._update_metrics()
+
+    def _update_metrics(self):
+        RESPONSE_CACHE_ENTRIES.set(len(self._entries))
+        RESPONSE_CACHE_BYTES.set(self._bytes)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class RedisProtocolError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Minimal client for a server speaking the Redis protocol (RESP2).
+
+    Only GET, SET ... EX, DEL, FLUSHDB, DBSIZE and INFO are used, so no
+    client library is needed. One connection per thread; any network
+    error closes it and the lookup counts as a miss.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, timeout=0.25):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _read_reply(self):
+        reader = self._local.reader
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise RedisProtocolError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unexpected reply: {line!r}")
+
+    def _call(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self._local.sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def command(self, *args):
+        try:
+            if getattr(self._local, 'sock', None) is None:
+                self._connect()
+            return self._call(*args)
+        except (OSError, ConnectionError):
+            self._close()
+            raise
+
+    def get(self, key):
+        try:
+            return self.command('GET', key)
+        except (OSError, ConnectionError):
+            return None
+
+    def set(self, key, value, ttl=None):
+        try:
+            if ttl:
+                self.command('SET', key, value, 'EX', int(ttl))
+            else:
+                self.command('SET', key, value)
+        except (OSError, ConnectionError):
+            pass
+
+    def delete(self, key):
+        self.command('DEL', key)
+
+    def clear(self):
+        self.command('FLUSHDB')
+
+    def stats(self):
+        info = self.command('INFO', 'memory').decode()
+        memory = dict(line.split(':', 1) for line in info.splitlines() if ':' in line)
+        return {
+            'entries': self.command('DBSIZE'),
+            'bytes': int(memory.get('used_memory', 0)),
+            'max_bytes': int(memory.get('maxmemory', 0)) or None
+        }
+
+
+def create_backend(config):
+    backend = (config.get('RESPONSE_CACHE_BACKEND') or 'none').lower()
+    if backend == 'memory':
+        return MemoryBackend(config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    if backend == 'redis':
+        return RedisBackend(config.get('RESPONSE_CACHE_URL') or 'redis://localhost:6379/0')
+    if backend == 'none':
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+
+def get_response_cache(app=None):
+    app = app or current_app
+    return app.extensions.get(_EXTENSION_KEY)
+
+
+def get_property_version(property_id):
+    """Latest change-log id for a property; changes whenever the property or its rows do"""
+    from app import db
+    from app.models.sync_change import SyncChange
+
+    return db.session.query(func.max(SyncChange.id)).filter(SyncChange.property_id == property_id).scalar() or 0
+
+
+def _cache_key(property_id, version, role):
+    args = urlencode(sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1(args.encode()).hexdigest()[:16]
+    return f"rc:{request.endpoint}:{property_id}:{version}:{role}:{digest}"
+
+
+def _encode(response):
+    headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+    return json.dumps(headers).encode() + b'\n' + response.get_data()
+
+
+def _decode(value):
+    headers, body = value.split(b'\n', 1)
+    return json.loads(headers), body
+
+
+def _cached_response(value):
+    headers, body = _decode(value)
+    response = current_app.response_class(body, status=200, headers=headers)
+    etag = headers.get('ETag')
+    if etag and request.if_none_match:
+        unquoted, _ = response.get_etag()
+        if request.if_none_match.contains_weak(unquoted):
+            response = current_app.response_class(status=304, headers=headers)
+    response.headers[CACHE_HEADER] = 'HIT'
+    return response
+
+
+def property_cached(property_arg='property_id'):
+    """Cache a property-scoped read endpoint (see module docstring).
+
+    The property id is taken from the view argument or query parameter
+    named property_arg; requests without one, or from users who aren't
+    members of the property, go straight to the view. Only 200 responses
+    are stored. Apply below the route and auth decorators.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from app.utils.property_permissions import get_property_membership
+
+            backend = get_response_cache()
+            property_id = kwargs.get(property_arg, request.args.get(property_arg))
+            membership = get_property_membership(property_id, get_jwt_identity()) if property_id else None
+            if membership is not None:
+                # Whether or not a cache is configured, so ETags don't depend on it
+                g.shared_response = True
+            if backend is None or membership is None:
+                RESPONSE_CACHE_LOOKUPS.inc(endpoint=request.endpoint, result='bypass')
+                return view(*args, **kwargs)
+
+            key = _cache_key(membership.property_id, get_property_version(membership.property_id), membership.role)
+            value = backend.get(key)
+            if value is not None:
+                RESPONSE_CACHE_LOOKUPS.inc(endpoint=request.endpoint, result='hit')
+                return _cached_response(value)
+
+            RESPONSE_CACHE_LOOKUPS.inc(endpoint=request.endpoint, result='miss')
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                backend.set(key, _encode(response), current_app.config.get('RESPONSE_CACHE_TTL', 3600))
+            response.headers[CACHE_HEADER] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def get_cache_stats(app=None):
+    """Backend size plus this worker's hit ratio per endpoint"""
+    backend = get_response_cache(app)
+    endpoints = {}
+    for (endpoint, result), count in RESPONSE_CACHE_LOOKUPS.snapshot():
+        endpoints.setdefault(endpoint, {'hit': 0, 'miss': 0, 'bypass': 0})[result] = count
+    for counts in endpoints.values():
+        lookups = counts['hit'] + counts['miss']
+        counts['hit_ratio'] = round(counts['hit'] / lookups, 4) if lookups else None
+
+    storage = None
+    if backend is not None:
+        try:
+            storage = backend.stats()
+        except (OSError, ConnectionError, RedisProtocolError) as e:
+            storage = {'error': str(e)}
+
+    hits = sum(counts['hit'] for counts in endpoints.values())
+    misses = sum(counts['miss'] for counts in endpoints.values())
+    return {
+        'backend': backend.name if backend else 'none',
+        'storage': storage,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        'endpoints': endpoints
+    }
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """One client connection of the stand-in server"""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, e.g. from telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            data = b'$-1\r\n'
+        elif isinstance(value, int):
+            data = b':%d\r\n' % value
+        elif isinstance(value, str):
+            data = f"+{value}\r\n".encode()
+        else:
+            data = b'$%d\r\n%s\r\n' % (len(value), value)
+        self.wfile.write(data)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            name = args[0].upper()
+            if name == b'GET':
+                self._reply(store.get(args[1].decode()))
+            elif name == b'SET':
+                store.set(args[1].decode(), args[2])
+                self._reply('OK')
+            elif name == b'DEL':
+                store.delete(args[1].decode())
+                self._reply(1)
+            elif name == b'FLUSHDB':
+                store.clear()
+                self._reply('OK')
+            elif name == b'DBSIZE':
+                self._reply(store.stats()['entries'])
+            elif name == b'INFO':
+                stats = store.stats()
+                self._reply(f"# Memory\r\nused_memory:{stats['bytes']}\r\nmaxmemory:{stats['max_bytes']}\r\n".encode())
+            elif name in (b'PING', b'AUTH', b'SELECT'):
+                self._reply('PONG' if name == b'PING' else 'OK')
+            else:
+                self.wfile.write(f"-ERR unknown command '{name.decode()}'\r\n".encode())
+
+
+class _RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_standin_server(host, port, max_bytes):
+    """Stand-in for a Redis server, for running the shared backend locally.
+
+    Speaks enough of the protocol for RedisBackend, keeps entries in a
+    MemoryBackend and ignores TTLs (the LRU bounds it instead). Not meant
+    for production.
+    """
+    server = _RespServer((host, port), _RespHandler)
+    server.store = MemoryBackend(max_bytes)
+    return server
+
+
+def init_response_cache(app):
+    """Create the configured cache backend"""
+    backend = create_backend(app.config)
+    if backend is not None:
+        app.extensions[_EXTENSION_KEY] = backend
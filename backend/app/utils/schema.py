@@ -0,0 +1,253 @@
+# utils/schema.py
+"""
+Database schema version checks and upgrades.
+
+The migration scripts in migrations/versions are the source of truth for
+the schema; containers no longer autogenerate migrations on boot. Reading
+the script headers with a regex (instead of loading alembic) and a single
+SELECT from alembic_version keeps the startup check to a few milliseconds,
+so every worker can verify the schema it is about to serve.
+
+Statuses returned by get_schema_status():
+- current: the database is at the head revision
+- behind: the database is at an older revision and needs `flask schema upgrade`
+- ahead: the database has a revision this code doesn't know, e.g. a newer
+  release already migrated it during a rolling deploy
+- unversioned: tables exist but were created by create_all or stamped with
+  one of the old per-boot autogenerated revisions
+- empty: no tables yet
+
+Unversioned databases are adopted by stamping the latest revision whose
+tables and columns (read from the scripts' op.create_table and
+add_column calls) are all present, then upgrading from there: a legacy
+database gets every migration after the baseline, one create_all built
+from the current models gets none.
+"""
+import glob
+import os
+import re
+
+import click
+import sqlalchemy as sa
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+
+BASELINE_REVISION = '0001_baseline'
+
+# Revisions autogenerated on boot by the old entrypoint (12 hex chars) never
+# made it into the repo; such databases are adopted at the baseline.
+LEGACY_REVISION_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+
+_REVISION_PATTERN = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION_PATTERN = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+_CREATE_TABLE_PATTERN = re.compile(r"op\.create_table\(\s*['\"]([^'\"]+)['\"]")
+_BATCH_TABLE_PATTERN = re.compile(r"batch_alter_table\(\s*['\"]([^'\"]+)['\"]")
+_ADD_COLUMN_PATTERN = re.compile(r"add_column\(\s*(?:['\"]([^'\"]+)['\"]\s*,\s*)?sa\.Column\(\s*['\"]([^'\"]+)['\"]")
+
+
+class SchemaError(RuntimeError):
+    """The database schema doesn't match the code being started"""
+
+
+def read_revisions(directory=MIGRATIONS_DIR):
+    """Map each migration revision to its parent revisions"""
+    revisions = {}
+    for path in glob.glob(os.path.join(directory, 'versions', '*.py')):
+        with open(path) as f:
+            source = f.read()
+        revision = _REVISION_PATTERN.search(source)
+        if not revision:
+            continue
+        down = _DOWN_REVISION_PATTERN.search(source)
+        parents = re.findall(r"['\"]([^'\"]+)['\"]", down.group(1)) if down else []
+        revisions[revision.group(1)] = parents
+    return revisions
+
+
+def read_schema_objects(directory=MIGRATIONS_DIR):
+    """Map each revision to the tables and (table, column) pairs its upgrade() adds"""
+    objects = {}
+    for path in glob.glob(os.path.join(directory, 'versions', '*.py')):
+        with open(path) as f:
+            source = f.read()
+        revision = _REVISION_PATTERN.search(source)
+        if not revision:
+            continue
+        upgrade = source.split('def upgrade', 1)[-1].split('def downgrade', 1)[0]
+        tables, columns = set(_CREATE_TABLE_PATTERN.findall(upgrade)), set()
+        batch_table = None
+        for line in upgrade.splitlines():
+            batch = _BATCH_TABLE_PATTERN.search(line)
+            if batch:
+                batch_table = batch.group(1)
+            column = _ADD_COLUMN_PATTERN.search(line)
+            if column:
+                columns.add((column.group(1) or batch_table, column.group(2)))
+        objects[revision.group(1)] = {'tables': tables, 'columns': columns}
+    return objects
+
+
+def get_revision_chain(revisions):
+    """Revisions from the root to the head, for a history without branches"""
+    children = {}
+    for revision, parents in revisions.items():
+        for parent in parents:
+            children.setdefault(parent, []).append(revision)
+    roots = [revision for revision, parents in revisions.items() if not parents]
+    chain = []
+    while len(roots) == 1:
+        chain.append(roots[0])
+        roots = children.get(roots[0], [])
+    if roots:
+        raise SchemaError(f"Migration history branches at {chain[-1] if chain else 'the root'}")
+    return chain
+
+
+def find_adopted_revision(engine, directory=MIGRATIONS_DIR):
+    """The latest revision whose tables and columns an unversioned database already has.
+
+    Revisions that add no tables or columns (data migrations) count as
+    applied only when a later one is.
+    """
+    inspector = sa.inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    objects = read_schema_objects(directory)
+
+    def applied(revision):
+        tables, columns = objects[revision]['tables'], objects[revision]['columns']
+        if not tables <= existing_tables:
+            return False
+        for table in {table for table, _ in columns}:
+            if table not in existing_tables:
+                return False
+            names = {column['name'] for column in inspector.get_columns(table)}
+            if not {column for owner, column in columns if owner == table} <= names:
+                return False
+        return True
+
+    chain = get_revision_chain(read_revisions(directory))
+    if BASELINE_REVISION not in chain:
+        raise SchemaError(f"{BASELINE_REVISION} is not in the migration history")
+    chain = chain[chain.index(BASELINE_REVISION):]
+
+    missing = objects[BASELINE_REVISION]['tables'] - existing_tables
+    if missing:
+        raise SchemaError(
+            f"Can't adopt the database at {BASELINE_REVISION}, tables are missing: {', '.join(sorted(missing))}"
+        )
+
+    marked = [revision for revision in chain[1:] if objects[revision]['tables'] or objects[revision]['columns']]
+    present = [revision for revision in marked if applied(revision)]
+    if not present:
+        return BASELINE_REVISION
+    adopted = present[-1]
+    skipped = [revision for revision in marked[:marked.index(adopted)] if revision not in present]
+    if skipped:
+        raise SchemaError(f"Can't adopt the database: it has {adopted} but not {', '.join(skipped)}")
+    return adopted
+
+
+def get_head_revisions(revisions):
+    parents = {parent for down in revisions.values() for parent in down}
+    return sorted(revision for revision in revisions if revision not in parents)
+
+
+def get_database_revisions(engine):
+    """Revisions stamped in alembic_version, or None if the table doesn't exist"""
+    inspector = sa.inspect(engine)
+    if not inspector.has_table('alembic_version'):
+        return None
+    with engine.connect() as conn:
+        return sorted(row[0] for row in conn.execute(sa.text('SELECT version_num FROM alembic_version')))
+
+
+def get_schema_status(engine, directory=MIGRATIONS_DIR):
+    """Compare the database's revision with the migration scripts"""
+    revisions = read_revisions(directory)
+    heads = get_head_revisions(revisions)
+    database = get_database_revisions(engine)
+
+    if not database:
+        has_tables = bool(sa.inspect(engine).get_table_names())
+        status = 'unversioned' if has_tables else 'empty'
+    elif database == heads:
+        status = 'current'
+    elif all(revision in revisions for revision in database):
+        status = 'behind'
+    elif all(LEGACY_REVISION_PATTERN.match(revision) for revision in database):
+        status = 'unversioned'
+    else:
+        status = 'ahead'
+
+    return {'status': status, 'database': database or [], 'head': heads}
+
+
+def verify_schema(app, engine):
+    """Startup check controlled by SCHEMA_CHECK (off, warn or fail).
+
+    'ahead' only warns even in fail mode: old workers keep serving while a
+    newer release rolls out, which is what migrations must stay compatible with.
+    """
+    mode = app.config.get('SCHEMA_CHECK', 'off')
+    # Skip under the flask CLI, which is how the schema gets fixed
+    if mode == 'off' or click.get_current_context(silent=True) is not None:
+        return None
+
+    info = get_schema_status(engine)
+    status = info['status']
+    if status == 'current':
+        return info
+
+    message = (
+        f"Database schema is {status} (database: {', '.join(info['database']) or 'none'}, "
+        f"code: {', '.join(info['head'])})"
+    )
+    if status != 'ahead':
+        message += "; run `flask schema upgrade`"
+    if mode == 'fail' and status != 'ahead':
+        raise SchemaError(message)
+    app.logger.warning(message)
+    return info
+
+
+def upgrade_schema(app, adopt_legacy=True):
+    """Bring the database to the head revision.
+
+    Returns the status before upgrading. Only loads alembic when there is
+    something to do, so the common "already current" boot stays fast.
+    """
+    from app import db
+
+    info = get_schema_status(db.engine)
+    status = info['status']
+    if status in ('current', 'ahead'):
+        return info
+
+    from flask_migrate import stamp, upgrade
+    from app.cli import get_migrate
+
+    get_migrate(app)
+    if status == 'unversioned':
+        if not adopt_legacy:
+            raise SchemaError("Database was not created from these migrations; rerun without --strict to adopt it")
+        # Stamp the revision the schema already matches so only the missing
+        # migrations run. Nothing is created here: create_all would add the
+        # tables of later migrations too, which then fail with "already exists".
+        revision = find_adopted_revision(db.engine)
+        with db.engine.begin() as conn:
+            conn.execute(sa.text('DROP TABLE IF EXISTS alembic_version'))
+        stamp(directory=MIGRATIONS_DIR, revision=revision)
+
+    upgrade(directory=MIGRATIONS_DIR)
+    return info
+
+
+def reset_schema(app):
+    """Drop every table and rebuild the schema from the migrations (development and benchmarks)"""
+    from app import db
+
+    db.drop_all()
+    with db.engine.begin() as conn:
+        conn.execute(sa.text('DROP TABLE IF EXISTS alembic_version'))
+    return upgrade_schema(app)
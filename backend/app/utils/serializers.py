@@ -0,0 +1,338 @@
+# utils/serializers.py
+"""
+Compiled model serializers and orjson responses.
+
+A Serializer lists the fields a model exposes; for each set of fields it
+is asked for, it generates (once, then caches) a function that builds the
+dicts with a single literal, so serializing a long list costs one dict
+display per row instead of a loop of isoformat() calls and lookups:
+
+    TENANT = Serializer('tenant', Tenant, [
+        'id', 'first_name',
+        ('lease_end_date', 'lease_end'),                   # renamed attribute
+        ('property', _tenant_property, ['property_id']),   # computed, and the columns it reads
+    ])
+
+    return with_validators(TENANT.response(tenants, many=True), etag, last_modified)
+
+Projection: a list view that only reads its rows selects just the
+columns the requested fields need, as plain Row tuples instead of ORM
+instances (no identity map, no large Text columns nobody asked for). The
+compiled functions read rows and instances alike:
+
+    fields = TENANT.requested_fields(only=TENANT_ACTIVE_FIELDS)
+    rows = TENANT.project(query, fields).order_by(Tenant.created_at.desc()).all()
+    return TENANT.response(rows, many=True, fields=fields)
+
+Views that go on to change the objects use load_only(fields) instead.
+Computed fields name the columns they read, and only use those.
+
+Dates and datetimes are left as they are and written by orjson as ISO
+8601, the same strings isoformat() gave. Responses are bytes straight from
+orjson; when orjson isn't installed the stdlib json module writes the same
+output, only slower.
+
+Sparse fieldsets: GET /api/tenants/?fields=id,first_name,lease_end returns
+only those fields. only= limits what a view offers (its default shape);
+asking for anything else is a 400 listing the available fields. The
+fields parameter is part of the ETag and response cache keys, so a
+trimmed response is never served for a full one.
+
+init_serializers also makes orjson the app's JSON provider, so jsonify()
+elsewhere gets faster too. It keeps Flask's behaviour there, including
+HTTP dates for datetime values passed to jsonify directly.
+"""
+from datetime import date
+import json
+import os
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import load_only
+
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.finance import Budget, Expense
+from app.models.maintenance import Maintenance
+from app.models.project import Project
+from app.models.property import Property
+from app.models.tenant import Tenant
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# Compiled functions kept per serializer; fieldsets past this are compiled on every request
+MAX_COMPILED_FIELDSETS = 64
+
+
+class InvalidFieldset(ValueError):
+    """The fields query parameter named fields the endpoint doesn't have"""
+
+
+def _native_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(data, sort_keys=False, indent=False):
+    """Serialize to JSON bytes, with dates and datetimes in ISO 8601"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=DefaultJSONProvider.default, option=option)
+    # orjson writes UTF-8 rather than \u escapes; match it byte for byte
+    return json.dumps(data, default=_native_default, sort_keys=sort_keys, ensure_ascii=False,
+                      indent=2 if indent else None, separators=None if indent else (',', ':')).encode()
+
+
+def _indent(provider, app):
+    return provider.compact is False or (provider.compact is None and app.debug)
+
+
+def json_response(data, status=200):
+    """A JSON response written by dumps(), formatted like jsonify()'s"""
+    app = current_app._get_current_object()
+    body = dumps(data, sort_keys=app.json.sort_keys, indent=_indent(app.json, app))
+    return app.response_class(body, status=status, mimetype=app.json.mimetype)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's JSON provider on orjson; same output as the default one"""
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs.keys() <= {'sort_keys', 'indent', 'default'}:
+            # json.dumps options orjson doesn't have
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self.dumps(obj, indent=_indent(self, self._app))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class Serializer:
+    """Dict builder for one model, compiled per set of fields.
+
+    fields: in output order, each a name (the column of the same name),
+    a (name, column) pair, or a (name, function, columns) triple where the
+    function takes (obj, context), returns the value and reads only the
+    listed columns of obj.
+    """
+
+    def __init__(self, name, model, fields):
+        self.name = name
+        self.model = model
+        self.fields = {}
+        self.columns = {}
+        for field in fields:
+            if isinstance(field, str):
+                field = (field, field)
+            key, source = field[:2]
+            if isinstance(source, str) and not source.isidentifier():
+                raise ValueError(f"{name}.{key}: {source!r} is not an attribute name")
+            self.fields[key] = source
+            self.columns[key] = tuple(field[2]) if callable(source) else (source,)
+        self._compiled = {}
+
+    def _compile(self, names):
+        namespace = {}
+        items = []
+        for index, key in enumerate(names):
+            source = self.fields[key]
+            if callable(source):
+                namespace[f"_f{index}"] = source
+                items.append(f"{key!r}: _f{index}(obj, context)")
+            else:
+                items.append(f"{key!r}: obj.{source}")
+        body = '{' + ', '.join(items) + '}'
+        code = (
+            f"def dump(obj, context):\n    return {body}\n"
+            f"def dump_many(objs, context):\n    return [{body} for obj in objs]\n"
+        )
+        exec(compile(code, f"<serializer {self.name}>", 'exec'), namespace)
+        return namespace['dump'], namespace['dump_many']
+
+    def _functions(self, fields):
+        names = tuple(fields) if fields is not None else tuple(self.fields)
+        functions = self._compiled.get(names)
+        if functions is None:
+            unknown = [key for key in names if key not in self.fields]
+            if unknown:
+                raise InvalidFieldset(f"Unknown fields for {self.name}: {', '.join(unknown)}")
+            functions = self._compile(names)
+            if len(self._compiled) < MAX_COMPILED_FIELDSETS:
+                self._compiled[names] = functions
+        return functions
+
+    def dump(self, obj, fields=None, context=None):
+        """obj as a dict of fields (all of them by default)"""
+        return self._functions(fields)[0](obj, context)
+
+    def dump_many(self, objs, fields=None, context=None):
+        return self._functions(fields)[1](objs, context)
+
+    def column_names(self, fields=None):
+        """Columns the given fields read, in table order"""
+        needed = set()
+        for key in (fields if fields is not None else self.fields):
+            needed.update(self.columns[key])
+        return [column.key for column in self.model.__table__.columns if column.key in needed]
+
+    def project(self, query, fields=None):
+        """query selecting only what fields need, returning Row tuples.
+
+        For rows that are only read: the results aren't ORM instances, so
+        they can't be changed, lazy-load or be passed to row_validators.
+        """
+        return query.with_entities(*(getattr(self.model, key) for key in self.column_names(fields)))
+
+    def load_only(self, fields=None):
+        """Loader option deferring the columns fields don't need, for ORM instances"""
+        return load_only(*(getattr(self.model, key) for key in self.column_names(fields)))
+
+    def requested_fields(self, only=None):
+        """Fields to return for this request: only=, narrowed by ?fields="""
+        available = tuple(only) if only is not None else tuple(self.fields)
+        raw = request.args.get('fields')
+        if not raw:
+            return available
+        wanted = {key.strip() for key in raw.split(',') if key.strip()}
+        if not wanted:
+            return available
+        unknown = wanted.difference(available)
+        if unknown:
+            raise InvalidFieldset(
+                f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}"
+            )
+        # Declaration order, so equivalent requests share a compiled function
+        return tuple(key for key in available if key in wanted)
+
+    def response(self, data, many=False, only=None, context=None, status=200, fields=None):
+        """JSON response for one object or a list, honouring ?fields=.
+
+        fields: from requested_fields(), when the view already asked for
+        them to project its query.
+        """
+        if fields is None:
+            fields = self.requested_fields(only)
+        if many:
+            return json_response(self.dump_many(data, fields, context), status)
+        return json_response(self.dump(data, fields, context), status)
+
+
+def _invalid_fieldset(error):
+    return json_response({"error": str(error)}, 400)
+
+
+def init_serializers(app):
+    """Use orjson for the app's JSON and turn bad ?fields= into 400s"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    app.register_error_handler(InvalidFieldset, _invalid_fieldset)
+
+
+# Model serializers
+
+def property_summaries(property_ids):
+    """{id: summary dict} for the properties shown nested in other rows"""
+    ids = {property_id for property_id in property_ids if property_id is not None}
+    if not ids:
+        return {}
+    rows = PROPERTY.project(Property.query.filter(Property.id.in_(ids)), PROPERTY_SUMMARY_FIELDS).all()
+    return {row.id: PROPERTY.dump(row, PROPERTY_SUMMARY_FIELDS) for row in rows}
+
+
+def _tenant_property(tenant, context):
+    return context['properties'].get(tenant.property_id)
+
+
+def _property_role(prop, context):
+    return context['roles'].get(prop.id) if context else None
+
+
+def _document_url(doc, context):
+    filename = os.path.basename(doc.file_path)
+    if doc.property_id:
+        return f"/uploads/documents/files/property_{doc.property_id}/{filename}"
+    return f"/uploads/documents/files/user_{context['user_id']}/{filename}"
+
+
+def _amount_dollars(row, context):
+    # Stored in cents
+    return row.amount / 100.0 if row.amount is not None else None
+
+
+PROPERTY = Serializer('property', Property, [
+    'id', 'address', 'city', 'state', 'zip', 'property_type', 'status',
+    'purchase_date', 'purchase_price', 'current_value', 'bedrooms', 'bathrooms',
+    'square_footage', 'is_primary_residence', 'created_at',
+    ('role', _property_role, ['id']),  # context: {'roles': {property_id: role}}
+])
+PROPERTY_DETAIL_FIELDS = tuple(key for key in PROPERTY.fields if key != 'is_primary_residence')
+PROPERTY_SUMMARY_FIELDS = ('id', 'address', 'city', 'state')
+
+TENANT = Serializer('tenant', Tenant, [
+    'id', 'property_id', ('property', _tenant_property, ['property_id']), 'first_name', 'last_name', 'email', 'phone',
+    'lease_start', 'lease_end', ('lease_end_date', 'lease_end'), 'monthly_rent', 'security_deposit',
+    'rent_paid_through', 'emergency_contact_name', 'emergency_contact_phone', 'notes', 'status',
+    'created_at', 'updated_at', ('created_by', 'user_id'),
+])
+TENANT_DETAIL_FIELDS = tuple(TENANT.fields)  # context: {'properties': property_summaries(...)}
+TENANT_PROPERTY_FIELDS = (
+    'id', 'property_id', 'first_name', 'last_name', 'email', 'phone', 'lease_start', 'lease_end',
+    'monthly_rent', 'security_deposit', 'status', 'created_at', 'created_by'
+)
+TENANT_ACTIVE_FIELDS = ('id', 'property_id', 'first_name', 'last_name', 'email', 'lease_end', 'monthly_rent', 'created_by')
+TENANT_SEARCH_FIELDS = ('id', 'property_id', 'first_name', 'last_name', 'email', 'phone', 'status', 'created_by')
+
+APPLIANCE = Serializer('appliance', Appliance, [
+    'id', 'name', 'brand', 'model', 'serial_number', 'purchase_date', 'warranty_expiration',
+    'notes', 'category', 'created_at', 'updated_at', 'property_id', ('created_by', 'user_id'),
+])
+APPLIANCE_DETAIL_FIELDS = tuple(APPLIANCE.fields)[:-1]
+
+PROJECT = Serializer('project', Project, [
+    'id', 'name', 'description', 'status', 'budget', 'spent', 'start_date',
+    'projected_end_date', 'completed_date', 'created_at', 'updated_at', 'property_id',
+])
+
+MAINTENANCE = Serializer('maintenance', Maintenance, [
+    'id', 'title', 'description', 'priority', 'status', 'due_date', 'created_at',
+    'updated_at', 'completed_at', 'property_id', ('created_by', 'user_id'),
+])
+MAINTENANCE_DETAIL_FIELDS = tuple(MAINTENANCE.fields)[:-1]
+
+DOCUMENT = Serializer('document', Document, [
+    'id', 'title', 'description', 'file_type', 'file_size', 'category', 'created_at',
+    'updated_at', 'property_id', 'tenant_id', 'appliance_id', 'expiration_date',
+    ('url', _document_url, ['file_path', 'property_id']),  # context: {'user_id': current user}
+    ('created_by', 'user_id'),
+])
+DOCUMENT_SEARCH_FIELDS = tuple(key for key in DOCUMENT.fields if key not in ('appliance_id', 'created_by'))
+
+EXPENSE = Serializer('expense', Expense, [
+    'id', 'title', ('amount', _amount_dollars, ['amount']), 'category', 'date', 'description', 'recurring',
+    'recurring_interval', 'property_id', 'created_at', 'updated_at', ('created_by', 'user_id'),
+])
+
+BUDGET = Serializer('budget', Budget, [
+    'id', 'category', ('amount', _amount_dollars, ['amount']), 'month', 'year', 'property_id',
+    'created_at', 'updated_at', ('created_by', 'user_id'),
+])
@@ -0,0 +1,196 @@
+# utils/slow_query_log.py
+"""
+Opt-in slow-query log.
+
+Records every SQL statement slower than SLOW_QUERY_THRESHOLD_MS together
+with the route and view function that issued it. A sampled fraction of
+slow SELECTs also gets its query plan captured: `EXPLAIN (ANALYZE,
+BUFFERS)` on PostgreSQL, `EXPLAIN QUERY PLAN` on SQLite.
+
+Records are kept in an in-memory ring buffer (served by the admin API)
+and optionally appended to a JSON-lines file.
+
+Bind parameters carry user data (emails, names, tokens), so by default a
+record only lists their types, and string literals in PostgreSQL plans
+are masked. SLOW_QUERY_LOG_PARAMETERS=true records the values, for
+debugging on a trusted system.
+"""
+from collections import deque
+from datetime import datetime
+import json
+import random
+import re
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Longest statement text kept in a record
+MAX_STATEMENT_LENGTH = 4000
+
+# Quoted literals in a plan, e.g. Filter: (email = 'a@b.com'::text)
+PLAN_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of slow statements, with optional JSONL output"""
+
+    def __init__(self, threshold_ms=200, explain_sample_rate=0.1, buffer_size=500, log_file=None,
+                 log_parameters=False):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.log_parameters = log_parameters
+        self.log_file = log_file
+        self._records = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+            if self.log_file:
+                try:
+                    with open(self.log_file, 'a') as f:
+                        f.write(json.dumps(record, default=str) + '\n')
+                except OSError as e:
+                    current_app.logger.warning(f"Could not write slow query log: {e}")
+
+    def records(self, limit=None):
+        """Most recent records first"""
+        with self._lock:
+            records = list(reversed(self._records))
+        return records[:limit] if limit else records
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+# Set by init_slow_query_log; None while the log is disabled
+slow_query_log = None
+
+_listeners_installed = False
+
+
+def _request_origin():
+    """Route and handler that issued the current statement, if inside a request"""
+    if not has_request_context():
+        return {'route': None, 'endpoint': None, 'handler': None, 'method': None}
+
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    return {
+        'route': request.url_rule.rule if request.url_rule else request.path,
+        'endpoint': request.endpoint,
+        'handler': f"{view.__module__}.{view.__qualname__}" if view else None,
+        'method': request.method
+    }
+
+
+def _describe_parameters(parameters):
+    """Parameter types in place of their values, e.g. ['str', 'int'] or {'email': 'str'}"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _explain(conn, cursor, statement, parameters):
+    """Capture the plan of a slow SELECT on the same connection.
+
+    Uses a fresh DBAPI cursor so the EXPLAIN itself doesn't fire engine
+    events. On PostgreSQL the EXPLAIN runs inside a savepoint, so a failure
+    can't abort the caller's transaction.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        explain_sql = f"EXPLAIN (ANALYZE, BUFFERS) {statement}"
+    elif dialect == 'sqlite':
+        explain_sql = f"EXPLAIN QUERY PLAN {statement}"
+    else:
+        return None
+
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if dialect == 'postgresql':
+            explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(explain_sql, parameters or ())
+            rows = explain_cursor.fetchall()
+        except Exception as e:
+            if dialect == 'postgresql':
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"EXPLAIN failed: {e}"
+        if dialect == 'postgresql':
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return '\n'.join(row[0] for row in rows)
+        # SQLite rows are (id, parent, notused, detail)
+        return '\n'.join(str(row[-1]) for row in rows)
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('slow_query_start')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    log = slow_query_log
+    if log is None or duration_ms < log.threshold_ms:
+        return
+
+    record = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'duration_ms': round(duration_ms, 2),
+        'statement': statement[:MAX_STATEMENT_LENGTH],
+        'parameters': None,
+        'executemany': executemany,
+        'plan': None
+    }
+    if not executemany:
+        if log.log_parameters:
+            record['parameters'] = repr(parameters)[:MAX_STATEMENT_LENGTH]
+        else:
+            record['parameters'] = _describe_parameters(parameters)
+    record.update(_request_origin())
+
+    # EXPLAIN ANALYZE re-executes the statement, so only plan reads
+    is_select = statement.lstrip()[:6].upper() == 'SELECT'
+    if is_select and not executemany and random.random() < log.explain_sample_rate:
+        try:
+            record['plan'] = _explain(conn, cursor, statement, parameters)
+        except Exception as e:
+            record['plan'] = f"EXPLAIN failed: {e}"
+        if record['plan'] and not log.log_parameters:
+            # psycopg2 binds client-side, so PostgreSQL plans show the values inline
+            record['plan'] = PLAN_LITERAL_PATTERN.sub("'?'", record['plan'])
+
+    log.add(record)
+
+
+def init_slow_query_log(app):
+    """Enable the slow-query log if SLOW_QUERY_LOG_ENABLED is set"""
+    global slow_query_log, _listeners_installed
+    if not app.config.get('SLOW_QUERY_LOG_ENABLED'):
+        return
+
+    slow_query_log = SlowQueryLog(
+        threshold_ms=app.config.get('SLOW_QUERY_THRESHOLD_MS', 200),
+        explain_sample_rate=app.config.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1),
+        buffer_size=app.config.get('SLOW_QUERY_BUFFER_SIZE', 500),
+        log_file=app.config.get('SLOW_QUERY_LOG_FILE'),
+        log_parameters=app.config.get('SLOW_QUERY_LOG_PARAMETERS', False)
+    )
+
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
+
+    app.logger.info(f"Slow query log enabled (threshold {slow_query_log.threshold_ms}ms)")
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Synthetic data generation and performance benchmarks (not part of the test suite)."""
@@ -0,0 +1,135 @@
+# benchmarks/coldstart.py
+"""
+Cold-start benchmark: time from launching the server to its first 200.
+
+Starts the production server (gunicorn with gunicorn.conf.py, one worker)
+against a migrated database, polls /health until it answers 200 and
+reports the time per run. Exits non-zero when the median exceeds the
+budget, so it can guard deploy speed in CI.
+
+The database is migrated once up front with `flask schema upgrade`, the
+same step the container entrypoint runs; its time is reported separately
+since it only does work when migrations are pending.
+
+Usage (from backend/):
+    python -m benchmarks.coldstart --runs 5 --budget 1.0
+    python -m benchmarks.coldstart --database-url postgresql://... --output coldstart.json
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _health_ok(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+    try:
+        conn.request('GET', '/health')
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        conn.close()
+
+
+def server_env(database_url):
+    env = dict(os.environ)
+    env.update({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'FLASK_APP': 'run.py',
+        'FLASK_ENV': 'production',
+        'GUNICORN_WORKERS': '1',
+        'GUNICORN_ACCESS_LOG': '',
+        'GUNICORN_LOG_LEVEL': 'warning',
+    })
+    return env
+
+
+def migrate(env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'flask', 'schema', 'upgrade'],
+        cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def time_cold_start(env, timeout=30.0):
+    """Seconds from spawning gunicorn until /health returns 200"""
+    port = _free_port()
+    env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'run:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup:\n{process.stderr.read().decode()}")
+            if _health_ok(port):
+                return time.perf_counter() - start
+            time.sleep(0.005)
+        raise RuntimeError(f"No 200 from /health within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure server cold start to first 200.')
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite database')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help='Maximum median seconds to first 200')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='homiehq_coldstart_')
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'coldstart.db')}"
+    env = server_env(database_url)
+    env['METRICS_MULTIPROC_DIR'] = os.path.join(tmpdir, 'metrics')
+
+    first_migration = migrate(env)
+    noop_migration = migrate(env)
+    print(f"flask schema upgrade: {first_migration:.3f}s (pending), {noop_migration:.3f}s (current)")
+
+    timings = []
+    for run in range(1, args.runs + 1):
+        elapsed = time_cold_start(env)
+        timings.append(elapsed)
+        print(f"run {run}: first 200 after {elapsed:.3f}s")
+
+    median = statistics.median(timings)
+    print(f"median {median:.3f}s, max {max(timings):.3f}s (budget {args.budget:.3f}s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'runs': timings,
+                'median': median,
+                'budget': args.budget,
+                'migration_pending': first_migration,
+                'migration_current': noop_migration,
+            }, f, indent=2)
+
+    if median > args.budget:
+        print("Cold start exceeds the budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,537 @@
+# benchmarks/datagen.py
+"""
+Deterministic synthetic portfolio generator.
+
+Builds users, properties and everything hanging off them (property users,
+tenants, expenses, budgets, documents, maintenance requests, appliances,
+projects and checklist items) with realistic distributions: most users own
+their home only, some are small landlords and a few manage large
+portfolios with many units, years of expenses and a long tenant history.
+
+The same seed and scale always produce the same rows, so benchmark runs
+are comparable between releases. Rows are written with Core bulk inserts
+in batches, which keeps generation of millions of rows tractable.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --scale medium --database-url sqlite:///bench.db
+"""
+import argparse
+from datetime import date, datetime, timedelta
+import math
+import random
+
+from sqlalchemy import func, insert, text
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.document import Document
+from app.models.finance import Budget, Expense
+from app.models.maintenance import Maintenance
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.project import Project
+from app.models.property import Property
+from app.models.Property_user import PropertyUser
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.utils.constants import DEFAULT_CHECKLIST_ITEMS
+
+# Data scales. Expense volume is roughly
+# properties * months_of_history * expenses_per_month.
+SCALES = {
+    'tiny': {'users': 10, 'months_of_history': 6, 'expenses_per_month': 3, 'max_portfolio': 8},
+    'small': {'users': 200, 'months_of_history': 12, 'expenses_per_month': 4, 'max_portfolio': 40},
+    'medium': {'users': 2000, 'months_of_history': 24, 'expenses_per_month': 6, 'max_portfolio': 150},
+    'large': {'users': 10000, 'months_of_history': 36, 'expenses_per_month': 8, 'max_portfolio': 400},
+}
+
+# Share of users by portfolio type
+USER_KINDS = [('homeowner', 0.70), ('small_landlord', 0.25), ('large_landlord', 0.05)]
+
+EXPENSE_CATEGORIES = [
+    # (category, weight, median amount in cents, spread)
+    ('utilities', 30, 12000, 0.5),
+    ('maintenance', 20, 25000, 1.0),
+    ('repairs', 12, 60000, 1.2),
+    ('mortgage', 10, 180000, 0.3),
+    ('insurance', 6, 110000, 0.4),
+    ('taxes', 4, 350000, 0.4),
+    ('hoa', 8, 30000, 0.3),
+    ('landscaping', 6, 9000, 0.6),
+    ('other', 4, 15000, 1.5),
+]
+BUDGET_CATEGORIES = ['utilities', 'maintenance', 'repairs', 'mortgage']
+
+DOCUMENT_CATEGORIES = [
+    ('lease', 25), ('insurance', 15), ('receipt', 25), ('warranty', 10),
+    ('tax', 10), ('inspection', 5), ('identification', 5), ('other', 5),
+]
+EXPIRING_DOCUMENT_CATEGORIES = {'lease', 'insurance', 'warranty', 'identification'}
+
+APPLIANCES = [
+    ('Refrigerator', 'kitchen', ['Samsung', 'LG', 'Whirlpool', 'GE']),
+    ('Dishwasher', 'kitchen', ['Bosch', 'KitchenAid', 'Whirlpool']),
+    ('Range', 'kitchen', ['GE', 'Frigidaire', 'Samsung']),
+    ('Washer', 'laundry', ['LG', 'Maytag', 'Samsung']),
+    ('Dryer', 'laundry', ['LG', 'Maytag', 'Whirlpool']),
+    ('Water Heater', 'plumbing', ['Rheem', 'A.O. Smith', 'Bradford White']),
+    ('Furnace', 'hvac', ['Carrier', 'Trane', 'Lennox']),
+    ('Air Conditioner', 'hvac', ['Carrier', 'Trane', 'Goodman']),
+]
+
+MAINTENANCE_TITLES = [
+    'Leaking faucet', 'HVAC filter replacement', 'Clogged drain', 'Broken window latch',
+    'Gutter cleaning', 'Roof inspection', 'Smoke detector battery', 'Garage door noise',
+    'Water heater flush', 'Repaint bedroom', 'Replace caulking', 'Fence repair',
+]
+MAINTENANCE_STATUSES = [('completed', 55), ('pending', 25), ('in-progress', 15), ('cancelled', 5)]
+
+PROJECT_NAMES = ['Kitchen remodel', 'Bathroom refresh', 'New deck', 'Roof replacement', 'Basement finish', 'Landscaping']
+
+STREETS = ['Maple', 'Oak', 'Pine', 'Cedar', 'Elm', 'Birch', 'Willow', 'Lake', 'Hill', 'Park']
+CITIES = [('Springfield', 'IL'), ('Portland', 'OR'), ('Austin', 'TX'), ('Seattle', 'WA'), ('Denver', 'CO'), ('Raleigh', 'NC')]
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Maria', 'Wei']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Lee']
+
+# Password of every generated user
+BENCHMARK_PASSWORD = 'benchmark'
+
+# Rows buffered per table before a bulk insert
+BATCH_SIZE = 5000
+
+
+def _weighted(rng, choices):
+    """Pick from [(value, weight), ...]"""
+    total = sum(weight for _, weight in choices)
+    point = rng.uniform(0, total)
+    for value, weight in choices:
+        point -= weight
+        if point <= 0:
+            return value
+    return choices[-1][0]
+
+
+def _poisson(rng, mean):
+    """Small-mean Poisson sample (Knuth)"""
+    if mean <= 0:
+        return 0
+    limit = math.exp(-mean)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+class _BulkWriter:
+    """Buffers rows per model and writes them with executemany inserts"""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+        self.next_ids = {}
+
+    def next_id(self, model):
+        if model not in self.next_ids:
+            current = db.session.query(func.max(model.id)).scalar() or 0
+            self.next_ids[model] = current + 1
+        value = self.next_ids[model]
+        self.next_ids[model] += 1
+        return value
+
+    def add(self, model, row):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows, parents before children so foreign keys hold"""
+        table_order = {table: index for index, table in enumerate(db.metadata.sorted_tables)}
+        for model in sorted(self.buffers, key=lambda model: table_order[model.__table__]):
+            rows = self.buffers[model]
+            if rows:
+                db.session.execute(insert(model.__table__), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                self.buffers[model] = []
+
+    def finish(self):
+        self.flush()
+        db.session.commit()
+        self._reset_sequences()
+
+    def _reset_sequences(self):
+        """Explicit ids bypass PostgreSQL sequences; move them past the generated rows"""
+        if db.engine.dialect.name != 'postgresql':
+            return
+        for model in self.next_ids:
+            table = model.__tablename__
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+        db.session.commit()
+
+
+class PortfolioGenerator:
+    """Generates a synthetic dataset for one scale and seed"""
+
+    def __init__(self, scale='small', seed=42, today=None, **overrides):
+        if scale not in SCALES:
+            raise ValueError(f"Unknown scale '{scale}', expected one of {', '.join(SCALES)}")
+        self.scale = scale
+        self.params = dict(SCALES[scale], **overrides)
+        self.rng = random.Random(seed)
+        # Dates are generated relative to `today`; pin it to reproduce a dataset exactly
+        self.today = today or date.today()
+        self.now = datetime.combine(self.today, datetime.min.time())
+        self.writer = _BulkWriter()
+        self.password_hash = generate_password_hash(BENCHMARK_PASSWORD)
+        self.user_ids = []
+        self.emails = []
+        self._managed_properties = []
+
+    def generate(self):
+        """Insert the whole dataset and return row counts per table"""
+        for index in range(self.params['users']):
+            self._user(index)
+
+        # Managers are picked among existing users once they all exist
+        for property_id, owner_id in self._managed_properties:
+            manager_id = self.rng.choice(self.user_ids)
+            if manager_id != owner_id:
+                self._property_user(property_id, manager_id, 'manager', owner_id)
+
+        self.writer.finish()
+        return dict(self.writer.counts)
+
+    def _portfolio_size(self, kind):
+        if kind == 'homeowner':
+            return 1
+        if kind == 'small_landlord':
+            return self.rng.randint(2, 10)
+        # Heavy tail: lognormal with median ~25, capped per scale
+        return min(self.params['max_portfolio'], max(11, int(self.rng.lognormvariate(math.log(25), 0.7))))
+
+    def _user(self, index):
+        rng = self.rng
+        user_id = self.writer.next_id(User)
+        kind = _weighted(rng, USER_KINDS)
+        email = f"bench{index}@example.com"
+        created_at = self.now - timedelta(days=rng.randint(30, 1500))
+
+        self.writer.add(User, {
+            'id': user_id,
+            'email': email,
+            'password_hash': self.password_hash,
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'role': 'user',
+            'email_verified': True,
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+        self.user_ids.append(user_id)
+        self.emails.append(email)
+
+        for number in range(self._portfolio_size(kind)):
+            self._property(user_id, kind, number == 0)
+
+    def _property(self, user_id, kind, first):
+        rng = self.rng
+        property_id = self.writer.next_id(Property)
+        city, state = rng.choice(CITIES)
+        is_rental = kind != 'homeowner'
+        purchase_date = self.today - timedelta(days=rng.randint(180, 7000))
+        price = round(rng.lognormvariate(math.log(320000), 0.45), -3)
+        created_at = self.now - timedelta(days=rng.randint(1, 900))
+
+        self.writer.add(Property, {
+            'id': property_id,
+            'user_id': user_id,
+            'address': f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(['St', 'Ave', 'Rd', 'Ln'])}",
+            'city': city,
+            'state': state,
+            'zip': f"{rng.randint(10000, 99999)}",
+            'property_type': 'residential' if not is_rental else rng.choice(['residential', 'multi-family', 'condo']),
+            'status': 'active' if rng.random() < 0.92 else 'vacant',
+            'purchase_date': purchase_date,
+            'purchase_price': price,
+            'current_value': round(price * rng.uniform(0.95, 1.6), -3),
+            'bedrooms': rng.randint(1, 5),
+            'bathrooms': rng.choice([1, 1.5, 2, 2.5, 3]),
+            'square_footage': rng.randint(600, 4200),
+            'description': f"Synthetic property {property_id} " + 'x' * rng.randint(0, 400),
+            'is_primary_residence': kind == 'homeowner' and first,
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+        self._property_user(property_id, user_id, 'owner', None)
+        if is_rental and rng.random() < 0.1:
+            self._managed_properties.append((property_id, user_id))
+
+        self._expenses(property_id, user_id, is_rental)
+        self._budgets(property_id, user_id)
+        tenant_ids = self._tenants(property_id, user_id) if is_rental else []
+        self._documents(property_id, user_id, tenant_ids)
+        self._maintenance(property_id, user_id)
+        self._appliances(property_id, user_id)
+        self._projects(property_id, user_id)
+        self._checklist(property_id, user_id)
+
+    def _property_user(self, property_id, user_id, role, invited_by):
+        self.writer.add(PropertyUser, {
+            'id': self.writer.next_id(PropertyUser),
+            'property_id': property_id,
+            'user_id': user_id,
+            'role': role,
+            'status': 'active',
+            'invited_by': invited_by,
+            'invited_at': self.now,
+            'accepted_at': self.now,
+            'created_at': self.now,
+            'updated_at': self.now,
+        })
+
+    def _expenses(self, property_id, user_id, is_rental):
+        rng = self.rng
+        mean = self.params['expenses_per_month'] * (1.5 if is_rental else 1.0)
+        weights = [(category, weight) for category, weight, _, _ in EXPENSE_CATEGORIES]
+        amounts = {category: (median, spread) for category, _, median, spread in EXPENSE_CATEGORIES}
+
+        for month in range(self.params['months_of_history']):
+            month_start = self.today - timedelta(days=30 * (month + 1))
+            for _ in range(_poisson(rng, mean)):
+                category = _weighted(rng, weights)
+                median, spread = amounts[category]
+                expense_date = month_start + timedelta(days=rng.randint(0, 29))
+                created_at = datetime.combine(expense_date, datetime.min.time())
+                self.writer.add(Expense, {
+                    'id': self.writer.next_id(Expense),
+                    'title': f"{category.title()} expense",
+                    'amount': max(100, int(rng.lognormvariate(math.log(median), spread))),
+                    'category': category,
+                    'date': expense_date,
+                    'description': None if rng.random() < 0.6 else 'Note ' + 'y' * rng.randint(10, 300),
+                    'recurring': category in ('mortgage', 'hoa', 'insurance'),
+                    'recurring_interval': 'monthly' if category in ('mortgage', 'hoa') else None,
+                    'property_id': property_id,
+                    'user_id': user_id,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                })
+
+    def _budgets(self, property_id, user_id):
+        rng = self.rng
+        for months_back in range(min(12, self.params['months_of_history'])):
+            month_date = self.today - timedelta(days=30 * months_back)
+            for category in BUDGET_CATEGORIES:
+                if rng.random() < 0.5:
+                    continue
+                self.writer.add(Budget, {
+                    'id': self.writer.next_id(Budget),
+                    'category': category,
+                    'amount': rng.randint(50, 3000) * 100,
+                    'month': month_date.month,
+                    'year': month_date.year,
+                    'property_id': property_id,
+                    'user_id': user_id,
+                    'created_at': self.now,
+                    'updated_at': self.now,
+                })
+
+    def _tenants(self, property_id, user_id):
+        rng = self.rng
+        tenant_ids = []
+        for _ in range(rng.randint(1, 4)):
+            # Current tenant plus a history of former ones
+            lease_end = self.today + timedelta(days=rng.randint(-30, 365))
+            for history in range(rng.randint(1, 4)):
+                tenant_id = self.writer.next_id(Tenant)
+                lease_start = lease_end - timedelta(days=365)
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                self.writer.add(Tenant, {
+                    'id': tenant_id,
+                    'user_id': user_id,
+                    'property_id': property_id,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'email': f"{first_name.lower()}.{last_name.lower()}{tenant_id}@example.com",
+                    'phone': f"555-{rng.randint(1000, 9999)}",
+                    'lease_start': lease_start,
+                    'lease_end': lease_end,
+                    'monthly_rent': float(rng.randint(9, 40) * 100),
+                    'security_deposit': float(rng.randint(9, 40) * 100),
+                    'rent_paid_through': min(lease_end, self.today),
+                    'notes': None if rng.random() < 0.5 else 'Notes ' + 'z' * rng.randint(10, 500),
+                    'status': 'active' if history == 0 else 'former',
+                    'created_at': datetime.combine(lease_start, datetime.min.time()),
+                    'updated_at': datetime.combine(lease_start, datetime.min.time()),
+                })
+                tenant_ids.append(tenant_id)
+                lease_end = lease_start - timedelta(days=rng.randint(0, 60))
+        return tenant_ids
+
+    def _documents(self, property_id, user_id, tenant_ids):
+        rng = self.rng
+        for _ in range(_poisson(rng, 6 + len(tenant_ids))):
+            category = _weighted(rng, DOCUMENT_CATEGORIES)
+            document_id = self.writer.next_id(Document)
+            expiration = None
+            if category in EXPIRING_DOCUMENT_CATEGORIES and rng.random() < 0.7:
+                expiration = self.today + timedelta(days=rng.randint(-200, 500))
+            created_at = self.now - timedelta(days=rng.randint(0, 900))
+            self.writer.add(Document, {
+                'id': document_id,
+                'user_id': user_id,
+                'property_id': property_id,
+                'tenant_id': rng.choice(tenant_ids) if tenant_ids and category == 'lease' else None,
+                'title': f"{category.title()} document {document_id}",
+                'description': None if rng.random() < 0.5 else 'Desc ' + 'd' * rng.randint(10, 400),
+                'file_path': f"documents/bench_{document_id}.pdf",
+                'file_type': 'application/pdf',
+                'file_size': int(rng.lognormvariate(math.log(250000), 1.0)),
+                'category': category,
+                'expiration_date': expiration,
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+
+    def _maintenance(self, property_id, user_id):
+        rng = self.rng
+        for _ in range(_poisson(rng, 5)):
+            status = _weighted(rng, MAINTENANCE_STATUSES)
+            created_at = self.now - timedelta(days=rng.randint(0, 700))
+            self.writer.add(Maintenance, {
+                'id': self.writer.next_id(Maintenance),
+                'user_id': user_id,
+                'property_id': property_id,
+                'title': rng.choice(MAINTENANCE_TITLES),
+                'description': None if rng.random() < 0.4 else 'Details ' + 'm' * rng.randint(10, 300),
+                'priority': rng.choice(['low', 'medium', 'medium', 'high']),
+                'status': status,
+                'due_date': (created_at + timedelta(days=rng.randint(1, 60))).date(),
+                'created_at': created_at,
+                'updated_at': created_at,
+                'completed_at': created_at + timedelta(days=rng.randint(1, 30)) if status == 'completed' else None,
+            })
+
+    def _appliances(self, property_id, user_id):
+        rng = self.rng
+        for name, category, brands in rng.sample(APPLIANCES, rng.randint(2, len(APPLIANCES))):
+            purchase_date = self.today - timedelta(days=rng.randint(30, 3000))
+            self.writer.add(Appliance, {
+                'id': self.writer.next_id(Appliance),
+                'user_id': user_id,
+                'property_id': property_id,
+                'name': name,
+                'brand': rng.choice(brands),
+                'model': f"M{rng.randint(100, 999)}",
+                'serial_number': f"SN{rng.randint(100000, 999999)}",
+                'purchase_date': purchase_date,
+                'warranty_expiration': purchase_date + timedelta(days=rng.choice([365, 730, 1825])),
+                'location': category.title(),
+                'notes': None,
+                'category': category,
+                'created_at': self.now,
+                'updated_at': self.now,
+            })
+
+    def _projects(self, property_id, user_id):
+        rng = self.rng
+        for _ in range(_poisson(rng, 0.8)):
+            budget = float(rng.randint(10, 500) * 100)
+            start = self.today - timedelta(days=rng.randint(0, 700))
+            self.writer.add(Project, {
+                'id': self.writer.next_id(Project),
+                'user_id': user_id,
+                'property_id': property_id,
+                'name': rng.choice(PROJECT_NAMES),
+                'description': 'Project ' + 'p' * rng.randint(10, 300),
+                'status': rng.choice(['planning', 'in-progress', 'on-hold', 'completed']),
+                'budget': budget,
+                'spent': round(budget * rng.uniform(0, 1.3), 2),
+                'start_date': start,
+                'projected_end_date': start + timedelta(days=rng.randint(14, 180)),
+                'created_at': self.now,
+                'updated_at': self.now,
+            })
+
+    def _checklist(self, property_id, user_id):
+        """Materialized default items (completed ones) plus a few custom tasks"""
+        rng = self.rng
+        for season, templates in DEFAULT_CHECKLIST_ITEMS.items():
+            for template in templates:
+                if rng.random() < 0.35:
+                    self.writer.add(MaintenanceChecklistItem, {
+                        'id': self.writer.next_id(MaintenanceChecklistItem),
+                        'user_id': user_id,
+                        'property_id': property_id,
+                        'task': template['task'],
+                        'description': template['description'],
+                        'season': season,
+                        'is_completed': True,
+                        'completed_at': self.now - timedelta(days=rng.randint(0, 300)),
+                        'is_default': True,
+                        'default_key': template['key'],
+                        'is_hidden': False,
+                        'created_at': self.now,
+                        'updated_at': self.now,
+                    })
+            for number in range(_poisson(rng, 1)):
+                completed = rng.random() < 0.5
+                self.writer.add(MaintenanceChecklistItem, {
+                    'id': self.writer.next_id(MaintenanceChecklistItem),
+                    'user_id': user_id,
+                    'property_id': property_id,
+                    'task': f"Custom {season.lower()} task {number + 1}",
+                    'description': None,
+                    'season': season,
+                    'is_completed': completed,
+                    'completed_at': self.now if completed else None,
+                    'is_default': False,
+                    'default_key': None,
+                    'is_hidden': False,
+                    'created_at': self.now,
+                    'updated_at': self.now,
+                })
+
+
+def generate_portfolio(scale='small', seed=42, today=None, **overrides):
+    """Generate a dataset into the current app's database; returns row counts"""
+    return PortfolioGenerator(scale, seed, today, **overrides).generate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic HomieHQ dataset.')
+    parser.add_argument('--scale', default='small', choices=sorted(SCALES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Target database (defaults to the app configuration)')
+    parser.add_argument('--today', type=date.fromisoformat, help='Anchor date for generated dates (YYYY-MM-DD)')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    args = parser.parse_args()
+
+    from app.utils.schema import reset_schema, upgrade_schema
+    from benchmarks.harness import create_benchmark_app
+
+    app = create_benchmark_app(args.database_url)
+    with app.app_context():
+        # Through the migrations, so gunicorn's schema check accepts the database
+        if args.reset:
+            reset_schema(app)
+        else:
+            upgrade_schema(app)
+        started = datetime.utcnow()
+        counts = generate_portfolio(args.scale, args.seed, today=args.today)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+
+    for table, count in sorted(counts.items()):
+        print(f"{table:30} {count:>10}")
+    print(f"Generated {sum(counts.values())} rows in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/harness.py
+"""Shared helpers for building a benchmark app and picking representative users."""
+import os
+import tempfile
+
+from sqlalchemy import func
+
+from config import Config
+
+
+class BenchmarkConfig(Config):
+    """Production-like settings with side effects (mail, metrics files) turned off"""
+    DEBUG = False
+    TESTING = False
+    MAIL_SUPPRESS_SEND = True
+    SKIP_EMAIL_VERIFICATION = True
+    METRICS_MULTIPROC_DIR = None
+    SLOW_QUERY_LOG_ENABLED = False
+    PROFILER_ENABLED = False
+
+
+def default_database_url(scale):
+    return 'sqlite:///' + os.path.join(tempfile.gettempdir(), f"homiehq_bench_{scale}.db")
+
+
+def create_benchmark_app(database_url=None, **overrides):
+    """Create the Flask app against the benchmark database"""
+    from app import create_app
+
+    if database_url:
+        os.environ['SQLALCHEMY_DATABASE_URI'] = database_url
+    os.environ.setdefault('UPLOAD_FOLDER', os.path.join(tempfile.gettempdir(), 'homiehq_bench_uploads'))
+
+    config_class = type('BenchmarkRunConfig', (BenchmarkConfig,), overrides)
+    return create_app(config_class)
+
+
+def pick_benchmark_users():
+    """Return users representative of each portfolio size.
+
+    'largest' is the user with the most properties (worst case for list and
+    report endpoints), 'median' a typical small landlord and 'single' a
+    homeowner with one property.
+    """
+    from app import db
+    from app.models.Property_user import PropertyUser
+
+    rows = db.session.query(
+        PropertyUser.user_id,
+        func.count(PropertyUser.id).label('properties')
+    ).filter(
+        PropertyUser.status == 'active',
+        PropertyUser.role == 'owner'
+    ).group_by(
+        PropertyUser.user_id
+    ).order_by(
+        func.count(PropertyUser.id).desc(), PropertyUser.user_id
+    ).all()
+
+    if not rows:
+        return {}
+
+    landlords = [row for row in rows if row.properties > 1]
+    picks = {'largest': rows[0]}
+    if landlords:
+        picks['median'] = landlords[len(landlords) // 2]
+    picks['single'] = rows[-1]
+
+    return {kind: {'user_id': row.user_id, 'properties': row.properties} for kind, row in picks.items()}
@@ -0,0 +1,406 @@
+# benchmarks/loadtest.py
+"""
+HTTP load test against a running HomieHQ server.
+
+Replays a weighted mix of realistic traffic from many concurrent virtual
+users and reports throughput and p50/p95/p99 latency per endpoint:
+
+- dashboard:  the burst of calls the web and mobile apps make on launch
+              (properties, maintenance, tenants, finances)
+- bootstrap:  the same launch through the single /api/bootstrap call
+- documents:  a document upload followed by downloads
+- ha_polling: Home Assistant polling /api/integrations/ha/maintenance
+- reports:    finance report generation
+
+Virtual users log in as the users created by benchmarks.datagen (password
+'benchmark'), so seed the target database first. Uses only the standard
+library and keep-alive connections, so it runs on any box next to the
+server.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:5008 \\
+        --profile mixed --concurrency 32 --duration 60 --output loadtest.json
+"""
+import argparse
+from collections import defaultdict
+from datetime import date
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+import uuid
+
+from benchmarks.datagen import BENCHMARK_PASSWORD
+
+# Traffic profiles: scenario name -> relative weight
+PROFILES = {
+    'mixed': {'dashboard': 55, 'ha_polling': 25, 'documents': 10, 'reports': 10},
+    'dashboard': {'dashboard': 100},
+    'bootstrap': {'bootstrap': 100},
+    'ha_polling': {'ha_polling': 100},
+    'documents': {'documents': 100},
+    'reports': {'reports': 100},
+}
+
+
+class LoadTestError(Exception):
+    """Raised when the target server can't be prepared for a run"""
+
+
+class Client:
+    """Minimal keep-alive JSON client; records one sample per request"""
+
+    def __init__(self, base_url, timeout, recorder):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        self.connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+        self.timeout = timeout
+        self.recorder = recorder
+        self.connection = None
+
+    def request(self, name, method, path, headers=None, body=None):
+        """Send a request; returns (status, body bytes). Status 0 means a transport error."""
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            status, data = 0, b''
+
+        if self.recorder is not None:
+            self.recorder.record(name, (time.perf_counter() - start) * 1000, status, len(data))
+        return status, data
+
+    def json(self, name, method, path, headers=None, body=None):
+        status, data = self.request(name, method, path, headers, body)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Recorder:
+    """Per-worker latency samples; merged after the run"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.bytes = defaultdict(int)
+
+    def record(self, name, latency_ms, status, size):
+        self.latencies[name].append(latency_ms)
+        self.statuses[name][status] += 1
+        self.bytes[name] += size
+
+    def merge(self, other):
+        for name, values in other.latencies.items():
+            self.latencies[name].extend(values)
+        for name, statuses in other.statuses.items():
+            for status, count in statuses.items():
+                self.statuses[name][status] += count
+        for name, size in other.bytes.items():
+            self.bytes[name] += size
+
+
+class VirtualUser:
+    """Credentials and ids for one logged-in benchmark user"""
+
+    def __init__(self, email, token, api_key, api_key_id, property_ids):
+        self.email = email
+        self.token = token
+        self.api_key = api_key
+        self.api_key_id = api_key_id
+        self.property_ids = property_ids
+        self.uploaded_document_ids = []
+        self.lock = threading.Lock()
+
+    @property
+    def auth(self):
+        return {'Authorization': f"Bearer {self.token}"}
+
+
+def _multipart(fields, file_field, filename, content, content_type='application/pdf'):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for key, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+# Scenarios. Each issues the requests one user action causes, in order.
+
+def scenario_dashboard(client, user, rng, options):
+    client.request('GET /api/auth/me', 'GET', '/api/auth/me', user.auth)
+    client.request('GET /api/settings/', 'GET', '/api/settings/', user.auth)
+    client.request('GET /api/properties/', 'GET', '/api/properties/', user.auth)
+    client.request('GET /api/maintenance/', 'GET', '/api/maintenance/', user.auth)
+    client.request('GET /api/tenants/active', 'GET', '/api/tenants/active', user.auth)
+    client.request('GET /api/finances/expenses', 'GET', '/api/finances/expenses', user.auth)
+    client.request('GET /api/finances/budgets', 'GET', '/api/finances/budgets', user.auth)
+    if user.property_ids:
+        property_id = rng.choice(user.property_ids)
+        client.request('GET /api/tenants/property/:id', 'GET', f"/api/tenants/property/{property_id}", user.auth)
+        client.request('GET /api/maintenance/checklist/?property_id', 'GET',
+                       f"/api/maintenance/checklist/?property_id={property_id}", user.auth)
+
+
+def scenario_bootstrap(client, user, rng, options):
+    # App launch through the single-round-trip bootstrap endpoint, for comparison with dashboard
+    client.request('GET /api/bootstrap/', 'GET', '/api/bootstrap/', user.auth)
+    if user.property_ids:
+        property_id = rng.choice(user.property_ids)
+        client.request('GET /api/tenants/property/:id', 'GET', f"/api/tenants/property/{property_id}", user.auth)
+        client.request('GET /api/maintenance/checklist/?property_id', 'GET',
+                       f"/api/maintenance/checklist/?property_id={property_id}", user.auth)
+
+
+def scenario_documents(client, user, rng, options):
+    with user.lock:
+        uploaded = list(user.uploaded_document_ids)
+
+    if not uploaded or rng.random() < 0.3:
+        fields = {'title': f"Load test {uuid.uuid4().hex[:8]}", 'category': 'receipt'}
+        if user.property_ids:
+            fields['property_id'] = rng.choice(user.property_ids)
+        body, content_type = _multipart(fields, 'file', 'loadtest.pdf', options['upload_payload'])
+        status, data = client.json('POST /api/documents/', 'POST', '/api/documents/',
+                                   dict(user.auth, **{'Content-Type': content_type}), body)
+        if status == 201 and data:
+            with user.lock:
+                user.uploaded_document_ids.append(data['id'])
+                uploaded = list(user.uploaded_document_ids)
+
+    client.request('GET /api/documents/', 'GET', '/api/documents/', user.auth)
+    if uploaded:
+        document_id = rng.choice(uploaded)
+        client.request('GET /api/documents/:id/download', 'GET', f"/api/documents/{document_id}/download", user.auth)
+
+
+def scenario_ha_polling(client, user, rng, options):
+    client.request('GET /api/integrations/ha/maintenance', 'GET', '/api/integrations/ha/maintenance',
+                   {'X-API-Key': user.api_key})
+
+
+def scenario_reports(client, user, rng, options):
+    today = date.today()
+    client.request('GET /api/finances/reports/property-comparison', 'GET',
+                   f"/api/finances/reports/property-comparison?year={today.year}", user.auth)
+    if user.property_ids:
+        property_id = rng.choice(user.property_ids)
+        client.request('GET /api/finances/reports/monthly-summary', 'GET',
+                       f"/api/finances/reports/monthly-summary?property_id={property_id}"
+                       f"&year={today.year}&month={today.month}", user.auth)
+        client.request('GET /api/finances/reports/yearly-summary', 'GET',
+                       f"/api/finances/reports/yearly-summary?property_id={property_id}&year={today.year}",
+                       user.auth)
+
+
+SCENARIOS = {
+    'dashboard': scenario_dashboard,
+    'bootstrap': scenario_bootstrap,
+    'documents': scenario_documents,
+    'ha_polling': scenario_ha_polling,
+    'reports': scenario_reports,
+}
+
+
+def prepare_users(base_url, count, timeout):
+    """Log in the generated benchmark users and create an API key for each"""
+    client = Client(base_url, timeout, recorder=None)
+    users = []
+    for index in range(count):
+        email = f"bench{index}@example.com"
+        status, data = client.json('login', 'POST', '/api/auth/login',
+                                   body={'email': email, 'password': BENCHMARK_PASSWORD})
+        if status != 200 or not data:
+            if index == 0:
+                raise LoadTestError(
+                    f"Could not log in as {email} (HTTP {status}); seed the server's database with benchmarks.datagen first"
+                )
+            break
+        auth = {'Authorization': f"Bearer {data['access_token']}"}
+
+        _, properties = client.json('properties', 'GET', '/api/properties/', auth)
+        _, key = client.json('api key', 'POST', '/api/integrations/api-keys', auth,
+                             {'name': 'Load test', 'scopes': ['read:maintenance']})
+        users.append(VirtualUser(
+            email, data['access_token'], key['api_key'] if key else None,
+            key['key_info']['id'] if key else None, [prop['id'] for prop in properties or []]
+        ))
+    client.close()
+    return users
+
+
+def cleanup(base_url, users, timeout):
+    """Delete the documents uploaded and API keys created for the run"""
+    client = Client(base_url, timeout, recorder=None)
+    deleted = 0
+    for user in users:
+        for document_id in user.uploaded_document_ids:
+            status, _ = client.request('delete', 'DELETE', f"/api/documents/{document_id}", user.auth)
+            deleted += status == 200
+        if user.api_key_id:
+            client.request('delete', 'DELETE', f"/api/integrations/api-keys/{user.api_key_id}", user.auth)
+    client.close()
+    return deleted
+
+
+def run_load(base_url, users, profile, concurrency, duration, think_time_ms, seed, timeout, upload_size):
+    """Run the traffic mix for `duration` seconds; returns (recorder, elapsed seconds)"""
+    weights = PROFILES[profile]
+    scenario_names = list(weights)
+    scenario_weights = [weights[name] for name in scenario_names]
+    options = {'upload_payload': b'%PDF-1.4\n' + b'0' * max(0, upload_size - 9)}
+    recorders = [Recorder() for _ in range(concurrency)]
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        client = Client(base_url, timeout, recorders[index])
+        user = users[index % len(users)]
+        while time.monotonic() < deadline:
+            name = rng.choices(scenario_names, scenario_weights)[0]
+            SCENARIOS[name](client, user, rng, options)
+            if think_time_ms:
+                time.sleep(rng.expovariate(1000.0 / think_time_ms))
+        client.close()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    merged = Recorder()
+    for recorder in recorders:
+        merged.merge(recorder)
+    return merged, elapsed
+
+
+def _percentile(ordered, percent):
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    all_latencies = []
+    for name, latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        all_latencies.extend(latencies)
+        statuses = dict(recorder.statuses[name])
+        errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+        endpoints[name] = {
+            'requests': len(ordered),
+            'throughput_rps': round(len(ordered) / elapsed, 2),
+            'p50_ms': round(_percentile(ordered, 50), 2),
+            'p95_ms': round(_percentile(ordered, 95), 2),
+            'p99_ms': round(_percentile(ordered, 99), 2),
+            'max_ms': round(ordered[-1], 2),
+            'mean_ms': round(statistics.mean(ordered), 2),
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            'bytes': recorder.bytes[name],
+        }
+
+    ordered = sorted(all_latencies)
+    total = {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else 0,
+        'p50_ms': round(_percentile(ordered, 50), 2) if ordered else None,
+        'p95_ms': round(_percentile(ordered, 95), 2) if ordered else None,
+        'p99_ms': round(_percentile(ordered, 99), 2) if ordered else None,
+        'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+    }
+    return {'elapsed_seconds': round(elapsed, 2), 'total': total, 'endpoints': endpoints}
+
+
+def print_summary(summary):
+    print(f"\n{'endpoint':52} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>6}")
+    for name, stats in summary['endpoints'].items():
+        print(f"{name:52} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>6}")
+    total = summary['total']
+    print(f"\nTotal: {total['requests']} requests in {summary['elapsed_seconds']}s = {total['throughput_rps']} req/s, "
+          f"p50 {total['p50_ms']}ms, p95 {total['p95_ms']}ms, p99 {total['p99_ms']}ms, errors {total['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a running HomieHQ server with a realistic traffic mix.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5008')
+    parser.add_argument('--profile', default='mixed', choices=sorted(PROFILES))
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--users', type=int, default=50, help='Distinct benchmark accounts to log in as')
+    parser.add_argument('--think-time-ms', type=float, default=0, help='Mean pause between user actions')
+    parser.add_argument('--upload-size', type=int, default=200 * 1024, help='Bytes per uploaded document')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep-uploads', action='store_true',
+                        help="Don't delete documents and API keys created during the run")
+    parser.add_argument('--output', help='Write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    users = prepare_users(args.base_url, args.users, args.timeout)
+    print(f"Logged in {len(users)} users; running '{args.profile}' with {args.concurrency} "
+          f"virtual users for {args.duration}s against {args.base_url}")
+
+    recorder, elapsed = run_load(
+        args.base_url, users, args.profile, args.concurrency, args.duration,
+        args.think_time_ms, args.seed, args.timeout, args.upload_size
+    )
+    summary = summarize(recorder, elapsed)
+    summary['config'] = {
+        'base_url': args.base_url,
+        'profile': args.profile,
+        'mix': PROFILES[args.profile],
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'users': len(users),
+        'think_time_ms': args.think_time_ms,
+    }
+    print_summary(summary)
+
+    if not args.keep_uploads:
+        deleted = cleanup(args.base_url, users, args.timeout)
+        if deleted:
+            print(f"Deleted {deleted} uploaded documents")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+# benchmarks/run.py
+"""
+Endpoint benchmark suite.
+
+Generates a synthetic dataset per scale, then times every list and report
+endpoint through the Flask test client for a few representative users
+(largest portfolio, median landlord, single homeowner). For each endpoint
+it records latency percentiles, SQL statement count and response size, and
+writes everything to a JSON file that can be diffed against a previous
+release with --compare.
+
+Usage (from backend/):
+    python -m benchmarks.run --scales tiny,small --output bench.json
+    python -m benchmarks.run --scales small --compare baseline.json
+"""
+import argparse
+from datetime import date, datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from sqlalchemy import event
+
+# (name, URL template, auth) - templates are filled from the benchmark user's data.
+# auth is 'jwt' or 'api_key' (Home Assistant integration endpoints).
+ENDPOINTS = [
+    ('bootstrap', '/api/bootstrap/', 'jwt'),
+    ('auth.me', '/api/auth/me', 'jwt'),
+    ('users.profile', '/api/users/profile', 'jwt'),
+    ('settings.get', '/api/settings/', 'jwt'),
+    ('properties.list', '/api/properties/', 'jwt'),
+    ('properties.detail', '/api/properties/{property_id}', 'jwt'),
+    ('property_users.list', '/api/property-users/{property_id}/users', 'jwt'),
+    ('property_users.invitations', '/api/property-users/invitations', 'jwt'),
+    ('property_photos.list', '/api/property_photos/{property_id}', 'jwt'),
+    ('documents.list', '/api/documents/', 'jwt'),
+    ('documents.by_property', '/api/documents/?property_id={property_id}', 'jwt'),
+    ('documents.expiring', '/api/documents/expiring?days=60', 'jwt'),
+    ('documents.category', '/api/documents/category/receipt', 'jwt'),
+    ('documents.search', '/api/documents/search?q=lease', 'jwt'),
+    ('maintenance.list', '/api/maintenance/', 'jwt'),
+    ('maintenance.by_property', '/api/maintenance/?property_id={property_id}', 'jwt'),
+    ('checklist.all', '/api/maintenance/checklist/?property_id={property_id}', 'jwt'),
+    ('checklist.season', '/api/maintenance/checklist/Spring?property_id={property_id}', 'jwt'),
+    ('checklist.stats', '/api/maintenance/checklist/stats', 'jwt'),
+    ('appliances.list', '/api/appliances/', 'jwt'),
+    ('projects.list', '/api/projects/', 'jwt'),
+    ('tenants.list', '/api/tenants/', 'jwt'),
+    ('tenants.by_property', '/api/tenants/property/{property_id}', 'jwt'),
+    ('tenants.active', '/api/tenants/active', 'jwt'),
+    ('tenants.search', '/api/tenants/search?q=smith', 'jwt'),
+    ('tenants.documents', '/api/tenants/{tenant_id}/documents', 'jwt'),
+    ('tenants.expiring_documents', '/api/tenants/{tenant_id}/documents/expiring?days=90', 'jwt'),
+    ('finances.expenses', '/api/finances/expenses', 'jwt'),
+    ('finances.expenses_by_property', '/api/finances/expenses?property_id={property_id}', 'jwt'),
+    ('finances.expense_categories', '/api/finances/expenses/categories', 'jwt'),
+    ('finances.budgets', '/api/finances/budgets', 'jwt'),
+    ('finances.monthly_summary', '/api/finances/reports/monthly-summary?property_id={property_id}&year={year}&month={month}', 'jwt'),
+    ('finances.yearly_summary', '/api/finances/reports/yearly-summary?property_id={property_id}&year={year}', 'jwt'),
+    ('finances.property_comparison', '/api/finances/reports/property-comparison?year={year}', 'jwt'),
+    ('integrations.ha_maintenance', '/api/integrations/ha/maintenance', 'api_key'),
+    ('integrations.ha_properties', '/api/integrations/ha/properties', 'api_key'),
+]
+
+# A p50 slowdown beyond this ratio is reported as a regression by --compare
+DEFAULT_REGRESSION_THRESHOLD = 1.25
+# ...as long as it is also slower by at least this much, which filters out sub-millisecond noise
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _user_context(user_id):
+    """Ids the URL templates need: a busy property and one of its tenants"""
+    from sqlalchemy import func
+    from app import db
+    from app.models.Property_user import PropertyUser
+    from app.models.tenant import Tenant
+
+    busiest = db.session.query(
+        PropertyUser.property_id, func.count(Tenant.id).label('tenants')
+    ).outerjoin(
+        Tenant, Tenant.property_id == PropertyUser.property_id
+    ).filter(
+        PropertyUser.user_id == user_id, PropertyUser.status == 'active'
+    ).group_by(
+        PropertyUser.property_id
+    ).order_by(
+        func.count(Tenant.id).desc(), PropertyUser.property_id
+    ).first()
+
+    property_id = busiest.property_id if busiest else 0
+    tenant = Tenant.query.filter_by(property_id=property_id).order_by(Tenant.id).first()
+    today = date.today()
+    return {
+        'property_id': property_id,
+        'tenant_id': tenant.id if tenant else 0,
+        'year': today.year,
+        'month': today.month,
+    }
+
+
+def _create_api_key(user_id):
+    from app import db
+    from app.models.api_key import APIKey
+
+    key = APIKey.generate_key()
+    db.session.add(APIKey(
+        user_id=user_id,
+        name='Benchmark',
+        key_hash=APIKey.hash_key(key),
+        key_prefix=key[:10],
+        scopes='read:maintenance,write:maintenance'
+    ))
+    db.session.commit()
+    return key
+
+
+def time_endpoint(client, url, headers, iterations, warmup, statement_counter):
+    """Time one endpoint; returns a result dict"""
+    for _ in range(warmup):
+        client.get(url, headers=headers)
+
+    timings = []
+    statements = []
+    status = None
+    size = 0
+    for _ in range(iterations):
+        statement_counter[0] = 0
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        statements.append(statement_counter[0])
+        status = response.status_code
+        size = len(response.get_data())
+
+    return {
+        'url': url,
+        'status': status,
+        'iterations': iterations,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'min_ms': round(min(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'sql_statements': max(statements),
+        'response_bytes': size,
+    }
+
+
+def run_scale(scale, args):
+    """Generate the dataset for one scale and benchmark every endpoint"""
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.utils.schema import reset_schema
+    from benchmarks.datagen import generate_portfolio
+    from benchmarks.harness import create_benchmark_app, default_database_url, pick_benchmark_users
+
+    database_url = args.database_url or default_database_url(scale)
+    app = create_benchmark_app(database_url)
+    # Failing endpoints are reported by status code; keep their tracebacks out of the output
+    app.logger.setLevel(logging.CRITICAL)
+    result = {'scale': scale, 'database': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1], 'users': {}}
+
+    with app.app_context():
+        if not args.reuse_data:
+            reset_schema(app)
+            started = time.perf_counter()
+            result['rows'] = generate_portfolio(scale, args.seed)
+            result['generation_seconds'] = round(time.perf_counter() - started, 2)
+            print(f"[{scale}] generated {sum(result['rows'].values())} rows in {result['generation_seconds']}s")
+
+        users = pick_benchmark_users()
+        contexts = {}
+        for kind, user in users.items():
+            contexts[kind] = dict(
+                _user_context(user['user_id']),
+                token=create_access_token(identity=str(user['user_id'])),
+                api_key=_create_api_key(user['user_id'])
+            )
+
+        statement_counter = [0]
+
+        def count_statement(*_):
+            statement_counter[0] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+    client = app.test_client()
+    selected = [name.strip() for name in args.endpoints.split(',')] if args.endpoints else None
+
+    for kind, user in users.items():
+        context = contexts[kind]
+        user_result = dict(user, endpoints={})
+        for name, template, auth in ENDPOINTS:
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            if auth == 'api_key':
+                headers = {'X-API-Key': context['api_key']}
+            else:
+                headers = {'Authorization': f"Bearer {context['token']}"}
+            url = template.format(**context)
+            user_result['endpoints'][name] = time_endpoint(
+                client, url, headers, args.iterations, args.warmup, statement_counter
+            )
+            timing = user_result['endpoints'][name]
+            print(f"[{scale}/{kind}] {name:32} {timing['status']} p50={timing['p50_ms']:>9.2f}ms "
+                  f"p95={timing['p95_ms']:>9.2f}ms sql={timing['sql_statements']:>4} bytes={timing['response_bytes']}")
+        result['users'][kind] = user_result
+
+    return result
+
+
+def compare_results(current, baseline, threshold, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """Return (endpoint key, baseline p50, current p50, ratio) for slowed-down endpoints"""
+    def index(results):
+        flat = {}
+        for scale_result in results['scales']:
+            for kind, user in scale_result['users'].items():
+                for name, timing in user['endpoints'].items():
+                    flat[f"{scale_result['scale']}/{kind}/{name}"] = timing
+        return flat
+
+    current_index, baseline_index = index(current), index(baseline)
+    regressions = []
+    for key, timing in sorted(current_index.items()):
+        before = baseline_index.get(key)
+        if not before or not before['p50_ms']:
+            continue
+        ratio = timing['p50_ms'] / before['p50_ms']
+        slower = ratio >= threshold and timing['p50_ms'] - before['p50_ms'] >= min_delta_ms
+        if slower or timing['sql_statements'] > before['sql_statements']:
+            regressions.append((key, before['p50_ms'], timing['p50_ms'], round(ratio, 2),
+                                before['sql_statements'], timing['sql_statements']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HomieHQ list and report endpoints.')
+    parser.add_argument('--scales', default='tiny,small', help='Comma-separated data scales (see benchmarks.datagen.SCALES)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--endpoints', help='Only run endpoints whose name starts with one of these prefixes')
+    parser.add_argument('--database-url', help='Benchmark database (default: a temporary SQLite file per scale)')
+    parser.add_argument('--reuse-data', action='store_true', help='Skip generation and use the existing database')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='Previous results file to diff against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='p50 slowdown ratio reported as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='Ignore slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'iterations': args.iterations,
+        'scales': [run_scale(scale.strip(), args) for scale in args.scales.split(',') if scale.strip()]
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for key, before, after, ratio, sql_before, sql_after in regressions:
+                print(f"  {key:60} p50 {before:.2f}ms -> {after:.2f}ms (x{ratio}), sql {sql_before} -> {sql_after}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -38,10 +38,130 @@ class Config:
 
     # for emails 
     FRONTEND_URL = os.environ.get('FRONTEND_URL') or 'http://localhost:3000'
+    MAIL_BULK_BATCH_SIZE = int(os.environ.get('MAIL_BULK_BATCH_SIZE', 200))  # Messages sent per SMTP connection
+
+    # Expiration digest: remind this many days before a document, lease or warranty expires
+    NOTIFICATION_REMINDER_DAYS = [
+        int(days) for days in os.environ.get('NOTIFICATION_REMINDER_DAYS', '30,7,1').split(',') if days.strip()
+    ]
+
+    # Upcoming expirations included in the /api/bootstrap startup payload
+    BOOTSTRAP_EXPIRING_DAYS = int(os.environ.get('BOOTSTRAP_EXPIRING_DAYS', 30))
+
+    # /api/batch limits
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+    BATCH_MAX_REQUEST_BYTES = int(os.environ.get('BATCH_MAX_REQUEST_BYTES', 1024 * 1024))
+    BATCH_MAX_RESPONSE_BYTES = int(os.environ.get('BATCH_MAX_RESPONSE_BYTES', 5 * 1024 * 1024))
+
+    # /api/sync: changes per page, edits per push, and how long the change log is kept
+    # (clients offline for longer get a full snapshot instead)
+    SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 500))
+    SYNC_PUSH_MAX_CHANGES = int(os.environ.get('SYNC_PUSH_MAX_CHANGES', 200))
+    SYNC_RETENTION_DAYS = int(os.environ.get('SYNC_RETENTION_DAYS', 90))
+
+    # Idempotency-Key: how long responses are replayable, how long a duplicate waits for
+    # the original to finish, and when an unfinished claim (crashed worker) is abandoned.
+    # The lock must outlast the slowest request a worker may still be running, i.e. the
+    # gunicorn worker timeout (GUNICORN_TIMEOUT, 120s), or a retry runs the view twice
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 10))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 300))
+
+    # Property-scoped response cache: 'memory' (per worker), 'redis' (shared, at
+    # RESPONSE_CACHE_URL) or 'none'. See utils/response_cache.py
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 3600))  # seconds, redis backend only
+
+    # Domain events: threads and queue for background subscribers (utils/events.py);
+    # EVENTS_RUN_INLINE runs them in the committing thread instead
+    EVENTS_BACKGROUND_WORKERS = int(os.environ.get('EVENTS_BACKGROUND_WORKERS', 4))
+    EVENTS_BACKGROUND_QUEUE = int(os.environ.get('EVENTS_BACKGROUND_QUEUE', 1000))
+    EVENTS_RUN_INLINE = os.environ.get('EVENTS_RUN_INLINE', 'false').lower() == 'true'
+
+    # Background job queue (utils/jobs.py, `flask jobs worker`): worker threads and poll
+    # interval, retries with exponential backoff, and when a running job counts as lost
+    JOBS_CONCURRENCY = int(os.environ.get('JOBS_CONCURRENCY', 2))
+    JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1.0))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+    JOBS_RETRY_BASE_SECONDS = int(os.environ.get('JOBS_RETRY_BASE_SECONDS', 10))
+    JOBS_RETRY_MAX_SECONDS = int(os.environ.get('JOBS_RETRY_MAX_SECONDS', 3600))
+    JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', 900))
+    # Run a worker inside the development server instead of a separate process
+    JOBS_EMBEDDED_WORKER = os.environ.get('JOBS_EMBEDDED_WORKER', 'false').lower() == 'true'
+    # Run jobs at enqueue time instead of queueing them (tests)
+    JOBS_RUN_INLINE = os.environ.get('JOBS_RUN_INLINE', 'false').lower() == 'true'
+    # Deliver mail through the job queue (retried on SMTP errors). Only turn this on
+    # where a worker runs (`flask jobs worker`, the compose worker service); off,
+    # mail is sent right away from a thread
+    MAIL_USE_QUEUE = os.environ.get('MAIL_USE_QUEUE', 'false').lower() == 'true'
+
+    # gzip/brotli compression of responses of at least COMPRESSION_MIN_SIZE bytes
+    # (utils/compression.py); levels kept low to limit CPU per request
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 5))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+
+    # DELETE /api/properties/<id>: 'inline' or 'background' (202, children deleted by
+    # a job, needs a job worker); ?mode= picks per request. Both delete children in
+    # chunks of PROPERTY_DELETE_CHUNK_SIZE rows
+    PROPERTY_DELETE_MODE = os.environ.get('PROPERTY_DELETE_MODE', 'inline')
+    PROPERTY_DELETE_CHUNK_SIZE = int(os.environ.get('PROPERTY_DELETE_CHUNK_SIZE', 1000))
+
+    # Database connection pool (PostgreSQL). Each worker process holds at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0)) or None
+    # Transaction-pooling-safe settings for running behind PgBouncer
+    DB_PGBOUNCER_MODE = os.environ.get('DB_PGBOUNCER_MODE', 'false').lower() == 'true'
+
+    # Schema version check when the app starts: off, warn or fail
+    # (gunicorn.conf.py defaults it to fail; migrations run with `flask schema upgrade`)
+    SCHEMA_CHECK = os.environ.get('SCHEMA_CHECK', 'off').lower()
+
+    # Read replicas (comma-separated URLs) for GET requests. After a write the user
+    # reads from the primary for DB_REPLICA_PIN_SECONDS so they see their own changes.
+    DB_REPLICA_URLS = [url.strip() for url in os.environ.get('DB_REPLICA_URLS', '').split(',') if url.strip()]
+    DB_REPLICA_PIN_SECONDS = float(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+    DB_REPLICA_EXCLUDED_BLUEPRINTS = [
+        name.strip() for name in os.environ.get('DB_REPLICA_EXCLUDED_BLUEPRINTS', 'auth,admin').split(',') if name.strip()
+    ]
+
+    # Prometheus metrics on /metrics (optionally protected by a bearer token)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Don't serve /metrics at all without a token (on in production and demo)
+    METRICS_REQUIRE_TOKEN = os.environ.get('METRICS_REQUIRE_TOKEN', 'false').lower() == 'true'
+    # Shared directory for merging metrics across gunicorn workers
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 5))  # seconds
+
+    # Slow query log: statements above the threshold are recorded with their route,
+    # and a sampled fraction of slow SELECTs gets an EXPLAIN captured
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'false').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1))
+    SLOW_QUERY_BUFFER_SIZE = int(os.environ.get('SLOW_QUERY_BUFFER_SIZE', 500))
+    SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE')  # JSON lines
+    # Record bind parameter values (user data) instead of just their types
+    SLOW_QUERY_LOG_PARAMETERS = os.environ.get('SLOW_QUERY_LOG_PARAMETERS', 'false').lower() == 'true'
+
+    # Sampling profiler for admin-selected requests; PROFILER_DIR must be shared by all workers
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_DIR = os.environ.get('PROFILER_DIR')  # defaults to <instance>/profiles
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    JOBS_EMBEDDED_WORKER = os.environ.get('JOBS_EMBEDDED_WORKER', 'true').lower() == 'true'
     
     # Check if we're running in Docker or local environment
     if os.environ.get('IN_DOCKER'):
@@ -65,6 +185,9 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
         'postgresql://propertypal:propertypal@db:5432/propertypal_test'
     JWT_SECRET_KEY = 'testing-jwt-secret-key'
+    EVENTS_RUN_INLINE = True
+    JOBS_RUN_INLINE = True
+    MAIL_USE_QUEUE = True
 
 
 class ProductionConfig(Config):
@@ -72,6 +195,7 @@ class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     USE_S3 = True
+    METRICS_REQUIRE_TOKEN = os.environ.get('METRICS_REQUIRE_TOKEN', 'true').lower() == 'true'
 
 
 class DemoConfig(Config):
@@ -82,4 +206,5 @@ class DemoConfig(Config):
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=10)  # Short session for demo
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'postgresql://propertypal:propertypal@db:5432/propertypal_demo'
-    USE_S3 = False  # Use local storage for demo
\ No newline at end of file
+    USE_S3 = False  # Use local storage for demo
+    METRICS_REQUIRE_TOKEN = os.environ.get('METRICS_REQUIRE_TOKEN', 'true').lower() == 'true'
\ No newline at end of file
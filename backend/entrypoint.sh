@@ -33,31 +33,29 @@ until PGPASSWORD=$DB_PASSWORD psql -h $DB_HOST -p $DB_PORT -U $DB_USER -d $DB_NA
 done
 echo "Database is ready!"
 
-# Check if we need to initialize the database
-DB_TABLES=$(PGPASSWORD=$DB_PASSWORD psql -h $DB_HOST -p $DB_PORT -U $DB_USER -d $DB_NAME -t -c "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema='public'" | tr -d ' ')
-
-echo "Found $DB_TABLES tables in database"
-
-# Initialize migrations folder if it doesn't exist
-if [ ! -d "migrations" ]; then
-    echo "Creating migrations folder..."
-    flask db init
+# `entrypoint.sh worker` runs the background job worker (emails, property
+# deletion) as the container's main process, so the container runtime
+# restarts it and stops it with SIGTERM. The web container applies the
+# migrations; the worker retries until the tables exist.
+if [ "$1" = "worker" ]; then
+    echo "Starting background job worker..."
+    exec flask jobs worker
 fi
 
-# Always try to run migrations
-echo "Running database migrations..."
-if [ $DB_TABLES -lt 5 ]; then
-    echo "Database appears to be empty. Creating initial migration..."
-    flask db migrate -m "Initial migration" || true
+# Apply the migrations committed in migrations/versions. This returns right
+# away when the schema is current; set RUN_MIGRATIONS=false when migrations
+# run as a separate deploy step (gunicorn still refuses to start on an
+# outdated schema, see SCHEMA_CHECK).
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    echo "Applying database migrations..."
+    flask schema upgrade
 fi
 
-echo "Applying migrations..."
-flask db upgrade
-
 # Start application based on environment
 if [ "$FLASK_ENV" = "production" ]; then
     echo "Starting production server with gunicorn..."
-    exec gunicorn --bind 0.0.0.0:5008 --workers 2 --timeout 120 "run:app"
+    # Worker model, counts and timeouts come from gunicorn.conf.py (tunable via GUNICORN_* env vars)
+    exec gunicorn --config gunicorn.conf.py "run:app"
 else
     echo "Starting development server..."
     exec python run.py
@@ -0,0 +1,169 @@
+# gunicorn.conf.py
+"""
+Production gunicorn settings.
+
+gunicorn loads this file automatically when started from backend/
+(`gunicorn run:app`); every value can be overridden through the
+environment variables below without editing the file.
+
+Worker model
+------------
+GUNICORN_WORKER_CLASS selects the worker type:
+
+- gthread (default): a few processes with a thread pool each. Best for our
+  mostly short, DB-bound requests; threads overlap DB and network waits
+  while keeping memory per request low.
+- gevent: cooperative greenlets, for I/O-heavy workloads with many slow
+  clients (large uploads/downloads, long-polling integrations). Requires
+  the `gevent` package (and `psycogreen` so psycopg2 yields to the hub).
+- auto: gevent when GUNICORN_WORKLOAD=io and gevent is installed,
+  otherwise gthread.
+
+Sizing defaults are derived from the CPU cores available to the container.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _available_cores():
+    """CPU cores this process may use (respects container CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def _gevent_available():
+    try:
+        import gevent  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+cores = _available_cores()
+workload = os.environ.get('GUNICORN_WORKLOAD', 'mixed')  # mixed, cpu, io
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'auto':
+    worker_class = 'gevent' if workload == 'io' and _gevent_available() else 'gthread'
+if worker_class == 'gevent' and not _gevent_available():
+    print("gevent is not installed, falling back to gthread workers")
+    worker_class = 'gthread'
+
+if worker_class == 'gevent':
+    # Patch before the app is preloaded so sockets, DB drivers and threads
+    # created at import time are cooperative.
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        print("psycogreen is not installed; psycopg2 queries will block gevent workers")
+
+    # Greenlets are cheap: one process per core, many concurrent requests each
+    workers = _env_int('GUNICORN_WORKERS', cores)
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+elif worker_class == 'gthread':
+    # CPU-bound work gains nothing from extra threads (GIL), I/O-bound work gains a lot
+    default_threads = {'cpu': 2, 'mixed': 4, 'io': 8}.get(workload, 4)
+    workers = _env_int('GUNICORN_WORKERS', cores + 1)
+    threads = _env_int('GUNICORN_THREADS', default_threads)
+else:
+    # sync workers: the classic (2 x cores) + 1
+    workers = _env_int('GUNICORN_WORKERS', cores * 2 + 1)
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5008')
+
+# Load the app once in the master so workers share its memory copy-on-write
+# and boot instantly; DB connections are reset per worker in post_fork.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Keep connections from the reverse proxy open between requests
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers periodically to contain slow leaks; jitter keeps them
+# from all restarting at the same moment
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Heartbeat files in RAM instead of a possibly slow container filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None  # empty disables it
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# One pooled DB connection per request thread is enough; keep the per-worker
+# pool matched to the thread count so workers x pool stays within max_connections
+if worker_class == 'gthread':
+    os.environ.setdefault('DB_POOL_SIZE', str(threads))
+    os.environ.setdefault('DB_MAX_OVERFLOW', '2')
+
+# An Idempotency-Key claim is only taken over once the request holding it can't
+# still be running (see app/utils/idempotency.py)
+os.environ.setdefault('IDEMPOTENCY_LOCK_SECONDS', str(max(300, timeout + graceful_timeout + 60)))
+
+# Don't serve traffic against a schema that is missing migrations; the
+# entrypoint runs `flask schema upgrade` first (see app/utils/schema.py)
+os.environ.setdefault('SCHEMA_CHECK', 'fail')
+
+# Let /metrics aggregate all workers (see app/utils/metrics.py)
+if not os.environ.get('METRICS_MULTIPROC_DIR'):
+    os.environ['METRICS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'homiehq_metrics')
+
+
+def on_starting(server):
+    """Clear metric snapshots left over from a previous master"""
+    metrics_dir = os.environ['METRICS_MULTIPROC_DIR']
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Only our own files: the directory may be shared or point somewhere unexpected
+    for path in glob.glob(os.path.join(metrics_dir, 'metrics_*.json')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    server.log.info(
+        f"Worker model: {worker_class}, {workers} workers"
+        + (f" x {threads} threads" if worker_class == 'gthread' else '')
+        + f" ({cores} cores, {workload} workload)"
+    )
+
+
+def post_fork(server, worker):
+    """Don't share pooled DB connections inherited from the preloading master"""
+    if not preload_app:
+        return
+    from app import db
+    from run import app
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Write the exiting worker's final metrics so child_exit merges up-to-date counts"""
+    from app.utils.metrics import write_snapshot
+    try:
+        write_snapshot(os.environ['METRICS_MULTIPROC_DIR'])
+    except OSError as e:
+        server.log.warning(f"Could not write final metrics snapshot: {e}")
+
+
+def child_exit(server, worker):
+    """Fold exited workers' metrics into the exited-workers total (see app/utils/metrics.py)"""
+    from app.utils.metrics import merge_exited_workers
+    try:
+        merge_exited_workers(os.environ['METRICS_MULTIPROC_DIR'])
+    except OSError as e:
+        server.log.warning(f"Could not merge metrics of exited workers: {e}")
@@ -0,0 +1,170 @@
+"""Checklist defaults
+
+Columns behind virtual default checklist items: the template key a row
+overrides and whether it only hides that item, an index for the
+per-property, per-season lookups and a unique index so a default item has
+at most one row per property.
+
+Existing data is converted so no default comes back once defaults are
+served virtually: the old code inserted every default of a season the
+first time a property's season was viewed empty, cleared is_default when
+one was edited and deleted removed ones outright. Untouched default rows
+get their template key; every template missing from a season that already
+has rows gets a hidden row.
+
+Revision ID: 0002_checklist_defaults
+Revises: 0001_baseline
+Create Date: 2026-10-19 09:12:41.208316
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_checklist_defaults'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# The default items as the old code inserted them, keyed as in DEFAULT_CHECKLIST_ITEMS.
+# Frozen here so later template changes don't change what this migration does.
+LEGACY_DEFAULTS = {
+    'Spring': [
+        ('spring_clean_gutters_downspouts', 'Clean gutters and downspouts', 'Remove debris and check for proper drainage'),
+        ('spring_inspect_roof_damage', 'Inspect roof for damage', 'Check for missing/damaged shingles or signs of leaks'),
+        ('spring_service_air_conditioning', 'Service air conditioning system', 'Schedule professional maintenance'),
+        ('spring_check_exterior_drainage', 'Check exterior drainage', 'Ensure water flows away from foundation'),
+        ('spring_inspect_clean_deck', 'Inspect and clean deck', 'Clean, repair, and reseal if needed'),
+        ('spring_test_smoke_co', 'Test smoke and CO detectors', 'Replace batteries and test functionality'),
+        ('spring_check_leaks_windows', 'Check for leaks around windows and doors', 'Inspect seals and weatherstripping'),
+        ('spring_trim_trees_shrubs', 'Trim trees and shrubs', 'Remove branches near the house and roof'),
+        ('spring_inspect_foundation_cracks', 'Inspect foundation for cracks', 'Note and repair any new or expanding cracks'),
+        ('spring_clean_outdoor_furniture', 'Clean outdoor furniture', 'Clean and prepare patio furniture for use'),
+    ],
+    'Summer': [
+        ('summer_check_irrigation_systems', 'Check irrigation systems', 'Ensure sprinklers and watering systems are working properly'),
+        ('summer_inspect_pest_infestations', 'Inspect for pest infestations', 'Look for signs of termites, ants, or other pests'),
+        ('summer_clean_inspect_outdoor', 'Clean and inspect outdoor grill', 'Clean grates and check propane connections'),
+        ('summer_check_window_screens', 'Check window screens', 'Repair any tears or holes in window screens'),
+        ('summer_service_lawn_equipment', 'Service lawn equipment', 'Sharpen mower blades and check other equipment'),
+        ('summer_check_pool_maintenance', 'Check pool maintenance', 'Test water, clean filters, check equipment (if applicable)'),
+        ('summer_test_garage_door', 'Test garage door and lubricate', 'Ensure proper operation and safety features'),
+        ('summer_clean_dryer_vent', 'Clean dryer vent', 'Remove lint buildup to prevent fire hazards'),
+        ('summer_check_attic_ventilation', 'Check attic ventilation', 'Ensure proper airflow to prevent heat buildup'),
+        ('summer_inspect_driveway_walkways', 'Inspect driveway and walkways', 'Repair cracks and seal if needed'),
+    ],
+    'Fall': [
+        ('fall_clean_gutters_downspouts', 'Clean gutters and downspouts', 'Remove fallen leaves and debris'),
+        ('fall_service_heating_system', 'Service heating system', 'Schedule professional maintenance before winter'),
+        ('fall_check_chimney_fireplace', 'Check chimney and fireplace', 'Clean and inspect for safe operation'),
+        ('fall_seal_gaps_cracks', 'Seal gaps and cracks', 'Prevent drafts and pests from entering'),
+        ('fall_test_smoke_co', 'Test smoke and CO detectors', 'Replace batteries and test functionality'),
+        ('fall_store_outdoor_furniture', 'Store outdoor furniture', 'Clean and store or cover for winter'),
+        ('fall_drain_store_garden', 'Drain and store garden hoses', 'Prevent freezing and damage'),
+        ('fall_winterize_irrigation_system', 'Winterize irrigation system', 'Drain water to prevent freezing damage'),
+        ('fall_inspect_roof_repair', 'Inspect roof and repair if needed', 'Address issues before winter weather'),
+        ('fall_rake_leaves_aerate', 'Rake leaves and aerate lawn', 'Prepare lawn for winter dormancy'),
+    ],
+    'Winter': [
+        ('winter_check_ice_dams', 'Check for ice dams on roof', 'Remove snow buildup to prevent ice dams'),
+        ('winter_test_sump_pump', 'Test sump pump', 'Ensure proper operation before spring thaw'),
+        ('winter_check_drafts', 'Check for drafts', 'Identify and seal cold air leaks'),
+        ('winter_inspect_attic_insulation', 'Inspect attic insulation', 'Check for proper coverage and no moisture issues'),
+        ('winter_check_basement_water', 'Check basement for water leaks', 'Inspect during thaws or heavy rain'),
+        ('winter_monitor_humidity_levels', 'Monitor humidity levels', 'Maintain proper indoor humidity (30-50%)'),
+        ('winter_check_water_heater', 'Check water heater', 'Inspect for leaks and flush if needed'),
+        ('winter_clean_refrigerator_coils', 'Clean refrigerator coils', 'Remove dust to improve efficiency'),
+        ('winter_check_emergency_supplies', 'Check emergency supplies', 'Update emergency kit for winter storms'),
+        ('winter_protect_outdoor_faucets', 'Protect outdoor faucets', 'Ensure they are drained and insulated'),
+    ],
+}
+
+checklist_items = sa.table(
+    'maintenance_checklist_items',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('property_id', sa.Integer),
+    sa.column('task', sa.String),
+    sa.column('description', sa.Text),
+    sa.column('season', sa.String),
+    sa.column('is_completed', sa.Boolean),
+    sa.column('is_default', sa.Boolean),
+    sa.column('default_key', sa.String),
+    sa.column('is_hidden', sa.Boolean),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def convert_legacy_defaults(conn):
+    rows = conn.execute(sa.select(
+        checklist_items.c.id, checklist_items.c.user_id, checklist_items.c.property_id,
+        checklist_items.c.task, checklist_items.c.season, checklist_items.c.is_default
+    ).where(checklist_items.c.property_id.isnot(None)).order_by(checklist_items.c.id)).all()
+
+    seasons = {}
+    for row in rows:
+        seasons.setdefault((row.property_id, row.season), []).append(row)
+
+    now = datetime.utcnow()
+    hidden = []
+    for (property_id, season), season_rows in seasons.items():
+        keys = {}
+        for row in season_rows:
+            if row.is_default:
+                keys.setdefault(row.task, row.id)
+        for key, task, description in LEGACY_DEFAULTS.get(season, []):
+            if task in keys:
+                # The oldest copy keeps the default; any duplicates stay plain rows
+                conn.execute(checklist_items.update().where(
+                    checklist_items.c.id == keys[task]
+                ).values(default_key=key))
+            else:
+                hidden.append({
+                    'user_id': season_rows[0].user_id,
+                    'property_id': property_id,
+                    'task': task,
+                    'description': description,
+                    'season': season,
+                    'is_completed': False,
+                    'is_default': True,
+                    'default_key': key,
+                    'is_hidden': True,
+                    'created_at': now,
+                    'updated_at': now,
+                })
+    if hidden:
+        conn.execute(checklist_items.insert(), hidden)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('maintenance_checklist_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('default_key', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('is_hidden', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.create_index('ix_checklist_property_season', ['property_id', 'season'], unique=False)
+
+    convert_legacy_defaults(op.get_bind())
+
+    with op.batch_alter_table('maintenance_checklist_items', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_checklist_property_default_key', ['property_id', 'default_key'], unique=True,
+            postgresql_where=sa.text('default_key IS NOT NULL'),
+            sqlite_where=sa.text('default_key IS NOT NULL')
+        )
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('maintenance_checklist_items', schema=None) as batch_op:
+        batch_op.drop_index('uq_checklist_property_default_key')
+        batch_op.drop_index('ix_checklist_property_season')
+        batch_op.drop_column('is_hidden')
+        batch_op.drop_column('default_key')
+
+    # ### end Alembic commands ###
@@ -59,9 +59,9 @@ def reset_database(force=False):
                 print("Database reset cancelled.")
                 return False
         
-        # Drop and recreate all tables
-        db.drop_all()
-        db.create_all()
+        # Drop all tables and rebuild them from the committed migrations
+        from app.utils.schema import reset_schema
+        reset_schema(app)
         print("Database reset complete!")
     return True
 
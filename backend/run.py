@@ -1,6 +1,5 @@
 import os
 from dotenv import load_dotenv
-from flask_migrate import Migrate
 load_dotenv()  # Load environment variables from .env file if it exists
 
 # Import configs
@@ -17,7 +16,7 @@ if 'IN_DOCKER' not in os.environ:
 if 'DATABASE_URL' not in os.environ and 'SQLALCHEMY_DATABASE_URI' not in os.environ:
     os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///dev.db'
 
-from app import create_app, db
+from app import create_app
 
 # Choose config based on environment and demo mode
 flask_env = os.environ.get('FLASK_ENV', 'development')
@@ -34,10 +33,17 @@ print(f"Starting with config: {config_class.__name__}")
 
 # Create app with the appropriate config
 app = create_app(config_class)
-migrate = Migrate(app, db)
 
 if __name__ == '__main__':
+    # Development server: apply committed migrations (a no-op when current)
+    from app.utils.schema import upgrade_schema
     with app.app_context():
-        # Create tables if they don't exist
-        db.create_all()
+        upgrade_schema(app)
+
+    # Process background jobs in this process; with the reloader, only in the
+    # child that serves requests
+    if app.config.get('JOBS_EMBEDDED_WORKER') and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        from app.utils.jobs import start_embedded_worker
+        start_embedded_worker(app)
+
     app.run(host='0.0.0.0', port=5008)
\ No newline at end of file
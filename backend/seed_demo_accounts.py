@@ -11,8 +11,10 @@ from app import create_app, db
 from app.models.user import User
 from app.models.property import Property
 from app.models.finance import Expense, Budget
-from app.models.maintenance import MaintenanceItem
+from app.models.maintenance import Maintenance
+from app.models.Property_user import PropertyUser
 from app.models.appliance import Appliance
+from app.utils.schema import upgrade_schema
 from config import DemoConfig
 
 def seed_demo_accounts():
@@ -101,7 +103,7 @@ def seed_demo_accounts():
             last_name=user_data['last_name'],
             email_verified=True  # Auto-verify demo accounts
         )
-        user.set_password(user_data['password'])
+        user.password = user_data['password']
         db.session.add(user)
         db.session.flush()  # Get user ID
 
@@ -114,7 +116,7 @@ def seed_demo_accounts():
             address=property_data['address'],
             city=property_data['city'],
             state=property_data['state'],
-            zip_code=property_data['zip_code'],
+            zip=property_data['zip_code'],
             property_type=property_data['property_type'],
             purchase_price=property_data['purchase_price'],
             purchase_date=datetime.strptime(property_data['purchase_date'], '%Y-%m-%d').date()
@@ -122,6 +124,15 @@ def seed_demo_accounts():
         db.session.add(property)
         db.session.flush()  # Get property ID
 
+        # Properties are listed through their PropertyUser association
+        db.session.add(PropertyUser(
+            property_id=property.id,
+            user_id=user.id,
+            role='owner',
+            status='active',
+            accepted_at=datetime.utcnow()
+        ))
+
         print(f"  - Created property: {property_data['address']}")
 
         # Add sample expenses
@@ -136,11 +147,13 @@ def seed_demo_accounts():
         for exp_data in sample_expenses:
             expense = Expense(
                 property_id=property.id,
-                description=exp_data['description'],
+                user_id=user.id,
+                title=exp_data['description'],
                 amount=exp_data['amount'],  # Already in cents
                 category=exp_data['category'],
                 date=datetime.now().date(),
-                recurring=exp_data['recurring']
+                recurring=True,
+                recurring_interval=exp_data['recurring']
             )
             db.session.add(expense)
 
@@ -148,19 +161,20 @@ def seed_demo_accounts():
 
         # Add sample budgets
         sample_budgets = [
-            {'category': 'mortgage', 'amount': 150000, 'period': 'monthly'},
-            {'category': 'utilities', 'amount': 15000, 'period': 'monthly'},
-            {'category': 'maintenance', 'amount': 50000, 'period': 'monthly'},
-            {'category': 'insurance', 'amount': 120000, 'period': 'yearly'},
+            {'category': 'mortgage', 'amount': 150000},
+            {'category': 'utilities', 'amount': 15000},
+            {'category': 'maintenance', 'amount': 50000},
+            {'category': 'insurance', 'amount': 10000},
         ]
 
         for budget_data in sample_budgets:
             budget = Budget(
                 property_id=property.id,
+                user_id=user.id,
                 category=budget_data['category'],
                 amount=budget_data['amount'],  # Already in cents
-                period=budget_data['period'],
-                start_date=datetime.now().date()
+                month=datetime.now().month,
+                year=datetime.now().year
             )
             db.session.add(budget)
 
@@ -168,19 +182,20 @@ def seed_demo_accounts():
 
         # Add sample maintenance items
         sample_maintenance = [
-            {'title': 'HVAC Filter Replacement', 'priority': 'low', 'status': 'pending', 'cost': 2500},
-            {'title': 'Annual Roof Inspection', 'priority': 'medium', 'status': 'pending', 'cost': 15000},
-            {'title': 'Gutter Cleaning', 'priority': 'medium', 'status': 'completed', 'cost': 12500},
+            {'title': 'HVAC Filter Replacement', 'priority': 'low', 'status': 'pending'},
+            {'title': 'Annual Roof Inspection', 'priority': 'medium', 'status': 'pending'},
+            {'title': 'Gutter Cleaning', 'priority': 'medium', 'status': 'completed'},
         ]
 
         for maint_data in sample_maintenance:
-            maintenance = MaintenanceItem(
+            maintenance = Maintenance(
                 property_id=property.id,
+                user_id=user.id,
                 title=maint_data['title'],
                 priority=maint_data['priority'],
                 status=maint_data['status'],
-                estimated_cost=maint_data['cost'],
-                due_date=(datetime.now() + timedelta(days=30)).date()
+                due_date=(datetime.now() + timedelta(days=30)).date(),
+                completed_at=datetime.utcnow() if maint_data['status'] == 'completed' else None
             )
             db.session.add(maintenance)
 
@@ -188,17 +203,19 @@ def seed_demo_accounts():
 
         # Add sample appliances
         sample_appliances = [
-            {'name': 'Refrigerator', 'brand': 'Samsung', 'model': 'RF28R7351SG', 'warranty_exp': 365},
-            {'name': 'Washing Machine', 'brand': 'LG', 'model': 'WM3900HWA', 'warranty_exp': 180},
-            {'name': 'HVAC System', 'brand': 'Carrier', 'model': 'Infinity 24', 'warranty_exp': 730},
+            {'name': 'Refrigerator', 'brand': 'Samsung', 'model': 'RF28R7351SG', 'category': 'kitchen', 'warranty_exp': 365},
+            {'name': 'Washing Machine', 'brand': 'LG', 'model': 'WM3900HWA', 'category': 'laundry', 'warranty_exp': 180},
+            {'name': 'HVAC System', 'brand': 'Carrier', 'model': 'Infinity 24', 'category': 'hvac', 'warranty_exp': 730},
         ]
 
         for app_data in sample_appliances:
             appliance = Appliance(
                 property_id=property.id,
+                user_id=user.id,
                 name=app_data['name'],
                 brand=app_data['brand'],
-                model_number=app_data['model'],
+                model=app_data['model'],
+                category=app_data['category'],
                 purchase_date=(datetime.now() - timedelta(days=90)).date(),
                 warranty_expiration=(datetime.now() + timedelta(days=app_data['warranty_exp'])).date()
             )
@@ -228,8 +245,8 @@ if __name__ == '__main__':
 
     with app.app_context():
         try:
-            # Create tables if they don't exist
-            db.create_all()
+            # Create or migrate the tables
+            upgrade_schema(app)
 
             # Seed demo accounts
             seed_demo_accounts()
@@ -0,0 +1,56 @@
+import pytest
+
+from config import TestingConfig
+
+
+class SqliteTestingConfig(TestingConfig):
+    """TestingConfig against a throwaway SQLite file instead of the Postgres service"""
+    SKIP_EMAIL_VERIFICATION = True
+    MAIL_SUPPRESS_SEND = True
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # create_app prefers these over the config class
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+
+    from app import create_app, db
+    app = create_app(SqliteTestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """Register a user and return Authorization headers for them"""
+    def login(email='owner@example.com', password='password'):
+        client.post('/api/auth/register', json={
+            'email': email,
+            'password': password,
+            'first_name': email.split('@')[0]
+        })
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def property_id(client, login):
+    """A property owned by the default login user"""
+    headers = login()
+    response = client.post('/api/properties/', headers=headers, json={
+        'address': '1 Main St',
+        'city': 'Springfield',
+        'state': 'IL',
+        'zip': '62701',
+        'property_type': 'single_family'
+    })
+    return response.get_json()['id']
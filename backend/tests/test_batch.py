@@ -0,0 +1,21 @@
+import gzip
+import json
+
+URL = '/api/batch'
+
+
+def test_sub_responses_are_not_compressed(client, login, property_id):
+    headers = login()
+
+    response = client.post(URL, headers={**headers, 'Accept-Encoding': 'gzip'}, json={'requests': [{
+        'id': 'checklist',
+        'path': f'/api/maintenance/checklist/?property_id={property_id}',
+        'headers': {'Accept-Encoding': 'gzip'}
+    }]})
+
+    assert response.status_code == 200
+    # Only the batch response as a whole is compressed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    [item] = json.loads(gzip.decompress(response.get_data()))['responses']
+    assert item['status'] == 200
+    assert set(item['body']) >= {'Spring', 'Summer', 'Fall', 'Winter'}
@@ -0,0 +1,89 @@
+from app import db
+from app.api import properties
+from app.models.Property_user import PropertyUser
+from app.models.user import User
+
+URL = '/api/properties/'
+
+
+def new_property(client, headers, address='2 Main St'):
+    return client.post(URL, headers=headers, json={
+        'address': address,
+        'city': 'Springfield',
+        'state': 'IL',
+        'zip': '62701',
+        'property_type': 'single_family'
+    }).get_json()['id']
+
+
+def etag_of(client, headers, url=URL, **params):
+    response = client.get(url, headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_unchanged_list_is_304_without_serializing(client, login, property_id, monkeypatch):
+    headers = login()
+    etag = etag_of(client, headers)
+
+    def serialize(*args, **kwargs):
+        raise AssertionError("serialized a 304")
+    monkeypatch.setattr(properties.PROPERTY, 'response', serialize)
+
+    response = client.get(URL, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+
+def test_list_etag_follows_changes(client, login, property_id):
+    headers = login()
+    seen = [etag_of(client, headers)]
+
+    client.put(f'{URL}{property_id}', headers=headers, json={'address': '1 Elm St'})
+    seen.append(etag_of(client, headers))
+
+    other_id = new_property(client, headers)
+    seen.append(etag_of(client, headers))
+    assert client.delete(f'{URL}{other_id}', headers=headers).status_code == 200
+    seen.append(etag_of(client, headers))
+
+    # A property shared with the user, then unshared, changes no property row
+    shared_id = new_property(client, login('landlord@example.com'), '3 Main St')
+    owner = User.query.filter_by(email='owner@example.com').one()
+    share = PropertyUser(property_id=shared_id, user_id=owner.id, role='manager', status='active')
+    db.session.add(share)
+    db.session.commit()
+    seen.append(etag_of(client, headers))
+    share.status = 'removed'
+    db.session.commit()
+    unshared = etag_of(client, headers)
+
+    assert all(before != after for before, after in zip(seen, seen[1:]))
+    # Back to the same rows and access as before sharing (a delete likewise
+    # returns to the list as it was before the create)
+    assert unshared == seen[-2] == seen[1]
+    assert client.get(URL, headers={**headers, 'If-None-Match': seen[-1]}).status_code == 200
+
+
+def test_fields_change_the_etag(client, login, property_id):
+    headers = login()
+
+    assert etag_of(client, headers) != etag_of(client, headers, fields='id,address')
+
+
+def test_detail_honours_if_modified_since(client, login, property_id):
+    headers = login()
+    response = client.get(f'{URL}{property_id}', headers=headers)
+    last_modified = response.headers['Last-Modified']
+
+    response = client.get(f'{URL}{property_id}', headers={**headers, 'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+    # An update moves updated_at past the client's copy (HTTP dates are whole seconds)
+    client.put(f'{URL}{property_id}', headers=headers, json={'address': '1 Elm St'})
+    prop = db.session.get(properties.Property, property_id)
+    prop.updated_at = prop.updated_at.replace(year=prop.updated_at.year + 1)
+    db.session.commit()
+    response = client.get(f'{URL}{property_id}', headers={**headers, 'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+    assert response.get_json()['address'] == '1 Elm St'
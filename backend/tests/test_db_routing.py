@@ -0,0 +1,33 @@
+from app import create_app, db
+from app.models.settings import Settings
+
+from tests.conftest import SqliteTestingConfig
+
+
+def test_settings_defaults_are_created_on_the_primary(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv('UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+
+    class ReplicaConfig(SqliteTestingConfig):
+        # A replica that never catches up, and no read-your-writes pin to hide it
+        DB_REPLICA_URLS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        DB_REPLICA_PIN_SECONDS = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(app.extensions['db_replicas'][0])
+
+        client = app.test_client()
+        client.post('/api/auth/register', json={'email': 'owner@example.com', 'password': 'password'})
+        token = client.post('/api/auth/login', json={
+            'email': 'owner@example.com', 'password': 'password'
+        }).get_json()['access_token']
+
+        for _ in range(2):
+            response = client.get('/api/settings/', headers={'Authorization': f'Bearer {token}'})
+            assert response.status_code == 200
+            assert response.headers['X-DB-Route'] == 'primary'
+
+        assert Settings.query.count() == 1
+        db.session.remove()
@@ -0,0 +1,134 @@
+import threading
+
+import pytest
+
+from app import db, mail
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.user import User
+from app.utils import events
+from app.utils.events import (
+    BoundedExecutor, ChecklistItemCreated, DomainEvent, UserRegistered, emit, subscribe, unsubscribe
+)
+
+
+@pytest.fixture
+def received(app):
+    """Events delivered to a synchronous subscriber"""
+    seen = []
+
+    def record(event):
+        seen.append(event)
+    subscribe(DomainEvent, record)
+    yield seen
+    unsubscribe(record)
+
+
+def checklist_item(task):
+    owner = User.query.filter_by(email='owner@example.com').one()
+    return MaintenanceChecklistItem(user_id=owner.id, task=task, season='Fall')
+
+
+def created_tasks(received):
+    return [
+        db.session.get(MaintenanceChecklistItem, event.entity_id).task
+        for event in received if isinstance(event, ChecklistItemCreated)
+    ]
+
+
+def test_events_are_delivered_after_commit(login, received):
+    login()
+    received.clear()
+
+    item = checklist_item('Kept')
+    db.session.add(item)
+    db.session.flush()
+    assert received == []
+
+    db.session.commit()
+    assert [(type(event), event.entity_id) for event in received] == [(ChecklistItemCreated, item.id)]
+
+
+def test_rolled_back_events_are_dropped(login, received):
+    login()
+    received.clear()
+
+    db.session.add(checklist_item('Dropped'))
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    assert received == []
+
+    db.session.add(checklist_item('Kept'))
+    with db.session.begin_nested() as savepoint:
+        db.session.add(checklist_item('Dropped'))
+        db.session.flush()
+        savepoint.rollback()
+    db.session.commit()
+    assert created_tasks(received) == ['Kept']
+
+
+def test_emit_waits_only_for_pending_writes(login, received):
+    login()
+    received.clear()
+
+    # Nothing written yet: delivered right away
+    emit(UserRegistered(1, '/verify'))
+    assert [event.name for event in received] == ['UserRegistered']
+
+    db.session.add(checklist_item('Kept'))
+    db.session.flush()
+    emit(UserRegistered(2, '/verify'))
+    assert len(received) == 1
+    db.session.commit()
+    assert [event.name for event in received] == ['UserRegistered', 'ChecklistItemCreated', 'UserRegistered']
+
+
+def test_full_executor_runs_background_subscribers_inline(app, monkeypatch):
+    release = threading.Event()
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+    assert executor.submit(release.wait)
+    assert not executor.submit(release.wait)
+
+    app.config['EVENTS_RUN_INLINE'] = False
+    monkeypatch.setattr(events, '_executor', executor)
+    threads = []
+
+    def handler(event):
+        threads.append(threading.current_thread())
+    subscribe(UserRegistered, handler, background=True)
+    try:
+        events.dispatch(UserRegistered(1, '/verify'))
+    finally:
+        unsubscribe(handler)
+        release.set()
+        executor.shutdown()
+
+    assert threads == [threading.current_thread()]
+
+
+def test_registration_sends_the_verification_email(client):
+    with mail.record_messages() as outbox:
+        response = client.post('/api/auth/register', json={
+            'email': 'new@example.com',
+            'password': 'password',
+            'first_name': 'New'
+        })
+
+    assert response.status_code == 201
+    assert [message.recipients for message in outbox] == [['new@example.com']]
+    assert 'verify-email?token=' in outbox[0].html
+
+
+def test_invitations_are_emailed(client, login, property_id):
+    headers = login()
+    login('manager@example.com')
+    url = f'/api/property-users/{property_id}/users'
+
+    with mail.record_messages() as outbox:
+        existing = client.post(url, headers=headers, json={'email': 'manager@example.com', 'role': 'manager'})
+        new = client.post(url, headers=headers, json={'email': 'stranger@example.com', 'role': 'tenant'})
+
+    assert existing.status_code == new.status_code == 201
+    assert [message.recipients for message in outbox] == [['manager@example.com'], ['stranger@example.com']]
+    assert 'accept-invitation?token=' in outbox[0].html
+    assert 'register?invitation=' in outbox[1].html
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+
+from app import db
+from app.models.idempotency_key import IdempotencyKey
+from app.models.property import Property
+from app.models.user import User
+from app.utils.idempotency import idempotent, request_fingerprint
+
+URL = '/api/properties/'
+PROPERTY = {
+    'address': '1 Main St',
+    'city': 'Springfield',
+    'state': 'IL',
+    'zip': '62701',
+    'property_type': 'single_family'
+}
+
+
+def create(client, headers, key, body=PROPERTY):
+    return client.post(URL, headers={**headers, 'Idempotency-Key': key}, json=body)
+
+
+def test_retry_replays_the_first_response(client, login):
+    headers = login()
+
+    first = create(client, headers, 'create-1')
+    retry = create(client, headers, 'create-1')
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert Property.query.count() == 1
+
+
+def test_key_reused_for_another_request(client, login):
+    headers = login()
+    create(client, headers, 'create-1')
+
+    response = create(client, headers, 'create-1', {**PROPERTY, 'address': '2 Main St'})
+
+    assert response.status_code == 422
+    assert Property.query.count() == 1
+
+
+def claim(app, key, age, body=PROPERTY):
+    """An in_progress claim as a request still running for age seconds would hold it"""
+    with app.test_request_context(URL, method='POST', json=body):
+        fingerprint = request_fingerprint()
+    now = datetime.utcnow()
+    db.session.add(IdempotencyKey(
+        user_id=User.query.filter_by(email='owner@example.com').one().id, key=key, request_hash=fingerprint,
+        status='in_progress', created_at=now - timedelta(seconds=age), expires_at=now + timedelta(hours=1)
+    ))
+    db.session.commit()
+
+
+def test_duplicate_of_a_running_request_waits_then_409(app, client, login):
+    headers = login()
+    app.config['IDEMPOTENCY_WAIT_SECONDS'] = 0
+    # Still running past the gunicorn worker timeout: not abandoned yet
+    claim(app, 'create-1', age=150)
+
+    response = create(client, headers, 'create-1')
+
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == '1'
+    assert Property.query.count() == 0
+
+
+def test_abandoned_claim_is_taken_over(app, client, login):
+    headers = login()
+    claim(app, 'create-1', age=app.config['IDEMPOTENCY_LOCK_SECONDS'] + 1)
+
+    assert create(client, headers, 'create-1').status_code == 201
+    assert Property.query.count() == 1
+
+
+def test_server_error_releases_the_key(app, client, login):
+    calls = []
+
+    @app.route('/api/test/flaky', methods=['POST'])
+    @jwt_required()
+    @idempotent
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            return jsonify({"error": "boom"}), 500
+        return jsonify({"calls": len(calls)}), 201
+
+    headers = {**login(), 'Idempotency-Key': 'flaky-1'}
+
+    assert client.post('/api/test/flaky', headers=headers, json={}).status_code == 500
+    assert IdempotencyKey.query.count() == 0
+    assert client.post('/api/test/flaky', headers=headers, json={}).get_json() == {"calls": 2}
+    assert client.post('/api/test/flaky', headers=headers, json={}).headers['Idempotent-Replayed'] == 'true'
+    assert len(calls) == 2
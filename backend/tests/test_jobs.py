@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from sqlalchemy import update
+
+from app import db, mail
+from app.models.job import DeadJob, Job
+from app.services import email_service
+from app.utils.jobs import REDACTED, claim_job, retry_dead_jobs, run_job
+
+
+@pytest.fixture
+def queue(app):
+    app.config['JOBS_RUN_INLINE'] = False
+    return app
+
+
+def test_dead_email_jobs_are_redacted(queue, monkeypatch):
+    email_service.send_email('Reset your password', ['owner@example.com'], '<a href="/reset?token=secret">Reset</a>')
+    db.session.execute(update(Job).values(max_attempts=1))
+    db.session.commit()
+
+    def refuse(message):
+        raise ConnectionRefusedError("SMTP is down")
+    monkeypatch.setattr(mail, 'send', refuse)
+
+    assert run_job(db.engine, claim_job(db.engine, 'test')) == 'dead'
+
+    dead = DeadJob.query.one()
+    payload = json.loads(dead.payload)
+    assert payload['html_body'] == REDACTED
+    assert payload['subject'] == 'Reset your password'
+    assert 'secret' not in dead.payload
+
+    # The body is gone, so it can't be sent again
+    assert retry_dead_jobs() == 0
+    assert DeadJob.query.count() == 1
+    assert Job.query.count() == 0
+
+
+def test_mail_is_sent_right_away_without_the_queue(queue, monkeypatch):
+    queue.config['MAIL_USE_QUEUE'] = False
+
+    class InlineThread:
+        def __init__(self, target, args):
+            self.target, self.args = target, args
+
+        def start(self):
+            self.target(*self.args)
+    monkeypatch.setattr(email_service, 'Thread', InlineThread)
+
+    with mail.record_messages() as outbox:
+        email_service.send_email('Welcome', ['owner@example.com'], '<p>Hi</p>')
+
+    assert [message.subject for message in outbox] == ['Welcome']
+    assert Job.query.count() == 0
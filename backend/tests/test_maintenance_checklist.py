@@ -0,0 +1,244 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from flask_migrate import upgrade
+
+from app import db
+from app.api.maintenance_checklist import insert_default_item
+from app.cli import get_migrate, prune_defaults_command
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.Property_user import PropertyUser
+from app.models.user import User
+from app.utils.constants import DEFAULT_CHECKLIST_ITEMS
+from app.utils.schema import BASELINE_REVISION, MIGRATIONS_DIR
+
+URL = '/api/maintenance/checklist'
+
+
+def spring_ref(property_id, index=0):
+    return f"default-{property_id}-{DEFAULT_CHECKLIST_ITEMS['Spring'][index]['key']}"
+
+
+def season_items(client, headers, property_id, season='Spring'):
+    response = client.get(f'{URL}/{season}?property_id={property_id}', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_defaults_are_virtual_until_written(client, login, property_id):
+    headers = login()
+
+    items = season_items(client, headers, property_id)
+
+    assert len(items) == len(DEFAULT_CHECKLIST_ITEMS['Spring'])
+    assert spring_ref(property_id) in {item['id'] for item in items}
+    assert all(item['is_default'] for item in items)
+    assert MaintenanceChecklistItem.query.count() == 0
+
+
+def test_toggle_materializes_default_once(client, login, property_id):
+    headers = login()
+    ref = spring_ref(property_id)
+
+    response = client.put(f'{URL}/{ref}/toggle', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['is_completed'] is True
+    row_id = response.get_json()['id']
+
+    # The virtual id keeps resolving to the same row
+    response = client.put(f'{URL}/{ref}/toggle', headers=headers)
+    assert response.get_json()['id'] == row_id
+    assert MaintenanceChecklistItem.query.count() == 1
+
+    items = season_items(client, headers, property_id)
+    assert len(items) == len(DEFAULT_CHECKLIST_ITEMS['Spring'])
+    assert ref not in {item['id'] for item in items}
+    assert row_id in {item['id'] for item in items}
+
+
+def test_deleted_default_stays_hidden(client, login, property_id):
+    headers = login()
+    ref = spring_ref(property_id)
+
+    assert client.delete(f'{URL}/{ref}', headers=headers).status_code == 200
+
+    items = season_items(client, headers, property_id)
+    assert len(items) == len(DEFAULT_CHECKLIST_ITEMS['Spring']) - 1
+    assert ref not in {item['id'] for item in items}
+    assert client.put(f'{URL}/{ref}/toggle', headers=headers).status_code == 404
+
+
+def test_default_moved_to_another_season_does_not_reappear(client, login, property_id):
+    headers = login()
+    ref = spring_ref(property_id)
+
+    response = client.put(f'{URL}/{ref}', headers=headers, json={'season': 'Summer'})
+    assert response.status_code == 200
+    row_id = response.get_json()['id']
+
+    spring = season_items(client, headers, property_id, 'Spring')
+    assert len(spring) == len(DEFAULT_CHECKLIST_ITEMS['Spring']) - 1
+    assert ref not in {item['id'] for item in spring}
+    summer = season_items(client, headers, property_id, 'Summer')
+    assert row_id in {item['id'] for item in summer}
+
+    grouped = client.get(f'{URL}/?property_id={property_id}', headers=headers).get_json()
+    assert ref not in {item['id'] for item in grouped['Spring']}
+
+    stats = client.get(f'{URL}/stats?property_id={property_id}', headers=headers).get_json()
+    assert stats['Spring']['total'] == len(DEFAULT_CHECKLIST_ITEMS['Spring']) - 1
+    assert stats['Summer']['total'] == len(DEFAULT_CHECKLIST_ITEMS['Summer']) + 1
+
+
+def test_default_moved_to_another_property(client, login, property_id):
+    headers = login()
+    ref = spring_ref(property_id)
+    other_id = client.post('/api/properties/', headers=headers, json={
+        'address': '2 Main St',
+        'city': 'Springfield',
+        'state': 'IL',
+        'zip': '62701',
+        'property_type': 'single_family'
+    }).get_json()['id']
+
+    response = client.put(f'{URL}/{ref}', headers=headers, json={'property_id': other_id})
+    assert response.status_code == 200
+    assert response.get_json()['default_key'] is None
+
+    # Gone from the old property, and the other property still has its own default
+    assert ref not in {item['id'] for item in season_items(client, headers, property_id)}
+    other = season_items(client, headers, other_id)
+    assert spring_ref(other_id) in {item['id'] for item in other}
+    assert len(other) == len(DEFAULT_CHECKLIST_ITEMS['Spring']) + 1
+
+
+def test_batch_update_materializes_defaults(client, login, property_id):
+    headers = login()
+    refs = [spring_ref(property_id, index) for index in range(3)]
+
+    response = client.put(f'{URL}/batch-update', headers=headers, json={
+        'items': [{'id': ref, 'is_completed': True} for ref in refs + refs[:1]]
+    })
+    assert response.status_code == 200
+    assert MaintenanceChecklistItem.query.count() == 3
+
+    items = season_items(client, headers, property_id)
+    assert sum(item['is_completed'] for item in items) == 3
+    assert len(items) == len(DEFAULT_CHECKLIST_ITEMS['Spring'])
+
+
+def test_default_ids_need_property_access(client, login, property_id):
+    headers = login('stranger@example.com')
+
+    assert client.put(f'{URL}/{spring_ref(property_id)}/toggle', headers=headers).status_code == 404
+    assert MaintenanceChecklistItem.query.count() == 0
+
+
+def test_batch_update_reports_invalid_values_per_item(client, login, property_id):
+    headers = login()
+    refs = [spring_ref(property_id, index) for index in range(3)]
+
+    response = client.put(f'{URL}/batch-update', headers=headers, json={
+        'items': [
+            {'id': refs[0], 'task': ['not', 'a', 'string']},
+            {'id': refs[1], 'description': {'text': 'nested'}},
+            {'id': refs[2], 'is_completed': True},
+            {'id': ['unhashable']}
+        ]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [item['id'] for item in body['updated_items']] == [
+        MaintenanceChecklistItem.query.filter_by(default_key=DEFAULT_CHECKLIST_ITEMS['Spring'][2]['key']).one().id
+    ]
+    assert [error.get('item_id') for error in body['errors']] == [refs[0], refs[1], None]
+
+
+def test_migration_keeps_legacy_edits_and_deletions(app, client, login):
+    # A property's Spring list as the old code left it: defaults inserted on the
+    # first view, one renamed (which cleared is_default) and one deleted
+    db.drop_all()
+    get_migrate(app)
+    upgrade(directory=MIGRATIONS_DIR, revision=BASELINE_REVISION)
+    now = datetime.utcnow()
+    rows = []
+    for template in DEFAULT_CHECKLIST_ITEMS['Spring']:
+        if template['key'] == 'spring_inspect_roof_damage':
+            continue
+        renamed = template['key'] == 'spring_clean_gutters_downspouts'
+        rows.append({
+            'user_id': 1, 'property_id': 1, 'season': 'Spring', 'description': template['description'],
+            'task': f"{template['task']} (front)" if renamed else template['task'],
+            'is_default': not renamed, 'is_completed': False, 'created_at': now, 'updated_at': now
+        })
+    legacy_table = sa.table('maintenance_checklist_items', *(sa.column(name) for name in rows[0]))
+    with db.engine.begin() as conn:
+        conn.execute(legacy_table.insert(), rows)
+    upgrade(directory=MIGRATIONS_DIR)
+
+    headers = login()
+    property_id = client.post('/api/properties/', headers=headers, json={
+        'address': '1 Main St', 'city': 'Springfield', 'state': 'IL', 'zip': '62701', 'property_type': 'single_family'
+    }).get_json()['id']
+    assert property_id == 1
+
+    items = season_items(client, headers, property_id)
+    assert sorted(item['task'] for item in items) == sorted(row['task'] for row in rows)
+    assert all(isinstance(item['id'], int) for item in items)
+    # Seasons the old code never filled get the virtual defaults
+    assert len(season_items(client, headers, property_id, 'Summer')) == len(DEFAULT_CHECKLIST_ITEMS['Summer'])
+
+
+def test_concurrent_materialization_keeps_one_row(client, login, property_id):
+    login()
+    owner = User.query.filter_by(email='owner@example.com').one()
+    template = DEFAULT_CHECKLIST_ITEMS['Spring'][0]
+
+    def default_row():
+        return MaintenanceChecklistItem(
+            user_id=owner.id, property_id=property_id, task=template['task'],
+            season='Spring', is_default=True, default_key=template['key']
+        )
+
+    first = insert_default_item(default_row())
+    db.session.commit()
+
+    # The insert that lost the race gets the winner's row
+    assert insert_default_item(default_row()).id == first.id
+    db.session.commit()
+    assert MaintenanceChecklistItem.query.count() == 1
+
+
+def test_reset_restores_defaults_overridden_by_anyone(client, login, property_id):
+    headers = login()
+    manager_headers = login('manager@example.com')
+    manager = User.query.filter_by(email='manager@example.com').one()
+    db.session.add(PropertyUser(property_id=property_id, user_id=manager.id, role='manager', status='active'))
+    db.session.commit()
+
+    moved, deleted = spring_ref(property_id, 0), spring_ref(property_id, 1)
+    assert client.put(f'{URL}/{moved}', headers=headers, json={'season': 'Summer'}).status_code == 200
+    assert client.delete(f'{URL}/{deleted}', headers=manager_headers).status_code == 200
+
+    response = client.post(f'{URL}/reset/Spring?property_id={property_id}', headers=headers)
+    assert response.status_code == 200
+
+    items = season_items(client, headers, property_id)
+    assert {moved, deleted} <= {item['id'] for item in items}
+    assert len(season_items(client, headers, property_id, 'Summer')) == len(DEFAULT_CHECKLIST_ITEMS['Summer'])
+
+
+def test_prune_defaults_keeps_hidden_and_completed_rows(app, client, login, property_id):
+    headers = login()
+    untouched, completed, deleted = (spring_ref(property_id, index) for index in range(3))
+    for _ in range(2):
+        client.put(f'{URL}/{untouched}/toggle', headers=headers)
+    client.put(f'{URL}/{completed}/toggle', headers=headers)
+    client.delete(f'{URL}/{deleted}', headers=headers)
+
+    result = app.test_cli_runner().invoke(prune_defaults_command)
+
+    assert 'Deleted 1 untouched default rows' in result.output
+    keys = {row.default_key for row in MaintenanceChecklistItem.query}
+    assert keys == {DEFAULT_CHECKLIST_ITEMS['Spring'][index]['key'] for index in (1, 2)}
+    assert untouched in {item['id'] for item in season_items(client, headers, property_id)}
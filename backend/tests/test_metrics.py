@@ -0,0 +1,59 @@
+import json
+import os
+
+from app.utils.metrics import EXITED_SNAPSHOT, _collect_snapshots, _snapshot_lock, merge_exited_workers
+
+
+def write_worker_snapshot(directory, pid, count, in_flight):
+    with open(os.path.join(directory, f"metrics_{pid}.json"), 'w') as f:
+        json.dump({
+            'homiehq_http_requests_total': [[['api', 'api.ping', 'GET', '200'], count]],
+            'homiehq_http_requests_in_flight': [[['api'], in_flight]],
+        }, f)
+
+
+def test_exited_workers_are_merged_into_one_file(tmp_path):
+    directory = str(tmp_path)
+    # pids far above pid_max, so they're never alive
+    write_worker_snapshot(directory, 99999991, 3, 1)
+    write_worker_snapshot(directory, 99999992, 4, 2)
+
+    merge_exited_workers(directory)
+
+    assert sorted(os.listdir(directory)) == ['metrics.lock', EXITED_SNAPSHOT]
+    with open(os.path.join(directory, EXITED_SNAPSHOT)) as f:
+        exited = json.load(f)
+    assert exited == {'homiehq_http_requests_total': [[['api', 'api.ping', 'GET', '200'], 7]]}
+
+    # A new worker reusing a pid starts from zero without touching the merged counts
+    write_worker_snapshot(directory, 99999991, 1, 0)
+    totals = [
+        value
+        for snapshot in _collect_snapshots(directory)
+        for key, value in snapshot.get('homiehq_http_requests_total', [])
+        if key == ['api', 'api.ping', 'GET', '200']
+    ]
+    assert sorted(totals) == [1, 7]
+
+
+def test_merge_skips_when_lock_is_busy(tmp_path):
+    directory = str(tmp_path)
+    write_worker_snapshot(directory, 99999991, 3, 1)
+
+    # e.g. a second SIGCHLD arriving while the master is already merging
+    with _snapshot_lock(directory, exclusive=True):
+        merge_exited_workers(directory)
+    assert os.path.exists(os.path.join(directory, 'metrics_99999991.json'))
+
+    merge_exited_workers(directory)
+    assert not os.path.exists(os.path.join(directory, 'metrics_99999991.json'))
+
+
+def test_metrics_require_token(app, client):
+    app.config['METRICS_REQUIRE_TOKEN'] = True
+    assert client.get('/metrics').status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+    assert response.status_code == 200
@@ -0,0 +1,22 @@
+from app import db
+from app.models.property import Property
+
+
+def test_delete_is_inline_by_default(client, login, property_id):
+    headers = login()
+
+    response = client.delete(f'/api/properties/{property_id}', headers=headers)
+
+    assert response.status_code == 200
+    assert db.session.get(Property, property_id) is None
+
+
+def test_background_delete_is_opt_in(client, login, property_id):
+    headers = login()
+
+    # Test config runs jobs inline, so the job is done when the request returns
+    response = client.delete(f'/api/properties/{property_id}?mode=background', headers=headers)
+
+    assert response.status_code == 202
+    assert response.get_json()['property_id'] == property_id
+    assert db.session.get(Property, property_id) is None
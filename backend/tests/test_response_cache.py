@@ -0,0 +1,63 @@
+from app import db
+from app.models.Property_user import PropertyUser
+from app.models.user import User
+from app.utils.response_cache import get_response_cache
+
+URL = '/api/appliances/'
+
+
+def appliances(client, headers, property_id):
+    response = client.get(URL, headers=headers, query_string={'property_id': property_id})
+    assert response.status_code == 200
+    return response
+
+
+def add_manager(client, login, property_id, email):
+    headers = login(email)
+    user = User.query.filter_by(email=email).one()
+    db.session.add(PropertyUser(property_id=property_id, user_id=user.id, role='manager', status='active'))
+    db.session.commit()
+    return headers
+
+
+def test_hit_after_miss_until_the_property_changes(client, login, property_id):
+    headers = login()
+
+    assert appliances(client, headers, property_id).headers['X-Cache'] == 'MISS'
+    assert appliances(client, headers, property_id).headers['X-Cache'] == 'HIT'
+
+    client.post(URL, headers=headers, json={'name': 'Furnace', 'category': 'hvac', 'property_id': property_id})
+
+    response = appliances(client, headers, property_id)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [item['name'] for item in response.get_json()] == ['Furnace']
+    assert appliances(client, headers, property_id).headers['X-Cache'] == 'HIT'
+
+
+def test_entries_are_per_role(client, login, property_id):
+    owner_headers = login()
+    first_manager = add_manager(client, login, property_id, 'manager@example.com')
+    second_manager = add_manager(client, login, property_id, 'manager2@example.com')
+
+    assert appliances(client, owner_headers, property_id).headers['X-Cache'] == 'MISS'
+    assert appliances(client, first_manager, property_id).headers['X-Cache'] == 'MISS'
+    assert appliances(client, second_manager, property_id).headers['X-Cache'] == 'HIT'
+
+
+def test_shared_entries_carry_the_callers_etag(app, client, login, property_id):
+    login()
+    first_manager = add_manager(client, login, property_id, 'manager@example.com')
+    second_manager = add_manager(client, login, property_id, 'manager2@example.com')
+
+    etag = appliances(client, first_manager, property_id).headers['ETag']
+    hit = appliances(client, second_manager, property_id)
+    assert hit.headers['X-Cache'] == 'HIT'
+
+    # The view computes the same ETag for the second manager on a miss
+    get_response_cache(app).clear()
+    miss = appliances(client, second_manager, property_id)
+    assert miss.headers['X-Cache'] == 'MISS'
+    assert hit.headers['ETag'] == miss.headers['ETag'] == etag
+
+    response = client.get(URL, headers={**second_manager, 'If-None-Match': etag}, query_string={'property_id': property_id})
+    assert response.status_code == 304
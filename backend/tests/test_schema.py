@@ -0,0 +1,93 @@
+import pytest
+import sqlalchemy as sa
+from flask_migrate import upgrade
+
+from app import db
+from app.cli import get_migrate
+from app.utils.schema import (
+    BASELINE_REVISION, MIGRATIONS_DIR, SchemaError, find_adopted_revision, get_schema_status, reset_schema, upgrade_schema
+)
+
+
+@pytest.fixture
+def legacy_database(app):
+    """A database as create_all built it before migrations were committed"""
+    db.drop_all()
+    get_migrate(app)
+    upgrade(directory=MIGRATIONS_DIR, revision=BASELINE_REVISION)
+
+    def stamp(version=None):
+        with db.engine.begin() as conn:
+            conn.execute(sa.text('DELETE FROM alembic_version'))
+            if version:
+                conn.execute(sa.text('INSERT INTO alembic_version (version_num) VALUES (:v)'), {'v': version})
+            else:
+                conn.execute(sa.text('DROP TABLE alembic_version'))
+    return stamp
+
+
+def column_names(table):
+    return {column['name'] for column in sa.inspect(db.engine).get_columns(table)}
+
+
+@pytest.mark.parametrize('version', [None, '3f2a9c1b7d4e'])
+def test_upgrade_adopts_legacy_database(app, legacy_database, version):
+    legacy_database(version)
+    assert get_schema_status(db.engine)['status'] == 'unversioned'
+
+    assert upgrade_schema(app)['status'] == 'unversioned'
+
+    assert get_schema_status(db.engine)['status'] == 'current'
+    assert {'default_key', 'is_hidden'} <= column_names('maintenance_checklist_items')
+    assert sa.inspect(db.engine).has_table('sync_changes')
+
+
+def test_adopting_requires_the_baseline_tables(app, legacy_database):
+    legacy_database()
+    with db.engine.begin() as conn:
+        conn.execute(sa.text('DROP TABLE maintenance_checklist_items'))
+
+    with pytest.raises(SchemaError, match='maintenance_checklist_items'):
+        upgrade_schema(app)
+
+
+def test_strict_upgrade_refuses_legacy_database(app, legacy_database):
+    legacy_database()
+
+    with pytest.raises(SchemaError):
+        upgrade_schema(app, adopt_legacy=False)
+
+
+def test_upgrade_adopts_create_all_database(app):
+    # The app fixture builds the schema with create_all from the current models
+    assert get_schema_status(db.engine)['status'] == 'unversioned'
+    assert find_adopted_revision(db.engine) == get_schema_status(db.engine)['head'][0]
+
+    upgrade_schema(app)
+
+    assert get_schema_status(db.engine)['status'] == 'current'
+
+
+def test_adopting_applies_only_missing_migrations(app, legacy_database):
+    upgrade(directory=MIGRATIONS_DIR, revision='0003_sync_changes')
+    legacy_database()
+    assert find_adopted_revision(db.engine) == '0003_sync_changes'
+
+    upgrade_schema(app)
+
+    assert get_schema_status(db.engine)['status'] == 'current'
+    assert sa.inspect(db.engine).has_table('jobs')
+
+
+def test_adopting_refuses_gaps(app, legacy_database):
+    legacy_database()
+    db.metadata.create_all(db.engine, tables=[db.metadata.tables['jobs'], db.metadata.tables['dead_jobs']])
+
+    with pytest.raises(SchemaError, match='0002_checklist_defaults'):
+        upgrade_schema(app)
+
+
+def test_reset_schema_builds_from_migrations(app):
+    reset_schema(app)
+
+    assert get_schema_status(db.engine)['status'] == 'current'
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from app import db
+from app.models.appliance import Appliance
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.utils import serializers
+from app.utils.serializers import APPLIANCE, TENANT, TENANT_ACTIVE_FIELDS
+
+
+def iso(value):
+    return value.isoformat() if value else None
+
+
+def legacy_tenant(tenant):
+    """A tenant as GET /api/tenants/ built it by hand before serializers were compiled"""
+    prop = db.session.get(Property, tenant.property_id)
+    return {
+        'id': tenant.id,
+        'property_id': tenant.property_id,
+        'property': {'id': prop.id, 'address': prop.address, 'city': prop.city, 'state': prop.state},
+        'first_name': tenant.first_name,
+        'last_name': tenant.last_name,
+        'email': tenant.email,
+        'phone': tenant.phone,
+        'lease_start': iso(tenant.lease_start),
+        'lease_end': iso(tenant.lease_end),
+        'lease_end_date': iso(tenant.lease_end),
+        'monthly_rent': tenant.monthly_rent,
+        'security_deposit': tenant.security_deposit,
+        'rent_paid_through': iso(tenant.rent_paid_through),
+        'emergency_contact_name': tenant.emergency_contact_name,
+        'emergency_contact_phone': tenant.emergency_contact_phone,
+        'notes': tenant.notes,
+        'status': tenant.status,
+        'created_at': tenant.created_at.isoformat(),
+        'updated_at': tenant.updated_at.isoformat(),
+        'created_by': tenant.user_id
+    }
+
+
+def legacy_appliance(appliance):
+    return {
+        'id': appliance.id,
+        'name': appliance.name,
+        'brand': appliance.brand,
+        'model': appliance.model,
+        'serial_number': appliance.serial_number,
+        'purchase_date': iso(appliance.purchase_date),
+        'warranty_expiration': iso(appliance.warranty_expiration),
+        'notes': appliance.notes,
+        'category': appliance.category,
+        'created_at': appliance.created_at.isoformat(),
+        'updated_at': appliance.updated_at.isoformat(),
+        'property_id': appliance.property_id,
+        'created_by': appliance.user_id
+    }
+
+
+@pytest.fixture
+def records(client, login, property_id):
+    headers = login()
+    for name in ('Zoë', 'Ann'):
+        client.post('/api/tenants/', headers=headers, json={
+            'property_id': property_id, 'first_name': name, 'last_name': 'Lee', 'email': f'{name}@example.com',
+            'lease_start': '2024-01-01', 'lease_end': '2024-12-31', 'monthly_rent': 1450.5
+        })
+    client.post('/api/appliances/', headers=headers, json={
+        'name': 'Furnace', 'category': 'hvac', 'property_id': property_id, 'purchase_date': '2020-05-01'
+    })
+    return headers
+
+
+def test_lists_match_the_hand_built_responses(client, records):
+    tenants = client.get('/api/tenants/', headers=records).get_json()
+    appliances = client.get('/api/appliances/', headers=records).get_json()
+
+    assert tenants == [legacy_tenant(t) for t in Tenant.query.order_by(Tenant.created_at.desc())]
+    assert appliances == [legacy_appliance(a) for a in Appliance.query]
+
+
+def test_stdlib_json_writes_the_same_bytes(client, records, monkeypatch):
+    urls = ['/api/tenants/', '/api/appliances/', '/api/properties/']
+    with_orjson = [client.get(url, headers=records).get_data() for url in urls]
+
+    monkeypatch.setattr(serializers, 'orjson', None)
+    assert [client.get(url, headers=records).get_data() for url in urls] == with_orjson
+    assert 'Zoë'.encode() in with_orjson[0]
+
+
+def test_fields_narrow_the_response(client, records):
+    response = client.get('/api/tenants/?fields=first_name,id', headers=records)
+
+    assert response.status_code == 200
+    assert [set(tenant) for tenant in response.get_json()] == [{'id', 'first_name'}] * 2
+
+
+def test_unknown_fields_are_a_400_listing_the_available_ones(client, records):
+    response = client.get('/api/tenants/?fields=id,salary', headers=records)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f"Unknown fields: salary. Available: {', '.join(TENANT.fields)}"
+
+    # A view offering fewer fields only accepts those
+    response = client.get('/api/tenants/active?fields=notes', headers=records)
+    assert response.status_code == 400
+    assert response.get_json()['error'].endswith(f"Available: {', '.join(TENANT_ACTIVE_FIELDS)}")
+
+
+def test_projected_rows_dump_like_instances(app, records):
+    fields = ('id', 'property', 'first_name', 'lease_end_date', 'created_by')
+    assert TENANT.column_names(fields) == ['id', 'user_id', 'property_id', 'first_name', 'lease_end']
+
+    rows = TENANT.project(Tenant.query.order_by(Tenant.id), fields).all()
+    instances = Tenant.query.order_by(Tenant.id).all()
+    assert not isinstance(rows[0], Tenant)
+
+    context = {'properties': serializers.property_summaries(row.property_id for row in rows)}
+    assert TENANT.dump_many(rows, fields, context) == TENANT.dump_many(instances, fields, context)
+    assert json.loads(serializers.dumps(APPLIANCE.dump(Appliance.query.one())))['purchase_date'] == '2020-05-01'
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.models.user import User
+from app.utils import slow_query_log as slow_query_module
+from app.utils.slow_query_log import init_slow_query_log
+
+
+@pytest.fixture
+def slow_query_log(app, monkeypatch):
+    # Restored to None (disabled) after the test
+    monkeypatch.setattr(slow_query_module, 'slow_query_log', None)
+
+    def enable(**config):
+        app.config.update(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0,
+                          SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0, **config)
+        init_slow_query_log(app)
+        return slow_query_module.slow_query_log
+    return enable
+
+
+def lookup_records(log):
+    User.query.filter_by(email='secret@example.com').first()
+    return [r for r in log.records() if 'users.email' in r['statement']]
+
+
+def test_parameters_are_not_recorded_by_default(slow_query_log):
+    records = lookup_records(slow_query_log())
+
+    assert records
+    assert 'secret@example.com' not in json.dumps(records)
+    assert records[0]['parameters'][0] == 'str'
+
+
+def test_parameters_are_recorded_when_opted_in(slow_query_log):
+    records = lookup_records(slow_query_log(SLOW_QUERY_LOG_PARAMETERS=True))
+
+    assert 'secret@example.com' in records[0]['parameters']
+
+
+def test_plan_literals_are_masked():
+    plan = "Index Scan using ix_users_email on users\n  Index Cond: ((email)::text = 'it''s@example.com'::text)"
+
+    masked = slow_query_module.PLAN_LITERAL_PATTERN.sub("'?'", plan)
+
+    assert masked.endswith("Index Cond: ((email)::text = '?'::text)")
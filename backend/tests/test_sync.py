@@ -0,0 +1,137 @@
+from app import db
+from app.models.maintenance_checklist import MaintenanceChecklistItem
+from app.models.Property_user import PropertyUser
+from app.models.sync_change import SyncChange
+from app.models.user import User
+
+URL = '/api/sync/'
+CHECKLIST_URL = '/api/maintenance/checklist/'
+
+
+def sync(client, headers, since=0, **params):
+    response = client.get(URL, headers=headers, query_string={'since': since, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def add_item(client, headers, property_id, task='Check the boiler'):
+    response = client.post(CHECKLIST_URL, headers=headers, json={
+        'task': task,
+        'season': 'Fall',
+        'property_id': property_id
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_initial_sync_is_a_snapshot(client, login, property_id):
+    headers = login()
+
+    payload = sync(client, headers)
+
+    assert payload['reset'] is True
+    assert payload['reason'] == 'initial'
+    assert {'entity': 'property', 'id': property_id} in [
+        {'entity': change['entity'], 'id': change['id']} for change in payload['changes']
+    ]
+    assert payload['cursor'] == db.session.query(db.func.max(SyncChange.id)).scalar()
+
+
+def test_cursor_returns_changes_then_tombstones(client, login, property_id):
+    headers = login()
+    cursor = sync(client, headers)['cursor']
+
+    item_id = add_item(client, headers, property_id)
+    payload = sync(client, headers, cursor)
+    assert payload['reset'] is False
+    assert [(c['entity'], c['id'], c['op']) for c in payload['changes']] == [('checklist_item', item_id, 'upsert')]
+    assert payload['changes'][0]['data']['task'] == 'Check the boiler'
+
+    # Nothing new: same cursor, no changes
+    assert sync(client, headers, payload['cursor']) == {
+        'reset': False, 'cursor': payload['cursor'], 'has_more': False, 'changes': []
+    }
+
+    assert client.delete(f'{CHECKLIST_URL}{item_id}', headers=headers).status_code == 200
+    payload = sync(client, headers, payload['cursor'])
+    assert [(c['entity'], c['id'], c['op']) for c in payload['changes']] == [('checklist_item', item_id, 'delete')]
+
+
+def test_pages_follow_the_cursor(client, login, property_id):
+    headers = login()
+    cursor = sync(client, headers)['cursor']
+    item_ids = [add_item(client, headers, property_id, f'Task {n}') for n in range(3)]
+
+    seen = []
+    has_more = True
+    while has_more:
+        payload = sync(client, headers, cursor, limit=2)
+        seen.extend(change['id'] for change in payload['changes'])
+        assert payload['cursor'] > cursor
+        cursor, has_more = payload['cursor'], payload['has_more']
+
+    assert seen == item_ids
+
+
+def test_bulk_updates_are_logged(client, login, property_id):
+    headers = login()
+    item_ids = [add_item(client, headers, property_id, f'Task {n}') for n in range(2)]
+    cursor = sync(client, headers)['cursor']
+
+    client.put(f'{CHECKLIST_URL}batch-update', headers=headers, json={
+        'items': [{'id': item_id, 'is_completed': True} for item_id in item_ids]
+    })
+
+    payload = sync(client, headers, cursor)
+    assert sorted(c['id'] for c in payload['changes']) == item_ids
+    assert all(c['data']['is_completed'] for c in payload['changes'])
+
+
+def test_resets(client, login, property_id):
+    headers = login()
+    other_headers = login('manager@example.com')
+    cursor = sync(client, headers)['cursor']
+    other_cursor = sync(client, other_headers)['cursor']
+
+    payload = sync(client, headers, cursor + 1000)
+    assert (payload['reset'], payload['reason']) == (True, 'unknown_cursor')
+
+    # Gaining access to a property needs a fresh snapshot
+    manager = User.query.filter_by(email='manager@example.com').one()
+    db.session.add(PropertyUser(property_id=property_id, user_id=manager.id, role='manager', status='active'))
+    db.session.commit()
+    payload = sync(client, other_headers, other_cursor)
+    assert (payload['reset'], payload['reason']) == (True, 'memberships_changed')
+    assert property_id in [c['id'] for c in payload['changes'] if c['entity'] == 'property']
+
+
+def test_changes_are_logged_at_commit(app, login, property_id):
+    owner = User.query.filter_by(email='owner@example.com').one()
+    logged = SyncChange.query.count()
+
+    item = MaintenanceChecklistItem(user_id=owner.id, property_id=property_id, task='Kept', season='Fall')
+    db.session.add(item)
+    db.session.flush()
+    assert SyncChange.query.count() == logged
+
+    # A rolled-back savepoint leaves nothing behind
+    with db.session.begin_nested() as savepoint:
+        db.session.add(MaintenanceChecklistItem(user_id=owner.id, property_id=property_id, task='Dropped', season='Fall'))
+        db.session.flush()
+        savepoint.rollback()
+    db.session.commit()
+
+    changes = SyncChange.query.order_by(SyncChange.id).all()[logged:]
+    assert [(c.entity, c.entity_id, c.op) for c in changes] == [('checklist_item', item.id, 'upsert')]
+
+
+def test_rolled_back_changes_are_not_logged(app, login, property_id):
+    owner = User.query.filter_by(email='owner@example.com').one()
+    logged = SyncChange.query.count()
+
+    db.session.add(MaintenanceChecklistItem(user_id=owner.id, property_id=property_id, task='Dropped', season='Fall'))
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert SyncChange.query.count() == logged